@@ -0,0 +1,291 @@
+"""
+Almacén persistente de resultados
+=================================
+
+Guarda en disco (SQLite) los resultados de las integrales para que una
+sesión nueva no empiece en frío. Lo comparten la interfaz, sus procesos
+trabajadores y el motor por lotes, porque todos integran a través de
+integracion.py.
+
+Las claves combinan la forma canónica del integrando (``sp.srepr``), los
+límites exactos y la precisión: los resultados exactos se guardan con
+precisión 'exacta' y los numéricos con su tolerancia. También se guardan
+las antiderivadas. Cuando el archivo supera su tamaño máximo se descartan
+las entradas usadas hace más tiempo.
+
+Las expresiones se guardan con ``sp.srepr`` y se reconstruyen con
+leer_expresion, que solo admite constructores de SymPy y literales: el
+archivo puede haberse modificado y nunca se evalúa como código.
+
+El archivo vive en el directorio de caché del usuario. La variable de
+entorno ``CALCULADORA_ALMACEN`` permite indicar otro archivo, o desactivar
+el almacén con ``off``.
+"""
+
+import ast
+import hashlib
+import json
+import os
+import sqlite3
+import sys
+import threading
+import time
+
+# Tamaño máximo por defecto de los datos guardados (bytes)
+MAX_BYTES = 50 * 1024 * 1024
+
+# Al superar el máximo se descartan entradas hasta quedar en esta fracción
+FRACCION_TRAS_DESCARTE = 0.9
+
+VARIABLE_ENTORNO = 'CALCULADORA_ALMACEN'
+DESACTIVADO = ('off', '0', 'no')
+
+PRECISION_EXACTA = 'exacta'
+
+# Constructores de leer_expresion que reciben textos o argumentos con nombre
+# (el nombre del símbolo, las cifras del Float y sus opciones); el resto de
+# clases de SymPy convertirían un texto con sympify, que lo evalúa
+CONSTRUCTORES_LITERALES = ('Symbol', 'Dummy', 'Float')
+
+
+def directorio_cache():
+    """Directorio de caché del usuario según el sistema operativo."""
+    if os.name == 'nt':
+        base = os.environ.get('LOCALAPPDATA') or os.path.expanduser(r'~\AppData\Local')
+    elif sys.platform == 'darwin':
+        base = os.path.expanduser('~/Library/Caches')
+    else:
+        base = os.environ.get('XDG_CACHE_HOME') or os.path.expanduser('~/.cache')
+    return os.path.join(base, 'calculadora_multivariado')
+
+
+def ruta_por_defecto():
+    """Archivo del almacén, o None si está desactivado por la variable de entorno."""
+    ruta = os.environ.get(VARIABLE_ENTORNO)
+    if ruta is None:
+        return os.path.join(directorio_cache(), 'resultados.sqlite3')
+    if ruta.strip().lower() in DESACTIVADO:
+        return None
+    return ruta
+
+
+def clave(operacion, expr, variables, limites=(), precision=PRECISION_EXACTA):
+    """
+    Clave de una entrada del almacén.
+
+    Args:
+        operacion: Tipo de cálculo (ej: 'integral', 'antiderivada')
+        expr: Expresión de SymPy del integrando
+        variables: Símbolos de integración, en orden
+        limites: Pares (inferior, superior) exactos de cada variable
+        precision: PRECISION_EXACTA o la tolerancia del cálculo numérico
+
+    Returns:
+        Texto hexadecimal de longitud fija
+    """
+    import sympy as sp
+
+    partes = [operacion, sp.srepr(expr), [str(v) for v in variables],
+              [[sp.srepr(sp.sympify(a)), sp.srepr(sp.sympify(b))] for a, b in limites],
+              str(precision)]
+    return hashlib.sha256(json.dumps(partes).encode('utf-8')).hexdigest()
+
+
+def leer_expresion(texto):
+    """
+    Reconstruye una expresión guardada con sp.srepr sin evaluar código.
+
+    El texto se analiza con ast y solo se admiten llamadas a clases de
+    SymPy (Add, Integer, Symbol, sin...), sus constantes (pi, E, oo...) y
+    números. Los textos y argumentos con nombre solo se admiten en
+    CONSTRUCTORES_LITERALES.
+
+    Args:
+        texto: Resultado de sp.srepr leído del almacén
+
+    Returns:
+        Expresión de SymPy
+
+    Raises:
+        ValueError: Si el texto contiene cualquier otra cosa
+    """
+    import sympy as sp
+    from sympy.functions.elementary.piecewise import ExprCondPair
+
+    espacio = {'ExprCondPair': ExprCondPair}
+
+    def construir(nodo, literales=False):
+        if isinstance(nodo, ast.Constant):
+            if type(nodo.value) in (int, float) or (literales and type(nodo.value) in (str, bool)):
+                return nodo.value
+        elif isinstance(nodo, ast.UnaryOp) and isinstance(nodo.op, ast.USub):
+            valor = construir(nodo.operand)
+            if type(valor) in (int, float):
+                return -valor
+        elif isinstance(nodo, ast.Tuple):
+            return tuple(construir(elemento) for elemento in nodo.elts)
+        elif isinstance(nodo, ast.Name):
+            objeto = espacio.get(nodo.id, getattr(sp, nodo.id, None))
+            if isinstance(objeto, sp.Basic):
+                return objeto
+        elif isinstance(nodo, ast.Call) and isinstance(nodo.func, ast.Name):
+            clase = espacio.get(nodo.func.id, getattr(sp, nodo.func.id, None))
+            if isinstance(clase, type) and issubclass(clase, sp.Basic):
+                literales = nodo.func.id in CONSTRUCTORES_LITERALES
+                if nodo.keywords and not literales:
+                    raise ValueError(f"Argumentos con nombre no admitidos en {nodo.func.id}")
+                argumentos = [construir(a, literales) for a in nodo.args]
+                opciones = {k.arg: construir(k.value, literales) for k in nodo.keywords}
+                return clase(*argumentos, **opciones)
+        raise ValueError(f"Expresión no admitida en el almacén: {ast.dump(nodo)[:80]}")
+
+    try:
+        arbol = ast.parse(texto, mode='eval')
+    except SyntaxError as e:
+        raise ValueError(f"Expresión ilegible en el almacén: {e}") from None
+    return construir(arbol.body)
+
+
+class AlmacenResultados:
+    """
+    Almacén de resultados en un archivo SQLite con descarte por tamaño.
+
+    Los valores son diccionarios serializables a JSON. Los errores de disco
+    nunca interrumpen un cálculo: se tratan como fallos de consulta.
+
+    Attributes:
+        ruta: Archivo SQLite
+        max_bytes: Tamaño máximo de los datos guardados
+        aciertos: Consultas resueltas desde el almacén
+        fallos: Consultas sin entrada
+    """
+
+    def __init__(self, ruta, max_bytes=MAX_BYTES):
+        self.ruta = ruta
+        self.max_bytes = max_bytes
+        self.aciertos = 0
+        self.fallos = 0
+        self._candado = threading.Lock()
+        directorio = os.path.dirname(os.path.abspath(ruta))
+        os.makedirs(directorio, exist_ok=True)
+        self._conexion = sqlite3.connect(ruta, timeout=5, check_same_thread=False)
+        with self._conexion:
+            self._conexion.execute('PRAGMA journal_mode=WAL')
+            self._conexion.execute(
+                'CREATE TABLE IF NOT EXISTS entradas ('
+                ' clave TEXT PRIMARY KEY, datos TEXT NOT NULL,'
+                ' tamano INTEGER NOT NULL, usado REAL NOT NULL)')
+            self._conexion.execute(
+                'CREATE INDEX IF NOT EXISTS entradas_usado ON entradas (usado)')
+
+    def obtener(self, clave):
+        """
+        Devuelve los datos guardados con una clave, o None si no hay.
+
+        Una consulta acertada marca la entrada como usada recientemente.
+        """
+        try:
+            with self._candado, self._conexion:
+                fila = self._conexion.execute(
+                    'SELECT datos FROM entradas WHERE clave = ?', (clave,)).fetchone()
+                if fila is not None:
+                    self._conexion.execute('UPDATE entradas SET usado = ? WHERE clave = ?',
+                                           (time.time(), clave))
+        except sqlite3.Error:
+            fila = None
+        if fila is None:
+            self.fallos += 1
+            return None
+        self.aciertos += 1
+        return json.loads(fila[0])
+
+    def guardar(self, clave, datos):
+        """Guarda un diccionario con una clave y descarta entradas si hace falta."""
+        texto = json.dumps(datos, ensure_ascii=False)
+        try:
+            with self._candado, self._conexion:
+                self._conexion.execute(
+                    'INSERT OR REPLACE INTO entradas (clave, datos, tamano, usado) '
+                    'VALUES (?, ?, ?, ?)', (clave, texto, len(texto), time.time()))
+                self._descartar()
+        except sqlite3.Error:
+            pass
+
+    def _descartar(self):
+        """Elimina las entradas menos usadas si el total supera max_bytes."""
+        total = self._conexion.execute(
+            'SELECT COALESCE(SUM(tamano), 0) FROM entradas').fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        objetivo = total - FRACCION_TRAS_DESCARTE * self.max_bytes
+        liberado = 0
+        descartes = []
+        for clave, tamano in self._conexion.execute(
+                'SELECT clave, tamano FROM entradas ORDER BY usado'):
+            descartes.append((clave,))
+            liberado += tamano
+            if liberado >= objetivo:
+                break
+        self._conexion.executemany('DELETE FROM entradas WHERE clave = ?', descartes)
+
+    def limpiar(self):
+        """Borra todas las entradas y reinicia los contadores."""
+        try:
+            with self._candado, self._conexion:
+                self._conexion.execute('DELETE FROM entradas')
+        except sqlite3.Error:
+            pass
+        self.aciertos = 0
+        self.fallos = 0
+
+    def estadisticas(self):
+        """Devuelve un diccionario con el tamaño, los contadores y la ruta del almacén."""
+        try:
+            with self._candado:
+                entradas, total = self._conexion.execute(
+                    'SELECT COUNT(*), COALESCE(SUM(tamano), 0) FROM entradas').fetchone()
+        except sqlite3.Error:
+            entradas, total = 0, 0
+        return {'ruta': self.ruta, 'entradas': entradas, 'bytes': total,
+                'max_bytes': self.max_bytes, 'aciertos': self.aciertos,
+                'fallos': self.fallos}
+
+    def cerrar(self):
+        self._conexion.close()
+
+
+_almacen = None
+_pid = None
+
+
+def almacen():
+    """
+    Almacén compartido del proceso actual, o None si está desactivado.
+
+    La conexión se abre al primer uso y se vuelve a abrir en un proceso
+    hijo creado con fork, porque SQLite no admite compartirla.
+    """
+    global _almacen, _pid
+    ruta = ruta_por_defecto()
+    if ruta is None:
+        return None
+    if _almacen is None or _pid != os.getpid() or _almacen.ruta != ruta:
+        try:
+            _almacen = AlmacenResultados(ruta)
+        except (OSError, sqlite3.Error):
+            return None
+        _pid = os.getpid()
+    return _almacen
+
+
+def estadisticas_almacen():
+    """Estadísticas del almacén (útil como tarea de un trabajador); None si está desactivado."""
+    actual = almacen()
+    return None if actual is None else actual.estadisticas()
+
+
+def limpiar_almacen():
+    """Vacía el almacén compartido si está activo."""
+    actual = almacen()
+    if actual is not None:
+        actual.limpiar()
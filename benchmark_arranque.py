@@ -0,0 +1,142 @@
+"""
+Benchmark de arranque de la calculadora
+=======================================
+
+Mide, en procesos nuevos (arranque en frío):
+
+- Tiempo hasta la primera ventana: desde que se lanza el intérprete hasta
+  que la ventana principal está construida y dibujada.
+- Tiempo hasta el primer resultado: desde que se lanza el intérprete hasta
+  que aparece el resultado de la integral doble por defecto (x*y en [0,1]²).
+
+Uso:
+
+    python benchmark_arranque.py
+    python benchmark_arranque.py --repeticiones 5 --json arranque.json
+    python benchmark_arranque.py --max-ventana 1.0 --max-resultado 5.0
+
+Con --max-ventana y --max-resultado el script termina con código 1 si la
+mediana supera el límite, lo que permite detectar regresiones. Necesita
+una pantalla (o un servidor X virtual) porque crea la ventana real.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+DIRECTORIO = os.path.dirname(os.path.abspath(__file__))
+
+# Código que se ejecuta en el proceso medido
+_SONDA = r"""
+import json, sys, time
+import tkinter as tk
+import calculadora_multivariado as cm
+
+root = tk.Tk()
+app = cm.CalculadoraMultivariado(root)
+root.update()
+marcas = {'ventana': time.time()}
+
+mostrar_original = app.mostrar_resultado
+def capturar(texto):
+    mostrar_original(texto)
+    if texto.startswith("∬"):
+        marcas['resultado'] = time.time()
+        root.after(0, app.al_cerrar)
+app.mostrar_resultado = capturar
+
+app.calcular_integral_doble()
+root.after(int(float(sys.argv[1]) * 1000), app.al_cerrar)
+root.mainloop()
+print(json.dumps(marcas))
+"""
+
+
+def medir_arranque(limite=60.0):
+    """
+    Lanza la calculadora en un proceso nuevo y mide sus tiempos de arranque.
+
+    Args:
+        limite: Segundos máximos de espera por el primer resultado
+
+    Returns:
+        Diccionario con 'ventana' y 'resultado' en segundos (resultado es
+        None si no llegó dentro del límite)
+
+    Raises:
+        RuntimeError: Si el proceso falla (por ejemplo, sin pantalla)
+    """
+    inicio = time.time()
+    proceso = subprocess.run([sys.executable, '-c', _SONDA, str(limite)],
+                             cwd=DIRECTORIO, capture_output=True, text=True,
+                             timeout=limite + 30)
+    if proceso.returncode != 0:
+        raise RuntimeError(proceso.stderr.strip().splitlines()[-1]
+                           if proceso.stderr.strip() else "El proceso medido falló")
+    marcas = json.loads(proceso.stdout.strip().splitlines()[-1])
+    resultado = marcas.get('resultado')
+    return {
+        'ventana': marcas['ventana'] - inicio,
+        'resultado': None if resultado is None else resultado - inicio,
+    }
+
+
+def resumir(valores):
+    """Devuelve mínimo, mediana y máximo de una lista de tiempos."""
+    return {'min': min(valores), 'mediana': statistics.median(valores), 'max': max(valores)}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Mide el tiempo de arranque de la calculadora.")
+    parser.add_argument('-n', '--repeticiones', type=int, default=3)
+    parser.add_argument('--json', help="Guarda las mediciones en este archivo JSON")
+    parser.add_argument('--max-ventana', type=float,
+                        help="Falla si la mediana hasta la primera ventana supera estos segundos")
+    parser.add_argument('--max-resultado', type=float,
+                        help="Falla si la mediana hasta el primer resultado supera estos segundos")
+    args = parser.parse_args(argv)
+
+    mediciones = []
+    for i in range(args.repeticiones):
+        try:
+            medicion = medir_arranque()
+        except RuntimeError as e:
+            print(f"Error al medir el arranque: {e}", file=sys.stderr)
+            return 2
+        mediciones.append(medicion)
+        resultado = medicion['resultado']
+        print(f"Ejecución {i + 1}: ventana {medicion['ventana']:.3f} s, "
+              f"primer resultado {'—' if resultado is None else f'{resultado:.3f} s'}")
+
+    ventana = resumir([m['ventana'] for m in mediciones])
+    resultados = [m['resultado'] for m in mediciones if m['resultado'] is not None]
+    resultado = resumir(resultados) if resultados else None
+
+    print(f"Primera ventana:   mediana {ventana['mediana']:.3f} s "
+          f"(min {ventana['min']:.3f} s, max {ventana['max']:.3f} s)")
+    if resultado:
+        print(f"Primer resultado:  mediana {resultado['mediana']:.3f} s "
+              f"(min {resultado['min']:.3f} s, max {resultado['max']:.3f} s)")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as archivo:
+            json.dump({'mediciones': mediciones, 'ventana': ventana, 'resultado': resultado},
+                      archivo, indent=2)
+
+    regresion = False
+    if args.max_ventana is not None and ventana['mediana'] > args.max_ventana:
+        print(f"REGRESIÓN: la primera ventana tarda más de {args.max_ventana} s", file=sys.stderr)
+        regresion = True
+    if args.max_resultado is not None and (resultado is None
+                                           or resultado['mediana'] > args.max_resultado):
+        print(f"REGRESIÓN: el primer resultado tarda más de {args.max_resultado} s", file=sys.stderr)
+        regresion = True
+    return 1 if regresion else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
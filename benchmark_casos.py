@@ -0,0 +1,552 @@
+"""
+Benchmark de los casos de ejemplo
+=================================
+
+Reúne en un corpus los casos de ``ejemplos.md`` y de ``test_calculadora.py``
+y mide por separado, para cada uno:
+
+- analisis: convertir el texto de la función y de los límites con SymPy
+- simbolico: ``sp.integrate`` con los límites exactos (en un proceso aparte,
+  con plazo)
+- compilacion: ``sp.lambdify`` del integrando
+- numerico: el nivel numérico del motor (cubatura de Gauss–Kronrod)
+- grafico: la malla adaptativa (o las curvas de la región) y su dibujo con Agg
+
+Cada resultado se contrasta con el valor esperado que indica ``ejemplos.md``
+y, si no lo hay, el valor simbólico con el numérico.
+
+Uso:
+
+    python benchmark_casos.py
+    python benchmark_casos.py --repeticiones 5 --json base.json
+    python benchmark_casos.py --base base.json --umbral 1.5
+    python benchmark_casos.py --exportar-corpus casos.jsonl
+    python benchmark_casos.py --backends
+
+Con --backends se comparan los backends del núcleo de evaluación
+(numpy, numexpr y numba; ver expresiones.py) sobre una rejilla de un
+millón de puntos por caso, en lugar de medir las etapas.
+
+El corpus exportado es JSONL con el mismo formato de trabajo que acepta
+``python motor.py``. Con --base el script termina con código 1 si alguna
+etapa tarda más de umbral veces lo que tardaba en la base, o si algún
+resultado deja de coincidir con lo esperado.
+"""
+
+import argparse
+import ast
+import json
+import multiprocessing
+import os
+import platform
+import queue
+import re
+import statistics
+import sys
+import time
+
+import numpy as np
+import sympy as sp
+from sympy.parsing.sympy_parser import (implicit_multiplication_application,
+                                        parse_expr, standard_transformations)
+
+import motor
+from almacen import VARIABLE_ENTORNO
+from expresiones import BACKENDS, comparar_backends, normalizar
+from integracion import cuadratura_gauss_kronrod, cubatura_gauss_kronrod
+
+DIRECTORIO = os.path.dirname(os.path.abspath(__file__))
+
+ETAPAS = ('analisis', 'simbolico', 'compilacion', 'numerico', 'grafico')
+
+# Plazo por defecto de la etapa simbólica (segundos)
+PLAZO_BENCHMARK = 30.0
+
+# Tolerancias relativas al comparar resultados
+TOLERANCIA_EXACTA = 1e-6
+TOLERANCIA_APROXIMADA = 2e-2
+
+# Las etapas que tardan menos que esto no cuentan como regresión
+MINIMO_REGRESION = 0.005
+
+# Presupuesto de puntos del gráfico (el mismo de la pestaña de volúmenes)
+PRESUPUESTO_GRAFICO = 50 * 50
+
+_TRANSFORMACIONES = standard_transformations + (implicit_multiplication_application,)
+
+
+def _tipo_seccion(titulo):
+    """Tipo de trabajo según el título de una sección de ejemplos.md."""
+    titulo = titulo.lower()
+    if 'integral' in titulo:
+        return 'integral'
+    if 'área' in titulo or 'area' in titulo:
+        return 'area'
+    if 'volumen' in titulo:
+        return 'volumen'
+    return None
+
+
+def _valor_esperado(texto):
+    """
+    Convierte un resultado escrito a mano ('32/3 ≈ 10.667', '4π') en texto de SymPy.
+
+    Returns:
+        Tupla (esperado, aproximado): el texto de la expresión (o None si no
+        se pudo interpretar) y si el documento lo da solo como aproximación
+    """
+    aproximado = 'aproximadamente' in texto.lower()
+    texto = re.sub('(?i)aproximadamente', '', texto)
+    texto = texto.rsplit('=', 1)[-1].split('≈')[0]
+    texto = re.sub(r'√(\d+|\w)', r'sqrt(\1)', texto)
+    texto = texto.replace('²', '**2').replace('π', 'pi').strip()
+    try:
+        expr = parse_expr(texto, local_dict={'e': sp.E}, transformations=_TRANSFORMACIONES)
+    except Exception:
+        return None, aproximado
+    if expr.free_symbols:
+        return None, aproximado
+    return str(expr), aproximado
+
+
+def cargar_ejemplos(ruta=None):
+    """
+    Lee los casos de ejemplos.md.
+
+    Cada subsección '### ' con campos '- **Campo**: valor' y límites de x es
+    un caso; su tipo sale del título de la sección o de la subsección.
+
+    Returns:
+        Lista de casos con el formato de trabajo de motor.ejecutar_trabajo
+        más 'nombre', 'origen', 'esperado' y 'aproximado'
+    """
+    ruta = ruta or os.path.join(DIRECTORIO, 'ejemplos.md')
+    with open(ruta, encoding='utf-8') as archivo:
+        lineas = archivo.read().splitlines()
+
+    casos = []
+    seccion = None
+    actual = None
+
+    def cerrar():
+        if actual and 'x_min' in actual and actual.get('tipo'):
+            actual['id'] = f"ejemplos-{len(casos) + 1}"
+            casos.append(actual)
+
+    for linea in lineas:
+        if linea.startswith('## '):
+            cerrar()
+            actual = None
+            seccion = _tipo_seccion(linea)
+        elif linea.startswith('### '):
+            cerrar()
+            nombre = linea[4:].strip()
+            actual = {'nombre': nombre, 'origen': 'ejemplos.md',
+                      'tipo': seccion or _tipo_seccion(nombre),
+                      'esperado': None, 'aproximado': False}
+        elif actual is not None:
+            campo = re.match(r'-\s*\*\*(.+?)\*\*:\s*(.+)', linea.strip())
+            if not campo:
+                continue
+            clave, valor = campo.group(1).lower(), campo.group(2).strip()
+            limites = re.match(r'de\s+(.+?)\s+a\s+(.+)$', valor)
+            if clave == 'función':
+                actual['funcion'] = valor.strip('`')
+            elif clave == 'y superior':
+                actual['y_sup'] = valor.strip('`')
+            elif clave == 'y inferior':
+                actual['y_inf'] = valor.strip('`')
+            elif clave.startswith('límites') and limites:
+                variable = clave.split()[-1]
+                actual[f'{variable}_min'] = limites.group(1).strip('`')
+                actual[f'{variable}_max'] = limites.group(2).strip('`')
+            elif clave.startswith('resultado'):
+                actual['esperado'], actual['aproximado'] = _valor_esperado(valor)
+    cerrar()
+    return casos
+
+
+class _Sustituir(ast.NodeTransformer):
+    """Reemplaza nombres por las expresiones que se les asignaron."""
+
+    def __init__(self, asignaciones):
+        self.asignaciones = asignaciones
+
+    def visit_Name(self, nodo):
+        if nodo.id in self.asignaciones:
+            return self.visit(self.asignaciones[nodo.id])
+        return nodo
+
+
+def _texto(nodo):
+    """Código de un nodo como expresión de la calculadora (sin el prefijo sp.)."""
+    return ast.unparse(nodo).replace('sp.', '')
+
+
+def cargar_pruebas(ruta=None):
+    """
+    Lee los casos de test_calculadora.py a partir de sus llamadas a sp.integrate.
+
+    Las variables auxiliares (func1 = x*y) se sustituyen por su expresión;
+    las de símbolos (x = sp.symbols('x')) se dejan como están. Las
+    funciones de prueba de áreas dan casos de área (y_sup - y_inf) y las de
+    volúmenes, casos de volumen.
+
+    Returns:
+        Lista de casos con el formato de cargar_ejemplos (sin valor esperado)
+    """
+    ruta = ruta or os.path.join(DIRECTORIO, 'test_calculadora.py')
+    with open(ruta, encoding='utf-8') as archivo:
+        arbol = ast.parse(archivo.read())
+
+    casos = []
+    for funcion in arbol.body:
+        if not (isinstance(funcion, ast.FunctionDef) and funcion.name.startswith('test_')):
+            continue
+        asignaciones = {}
+        llamadas = []
+        for nodo in ast.walk(funcion):
+            if (isinstance(nodo, ast.Assign) and len(nodo.targets) == 1
+                    and isinstance(nodo.targets[0], ast.Name)
+                    and 'symbols' not in ast.unparse(nodo.value)):
+                asignaciones[nodo.targets[0].id] = nodo.value
+            elif (isinstance(nodo, ast.Call) and isinstance(nodo.func, ast.Attribute)
+                  and nodo.func.attr == 'integrate'):
+                llamadas.append(nodo)
+
+        sustituir = _Sustituir(asignaciones)
+        for llamada in sorted(llamadas, key=lambda nodo: nodo.lineno):
+            integrando = sustituir.visit(llamada.args[0])
+            limites = [[_texto(e) for e in limite.elts[1:]] for limite in llamada.args[1:]]
+            caso = {'id': f"test_calculadora-{len(casos) + 1}",
+                    'nombre': f"{funcion.name} (línea {llamada.lineno})",
+                    'origen': 'test_calculadora.py', 'esperado': None, 'aproximado': False}
+            if len(limites) == 1:
+                caso['tipo'] = 'area'
+                if isinstance(integrando, ast.BinOp) and isinstance(integrando.op, ast.Sub):
+                    caso['y_sup'], caso['y_inf'] = _texto(integrando.left), _texto(integrando.right)
+                else:
+                    caso['y_sup'], caso['y_inf'] = _texto(integrando), '0'
+                caso['x_min'], caso['x_max'] = limites[0]
+            else:
+                caso['tipo'] = 'volumen' if 'volumen' in funcion.name else 'integral'
+                caso['funcion'] = _texto(integrando)
+                (caso['x_min'], caso['x_max']), (caso['y_min'], caso['y_max']) = limites
+            casos.append(caso)
+    return casos
+
+
+def _firma(caso):
+    """Clave para reconocer el mismo cálculo escrito de dos formas."""
+    campos = ('funcion', 'y_sup', 'y_inf', 'x_min', 'x_max', 'y_min', 'y_max')
+    return tuple(normalizar(str(caso.get(campo, ''))) for campo in campos)
+
+
+def cargar_corpus(ruta_ejemplos=None, ruta_pruebas=None):
+    """
+    Une los casos de ejemplos.md y de test_calculadora.py sin repetir cálculos.
+
+    Si un caso aparece en ambos se conserva el de ejemplos.md, que trae el
+    valor esperado.
+    """
+    casos = cargar_ejemplos(ruta_ejemplos)
+    vistos = {_firma(caso) for caso in casos}
+    for caso in cargar_pruebas(ruta_pruebas):
+        if _firma(caso) not in vistos:
+            vistos.add(_firma(caso))
+            casos.append(caso)
+    return casos
+
+
+def _integrar_cronometrado(func, limites, cola):
+    """Ejecuta sp.integrate en un proceso hijo y envía el resultado y su duración."""
+    inicio = time.perf_counter()
+    try:
+        resultado = sp.integrate(func, *limites)
+        cola.put(("ok", resultado, time.perf_counter() - inicio))
+    except Exception as e:
+        cola.put(("error", str(e), time.perf_counter() - inicio))
+
+
+def _simbolico(func, limites, plazo):
+    """
+    Mide sp.integrate dentro de un proceso hijo para poder abandonarlo.
+
+    Returns:
+        Tupla (integral o None, segundos); si se agota el plazo los segundos
+        son el propio plazo
+    """
+    cola = multiprocessing.Queue()
+    proceso = multiprocessing.Process(target=_integrar_cronometrado,
+                                      args=(func, limites, cola), daemon=True)
+    proceso.start()
+    try:
+        estado, integral, duracion = cola.get(timeout=plazo)
+    except queue.Empty:
+        return None, plazo
+    finally:
+        if proceso.is_alive():
+            proceso.terminate()
+        proceso.join()
+    if estado != "ok" or integral.has(sp.Integral):
+        return None, duracion
+    return integral, duracion
+
+
+def _crear_gestor():
+    """Gestor de gráficos sobre un lienzo Agg (sin pantalla)."""
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+
+    from graficos import GestorGraficos
+
+    fig = Figure(figsize=(6, 4), dpi=80)
+    return GestorGraficos(fig, FigureCanvasAgg(fig))
+
+
+def _cronometrar(funcion):
+    inicio = time.perf_counter()
+    resultado = funcion()
+    return resultado, time.perf_counter() - inicio
+
+
+def medir_caso(caso, repeticiones=3, plazo=PLAZO_BENCHMARK, gestor=None):
+    """
+    Mide las etapas de un caso y comprueba su resultado.
+
+    Args:
+        caso: Caso del corpus
+        repeticiones: Veces que se repite cada etapa (se guarda la mediana)
+        plazo: Segundos máximos de la etapa simbólica
+        gestor: GestorGraficos para la etapa de gráfico (se crea si es None)
+
+    Returns:
+        Diccionario con los tiempos por etapa, los valores obtenidos y si
+        coinciden con lo esperado
+    """
+    gestor = gestor or _crear_gestor()
+    medicion = {'id': caso['id'], 'nombre': caso['nombre'], 'tipo': caso['tipo'],
+                'tiempos': {}, 'valores': {}, 'errores': []}
+    muestras = {etapa: [] for etapa in ETAPAS}
+    area = caso['tipo'] == 'area'
+    limites_texto = ([caso['x_min'], caso['x_max']] if area
+                     else [caso['x_min'], caso['x_max'], caso['y_min'], caso['y_max']])
+    integrando = f"({caso['y_sup']}) - ({caso['y_inf']})" if area else caso['funcion']
+
+    for _ in range(repeticiones):
+        try:
+            # Análisis sin caché: es lo que cuesta la primera vez
+            (func, limites), duracion = _cronometrar(
+                lambda: (sp.sympify(integrando), [sp.sympify(t) for t in limites_texto]))
+            muestras['analisis'].append(duracion)
+
+            if area:
+                orden = ((motor.X, limites[0], limites[1]),)
+                variables = (motor.X,)
+            else:
+                externa, interna, a, b, inferior, superior = motor.analizar_region(*limites)
+                orden = ((interna, inferior, superior), (externa, a, b))
+                variables = (motor.X, motor.Y)
+            integral, duracion = _simbolico(func, orden, plazo)
+            muestras['simbolico'].append(duracion)
+
+            nucleo, duracion = _cronometrar(lambda: sp.lambdify(variables, func, 'numpy'))
+            muestras['compilacion'].append(duracion)
+
+            if area:
+                resultado, duracion = _cronometrar(lambda: cuadratura_gauss_kronrod(
+                    nucleo, float(limites[0]), float(limites[1])))
+                numerico = resultado[0]
+            elif not (inferior.free_symbols or superior.free_symbols):
+                x_min, x_max, y_min, y_max = (float(l) for l in limites)
+                resultado, duracion = _cronometrar(lambda: cubatura_gauss_kronrod(
+                    nucleo, x_min, x_max, y_min, y_max))
+                numerico = resultado[0]
+            else:
+                resultado, duracion = _cronometrar(lambda: motor.calcular_integral_doble(
+                    caso['funcion'], *limites_texto, plazo=0))
+                numerico = resultado.valor
+            muestras['numerico'].append(duracion)
+
+            def graficar():
+                if area:
+                    x_vals, (y_sup, y_inf) = motor.curvas_region(
+                        caso['y_sup'], caso['y_inf'], caso['x_min'], caso['x_max'], 100)
+                    gestor.region(x_vals, y_sup, y_inf, caso['y_sup'], caso['y_inf'])
+                else:
+                    for malla in motor.malla_adaptativa(caso['funcion'], *limites_texto,
+                                                        PRESUPUESTO_GRAFICO):
+                        gestor.superficie(*malla, 'viridis', caso['nombre'])
+                gestor.fig.canvas.draw()
+            _, duracion = _cronometrar(graficar)
+            muestras['grafico'].append(duracion)
+        except Exception as e:
+            medicion['errores'].append(f"{type(e).__name__}: {e}")
+            break
+
+    medicion['tiempos'] = {etapa: statistics.median(valores)
+                           for etapa, valores in muestras.items() if valores}
+    if medicion['errores']:
+        medicion['correcto'] = False
+        return medicion
+
+    simbolico = None if integral is None else float(integral.evalf())
+    medicion['valores'] = {'simbolico': simbolico, 'numerico': numerico,
+                           'exacto': None if integral is None else str(integral)}
+    medicion['correcto'] = _comprobar(caso, simbolico, numerico, medicion['errores'])
+    return medicion
+
+
+def _comprobar(caso, simbolico, numerico, errores):
+    """Compara los valores con el esperado o, si no lo hay, entre sí."""
+    if caso.get('esperado') is not None:
+        referencia = float(sp.sympify(caso['esperado']))
+        tolerancia = TOLERANCIA_APROXIMADA if caso.get('aproximado') else TOLERANCIA_EXACTA
+        origen = f"el esperado ({caso['esperado']})"
+    elif simbolico is not None:
+        referencia, tolerancia, origen = simbolico, TOLERANCIA_EXACTA, "el simbólico"
+    else:
+        return True
+
+    correcto = True
+    for nombre, valor in (('simbólico', simbolico), ('numérico', numerico)):
+        if valor is not None and abs(valor - referencia) > tolerancia * max(1.0, abs(referencia)):
+            errores.append(f"El valor {nombre} {valor:.10g} no coincide con {origen}")
+            correcto = False
+    return correcto
+
+
+def comparar(mediciones, base, umbral):
+    """
+    Compara los tiempos con los de una ejecución anterior.
+
+    Args:
+        mediciones: Lista devuelta por medir_caso
+        base: Contenido del JSON guardado por una ejecución anterior
+        umbral: Cociente de tiempos a partir del cual una etapa es regresión
+
+    Returns:
+        Lista de textos que describen las regresiones
+    """
+    anteriores = {m['id']: m for m in base.get('casos', [])}
+    regresiones = []
+    for medicion in mediciones:
+        anterior = anteriores.get(medicion['id'])
+        if anterior is None:
+            continue
+        for etapa, tiempo in medicion['tiempos'].items():
+            previo = anterior['tiempos'].get(etapa)
+            if previo and tiempo > umbral * previo and tiempo - previo > MINIMO_REGRESION:
+                regresiones.append(f"{medicion['id']} ({medicion['nombre']}): {etapa} "
+                                   f"{previo:.4f} s → {tiempo:.4f} s (×{tiempo / previo:.1f})")
+        if anterior.get('correcto') and not medicion['correcto']:
+            regresiones.append(f"{medicion['id']} ({medicion['nombre']}): el resultado "
+                               "ya no coincide con lo esperado")
+    return regresiones
+
+
+def medir_backends(casos, puntos=10**6):
+    """
+    Compara los backends del núcleo en cada caso e imprime una tabla.
+
+    Returns:
+        Lista de diccionarios {'id', 'backends'} con lo que devuelve
+        comparar_backends
+    """
+    print(f"{'caso':<26}" + "".join(f"{backend:>13}" for backend in BACKENDS) + "  diferencia")
+    mediciones = []
+    for caso in casos:
+        if caso['tipo'] == 'area':
+            fuente, variables = f"({caso['y_sup']}) - ({caso['y_inf']})", (motor.X,)
+        else:
+            fuente, variables = caso['funcion'], (motor.X, motor.Y)
+        resultados = comparar_backends(fuente, variables, puntos)
+        mediciones.append({'id': caso['id'], 'backends': resultados})
+        columnas = "".join(f"{r['evaluacion'] * 1000:>10.1f} ms" if r else f"{'—':>13}"
+                           for r in resultados.values())
+        diferencia = max((r['diferencia'] for r in resultados.values() if r), default=0.0)
+        print(f"{caso['id']:<26}{columnas}  {diferencia:.1e}")
+    return mediciones
+
+
+def versiones():
+    """Versiones de Python y de las librerías que influyen en los tiempos."""
+    import matplotlib
+    return {'python': platform.python_version(), 'sympy': sp.__version__,
+            'numpy': np.__version__, 'matplotlib': matplotlib.__version__}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Mide los casos de ejemplo por etapas.")
+    parser.add_argument('-n', '--repeticiones', type=int, default=3)
+    parser.add_argument('--plazo', type=float, default=PLAZO_BENCHMARK,
+                        help="Segundos máximos de la etapa simbólica de cada caso")
+    parser.add_argument('-k', '--filtro', help="Solo los casos cuyo id o nombre contengan este texto")
+    parser.add_argument('--json', help="Guarda las mediciones en este archivo JSON")
+    parser.add_argument('--base', help="Compara con un JSON guardado antes con --json")
+    parser.add_argument('--umbral', type=float, default=1.5,
+                        help="Cociente de tiempos que se considera regresión")
+    parser.add_argument('--exportar-corpus', help="Guarda el corpus como JSONL y termina")
+    parser.add_argument('--backends', action='store_true',
+                        help="Compara los backends del núcleo (numpy, numexpr, numba) y termina")
+    args = parser.parse_args(argv)
+    # Los tiempos deben medir el cálculo, no una lectura del almacén persistente
+    os.environ[VARIABLE_ENTORNO] = 'off'
+
+    casos = cargar_corpus()
+    if args.filtro:
+        casos = [c for c in casos if args.filtro in c['id'] or args.filtro in c['nombre']]
+
+    if args.exportar_corpus:
+        with open(args.exportar_corpus, 'w', encoding='utf-8') as archivo:
+            for caso in casos:
+                archivo.write(json.dumps(caso, ensure_ascii=False) + "\n")
+        print(f"{len(casos)} casos guardados en {args.exportar_corpus}")
+        return 0
+
+    if args.backends:
+        mediciones = medir_backends(casos)
+        if args.json:
+            with open(args.json, 'w', encoding='utf-8') as archivo:
+                json.dump({'versiones': versiones(), 'backends': mediciones}, archivo,
+                          indent=2, ensure_ascii=False)
+        return 0
+
+    # Las importaciones perezosas de lambdify y de matplotlib no cuentan en el primer caso
+    gestor = _crear_gestor()
+    sp.lambdify(motor.X, motor.X, 'numpy')
+    gestor.fig.canvas.draw()
+
+    mediciones = []
+    print(f"{'caso':<26}" + "".join(f"{etapa:>13}" for etapa in ETAPAS) + "  resultado")
+    for caso in casos:
+        medicion = medir_caso(caso, args.repeticiones, args.plazo, gestor)
+        mediciones.append(medicion)
+        tiempos = "".join(f"{medicion['tiempos'][e] * 1000:>10.1f} ms" if e in medicion['tiempos']
+                          else f"{'—':>13}" for e in ETAPAS)
+        print(f"{medicion['id']:<26}{tiempos}  {'ok' if medicion['correcto'] else 'FALLO'}")
+        for error in medicion['errores']:
+            print(f"    {error}", file=sys.stderr)
+
+    informe = {'versiones': versiones(), 'repeticiones': args.repeticiones,
+               'casos': mediciones}
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as archivo:
+            json.dump(informe, archivo, indent=2, ensure_ascii=False)
+
+    fallos = [m for m in mediciones if not m['correcto']]
+    regresiones = []
+    if args.base:
+        with open(args.base, encoding='utf-8') as archivo:
+            base = json.load(archivo)
+        regresiones = comparar(mediciones, base, args.umbral)
+        print(f"Comparado con {args.base} (sympy {base.get('versiones', {}).get('sympy', '?')})")
+        for regresion in regresiones:
+            print(f"REGRESIÓN: {regresion}", file=sys.stderr)
+
+    print(f"{len(mediciones)} casos, {len(fallos)} con resultado incorrecto")
+    return 1 if fallos or regresiones else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
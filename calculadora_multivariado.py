@@ -13,23 +13,82 @@ Funcionalidades:
 - Integrales dobles en coordenadas rectangulares
 - Cálculo de áreas entre curvas
 - Cálculo de volúmenes bajo superficies
+- Gradiente, hessiana, puntos críticos y multiplicadores de Lagrange
 - Visualización 3D interactiva
 - Interfaz gráfica amigable
 """
 
 import tkinter as tk
-from tkinter import ttk, messagebox, scrolledtext
-import numpy as np
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-from matplotlib.figure import Figure
-import sympy as sp
-from mpl_toolkits.mplot3d import Axes3D
+from tkinter import ttk, messagebox, scrolledtext, filedialog
+import importlib
+import os
+import threading
+import time
 import warnings
+from ejecucion import EjecutorTareas
+from perfilado import exportar_chrome, Perfilador
 warnings.filterwarnings('ignore')
 
-# Configuración de estilo matplotlib
-plt.style.use('seaborn-v0_8' if 'seaborn-v0_8' in plt.style.available else 'default')
+# Módulos pesados que no hacen falta para mostrar la ventana. Se cargan en un
+# hilo de precarga después de mostrarla (o en el primer uso si la precarga no
+# terminó). Los cálculos se hacen en los trabajadores; aquí SymPy solo hace
+# falta para recibir sus resultados.
+MODULOS_PRECARGA = (
+    'numpy',
+    'matplotlib.figure',
+    'matplotlib.backends.backend_tkagg',
+    'mpl_toolkits.mplot3d',
+    'graficos',
+    'integracion',
+)
+
+# Presupuesto de puntos de las superficies adaptativas
+PRESUPUESTO_FUNCION = 100 * 100
+PRESUPUESTO_SUPERFICIE = 50 * 50
+
+# Puntos por eje de la malla del campo de gradiente (la de graficar_funcion)
+PUNTOS_CAMPO = 100
+
+# Puntos por eje por defecto de una malla exportada
+PUNTOS_EXPORTACION = 4000
+
+# Límites que puede recorrer un barrido (los mismos que integracion.LIMITES)
+LIMITES_BARRIDO = ('x_min', 'x_max', 'y_min', 'y_max')
+
+# Milisegundos sin escribir tras los que se recalcula la vista previa en vivo
+RETARDO_VISTA_PREVIA_MS = 400
+
+# Filas de la tabla de un barrido que se muestran como máximo
+FILAS_TABLA_BARRIDO = 25
+
+# Cifras significativas que se pueden pedir; la primera es la doble precisión
+PRECISIONES = ('15', '30', '50', '100')
+
+# Reglas de cuadratura de los datos medidos (las mismas que mallas.REGLAS)
+REGLAS_DATOS = ('simpson', 'trapecio', 'romberg')
+
+# Métodos de Monte Carlo (los mismos que montecarlo.METODOS)
+METODOS_MONTECARLO = ('sobol', 'halton', 'mc')
+
+# Sistemas de coordenadas por dimensión y nombres de sus variables, de la
+# exterior a la interior (los mismos que coordenadas.SISTEMAS)
+COORDENADAS = {2: ('cartesianas', 'polares'), 3: ('cartesianas', 'cilindricas', 'esfericas')}
+VARIABLES_COORDENADAS = {
+    ('cartesianas', 2): ('x', 'y'),
+    ('polares', 2): ('r', 'theta'),
+    ('cartesianas', 3): ('x', 'y', 'z'),
+    ('cilindricas', 3): ('theta', 'r', 'z'),
+    ('esfericas', 3): ('theta', 'phi', 'rho'),
+}
+
+MENSAJE_INICIAL_GRAFICO = ('📊 Área de Visualización\n\n🎯 Selecciona una función y presiona\n'
+                           '"Graficar" para ver la visualización')
+
+
+def precargar_modulos():
+    """Importa los módulos pesados; pensada para ejecutarse en un hilo."""
+    for nombre in MODULOS_PRECARGA:
+        importlib.import_module(nombre)
 
 class CalculadoraMultivariado:
     """
@@ -40,9 +99,9 @@ class CalculadoraMultivariado:
     
     Attributes:
         root: Ventana principal de tkinter
-        x, y: Variables simbólicas de SymPy
-        fig: Figura de matplotlib para gráficos
-        canvas: Canvas de matplotlib integrado en tkinter
+        fig: Figura de matplotlib para gráficos (None hasta que se crea)
+        canvas: Canvas de matplotlib integrado en tkinter (None hasta que se crea)
+        ejecutor: Grupo de procesos donde se hacen los cálculos
     """
     
     def __init__(self, root):
@@ -61,8 +120,35 @@ class CalculadoraMultivariado:
         self.root.resizable(True, True)
         self.root.minsize(1200, 800)
         
-        # Variables simbólicas para cálculos
-        self.x, self.y = sp.symbols('x y')
+        # Segundos concedidos a la integración simbólica antes de pasar a la
+        # numérica; None usa el plazo por defecto del motor
+        self.plazo_simbolico = None
+        
+        # Procesos de cálculo en segundo plano (uno activo por pestaña)
+        self.ejecutor = EjecutorTareas(self.root)
+        self.root.protocol("WM_DELETE_WINDOW", self.al_cerrar)
+        
+        # La figura de matplotlib se crea después de mostrar la ventana
+        self.fig = None
+        self.canvas = None
+        
+        # Controles de barrido de límites de cada pestaña
+        self.barridos = {}
+        
+        # Selector de cifras significativas de cada pestaña
+        self.precisiones = {}
+        
+        # Controles de Monte Carlo de cada pestaña
+        self.montecarlo = {}
+        
+        # Selector de sistema de coordenadas de cada pestaña
+        self.coordenadas = {}
+        
+        # Casilla de vista previa en vivo y campos que la alimentan, por pestaña
+        self.vista_previa = {}
+        
+        # Etapas medidas cuando el panel de perfilado está activo
+        self.perfil = Perfilador()
         
         # Configurar estilos
         self.configurar_estilos()
@@ -70,6 +156,9 @@ class CalculadoraMultivariado:
         # Crear la interfaz
         self.crear_interfaz()
         
+        # Precargar módulos y un trabajador cuando la ventana ya esté visible
+        self.root.after_idle(self.precalentar)
+        
     def configurar_estilos(self):
         """Configura los estilos visuales de la aplicación."""
         style = ttk.Style()
@@ -134,7 +223,7 @@ class CalculadoraMultivariado:
         titulo.pack()
         
         subtitulo = tk.Label(titulo_frame,
-                           text="Integrales Dobles • Áreas • Volúmenes • Visualización 3D",
+                           text="Integrales Dobles • Áreas • Volúmenes • Derivadas • Visualización 3D",
                            font=('Segoe UI', 10),
                            fg='#bdc3c7',
                            bg='#2c3e50')
@@ -157,6 +246,8 @@ class CalculadoraMultivariado:
         self.crear_tab_integral_doble()
         self.crear_tab_area()
         self.crear_tab_volumen()
+        self.crear_tab_integral_triple()
+        self.crear_tab_derivadas()
         self.crear_tab_ayuda()
         
         # Frame derecho para gráficos con estilo mejorado
@@ -170,13 +261,19 @@ class CalculadoraMultivariado:
         self.graph_frame.columnconfigure(0, weight=1)
         self.graph_frame.rowconfigure(0, weight=1)
         
-        # Crear figura de matplotlib con estilo mejorado
-        self.fig = Figure(figsize=(10, 7), dpi=100, facecolor='#ecf0f1')
-        self.canvas = FigureCanvasTkAgg(self.fig, self.graph_frame)
-        self.canvas.get_tk_widget().grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
+        # Marcador con el mensaje inicial mientras se carga matplotlib
+        self.grafico_provisional = tk.Label(self.graph_frame,
+                                            text=MENSAJE_INICIAL_GRAFICO,
+                                            font=('Segoe UI', 14),
+                                            fg='white',
+                                            bg='#3498db')
+        self.grafico_provisional.grid(row=0, column=0)
         
-        # Mensaje inicial en el gráfico
-        self.mostrar_mensaje_inicial()
+        # Tiempo del último redibujado del gráfico
+        self.tiempo_grafico_label = tk.Label(self.graph_frame, text="",
+                                             font=('Segoe UI', 8),
+                                             fg='#7f8c8d')
+        self.tiempo_grafico_label.grid(row=1, column=0, sticky=tk.E)
         
         # Frame para resultados con estilo mejorado
         result_frame = ttk.LabelFrame(main_frame, 
@@ -199,11 +296,18 @@ class CalculadoraMultivariado:
         )
         self.result_text.grid(row=0, column=0, sticky=(tk.W, tk.E))
         
+        # Panel opcional con el tiempo y la memoria de cada etapa
+        self.perfil_activo = tk.BooleanVar(value=False)
+        ttk.Checkbutton(result_frame, text="⏱ Perfilar etapas",
+                        variable=self.perfil_activo,
+                        command=self.alternar_perfil).grid(row=1, column=0, sticky=tk.W, pady=(5, 0))
+        self.crear_panel_perfil(result_frame)
+        
         # Mensaje de bienvenida
         mensaje_bienvenida = """🎯 ¡Bienvenido a la Calculadora de Cálculo Multivariado!
 
 📚 Funcionalidades disponibles:
-• Integrales Dobles: Calcula ∫∫ f(x,y) dxdy sobre regiones rectangulares
+• Integrales Dobles: Calcula ∫∫ f(x,y) dxdy sobre rectángulos y regiones de tipo I/II
 • Cálculo de Áreas: Determina áreas entre curvas
 • Cálculo de Volúmenes: Encuentra volúmenes bajo superficies
 
@@ -212,26 +316,153 @@ class CalculadoraMultivariado:
 • Funciones disponibles: sin, cos, tan, exp, log, sqrt
 • Constantes: pi, E
 • Variables: solo x e y
+• Límites exactos: pi/2, E, sqrt(2)...
+• Regiones: los límites de y pueden depender de x (ej: de x**2 a x) o los de x de y
 
 🚀 ¡Selecciona una pestaña y comienza a calcular!
 """
         self.result_text.insert(tk.END, mensaje_bienvenida)
         
+    def precalentar(self):
+        """
+        Prepara en segundo plano lo que necesitará el primer resultado.
+        
+        Arranca un trabajador que carga el motor de cálculo y un hilo que
+        importa matplotlib; cuando el hilo termina se crea la figura.
+        """
+        self.ejecutor.enviar('precalentar', 'motor.precalentar')
+        self.hilo_precarga = threading.Thread(target=precargar_modulos, daemon=True)
+        self.hilo_precarga.start()
+        self.root.after(100, self.esperar_precarga)
+    
+    def esperar_precarga(self):
+        """Crea la figura en el hilo de Tk cuando la precarga ha terminado."""
+        if self.hilo_precarga.is_alive():
+            self.root.after(100, self.esperar_precarga)
+        else:
+            self.asegurar_figura()
+    
+    def asegurar_figura(self):
+        """Crea la figura de matplotlib y su canvas si todavía no existen."""
+        if self.fig is not None:
+            return
+        import matplotlib.style
+        from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+        from matplotlib.figure import Figure
+        from graficos import GestorGraficos
+        
+        # Configuración de estilo matplotlib
+        matplotlib.style.use('seaborn-v0_8' if 'seaborn-v0_8' in matplotlib.style.available else 'default')
+        
+        # Crear figura de matplotlib con estilo mejorado
+        self.fig = Figure(figsize=(10, 7), dpi=100, facecolor='#ecf0f1')
+        self.canvas = FigureCanvasTkAgg(self.fig, self.graph_frame)
+        self.grafico_provisional.destroy()
+        self.canvas.get_tk_widget().grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
+        
+        # Los gráficos se actualizan en su lugar en vez de rehacer la figura
+        self.graficos = GestorGraficos(self.fig, self.canvas,
+                                       al_dibujar=self.mostrar_tiempo_grafico)
+        
+        # Mensaje inicial en el gráfico
+        self.mostrar_mensaje_inicial()
+    
     def mostrar_mensaje_inicial(self):
         """Muestra un mensaje inicial en el área de gráficos."""
-        self.fig.clear()
-        ax = self.fig.add_subplot(111)
-        ax.text(0.5, 0.5, '📊 Área de Visualización\n\n🎯 Selecciona una función y presiona\n"Graficar" para ver la visualización', 
-                horizontalalignment='center',
-                verticalalignment='center',
-                transform=ax.transAxes,
-                fontsize=14,
-                bbox=dict(boxstyle="round,pad=0.3", facecolor='#3498db', alpha=0.7),
-                color='white')
-        ax.set_xlim(0, 1)
-        ax.set_ylim(0, 1)
-        ax.axis('off')
-        self.canvas.draw()
+        self.graficos.mostrar_mensaje(MENSAJE_INICIAL_GRAFICO)
+    
+    def mostrar_tiempo_grafico(self, duracion):
+        """Muestra la duración del último redibujado y la media reciente."""
+        self.tiempo_grafico_label.config(
+            text=f"Redibujado: {duracion * 1000:.0f} ms "
+                 f"(media {self.graficos.tiempo_medio * 1000:.0f} ms)")
+        if self.perfil_activo.get():
+            evento = self.perfil.registrar('canvas.draw', time.time() - duracion, duracion)
+            self.agregar_fila_perfil('', evento)
+    
+    def crear_panel_perfil(self, parent):
+        """Crea el panel de perfilado (oculto hasta que se activa)."""
+        self.perfil_frame = ttk.Frame(parent)
+        self.perfil_frame.grid(row=0, column=1, sticky=(tk.N, tk.S), padx=(10, 0))
+        
+        self.perfil_tree = ttk.Treeview(self.perfil_frame, columns=('tiempo', 'memoria'), height=6)
+        self.perfil_tree.heading('#0', text='Etapa')
+        self.perfil_tree.heading('tiempo', text='Tiempo (ms)')
+        self.perfil_tree.heading('memoria', text='Memoria pico (KB)')
+        self.perfil_tree.column('#0', width=200)
+        self.perfil_tree.column('tiempo', width=90, anchor=tk.E)
+        self.perfil_tree.column('memoria', width=120, anchor=tk.E)
+        self.perfil_tree.grid(row=0, column=0, columnspan=2)
+        
+        ttk.Button(self.perfil_frame, text="💾 Exportar traza",
+                   command=self.exportar_traza).grid(row=1, column=0, sticky=tk.W, pady=(5, 0))
+        ttk.Button(self.perfil_frame, text="🧹 Limpiar",
+                   command=self.limpiar_perfil).grid(row=1, column=1, sticky=tk.E, pady=(5, 0))
+        self.perfil_frame.grid_remove()
+    
+    def alternar_perfil(self):
+        """Muestra u oculta el panel de perfilado."""
+        if self.perfil_activo.get():
+            self.perfil_frame.grid()
+        else:
+            self.perfil_frame.grid_remove()
+    
+    def enviar_tarea(self, clave, funcion, *args, **kwargs):
+        """
+        Envía una tarea al ejecutor, perfilada si el panel está activo.
+        
+        Args:
+            clave: Clave de la tarea (ej: 'integral' o 'volumen_grafico')
+            funcion: Nombre de la función del motor
+            *args, **kwargs: Argumentos y callbacks de EjecutorTareas.enviar
+        """
+        if self.perfil_activo.get():
+            inicio = time.time()
+            kwargs['al_perfil'] = lambda eventos: self.registrar_perfil(clave, inicio, eventos)
+        return self.ejecutor.enviar(clave, funcion, *args, **kwargs)
+    
+    def registrar_perfil(self, clave, inicio, eventos):
+        """
+        Añade al panel las etapas medidas en un trabajador.
+        
+        Args:
+            clave: Clave de la tarea
+            inicio: Instante en que se envió la tarea (time.time())
+            eventos: Etapas devueltas por el trabajador
+        """
+        tarea = self.perfil.registrar(f'tarea {clave}', inicio, time.time() - inicio)
+        self.perfil.eventos.extend(eventos)
+        fila = self.agregar_fila_perfil('', tarea)
+        for evento in sorted(eventos, key=lambda e: e['inicio']):
+            self.agregar_fila_perfil(fila, evento)
+        self.perfil_tree.see(fila)
+    
+    def agregar_fila_perfil(self, padre, evento):
+        """Inserta una etapa en el panel y devuelve el identificador de la fila."""
+        memoria = '' if evento['memoria'] is None else f"{evento['memoria'] / 1024:.0f}"
+        return self.perfil_tree.insert(padre, tk.END,
+                                       text='  ' * evento['nivel'] + evento['nombre'],
+                                       values=(f"{evento['duracion'] * 1000:.1f}", memoria))
+    
+    def limpiar_perfil(self):
+        """Descarta las etapas medidas."""
+        self.perfil.eventos = []
+        self.perfil_tree.delete(*self.perfil_tree.get_children())
+    
+    def exportar_traza(self):
+        """Guarda las etapas medidas como traza de Chrome (chrome://tracing o Perfetto)."""
+        if not self.perfil.eventos:
+            messagebox.showinfo("Perfilado", "Todavía no hay etapas medidas.")
+            return
+        ruta = filedialog.asksaveasfilename(defaultextension='.json',
+                                            filetypes=[("Traza de Chrome", "*.json")],
+                                            initialfile='traza.json')
+        if not ruta:
+            return
+        procesos = {evento['pid']: 'trabajador' for evento in self.perfil.eventos}
+        procesos[os.getpid()] = 'interfaz'
+        exportar_chrome(self.perfil.eventos, ruta, procesos)
+        self.mostrar_resultado(f"💾 Traza guardada en {ruta}\n")
         
     def crear_tab_integral_doble(self):
         """Crea la pestaña para cálculo de integrales dobles."""
@@ -254,7 +485,8 @@ class CalculadoraMultivariado:
         limits_frame.grid(row=1, column=0, columnspan=2, pady=(10, 20), sticky=(tk.W, tk.E))
         
         # Límites de x
-        ttk.Label(limits_frame, text="Límites de x:", font=('Segoe UI', 9, 'bold')).grid(row=0, column=0, sticky=tk.W, pady=5)
+        x_label = ttk.Label(limits_frame, text="Límites de x:", font=('Segoe UI', 9, 'bold'))
+        x_label.grid(row=0, column=0, sticky=tk.W, pady=5)
         x_frame = ttk.Frame(limits_frame)
         x_frame.grid(row=0, column=1, pady=5, padx=(10, 0))
         
@@ -269,7 +501,8 @@ class CalculadoraMultivariado:
         self.x_max_entry.insert(0, "1")
         
         # Límites de y
-        ttk.Label(limits_frame, text="Límites de y:", font=('Segoe UI', 9, 'bold')).grid(row=1, column=0, sticky=tk.W, pady=5)
+        y_label = ttk.Label(limits_frame, text="Límites de y:", font=('Segoe UI', 9, 'bold'))
+        y_label.grid(row=1, column=0, sticky=tk.W, pady=5)
         y_frame = ttk.Frame(limits_frame)
         y_frame.grid(row=1, column=1, pady=5, padx=(10, 0))
         
@@ -283,6 +516,8 @@ class CalculadoraMultivariado:
         self.y_max_entry.grid(row=0, column=3, padx=2)
         self.y_max_entry.insert(0, "1")
         
+        self.crear_selector_coordenadas(limits_frame, 2, 'integral', (x_label, y_label))
+        
         # Botones con estilo mejorado
         button_frame = ttk.Frame(integral_frame)
         button_frame.grid(row=2, column=0, columnspan=2, pady=20)
@@ -295,7 +530,40 @@ class CalculadoraMultivariado:
         graph_btn = ttk.Button(button_frame, text="📊 Graficar Función", 
                               style='Custom.TButton',
                               command=self.graficar_funcion)
-        graph_btn.grid(row=0, column=1)
+        graph_btn.grid(row=0, column=1, padx=(0, 10))
+        
+        cancel_btn = ttk.Button(button_frame, text="⏹ Cancelar", 
+                               style='Custom.TButton',
+                               command=lambda: self.cancelar_tab('integral'))
+        cancel_btn.grid(row=0, column=2)
+        
+        self.crear_selector_precision(button_frame, 3, 'integral')
+        
+        self.crear_casilla_vista_previa(
+            button_frame, 5, 'integral', self.func_entry,
+            (self.x_min_entry, self.x_max_entry, self.y_min_entry, self.y_max_entry))
+        
+        self.crear_panel_barrido(
+            integral_frame, 3, 'integral', self.func_entry,
+            (self.x_min_entry, self.x_max_entry, self.y_min_entry, self.y_max_entry))
+        
+        self.crear_panel_montecarlo(
+            integral_frame, 4, 'integral', self.func_entry,
+            (self.x_min_entry, self.x_max_entry, self.y_min_entry, self.y_max_entry))
+        
+        # Malla de alta resolución evaluada por bloques y guardada en disco
+        exportar_frame = ttk.LabelFrame(integral_frame, text="💾 Malla de alta resolución", padding="10")
+        exportar_frame.grid(row=5, column=0, columnspan=2, pady=(10, 0), sticky=(tk.W, tk.E))
+        
+        ttk.Label(exportar_frame, text="puntos por eje").grid(row=0, column=0, padx=(0, 5))
+        self.exportar_puntos_entry = ttk.Entry(exportar_frame, width=8, style='Custom.TEntry')
+        self.exportar_puntos_entry.grid(row=0, column=1, padx=2)
+        self.exportar_puntos_entry.insert(0, str(PUNTOS_EXPORTACION))
+        
+        exportar_btn = ttk.Button(exportar_frame, text="💾 Exportar malla",
+                                  style='Custom.TButton',
+                                  command=self.exportar_malla)
+        exportar_btn.grid(row=0, column=2, padx=(10, 0))
         
         # Configurar expansión de columnas
         integral_frame.columnconfigure(1, weight=1)
@@ -358,7 +626,14 @@ class CalculadoraMultivariado:
         graph_area_btn = ttk.Button(button_area_frame, text="🎨 Graficar Región", 
                                    style='Custom.TButton',
                                    command=self.graficar_region)
-        graph_area_btn.grid(row=0, column=1)
+        graph_area_btn.grid(row=0, column=1, padx=(0, 10))
+        
+        cancel_area_btn = ttk.Button(button_area_frame, text="⏹ Cancelar", 
+                               style='Custom.TButton',
+                               command=lambda: self.cancelar_tab('area'))
+        cancel_area_btn.grid(row=0, column=2)
+        
+        self.crear_selector_precision(button_area_frame, 3, 'area')
         
         area_frame.columnconfigure(1, weight=1)
         
@@ -378,6 +653,12 @@ class CalculadoraMultivariado:
         self.vol_func_entry.grid(row=0, column=1, pady=5, padx=(10, 0), sticky=(tk.W, tk.E))
         self.vol_func_entry.insert(0, "x**2 + y**2")
         
+        # Superficie inferior: con 0 es el volumen bajo la superficie
+        ttk.Label(surf_frame, text="z inferior:", font=('Segoe UI', 9, 'bold')).grid(row=1, column=0, sticky=tk.W, pady=5)
+        self.vol_inf_entry = ttk.Entry(surf_frame, width=35, style='Custom.TEntry')
+        self.vol_inf_entry.grid(row=1, column=1, pady=5, padx=(10, 0), sticky=(tk.W, tk.E))
+        self.vol_inf_entry.insert(0, "0")
+        
         surf_frame.columnconfigure(1, weight=1)
         
         # Región de integración
@@ -385,7 +666,8 @@ class CalculadoraMultivariado:
         region_frame.grid(row=1, column=0, columnspan=2, pady=(0, 20), sticky=(tk.W, tk.E))
         
         # Límites de x
-        ttk.Label(region_frame, text="Límites de x:", font=('Segoe UI', 9, 'bold')).grid(row=0, column=0, sticky=tk.W, pady=5)
+        x_vol_label = ttk.Label(region_frame, text="Límites de x:", font=('Segoe UI', 9, 'bold'))
+        x_vol_label.grid(row=0, column=0, sticky=tk.W, pady=5)
         x_vol_frame = ttk.Frame(region_frame)
         x_vol_frame.grid(row=0, column=1, pady=5, padx=(10, 0))
         
@@ -400,7 +682,8 @@ class CalculadoraMultivariado:
         self.x_vol_max_entry.insert(0, "1")
         
         # Límites de y
-        ttk.Label(region_frame, text="Límites de y:", font=('Segoe UI', 9, 'bold')).grid(row=1, column=0, sticky=tk.W, pady=5)
+        y_vol_label = ttk.Label(region_frame, text="Límites de y:", font=('Segoe UI', 9, 'bold'))
+        y_vol_label.grid(row=1, column=0, sticky=tk.W, pady=5)
         y_vol_frame = ttk.Frame(region_frame)
         y_vol_frame.grid(row=1, column=1, pady=5, padx=(10, 0))
         
@@ -414,6 +697,8 @@ class CalculadoraMultivariado:
         self.y_vol_max_entry.grid(row=0, column=3, padx=2)
         self.y_vol_max_entry.insert(0, "1")
         
+        self.crear_selector_coordenadas(region_frame, 2, 'volumen', (x_vol_label, y_vol_label))
+        
         # Botones
         button_vol_frame = ttk.Frame(volumen_frame)
         button_vol_frame.grid(row=2, column=0, columnspan=2, pady=20)
@@ -426,10 +711,337 @@ class CalculadoraMultivariado:
         graph_vol_btn = ttk.Button(button_vol_frame, text="🌄 Graficar Superficie", 
                                   style='Custom.TButton',
                                   command=self.graficar_superficie)
-        graph_vol_btn.grid(row=0, column=1)
+        graph_vol_btn.grid(row=0, column=1, padx=(0, 10))
+        
+        cancel_vol_btn = ttk.Button(button_vol_frame, text="⏹ Cancelar", 
+                               style='Custom.TButton',
+                               command=lambda: self.cancelar_tab('volumen'))
+        cancel_vol_btn.grid(row=0, column=2)
+        
+        self.crear_selector_precision(button_vol_frame, 3, 'volumen')
+        
+        self.crear_casilla_vista_previa(
+            button_vol_frame, 5, 'volumen', self.vol_func_entry,
+            (self.x_vol_min_entry, self.x_vol_max_entry, self.y_vol_min_entry, self.y_vol_max_entry),
+            self.vol_inf_entry)
+
+        self.crear_panel_barrido(
+            volumen_frame, 3, 'volumen', self.vol_func_entry,
+            (self.x_vol_min_entry, self.x_vol_max_entry, self.y_vol_min_entry, self.y_vol_max_entry))
+
+        # Datos medidos: una rejilla de alturas en lugar de f(x, y)
+        datos_frame = ttk.LabelFrame(volumen_frame, text="📂 Datos medidos (CSV o .npy sobre la región R)",
+                                     padding="10")
+        datos_frame.grid(row=4, column=0, columnspan=2, pady=(15, 0), sticky=(tk.W, tk.E))
+
+        self.datos_entry = ttk.Entry(datos_frame, width=30, style='Custom.TEntry')
+        self.datos_entry.grid(row=0, column=0, padx=(0, 5), sticky=(tk.W, tk.E))
+
+        abrir_btn = ttk.Button(datos_frame, text="📂 Abrir…",
+                               style='Custom.TButton',
+                               command=self.elegir_datos)
+        abrir_btn.grid(row=0, column=1, padx=(0, 10))
+
+        self.regla_datos = ttk.Combobox(datos_frame, values=REGLAS_DATOS, width=9, state='readonly')
+        self.regla_datos.grid(row=0, column=2, padx=(0, 10))
+        self.regla_datos.set(REGLAS_DATOS[0])
+
+        integrar_datos_btn = ttk.Button(datos_frame, text="📦 Integrar datos",
+                                        style='Custom.TButton',
+                                        command=self.integrar_datos)
+        integrar_datos_btn.grid(row=0, column=3, padx=(0, 10))
+
+        graficar_datos_btn = ttk.Button(datos_frame, text="🌄 Graficar datos",
+                                        style='Custom.TButton',
+                                        command=self.graficar_datos)
+        graficar_datos_btn.grid(row=0, column=4)
+
+        datos_frame.columnconfigure(0, weight=1)
 
         volumen_frame.columnconfigure(1, weight=1)
         
+    def crear_tab_integral_triple(self):
+        """Crea la pestaña para integrales triples."""
+        triple_frame = ttk.Frame(self.notebook)
+        self.notebook.add(triple_frame, text="∭ Integral Triple")
+        
+        triple_frame.configure(padding="20")
+        
+        ttk.Label(triple_frame, text="🔢 Función f(x,y,z):", font=('Segoe UI', 10, 'bold')).grid(row=0, column=0, sticky=tk.W, pady=(0, 10))
+        self.triple_func_entry = ttk.Entry(triple_frame, width=35, style='Custom.TEntry')
+        self.triple_func_entry.grid(row=0, column=1, pady=(0, 10), padx=(10, 0), sticky=(tk.W, tk.E))
+        self.triple_func_entry.insert(0, "x*y*z")
+        
+        # Límites: los de y pueden depender de x y los de z de x e y
+        limits_frame = ttk.LabelFrame(triple_frame, text="📏 Sólido (y puede depender de x; z, de x e y)", padding="10")
+        limits_frame.grid(row=1, column=0, columnspan=2, pady=(10, 20), sticky=(tk.W, tk.E))
+        
+        self.triple_limites = {}
+        etiquetas = []
+        iniciales = {'x': ("0", "1"), 'y': ("0", "x"), 'z': ("0", "x + y")}
+        for fila, (variable, (inferior, superior)) in enumerate(iniciales.items()):
+            etiqueta = ttk.Label(limits_frame, text=f"Límites de {variable}:", font=('Segoe UI', 9, 'bold'))
+            etiqueta.grid(row=fila, column=0, sticky=tk.W, pady=5)
+            etiquetas.append(etiqueta)
+            fila_frame = ttk.Frame(limits_frame)
+            fila_frame.grid(row=fila, column=1, pady=5, padx=(10, 0))
+            for columna, (texto, extremo, inicial) in enumerate((("de", 'min', inferior), ("a", 'max', superior))):
+                ttk.Label(fila_frame, text=texto).grid(row=0, column=2 * columna, padx=(10 if columna else 0, 5))
+                entry = ttk.Entry(fila_frame, width=10, style='Custom.TEntry')
+                entry.grid(row=0, column=2 * columna + 1, padx=2)
+                entry.insert(0, inicial)
+                self.triple_limites[f'{variable}_{extremo}'] = entry
+        
+        self.crear_selector_coordenadas(limits_frame, 3, 'triple', etiquetas, marco=limits_frame)
+        
+        button_triple_frame = ttk.Frame(triple_frame)
+        button_triple_frame.grid(row=2, column=0, columnspan=2, pady=20)
+        
+        calc_triple_btn = ttk.Button(button_triple_frame, text="🧮 Calcular Integral",
+                                     style='Custom.TButton',
+                                     command=self.calcular_integral_triple)
+        calc_triple_btn.grid(row=0, column=0, padx=(0, 10))
+        
+        cancel_triple_btn = ttk.Button(button_triple_frame, text="⏹ Cancelar",
+                                       style='Custom.TButton',
+                                       command=lambda: self.cancelar_tab('triple'))
+        cancel_triple_btn.grid(row=0, column=1)
+        
+        self.crear_selector_precision(button_triple_frame, 2, 'triple')
+        
+        self.crear_panel_montecarlo(
+            triple_frame, 3, 'triple', self.triple_func_entry,
+            [self.triple_limites[nombre] for nombre in
+             ('x_min', 'x_max', 'y_min', 'y_max', 'z_min', 'z_max')])
+        
+        triple_frame.columnconfigure(1, weight=1)
+        
+    def crear_tab_derivadas(self):
+        """Crea la pestaña de gradiente, hessiana, puntos críticos y Lagrange."""
+        derivadas_frame = ttk.Frame(self.notebook)
+        self.notebook.add(derivadas_frame, text="∇ Derivadas")
+        
+        derivadas_frame.configure(padding="20")
+        
+        ttk.Label(derivadas_frame, text="🔢 Función f(x,y):", font=('Segoe UI', 10, 'bold')).grid(row=0, column=0, sticky=tk.W, pady=(0, 10))
+        self.der_func_entry = ttk.Entry(derivadas_frame, width=35, style='Custom.TEntry')
+        self.der_func_entry.grid(row=0, column=1, pady=(0, 10), padx=(10, 0), sticky=(tk.W, tk.E))
+        self.der_func_entry.insert(0, "x**3 - 3*x + y**2")
+        
+        # Restricción opcional para multiplicadores de Lagrange
+        ttk.Label(derivadas_frame, text="🎯 Restricción g(x,y):", font=('Segoe UI', 10, 'bold')).grid(row=1, column=0, sticky=tk.W, pady=(0, 10))
+        self.der_restriccion_entry = ttk.Entry(derivadas_frame, width=35, style='Custom.TEntry')
+        self.der_restriccion_entry.grid(row=1, column=1, pady=(0, 10), padx=(10, 0), sticky=(tk.W, tk.E))
+        self.der_restriccion_entry.insert(0, "x**2 + y**2 = 4")
+        
+        # Región donde se buscan los puntos críticos y se dibuja el campo
+        limits_frame = ttk.LabelFrame(derivadas_frame, text="📏 Región de búsqueda", padding="10")
+        limits_frame.grid(row=2, column=0, columnspan=2, pady=(10, 20), sticky=(tk.W, tk.E))
+        
+        self.derivadas_limites = {}
+        iniciales = {'x': ("-3", "3"), 'y': ("-3", "3")}
+        for fila, (variable, (inferior, superior)) in enumerate(iniciales.items()):
+            ttk.Label(limits_frame, text=f"Límites de {variable}:", font=('Segoe UI', 9, 'bold')).grid(row=fila, column=0, sticky=tk.W, pady=5)
+            fila_frame = ttk.Frame(limits_frame)
+            fila_frame.grid(row=fila, column=1, pady=5, padx=(10, 0))
+            for columna, (texto, extremo, inicial) in enumerate((("de", 'min', inferior), ("a", 'max', superior))):
+                ttk.Label(fila_frame, text=texto).grid(row=0, column=2 * columna, padx=(10 if columna else 0, 5))
+                entry = ttk.Entry(fila_frame, width=10, style='Custom.TEntry')
+                entry.grid(row=0, column=2 * columna + 1, padx=2)
+                entry.insert(0, inicial)
+                self.derivadas_limites[f'{variable}_{extremo}'] = entry
+        
+        button_derivadas_frame = ttk.Frame(derivadas_frame)
+        button_derivadas_frame.grid(row=3, column=0, columnspan=2, pady=20)
+        
+        analizar_btn = ttk.Button(button_derivadas_frame, text="∇ Analizar",
+                                  style='Custom.TButton',
+                                  command=self.analizar_derivadas)
+        analizar_btn.grid(row=0, column=0, padx=(0, 10))
+        
+        lagrange_btn = ttk.Button(button_derivadas_frame, text="🎯 Lagrange",
+                                  style='Custom.TButton',
+                                  command=self.optimizar_lagrange)
+        lagrange_btn.grid(row=0, column=1, padx=(0, 10))
+        
+        campo_btn = ttk.Button(button_derivadas_frame, text="🧭 Graficar campo",
+                               style='Custom.TButton',
+                               command=self.graficar_campo)
+        campo_btn.grid(row=0, column=2, padx=(0, 10))
+        
+        cancel_derivadas_btn = ttk.Button(button_derivadas_frame, text="⏹ Cancelar",
+                                          style='Custom.TButton',
+                                          command=lambda: self.cancelar_tab('derivadas'))
+        cancel_derivadas_btn.grid(row=0, column=3)
+        
+        derivadas_frame.columnconfigure(1, weight=1)
+        
+    def crear_selector_precision(self, parent, columna, tab):
+        """
+        Crea el selector de cifras significativas de una pestaña.
+        
+        Con más de 15 cifras los resultados exactos se evalúan con evalf y
+        los numéricos con la cuadratura de mpmath, subiendo la precisión de
+        trabajo solo hasta alcanzar las cifras pedidas.
+        """
+        ttk.Label(parent, text="Cifras:").grid(row=0, column=columna, padx=(15, 5))
+        precision = ttk.Combobox(parent, values=PRECISIONES, width=4, state='readonly')
+        precision.grid(row=0, column=columna + 1)
+        precision.set(PRECISIONES[0])
+        self.precisiones[tab] = precision
+        
+    def crear_selector_coordenadas(self, parent, fila, tab, etiquetas, marco=None):
+        """
+        Crea el selector de sistema de coordenadas de una pestaña.
+        
+        La función se sigue escribiendo en x, y (y z); los límites pasan a
+        ser los del sistema elegido y el jacobiano se añade en el motor.
+        
+        Args:
+            parent: Marco de los límites
+            fila: Fila de la rejilla donde se coloca el selector
+            tab: Clave de la pestaña
+            etiquetas: Etiquetas "Límites de ..." de cada variable, en orden
+            marco: LabelFrame del sólido, cuyo título indica las dependencias
+        """
+        dimension = len(etiquetas)
+        ttk.Label(parent, text="Coordenadas:", font=('Segoe UI', 9, 'bold')).grid(row=fila, column=0, sticky=tk.W, pady=5)
+        selector = ttk.Combobox(parent, values=COORDENADAS[dimension], width=12, state='readonly')
+        selector.grid(row=fila, column=1, pady=5, padx=(10, 0), sticky=tk.W)
+        selector.set(COORDENADAS[dimension][0])
+        
+        def renombrar(_evento=None):
+            nombres = VARIABLES_COORDENADAS[(selector.get(), dimension)]
+            for etiqueta, nombre in zip(etiquetas, nombres):
+                etiqueta.configure(text=f"Límites de {nombre}:")
+            if marco is not None:
+                u, v, w = nombres
+                marco.configure(text=f"📏 Sólido ({v} puede depender de {u}; {w}, de {u} y {v})")
+        
+        selector.bind('<<ComboboxSelected>>', renombrar)
+        self.coordenadas[tab] = selector
+        
+    def crear_casilla_vista_previa(self, parent, columna, tab, func_entry, limites_entries,
+                                   inferior_entry=None):
+        """
+        Crea la casilla de vista previa en vivo de una pestaña.
+        
+        Con la casilla marcada, cada cambio en la función, los límites o las
+        coordenadas programa una vista previa (ver programar_vista_previa).
+        
+        Args:
+            parent: Marco de los botones
+            columna: Columna de la rejilla donde se coloca la casilla
+            tab: Clave de la pestaña ('integral' o 'volumen')
+            func_entry: Campo con la función a integrar
+            limites_entries: Campos de x_min, x_max, y_min e y_max
+            inferior_entry: Campo de la superficie inferior de un volumen
+        """
+        activa = tk.BooleanVar(value=False)
+        ttk.Checkbutton(parent, text="⚡ En vivo", variable=activa,
+                        command=lambda: self.alternar_vista_previa(tab)).grid(
+            row=0, column=columna, padx=(15, 0))
+        
+        campos = [func_entry, *limites_entries]
+        if inferior_entry is not None:
+            campos.append(inferior_entry)
+        for campo in campos:
+            campo.bind('<KeyRelease>', lambda _evento: self.programar_vista_previa(tab), add='+')
+        self.coordenadas[tab].bind('<<ComboboxSelected>>',
+                                   lambda _evento: self.programar_vista_previa(tab), add='+')
+        
+        self.vista_previa[tab] = {
+            'activa': activa,
+            'funcion': func_entry,
+            'limites': limites_entries,
+            'inferior': inferior_entry,
+        }
+        
+    def crear_panel_barrido(self, parent, fila, tab, func_entry, limites_entries):
+        """
+        Crea los controles para recorrer uno de los límites de integración.
+        
+        Args:
+            parent: Marco de la pestaña
+            fila: Fila de la rejilla donde se coloca el panel
+            tab: Clave de la pestaña ('integral' o 'volumen')
+            func_entry: Campo con la función a integrar
+            limites_entries: Campos de x_min, x_max, y_min e y_max
+        """
+        barrido_frame = ttk.LabelFrame(parent, text="📈 Barrido de un límite", padding="10")
+        barrido_frame.grid(row=fila, column=0, columnspan=2, sticky=(tk.W, tk.E))
+        
+        parametro = ttk.Combobox(barrido_frame, values=LIMITES_BARRIDO, width=6, state='readonly')
+        parametro.grid(row=0, column=0, padx=(0, 10))
+        parametro.set('x_max')
+        
+        ttk.Label(barrido_frame, text="de").grid(row=0, column=1, padx=(0, 5))
+        inicio_entry = ttk.Entry(barrido_frame, width=6, style='Custom.TEntry')
+        inicio_entry.grid(row=0, column=2, padx=2)
+        inicio_entry.insert(0, "0.5")
+        
+        ttk.Label(barrido_frame, text="a").grid(row=0, column=3, padx=(10, 5))
+        fin_entry = ttk.Entry(barrido_frame, width=6, style='Custom.TEntry')
+        fin_entry.grid(row=0, column=4, padx=2)
+        fin_entry.insert(0, "2")
+        
+        ttk.Label(barrido_frame, text="puntos").grid(row=0, column=5, padx=(10, 5))
+        puntos_entry = ttk.Entry(barrido_frame, width=5, style='Custom.TEntry')
+        puntos_entry.grid(row=0, column=6, padx=2)
+        puntos_entry.insert(0, "50")
+        
+        barrido_btn = ttk.Button(barrido_frame, text="📈 Barrer",
+                                 style='Custom.TButton',
+                                 command=lambda: self.barrer_limite(tab))
+        barrido_btn.grid(row=0, column=7, padx=(10, 0))
+        
+        self.barridos[tab] = {
+            'funcion': func_entry,
+            'limites': limites_entries,
+            'parametro': parametro,
+            'inicio': inicio_entry,
+            'fin': fin_entry,
+            'puntos': puntos_entry,
+        }
+        
+    def crear_panel_montecarlo(self, parent, fila, tab, func_entry, limites_entries):
+        """
+        Crea los controles para estimar la integral por Monte Carlo.
+        
+        La estimación y su error estándar se actualizan mientras avanza;
+        "⏹ Cancelar" la detiene cuando el error ya es aceptable.
+        
+        Args:
+            parent: Marco de la pestaña
+            fila: Fila de la rejilla donde se coloca el panel
+            tab: Clave de la pestaña ('integral' o 'triple')
+            func_entry: Campo con la función a integrar
+            limites_entries: Campos de los límites, de x_min al último máximo
+        """
+        montecarlo_frame = ttk.LabelFrame(parent, text="🎲 Monte Carlo", padding="10")
+        montecarlo_frame.grid(row=fila, column=0, columnspan=2, pady=(10, 0), sticky=(tk.W, tk.E))
+        
+        metodo = ttk.Combobox(montecarlo_frame, values=METODOS_MONTECARLO, width=7, state='readonly')
+        metodo.grid(row=0, column=0, padx=(0, 10))
+        metodo.set(METODOS_MONTECARLO[0])
+        
+        ttk.Label(montecarlo_frame, text="error objetivo").grid(row=0, column=1, padx=(0, 5))
+        error_entry = ttk.Entry(montecarlo_frame, width=8, style='Custom.TEntry')
+        error_entry.grid(row=0, column=2, padx=2)
+        error_entry.insert(0, "1e-4")
+        
+        estimar_btn = ttk.Button(montecarlo_frame, text="🎲 Estimar",
+                                 style='Custom.TButton',
+                                 command=lambda: self.estimar_montecarlo(tab))
+        estimar_btn.grid(row=0, column=3, padx=(10, 0))
+        
+        self.montecarlo[tab] = {
+            'funcion': func_entry,
+            'limites': limites_entries,
+            'metodo': metodo,
+            'error': error_entry,
+        }
+        
     def crear_tab_ayuda(self):
         """Crea la pestaña de ayuda."""
         ayuda_frame = ttk.Frame(self.notebook)
@@ -441,177 +1053,626 @@ class CalculadoraMultivariado:
             "• Funciones: sin, cos, tan, exp, log, sqrt\n"
             "• Constantes: pi, E\n"
             "• Variables: x, y\n"
+            "• Coordenadas: polares, cilíndricas o esféricas (límites en r, theta, phi, rho)\n"
+            "• Límites: números o expresiones exactas (ej: pi/2)\n"
+            "• Regiones: los límites de y pueden depender de x, o los de x de y\n"
+            "• Cifras: más de 15 cifras significativas, con el error alcanzado\n"
+            "• Volumen: entre z inferior y la superficie; ∭: límites de z según x e y\n"
+            "• Monte Carlo: la estimación mejora en vivo; ⏹ Cancelar la detiene\n"
+            "• ⚡ En vivo: estimación y gráfico al dejar de escribir; la forma exacta llega después\n"
+            "• Abs, sign, Max, log(x*y), 1/sqrt(x)...: el rectángulo se divide en sus pliegues y singularidades\n"
+            "• 📂 Datos medidos: integra una rejilla CSV o .npy (una fila por y) sobre la región R\n"
+            "• ∇ Derivadas: gradiente, hessiana y puntos críticos; 🎯 Lagrange usa la restricción g = c\n"
             "• Selecciona una pestaña y comienza a calcular."
         )
         label = tk.Label(ayuda_frame, text=ayuda_text, justify="left", font=('Segoe UI', 11), bg='#ecf0f1', fg='#2c3e50')
         label.pack(fill="both", expand=True)
         
+        cache_btn = ttk.Button(ayuda_frame, text="📊 Estadísticas de caché", 
+                              style='Custom.TButton',
+                              command=self.mostrar_estadisticas_cache)
+        cache_btn.pack(pady=(10, 0))
+        
     def calcular_integral_doble(self):
-        """Calcula la integral doble de la función ingresada."""
+        """Calcula la integral doble de la función ingresada en segundo plano."""
         try:
             func_str = self.func_entry.get()
-            x_min = float(self.x_min_entry.get())
-            x_max = float(self.x_max_entry.get())
-            y_min = float(self.y_min_entry.get())
-            y_max = float(self.y_max_entry.get())
-            func = sp.sympify(func_str)
-            integral = sp.integrate(func, (self.x, x_min, x_max), (self.y, y_min, y_max))
-            resultado = f"∬ f(x, y) dxdy = {integral.evalf()}\n"
-            self.mostrar_resultado(resultado)
+            # Los límites se envían como texto: el motor los analiza de forma
+            # exacta, así que se admiten expresiones como pi/2
+            x_min = self.x_min_entry.get()
+            x_max = self.x_max_entry.get()
+            y_min = self.y_min_entry.get()
+            y_max = self.y_max_entry.get()
+            self.enviar_tarea(
+                'integral', 'motor.calcular_integral_doble',
+                func_str, x_min, x_max, y_min, y_max,
+                **self.opciones_calculo('integral'),
+                al_terminar=lambda integral: self.mostrar_resultado(
+                    self.formatear_integral("∬ f(x, y) dxdy", integral)),
+                al_fallar=self.mostrar_error_calculo)
+            self.mostrar_resultado("⏳ Calculando integral doble...\n")
         except Exception as e:
-            messagebox.showerror("Error", f"Error en el cálculo: {str(e)}")
+            self.mostrar_error_calculo(e)
 
     def calcular_area(self):
         """Calcula el área entre las curvas definidas por las funciones límite."""
         try:
             y_sup_str = self.y_sup_entry.get()
             y_inf_str = self.y_inf_entry.get()
-            x_min = float(self.x_area_min_entry.get())
-            x_max = float(self.x_area_max_entry.get())
-            y_sup = sp.sympify(y_sup_str)
-            y_inf = sp.sympify(y_inf_str)
-            area = sp.integrate(y_sup - y_inf, (self.x, x_min, x_max))
-            resultado = f"Área = {area.evalf()}\n"
-            self.mostrar_resultado(resultado)
+            x_min = self.x_area_min_entry.get()
+            x_max = self.x_area_max_entry.get()
+            self.enviar_tarea(
+                'area', 'motor.calcular_area', y_sup_str, y_inf_str, x_min, x_max,
+                **self.opciones_calculo('area'),
+                al_terminar=lambda area: self.mostrar_resultado(self.formatear_integral("Área", area)),
+                al_fallar=self.mostrar_error_calculo)
+            self.mostrar_resultado("⏳ Calculando área...\n")
         except Exception as e:
-            messagebox.showerror("Error", f"Error en el cálculo: {str(e)}")
+            self.mostrar_error_calculo(e)
 
     def calcular_volumen(self):
-        """Calcula el volumen bajo la superficie definida por la función ingresada."""
+        """Calcula el volumen entre la superficie ingresada y la inferior (z = 0 por defecto)."""
         try:
             func_str = self.vol_func_entry.get()
-            x_min = float(self.x_vol_min_entry.get())
-            x_max = float(self.x_vol_max_entry.get())
-            y_min = float(self.y_vol_min_entry.get())
-            y_max = float(self.y_vol_max_entry.get())
-            func = sp.sympify(func_str)
-            integral = sp.integrate(func, (self.x, x_min, x_max), (self.y, y_min, y_max))
-            resultado = f"Volumen = {integral.evalf()}\n"
-            self.mostrar_resultado(resultado)
+            x_min = self.x_vol_min_entry.get()
+            x_max = self.x_vol_max_entry.get()
+            y_min = self.y_vol_min_entry.get()
+            y_max = self.y_vol_max_entry.get()
+            self.enviar_tarea(
+                'volumen', 'motor.calcular_volumen',
+                func_str, x_min, x_max, y_min, y_max,
+                z_inferior=self.vol_inf_entry.get(),
+                **self.opciones_calculo('volumen'),
+                al_terminar=lambda integral: self.mostrar_resultado(
+                    self.formatear_integral("Volumen", integral)),
+                al_fallar=self.mostrar_error_calculo)
+            self.mostrar_resultado("⏳ Calculando volumen...\n")
         except Exception as e:
-            messagebox.showerror("Error", f"Error en el cálculo: {str(e)}")
+            self.mostrar_error_calculo(e)
+    
+    def elegir_datos(self):
+        """Pide al usuario el archivo de datos medidos de la pestaña de volúmenes."""
+        ruta = filedialog.askopenfilename(filetypes=[("Datos medidos", "*.csv *.npy"),
+                                                     ("Todos los archivos", "*.*")])
+        if ruta:
+            self.datos_entry.delete(0, tk.END)
+            self.datos_entry.insert(0, ruta)
+
+    def integrar_datos(self):
+        """
+        Integra la rejilla de datos medidos sobre la región R de la pestaña de volúmenes.
+        
+        El archivo se lee por bloques en un trabajador, así que puede ser más
+        grande que la memoria; la superficie inferior, si la hay, se resta.
+        """
+        try:
+            ruta = self.datos_entry.get().strip()
+            if not ruta:
+                raise ValueError("Elige un archivo CSV o .npy con las alturas medidas")
+            limites = [entry.get() for entry in
+                       (self.x_vol_min_entry, self.x_vol_max_entry, self.y_vol_min_entry, self.y_vol_max_entry)]
+            regla = self.regla_datos.get()
+            self.enviar_tarea(
+                'volumen', 'motor.integrar_datos',
+                ruta, *limites, regla=regla, z_inferior=self.vol_inf_entry.get(),
+                al_terminar=lambda integral: self.mostrar_resultado(
+                    self.formatear_integral(f"Volumen de los datos ({regla})", integral)),
+                al_fallar=self.mostrar_error_calculo)
+            self.mostrar_resultado(f"⏳ Integrando {os.path.basename(ruta)}...\n")
+        except Exception as e:
+            self.mostrar_error_calculo(e)
+    
+    def calcular_integral_triple(self):
+        """Calcula la integral triple de la función ingresada en segundo plano."""
+        try:
+            limites = [self.triple_limites[nombre].get() for nombre in
+                       ('x_min', 'x_max', 'y_min', 'y_max', 'z_min', 'z_max')]
+            self.enviar_tarea(
+                'triple', 'motor.calcular_integral_triple',
+                self.triple_func_entry.get(), *limites,
+                **self.opciones_calculo('triple'),
+                al_terminar=lambda integral: self.mostrar_resultado(
+                    self.formatear_integral("∭ f(x, y, z) dV", integral)),
+                al_fallar=self.mostrar_error_calculo)
+            self.mostrar_resultado("⏳ Calculando integral triple...\n")
+        except Exception as e:
+            self.mostrar_error_calculo(e)
+    
+    def limites_derivadas(self):
+        """Textos de los límites (x_min, x_max, y_min, y_max) de la pestaña de derivadas."""
+        return [self.derivadas_limites[nombre].get() for nombre in ('x_min', 'x_max', 'y_min', 'y_max')]
+    
+    def analizar_derivadas(self):
+        """Calcula el gradiente, la hessiana y los puntos críticos de f y los marca en su campo."""
+        try:
+            func_str = self.der_func_entry.get()
+            limites = self.limites_derivadas()
+            self.enviar_tarea(
+                'derivadas', 'motor.analizar_funcion', func_str, *limites,
+                **self.opciones_calculo(),
+                al_terminar=lambda analisis: self.mostrar_analisis(analisis, func_str),
+                al_fallar=self.mostrar_error_calculo)
+            self.mostrar_resultado("⏳ Buscando puntos críticos...\n")
+        except Exception as e:
+            self.mostrar_error_calculo(e)
+    
+    def optimizar_lagrange(self):
+        """Busca los extremos de f sobre la restricción con multiplicadores de Lagrange."""
+        try:
+            func_str = self.der_func_entry.get()
+            restriccion_str = self.der_restriccion_entry.get()
+            if not restriccion_str.strip():
+                raise ValueError("Escribe una restricción g(x, y) = c")
+            limites = self.limites_derivadas()
+            self.enviar_tarea(
+                'derivadas', 'motor.optimizar_lagrange', func_str, restriccion_str, *limites,
+                **self.opciones_calculo(),
+                al_terminar=lambda analisis: self.mostrar_analisis(analisis, func_str,
+                                                                   restriccion_str),
+                al_fallar=self.mostrar_error_calculo)
+            self.mostrar_resultado("⏳ Resolviendo ∇f = λ∇g...\n")
+        except Exception as e:
+            self.mostrar_error_calculo(e)
+    
+    def graficar_campo(self, puntos=(), restriccion_str=None):
+        """
+        Grafica las curvas de nivel de f y su campo de gradiente.
+        
+        Args:
+            puntos: Puntos críticos a marcar como tuplas (x, y, tipo)
+            restriccion_str: Restricción cuya curva se dibuja, o None
+        """
+        try:
+            func_str = self.der_func_entry.get()
+            # f y ∇f salen de una sola llamada al núcleo de derivadas del trabajador
+            self.enviar_tarea(
+                'derivadas_grafico', 'motor.malla_gradiente',
+                func_str, *self.limites_derivadas(), PUNTOS_CAMPO, restriccion_str,
+                al_terminar=lambda malla: self.dibujar_campo(malla, f'∇f para f = {func_str}',
+                                                             puntos),
+                al_fallar=self.mostrar_error_grafico)
+        except Exception as e:
+            self.mostrar_error_grafico(e)
     
     def graficar_funcion(self):
         """Genera un gráfico de la función ingresada para la integral doble."""
         try:
             func_str = self.func_entry.get()
-            x_min = float(self.x_min_entry.get())
-            x_max = float(self.x_max_entry.get())
-            y_min = float(self.y_min_entry.get())
-            y_max = float(self.y_max_entry.get())
-            
-            # Crear malla de puntos
-            x_vals = np.linspace(x_min, x_max, 100)
-            y_vals = np.linspace(y_min, y_max, 100)
-            X, Y = np.meshgrid(x_vals, y_vals)
-            
-            # Evaluar función
-            func = sp.sympify(func_str)
-            func_lambdified = sp.lambdify((self.x, self.y), func, 'numpy')
-            Z = func_lambdified(X, Y)
-            
-            # Limpiar figura
-            self.fig.clear()
-            
-            # Crear gráfico 3D
-            ax = self.fig.add_subplot(111, projection='3d')
-            surf = ax.plot_surface(X, Y, Z, cmap='viridis', alpha=0.8)
-            
-            # Agregar plano z=0
-            ax.plot_surface(X, Y, np.zeros_like(Z), alpha=0.3, color='gray')
+            x_min = self.x_min_entry.get()
+            x_max = self.x_max_entry.get()
+            y_min = self.y_min_entry.get()
+            y_max = self.y_max_entry.get()
             
-            ax.set_xlabel('x')
-            ax.set_ylabel('y')
-            ax.set_zlabel('z')
-            ax.set_title(f'Gráfico de la Función: z = {func_str}')
-            
-            # Agregar barra de colores
-            self.fig.colorbar(surf, ax=ax, shrink=0.5)
-            
-            self.canvas.draw()
+            # Las mallas se evalúan en un proceso trabajador: primero una vista
+            # previa y luego refinamientos de hasta 100×100 puntos
+            self.enviar_tarea(
+                'integral_grafico', 'motor.malla_adaptativa',
+                func_str, x_min, x_max, y_min, y_max, PRESUPUESTO_FUNCION,
+                coordenadas=self.coordenadas['integral'].get(),
+                al_progreso=lambda malla: self.dibujar_superficie(
+                    malla, 'viridis', f'Gráfico de la Función: z = {func_str}'),
+                al_fallar=self.mostrar_error_grafico)
             
         except Exception as e:
-            messagebox.showerror("Error", f"Error en la graficación: {str(e)}")
+            self.mostrar_error_grafico(e)
+    
+    def exportar_malla(self):
+        """
+        Evalúa la función de la integral doble en una malla fina y la guarda como .npy.
+        
+        La malla se evalúa por bloques en un trabajador y se escribe en un
+        archivo proyectado en memoria; aquí solo llegan una versión reducida
+        para el gráfico y la integral por la regla del trapecio.
+        """
+        try:
+            func_str = self.func_entry.get()
+            limites = [entry.get() for entry in
+                       (self.x_min_entry, self.x_max_entry, self.y_min_entry, self.y_max_entry)]
+            puntos = int(self.exportar_puntos_entry.get())
+            if puntos < 2:
+                raise ValueError("La malla necesita al menos 2 puntos por eje")
+            ruta = filedialog.asksaveasfilename(defaultextension='.npy',
+                                                filetypes=[("Arreglo de NumPy", "*.npy")],
+                                                initialfile='malla.npy')
+            if not ruta:
+                return
+            self.enviar_tarea(
+                'integral_grafico', 'motor.exportar_malla',
+                func_str, *limites, puntos, ruta,
+                al_terminar=lambda exportada: self.mostrar_exportacion(exportada, func_str),
+                al_fallar=self.mostrar_error_grafico)
+            self.mostrar_resultado(f"⏳ Evaluando malla de {puntos}×{puntos}...\n")
+        except Exception as e:
+            self.mostrar_error_grafico(e)
+    
+    def mostrar_exportacion(self, exportada, func_str):
+        """Dibuja la versión reducida de una malla exportada e informa de la integral."""
+        filas, columnas = exportada['forma']
+        self.dibujar_superficie(exportada['malla'], 'viridis',
+                                f'z = {func_str} ({filas}×{columnas} puntos)')
+        if exportada['no_finitos']:
+            integral = (f"∬ no disponible: {exportada['no_finitos']} puntos no finitos "
+                        f"(singularidades de f)")
+        else:
+            integral = f"∬ por trapecios ≈ {exportada['integral']:.10g}"
+        self.mostrar_resultado(
+            f"💾 Malla {filas}×{columnas} guardada en {exportada['ruta']}; "
+            f"{integral}   [{exportada['tiempo']:.2f} s]\n")
     
     def graficar_region(self):
         """Genera un gráfico de la región de integración para el cálculo de áreas."""
         try:
             y_sup_str = self.y_sup_entry.get()
             y_inf_str = self.y_inf_entry.get()
-            x_min = float(self.x_area_min_entry.get())
-            x_max = float(self.x_area_max_entry.get())
-            
-            # Definir funciones límite
-            y_sup = sp.sympify(y_sup_str)
-            y_inf = sp.sympify(y_inf_str)
-            
-            # Crear malla de puntos
-            x_vals = np.linspace(x_min, x_max, 100)
-            y_vals_sup = y_sup.subs(self.x, x_vals)
-            y_vals_inf = y_inf.subs(self.x, x_vals)
-            
-            # Limpiar figura
-            self.fig.clear()
-            ax = self.fig.add_subplot(111)
-            
-            # Graficar curvas
-            ax.plot(x_vals, y_vals_sup, 'b-', label=f'y = {y_sup_str}', linewidth=2)
-            ax.plot(x_vals, y_vals_inf, 'r-', label=f'y = {y_inf_str}', linewidth=2)
-            
-            # Rellenar área
-            ax.fill_between(x_vals, y_vals_inf, y_vals_sup, alpha=0.3, color='green', label='Área')
-            
-            ax.set_xlabel('x')
-            ax.set_ylabel('y')
-            ax.set_title('Región de integración')
-            ax.legend()
-            ax.grid(True, alpha=0.3)
+            x_min = self.x_area_min_entry.get()
+            x_max = self.x_area_max_entry.get()
             
-            self.canvas.draw()
+            # Las curvas límite se evalúan en un proceso trabajador
+            self.enviar_tarea(
+                'area_grafico', 'motor.curvas_region', y_sup_str, y_inf_str, x_min, x_max, 100,
+                al_terminar=lambda curvas: self.dibujar_region(curvas, y_sup_str, y_inf_str),
+                al_fallar=self.mostrar_error_grafico)
             
         except Exception as e:
-            messagebox.showerror("Error", f"Error en la graficación: {str(e)}")
+            self.mostrar_error_grafico(e)
     
     def graficar_superficie(self):
+        """Genera un gráfico de la superficie para el cálculo de volúmenes."""
         try:
             func_str = self.vol_func_entry.get()
-            x_min = float(self.x_vol_min_entry.get())
-            x_max = float(self.x_vol_max_entry.get())
-            y_min = float(self.y_vol_min_entry.get())
-            y_max = float(self.y_vol_max_entry.get())
+            z_inferior = self.vol_inf_entry.get().strip()
+            x_min = self.x_vol_min_entry.get()
+            x_max = self.x_vol_max_entry.get()
+            y_min = self.y_vol_min_entry.get()
+            y_max = self.y_vol_max_entry.get()
             
-            # Crear malla de puntos
-            x_vals = np.linspace(x_min, x_max, 50)
-            y_vals = np.linspace(y_min, y_max, 50)
-            X, Y = np.meshgrid(x_vals, y_vals)
-            
-            # Evaluar función
-            func = sp.sympify(func_str)
-            func_lambdified = sp.lambdify((self.x, self.y), func, 'numpy')
-            Z = func_lambdified(X, Y)
-            
-            # Limpiar figura
-            self.fig.clear()
-            
-            # Crear gráfico 3D
-            ax = self.fig.add_subplot(111, projection='3d')
-            surf = ax.plot_surface(X, Y, Z, cmap='plasma', alpha=0.8)
-            
-            # Agregar plano z=0
-            ax.plot_surface(X, Y, np.zeros_like(Z), alpha=0.3, color='gray')
-            
-            ax.set_xlabel('x')
-            ax.set_ylabel('y')
-            ax.set_zlabel('z')
-            ax.set_title(f'Superficie z = {func_str}')
-            
-            # Agregar barra de colores
-            self.fig.colorbar(surf, ax=ax, shrink=0.5)
-            
-            self.canvas.draw()
+            if z_inferior in ('', '0'):
+                funcion, args = 'motor.malla_adaptativa', (func_str,)
+                titulo = f'Superficie z = {func_str}'
+            else:
+                funcion, args = 'motor.malla_volumen', (func_str, z_inferior)
+                titulo = f'Entre z = {z_inferior} y z = {func_str}'
+            self.enviar_tarea(
+                'volumen_grafico', funcion,
+                *args, x_min, x_max, y_min, y_max, PRESUPUESTO_SUPERFICIE,
+                coordenadas=self.coordenadas['volumen'].get(),
+                al_progreso=lambda malla: self.dibujar_superficie(malla, 'plasma', titulo),
+                al_fallar=self.mostrar_error_grafico)
             
         except Exception as e:
-            messagebox.showerror("Error", f"Error en la graficación: {str(e)}")
+            self.mostrar_error_grafico(e)
+    
+    def graficar_datos(self):
+        """Grafica una versión reducida de la rejilla de datos medidos."""
+        try:
+            ruta = self.datos_entry.get().strip()
+            if not ruta:
+                raise ValueError("Elige un archivo CSV o .npy con las alturas medidas")
+            limites = [entry.get() for entry in
+                       (self.x_vol_min_entry, self.x_vol_max_entry, self.y_vol_min_entry, self.y_vol_max_entry)]
+            titulo = f'Datos medidos: {os.path.basename(ruta)}'
+            self.enviar_tarea(
+                'volumen_grafico', 'motor.malla_datos',
+                ruta, *limites, z_inferior=self.vol_inf_entry.get(),
+                al_terminar=lambda malla: self.dibujar_superficie(malla, 'plasma', titulo),
+                al_fallar=self.mostrar_error_grafico)
+        except Exception as e:
+            self.mostrar_error_grafico(e)
+    
+    def barrer_limite(self, tab):
+        """
+        Calcula la integral de una pestaña para muchos valores de un límite.
+        
+        Args:
+            tab: Clave de la pestaña ('integral' o 'volumen')
+        """
+        try:
+            controles = self.barridos[tab]
+            func_str = controles['funcion'].get()
+            if tab == 'volumen' and self.vol_inf_entry.get().strip() not in ('', '0'):
+                func_str = f"({func_str}) - ({self.vol_inf_entry.get().strip()})"
+            limites = [entry.get() for entry in controles['limites']]
+            parametro = controles['parametro'].get()
+            inicio = controles['inicio'].get()
+            fin = controles['fin'].get()
+            puntos = int(controles['puntos'].get())
+            if puntos < 2:
+                raise ValueError("El barrido necesita al menos 2 puntos")
+            self.enviar_tarea(
+                f'{tab}_barrido', 'motor.barrer_integral_doble',
+                func_str, *limites, parametro, inicio, fin, puntos,
+                coordenadas=self.coordenadas[tab].get(),
+                **self.opciones_calculo(),
+                al_terminar=lambda barrido: self.mostrar_barrido(barrido, func_str),
+                al_fallar=self.mostrar_error_calculo)
+            self.mostrar_resultado(f"⏳ Barriendo {parametro} de {inicio} a {fin}...\n")
+        except Exception as e:
+            self.mostrar_error_calculo(e)
+    
+    def estimar_montecarlo(self, tab):
+        """
+        Estima la integral de una pestaña por Monte Carlo o cuasi-Monte Carlo.
+        
+        Cada estimación parcial reemplaza a la anterior en la misma línea de
+        resultados, así que se ve cómo converge.
+        
+        Args:
+            tab: Clave de la pestaña ('integral' o 'triple')
+        """
+        try:
+            controles = self.montecarlo[tab]
+            texto_error = controles['error'].get().strip()
+            error_objetivo = float(texto_error) if texto_error else None
+            # Marca al principio de la línea que irán reescribiendo las estimaciones
+            marca = f'{tab}_montecarlo'
+            self.mostrar_resultado("⏳ Estimando por Monte Carlo...\n")
+            self.result_text.mark_set(marca, 'end-2l linestart')
+            self.result_text.mark_gravity(marca, tk.LEFT)
+            self.enviar_tarea(
+                f'{tab}_montecarlo', 'motor.estimar_montecarlo',
+                controles['funcion'].get(), [entry.get() for entry in controles['limites']],
+                metodo=controles['metodo'].get(), error_objetivo=error_objetivo,
+                coordenadas=self.coordenadas[tab].get(),
+                al_progreso=lambda estimacion: self.mostrar_estimacion(marca, estimacion),
+                al_terminar=lambda estimacion: self.mostrar_estimacion(marca, estimacion),
+                al_fallar=self.mostrar_error_calculo)
+        except Exception as e:
+            self.mostrar_error_calculo(e)
+    
+    def mostrar_estimacion(self, marca, estimacion):
+        """
+        Reescribe la línea de Monte Carlo de una pestaña.
+        
+        Args:
+            marca: Marca del texto de resultados al principio de la línea
+            estimacion: EstimacionMonteCarlo parcial o final
+        """
+        estado = "" if estimacion.terminado else "⏳ "
+        self.reescribir_linea(
+            marca, f"{estado}Monte Carlo ({estimacion.metodo}) ≈ {estimacion.valor:.10g} "
+                   f"± {estimacion.error:.1e}   [{estimacion.puntos:,} puntos, "
+                   f"{estimacion.tiempo:.2f} s]")
+    
+    def alternar_vista_previa(self, tab):
+        """Abre la línea de la vista previa en vivo al activarla; la cancela al desactivarla."""
+        marca = f'{tab}_vivo'
+        if not self.vista_previa[tab]['activa'].get():
+            self.ejecutor.cancelar(marca)
+            return
+        self.mostrar_resultado("⚡ Vista previa en vivo activada\n")
+        self.result_text.mark_set(marca, 'end-2l linestart')
+        self.result_text.mark_gravity(marca, tk.LEFT)
+        self.programar_vista_previa(tab)
+    
+    def programar_vista_previa(self, tab):
+        """
+        Programa la vista previa en vivo de una pestaña tras un cambio.
+        
+        La tarea se envía cuando pasan RETARDO_VISTA_PREVIA_MS sin más
+        cambios; el resultado de una vista previa anterior se descarta en
+        cuanto cambia la entrada. Primero llegan una malla gruesa y una
+        estimación numérica, y la forma exacta solo cuando el motor la
+        encuentra. Los errores mientras se escribe ('sin(' a medias) se
+        muestran en la misma línea, sin ventanas emergentes.
+        
+        Args:
+            tab: Clave de la pestaña ('integral' o 'volumen')
+        """
+        controles = self.vista_previa.get(tab)
+        if controles is None or not controles['activa'].get():
+            return
+        marca = f'{tab}_vivo'
+        func_str = controles['funcion'].get()
+        limites = [entry.get() for entry in controles['limites']]
+        inferior = '0' if controles['inferior'] is None else controles['inferior'].get()
+        opciones = {'coordenadas': self.coordenadas[tab].get()}
+        if self.plazo_simbolico is not None:
+            opciones['plazo'] = self.plazo_simbolico
+        etiqueta = "∬ f(x, y) dxdy" if tab == 'integral' else "Volumen"
+        cmap = 'viridis' if tab == 'integral' else 'plasma'
+        self.ejecutor.enviar_diferido(
+            marca, RETARDO_VISTA_PREVIA_MS, 'motor.vista_previa',
+            func_str, *limites, z_inferior=inferior, **opciones,
+            al_progreso=lambda parcial: self.mostrar_vista_previa(
+                marca, etiqueta, parcial, cmap, f'Vista previa: z = {func_str}'),
+            al_terminar=lambda integral: self.reescribir_linea(
+                marca, "⚡ " + self.formatear_integral(etiqueta, integral).splitlines()[0]),
+            al_fallar=lambda e: self.reescribir_linea(marca, f"⚡ {etiqueta}: {e}"))
+    
+    def mostrar_vista_previa(self, marca, etiqueta, parcial, cmap, titulo):
+        """Dibuja la malla gruesa de una vista previa y su estimación numérica, si ya llegó."""
+        self.dibujar_superficie(parcial['malla'], cmap, titulo)
+        estimacion = parcial['estimacion']
+        if estimacion is None:
+            self.reescribir_linea(marca, f"⚡ {etiqueta}: ⏳ estimando...")
+        else:
+            self.reescribir_linea(
+                marca, f"⚡ {etiqueta} ≈ {estimacion.valor:.10g} (± {estimacion.error:.1e})"
+                       f"   ⏳ buscando la forma exacta...")
+    
+    def reescribir_linea(self, marca, texto):
+        """Sustituye la línea del texto de resultados que empieza en una marca."""
+        self.result_text.delete(marca, f'{marca} lineend +1c')
+        self.result_text.insert(marca, texto + "\n")
+        self.result_text.see(tk.END)
+    
+    def mostrar_barrido(self, barrido, func_str):
+        """
+        Muestra la tabla y la curva de un barrido de límites.
+        
+        Args:
+            barrido: ResultadoBarrido devuelto por motor.barrer_integral_doble
+            func_str: Texto de la función integrada
+        """
+        lineas = [f"Barrido de {barrido.parametro}   [{barrido.nivel}, {barrido.tiempo:.3f} s]"]
+        if barrido.exacto is not None:
+            lineas.append(f"∬ f(x, y) dxdy = {barrido.exacto}")
+        lineas.append(f"{barrido.parametro:>12}  {'∬ f(x, y) dxdy':>22}")
+        paso = max(1, -(-len(barrido.valores) // FILAS_TABLA_BARRIDO))
+        for valor, resultado in list(zip(barrido.valores, barrido.resultados))[::paso]:
+            lineas.append(f"{valor:>12.6g}  {resultado:>22.12g}")
+        if paso > 1:
+            lineas.append(f"(una de cada {paso} filas)")
+        self.mostrar_resultado("\n".join(lineas) + "\n")
+        
+        self.asegurar_figura()
+        self.graficos.curva(barrido.valores, barrido.resultados, barrido.parametro,
+                            '∬ f(x, y) dxdy', f'Barrido de {barrido.parametro}: f = {func_str}')
+    
+    def dibujar_superficie(self, malla, cmap, titulo):
+        """
+        Dibuja una superficie 3D ya evaluada junto con el plano z=0.
+        
+        Args:
+            malla: Tupla (X, Y, Z) producida por motor.malla_adaptativa, o
+                (X, Y, Z, Z_inferior) de motor.malla_volumen o motor.malla_datos
+            cmap: Mapa de colores de matplotlib
+            titulo: Título del gráfico
+        """
+        X, Y, Z, *inferior = malla
+        self.asegurar_figura()
+        self.graficos.superficie(X, Y, Z, cmap, titulo, *inferior)
+    
+    def dibujar_region(self, curvas, y_sup_str, y_inf_str):
+        """
+        Dibuja la región entre dos curvas ya evaluadas.
+        
+        Args:
+            curvas: Tupla (x_vals, [y_sup, y_inf]) devuelta por motor.curvas_region
+            y_sup_str, y_inf_str: Textos de las funciones para la leyenda
+        """
+        x_vals, (y_vals_sup, y_vals_inf) = curvas
+        self.asegurar_figura()
+        self.graficos.region(x_vals, y_vals_sup, y_vals_inf,
+                             f'y = {y_sup_str}', f'y = {y_inf_str}')
+    
+    def dibujar_campo(self, malla, titulo, puntos):
+        """
+        Dibuja un campo de gradiente ya evaluado.
+        
+        Args:
+            malla: Tupla (X, Y, Z, U, V, G) devuelta por motor.malla_gradiente
+            titulo: Título del gráfico
+            puntos: Puntos críticos a marcar como tuplas (x, y, tipo)
+        """
+        X, Y, Z, U, V, G = malla
+        self.asegurar_figura()
+        self.graficos.campo(X, Y, Z, U, V, titulo, puntos, G)
+    
+    def cancelar_tab(self, tab):
+        """
+        Cancela el cálculo, la graficación, el barrido, la estimación de
+        Monte Carlo y la vista previa en vivo en curso de una pestaña.
+        
+        Args:
+            tab: Clave de la pestaña ('integral', 'area', 'volumen', 'triple' o
+                'derivadas')
+        """
+        cancelado = False
+        for clave in (tab, f'{tab}_grafico', f'{tab}_barrido', f'{tab}_montecarlo',
+                      f'{tab}_vivo'):
+            cancelado = self.ejecutor.cancelar(clave) or cancelado
+        if cancelado:
+            self.mostrar_resultado("⏹ Cálculo cancelado\n")
+    
+    def mostrar_estadisticas_cache(self):
+        """Muestra los contadores de la caché de expresiones y del almacén persistente."""
+        def formatear(est):
+            return (f"Caché de expresiones: {est['entradas']}/{est['max_entradas']} entradas, "
+                    f"{est['aciertos']} aciertos, {est['fallos']} fallos "
+                    f"({est['tasa_aciertos']:.0%} de aciertos)\n")
+        
+        def formatear_almacen(est):
+            if est is None:
+                return "Almacén persistente: desactivado\n"
+            return (f"Almacén persistente: {est['entradas']} entradas, "
+                    f"{est['bytes'] / 1024:.0f}/{est['max_bytes'] / 1024:.0f} KB "
+                    f"en {est['ruta']}\n")
+        
+        self.ejecutor.enviar('cache', 'expresiones.estadisticas_cache',
+                             al_terminar=lambda est: self.mostrar_resultado(formatear(est)),
+                             al_fallar=self.mostrar_error_calculo)
+        self.ejecutor.enviar('almacen', 'almacen.estadisticas_almacen',
+                             al_terminar=lambda est: self.mostrar_resultado(formatear_almacen(est)),
+                             al_fallar=self.mostrar_error_calculo)
+    
+    def opciones_calculo(self, tab=None):
+        """Opciones que se envían a las funciones del motor (con las cifras y coordenadas de la pestaña)."""
+        opciones = {}
+        if self.plazo_simbolico is not None:
+            opciones['plazo'] = self.plazo_simbolico
+        if tab in self.precisiones and self.precisiones[tab].get() != PRECISIONES[0]:
+            opciones['digitos'] = int(self.precisiones[tab].get())
+        if tab in self.coordenadas and self.coordenadas[tab].get() != 'cartesianas':
+            opciones['coordenadas'] = self.coordenadas[tab].get()
+        return opciones
+    
+    def mostrar_error_calculo(self, e):
+        messagebox.showerror("Error", f"Error en el cálculo: {str(e)}")
+    
+    def mostrar_error_grafico(self, e):
+        messagebox.showerror("Error", f"Error en la graficación: {str(e)}")
+    
+    def al_cerrar(self):
+        """Detiene los procesos de cálculo antes de cerrar la ventana."""
+        self.ejecutor.cerrar()
+        self.root.destroy()
+    
+    def formatear_integral(self, etiqueta, integral):
+        """
+        Da formato a un ResultadoIntegral indicando el nivel que lo produjo.
+        
+        Args:
+            etiqueta: Texto que precede al valor (ej: "Volumen")
+            integral: ResultadoIntegral devuelto por el motor de cálculo
+        """
+        if integral.valor_preciso is not None:
+            exacto = "" if integral.exacto is None else f"{integral.exacto} ≈ "
+            valor = (f"{exacto}{integral.valor_preciso} "
+                     f"({integral.digitos} cifras, ± {integral.error:.1e})")
+        elif integral.exacto is not None and (integral.exacto.is_Integer or integral.exacto.is_Float):
+            valor = f"{integral.valor}"
+        elif integral.exacto is not None:
+            valor = f"{integral.exacto} ≈ {integral.valor}"
+        else:
+            valor = f"≈ {integral.valor} (± {integral.error:.2e})"
+        origen = ", almacén" if integral.almacenado else ""
+        texto = f"{etiqueta} = {valor}   [{integral.nivel}{origen}, {integral.tiempo:.3f} s]\n"
+        if integral.sugerencia is not None:
+            texto += (f"💡 El integrando tiene simetría radial: en coordenadas "
+                      f"{integral.sugerencia} probablemente sea más rápida y exacta\n")
+        if integral.piezas > 1:
+            texto += (f"✂️ Dominio dividido en {integral.piezas} piezas por pliegues "
+                      f"o singularidades del integrando\n")
+        return texto
+    
+    def mostrar_analisis(self, analisis, func_str, restriccion_str=None):
+        """
+        Muestra un AnalisisDiferencial y grafica el campo con sus puntos críticos.
+        
+        Args:
+            analisis: derivadas.AnalisisDiferencial devuelto por el motor
+            func_str: Texto de la función
+            restriccion_str: Texto de la restricción de Lagrange, o None
+        """
+        (fxx, fxy), (_, fyy) = analisis.hessiana.tolist()
+        texto = (f"f(x, y) = {func_str}\n"
+                 f"∇f = ({analisis.gradiente[0]}, {analisis.gradiente[1]})\n"
+                 f"H = [[{fxx}, {fxy}], [{fxy}, {fyy}]]\n")
+        if restriccion_str is not None:
+            texto += f"Restricción: {analisis.restriccion} = 0\n"
+        for punto in analisis.puntos:
+            posicion = (f"({punto.x:.10g}, {punto.y:.10g})" if punto.exacto is None
+                        else f"({punto.exacto[0]}, {punto.exacto[1]})")
+            lagrange = "" if punto.multiplicador is None else f", λ = {punto.multiplicador:.10g}"
+            texto += f"  • {punto.tipo} en {posicion}: f = {punto.valor:.10g}{lagrange}\n"
+        if not analisis.puntos:
+            texto += "  • Sin puntos críticos aislados en la región\n"
+        for familia in analisis.no_aislados:
+            texto += f"  • Curva de puntos críticos: {familia}\n"
+        texto += f"[{analisis.nivel}, {analisis.tiempo:.3f} s]\n"
+        self.mostrar_resultado(texto)
+        self.graficar_campo([(p.x, p.y, p.tipo) for p in analisis.puntos], restriccion_str)
     
     def mostrar_resultado(self, texto):
         self.result_text.insert(tk.END, texto)
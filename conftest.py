@@ -0,0 +1,20 @@
+"""
+Configuración común de las pruebas
+"""
+import os
+
+import pytest
+
+from almacen import VARIABLE_ENTORNO
+
+
+@pytest.fixture(autouse=True, scope='session')
+def almacen_temporal(tmp_path_factory):
+    """Usa un almacén persistente propio de la sesión en lugar del del usuario."""
+    anterior = os.environ.get(VARIABLE_ENTORNO)
+    os.environ[VARIABLE_ENTORNO] = str(tmp_path_factory.mktemp('almacen') / 'resultados.sqlite3')
+    yield
+    if anterior is None:
+        del os.environ[VARIABLE_ENTORNO]
+    else:
+        os.environ[VARIABLE_ENTORNO] = anterior
@@ -0,0 +1,170 @@
+"""
+Sistemas de coordenadas
+=======================
+
+Cambios de variable de las coordenadas cartesianas a polares, cilíndricas y
+esféricas, con su jacobiano. Una integral sobre un disco o una esfera
+suele ser mucho más barata (simbólica y numéricamente) en las coordenadas
+que siguen su simetría: ``sqrt(x**2 + y**2)`` sobre un disco pasa a ser
+``r·r`` sobre un rectángulo.
+
+Las variables de cada sistema se escriben ``r``, ``theta``, ``phi`` y
+``rho``. En esféricas, ``theta`` es el ángulo azimutal y ``phi`` el
+ángulo medido desde el eje z (0 ≤ phi ≤ pi).
+
+Las variables de cada sistema están ordenadas de la exterior a la
+interior, como las espera integrar_triple: en cilíndricas (theta, r, z) y
+en esféricas (theta, phi, rho).
+"""
+
+from dataclasses import dataclass
+
+import numpy as np
+import sympy as sp
+
+from expresiones import compilar
+from perfilado import etapa
+
+X, Y, Z = sp.symbols('x y z')
+R, THETA, PHI, RHO = sp.symbols('r theta phi rho')
+
+CARTESIANAS = 'cartesianas'
+
+# Puntos de prueba de la detección de simetría: radios y ángulos por radio
+RADIOS_PRUEBA = (0.3, 0.7, 1.3, 2.1)
+ANGULOS_PRUEBA = 16
+
+
+@dataclass(frozen=True)
+class SistemaCoordenadas:
+    """
+    Sistema de coordenadas y su cambio de variable a cartesianas.
+
+    Attributes:
+        nombre: Clave del sistema (ej: 'polares')
+        variables: Símbolos del sistema, de la variable exterior a la interior
+        cambio: Expresiones de x, y (y z) en función de las variables
+        jacobiano: Valor absoluto del determinante jacobiano del cambio
+    """
+    nombre: str
+    variables: tuple
+    cambio: tuple
+    jacobiano: sp.Expr
+
+    @property
+    def dimension(self):
+        return len(self.variables)
+
+
+SISTEMAS = {
+    sistema.nombre: sistema for sistema in (
+        SistemaCoordenadas(CARTESIANAS, (X, Y), (X, Y), sp.S.One),
+        SistemaCoordenadas('polares', (R, THETA),
+                           (R * sp.cos(THETA), R * sp.sin(THETA)), R),
+        SistemaCoordenadas('cilindricas', (THETA, R, Z),
+                           (R * sp.cos(THETA), R * sp.sin(THETA), Z), R),
+        SistemaCoordenadas('esfericas', (THETA, PHI, RHO),
+                           (RHO * sp.sin(PHI) * sp.cos(THETA),
+                            RHO * sp.sin(PHI) * sp.sin(THETA),
+                            RHO * sp.cos(PHI)), RHO**2 * sp.sin(PHI)),
+    )
+}
+
+# Sistema cartesiano de cada dimensión
+CARTESIANAS_3D = SistemaCoordenadas(CARTESIANAS, (X, Y, Z), (X, Y, Z), sp.S.One)
+
+
+def sistema(nombre, dimension):
+    """
+    Busca un sistema de coordenadas de una dimensión.
+
+    Args:
+        nombre: Clave del sistema ('cartesianas', 'polares', 'cilindricas'
+            o 'esfericas')
+        dimension: 2 para integrales dobles, 3 para triples
+
+    Returns:
+        SistemaCoordenadas
+
+    Raises:
+        ValueError: Si el sistema no existe o no es de esa dimensión
+    """
+    if nombre == CARTESIANAS and dimension == 3:
+        return CARTESIANAS_3D
+    encontrado = SISTEMAS.get(nombre)
+    if encontrado is None or encontrado.dimension != dimension:
+        validos = ", ".join(sistemas_de(dimension))
+        raise ValueError(f"Coordenadas desconocidas en {dimension}D: {nombre!r} (use {validos})")
+    return encontrado
+
+
+def sistemas_de(dimension):
+    """Nombres de los sistemas de coordenadas de una dimensión, cartesianas primero."""
+    return tuple(nombre for nombre, s in SISTEMAS.items()
+                 if s.dimension == dimension or nombre == CARTESIANAS)
+
+
+def transformar(func, destino):
+    """
+    Escribe un integrando cartesiano en otro sistema, jacobiano incluido.
+
+    El resultado se simplifica con trigsimp suponiendo r, rho ≥ 0 y
+    sin(phi) ≥ 0, de modo que sqrt(x**2 + y**2) pasa a ser r.
+
+    Args:
+        func: Expresión de SymPy en x, y (y z)
+        destino: SistemaCoordenadas
+
+    Returns:
+        Expresión de SymPy en las variables de destino
+    """
+    if destino.nombre == CARTESIANAS:
+        return func
+    cartesianas = (X, Y, Z)[:destino.dimension]
+    radial = RHO if destino.nombre == 'esfericas' else R
+    positivo = sp.Dummy(radial.name, nonnegative=True)
+    expr = func.subs(dict(zip(cartesianas, destino.cambio)), simultaneous=True) * destino.jacobiano
+    with etapa('simplify'):
+        expr = sp.trigsimp(expr.subs(radial, positivo))
+    expr = expr.subs(sp.sqrt(sp.sin(PHI)**2), sp.sin(PHI))
+    return expr.subs(positivo, radial)
+
+
+def sugerir_coordenadas(func, dimension):
+    """
+    Sugiere un sistema de coordenadas si el integrando tiene simetría radial.
+
+    La simetría se comprueba numéricamente: el integrando debe valer lo
+    mismo en varios puntos de cada circunferencia (o esfera) centrada en
+    el origen.
+
+    Args:
+        func: Expresión de SymPy en x, y (y z)
+        dimension: 2 o 3
+
+    Returns:
+        'polares', 'esfericas', 'cilindricas' o None si no hay simetría
+    """
+    if dimension == 2:
+        candidatos = (('polares', lambda r, t, p: (r * np.cos(t), r * np.sin(t))),)
+    else:
+        candidatos = (
+            ('esfericas', lambda r, t, p: (r * np.sin(p) * np.cos(t),
+                                          r * np.sin(p) * np.sin(t), r * np.cos(p))),
+            ('cilindricas', lambda r, t, p: (r * np.cos(t), r * np.sin(t), np.full_like(r, 0.4))),
+        )
+    nucleo = compilar(func, (X, Y, Z)[:dimension]).nucleo
+    generador = np.random.default_rng(0)
+    radios = np.repeat(RADIOS_PRUEBA, ANGULOS_PRUEBA).reshape(len(RADIOS_PRUEBA), -1)
+    angulos = generador.uniform(0, 2 * np.pi, radios.shape)
+    polares = generador.uniform(0.1, np.pi - 0.1, radios.shape)
+    for nombre, cambio in candidatos:
+        with np.errstate(all='ignore'):
+            valores = np.broadcast_to(
+                np.asarray(nucleo(*cambio(radios, angulos, polares)), dtype=float), radios.shape)
+        if not np.all(np.isfinite(valores)):
+            continue
+        escala = np.maximum(np.abs(valores).max(axis=1, keepdims=True), 1.0)
+        if np.all(np.ptp(valores, axis=1, keepdims=True) <= 1e-9 * escala):
+            return nombre
+    return None
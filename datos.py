@@ -0,0 +1,125 @@
+"""
+Datos medidos como integrandos
+==============================
+
+Carga rejillas de alturas medidas (CSV o ``.npy``) para integrarlas y
+graficarlas en lugar de una función simbólica. La rejilla Z tiene una fila
+por valor de y y una columna por valor de x, como las mallas de mallas.py:
+Z[i, j] es la altura en (x_j, y_i), con los puntos repartidos de forma
+uniforme sobre el rectángulo de la pestaña de volúmenes.
+
+Los ``.npy`` se abren proyectados en memoria (``np.load(mmap_mode='r')``),
+así que solo se leen las filas que se usan. Un CSV pequeño se lee entero;
+uno grande se convierte una vez, por bloques de filas, a un ``.npy`` junto
+a él y se proyecta en memoria. Con mallas.integrar_rejilla, que lee por
+bloques de filas, se integran archivos más grandes que la memoria.
+"""
+
+import itertools
+import os
+
+import numpy as np
+
+from mallas import malla_en_disco
+from perfilado import etapa
+
+# CSV más grandes que esto (bytes) se convierten a .npy en lugar de leerse enteros
+MAX_CSV_EN_MEMORIA = 64 * 2**20
+
+# Filas de CSV que se convierten de una vez
+FILAS_CONVERSION = 4096
+
+
+def _separador(linea):
+    """Separador de columnas de un CSV a partir de su primera línea (None: espacios)."""
+    for separador in (',', ';', '\t'):
+        if separador in linea:
+            return separador
+    return None
+
+
+def _lineas_de_datos(archivo):
+    """Líneas no vacías y sin comentarios (#) de un archivo de texto."""
+    return (linea for linea in archivo if linea.strip() and not linea.lstrip().startswith('#'))
+
+
+def csv_a_npy(ruta_csv, ruta_npy, filas_por_bloque=FILAS_CONVERSION):
+    """
+    Convierte un CSV numérico a .npy sin cargarlo entero en memoria.
+
+    Hace dos pasadas: una cuenta filas y columnas y otra escribe bloques de
+    filas en un np.memmap.
+
+    Args:
+        ruta_csv: CSV de alturas, una fila de la rejilla por línea
+        ruta_npy: Archivo .npy de destino
+
+    Returns:
+        El arreglo proyectado en memoria (solo lectura)
+
+    Raises:
+        ValueError: Si las filas no tienen todas el mismo número de columnas
+    """
+    with open(ruta_csv, encoding='utf-8') as archivo:
+        lineas = _lineas_de_datos(archivo)
+        primera = next(lineas, None)
+        if primera is None:
+            raise ValueError(f"{ruta_csv} no contiene datos")
+        separador = _separador(primera)
+        columnas = len(primera.split(separador))
+        filas = 1 + sum(1 for _ in lineas)
+
+    with etapa('conversion', filas=filas, columnas=columnas):
+        destino = malla_en_disco(ruta_npy, filas, columnas)
+        with open(ruta_csv, encoding='utf-8') as archivo:
+            lineas = _lineas_de_datos(archivo)
+            for inicio in range(0, filas, filas_por_bloque):
+                bloque = list(itertools.islice(lineas, filas_por_bloque))
+                valores = np.loadtxt(bloque, delimiter=separador, ndmin=2)
+                if valores.shape[1] != columnas:
+                    raise ValueError(f"{ruta_csv}: las filas deben tener {columnas} columnas")
+                destino[inicio:inicio + len(valores)] = valores
+        destino.flush()
+        del destino
+    return np.load(ruta_npy, mmap_mode='r')
+
+
+def cargar_rejilla(ruta, max_csv_en_memoria=MAX_CSV_EN_MEMORIA):
+    """
+    Abre una rejilla de alturas medida.
+
+    Args:
+        ruta: Archivo .npy (2D) o CSV (una fila de la rejilla por línea,
+            separada por comas, punto y coma, tabuladores o espacios)
+        max_csv_en_memoria: Tamaño en bytes a partir del cual un CSV se
+            convierte a ``ruta + '.npy'`` (y se reutiliza esa conversión
+            mientras sea más reciente que el CSV)
+
+    Returns:
+        Arreglo 2D (filas de y, columnas de x), en memoria o np.memmap
+
+    Raises:
+        ValueError: Si el archivo no es una rejilla 2D de al menos 2×2 puntos
+    """
+    if ruta.lower().endswith('.npy'):
+        Z = np.load(ruta, mmap_mode='r')
+    elif os.path.getsize(ruta) <= max_csv_en_memoria:
+        with open(ruta, encoding='utf-8') as archivo:
+            lineas = list(_lineas_de_datos(archivo))
+        Z = np.loadtxt(lineas, delimiter=_separador(lineas[0]) if lineas else None, ndmin=2)
+    else:
+        convertido = ruta + '.npy'
+        if (os.path.exists(convertido)
+                and os.path.getmtime(convertido) >= os.path.getmtime(ruta)):
+            Z = np.load(convertido, mmap_mode='r')
+        else:
+            Z = csv_a_npy(ruta, convertido)
+    if Z.ndim != 2 or min(Z.shape) < 2:
+        raise ValueError(f"{ruta} debe ser una rejilla 2D de al menos 2×2 puntos, no {Z.shape}")
+    return Z
+
+
+def coordenadas_rejilla(Z, x_min, x_max, y_min, y_max):
+    """Coordenadas (xs, ys) de las columnas y filas de una rejilla uniforme."""
+    filas, columnas = Z.shape
+    return np.linspace(x_min, x_max, columnas), np.linspace(y_min, y_max, filas)
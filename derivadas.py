@@ -0,0 +1,331 @@
+"""
+Cálculo diferencial de f(x, y)
+==============================
+
+Gradiente, hessiana y puntos críticos de f(x, y) con su clasificación, y
+extremos de f sobre una restricción g(x, y) = 0 por multiplicadores de
+Lagrange.
+
+Las derivadas se compilan una sola vez en un núcleo fusionado (ver
+ExpresionCompilada.nucleo_derivadas): una llamada de NumPy devuelve f, el
+gradiente y la hessiana en todos los puntos, con las subexpresiones
+comunes calculadas una vez. Lo usan tanto el campo de gradiente sobre una
+malla como el método de Newton.
+
+Los dos problemas son el mismo: los puntos críticos de f son los ceros de
+∇f, y los extremos con restricción son los ceros de ∇L con
+L(x, y, λ) = f − λ·g, cuya hessiana es la hessiana orlada que los
+clasifica. Cada sistema se resuelve primero con SymPy, en un proceso hijo
+con plazo; además, Newton vectorizado desde una rejilla de semillas sobre
+la región encuentra las soluciones que SymPy no da (familias periódicas,
+sistemas sin forma cerrada o sin tiempo).
+"""
+
+import time
+from dataclasses import dataclass, field
+from typing import Optional
+
+import numpy as np
+import sympy as sp
+
+from expresiones import compilar
+from integracion import NIVEL_NUMERICO, NIVEL_SIMBOLICO
+from perfilado import etapa
+from preprocesado import ejecutar_con_plazo
+
+# Plazo por defecto (segundos) para resolver el sistema con SymPy
+PLAZO_ECUACIONES = 5.0
+
+# Semillas de Newton por eje de la región
+SEMILLAS_POR_EJE = 12
+
+# Iteraciones máximas de Newton y residuo con el que se acepta un cero
+ITERACIONES_NEWTON = 40
+TOLERANCIA_NEWTON = 1e-10
+
+# Multiplicador de Lagrange
+LAMBDA = sp.Symbol('lambda')
+
+MINIMO = 'mínimo local'
+MAXIMO = 'máximo local'
+SILLA = 'punto de silla'
+DEGENERADO = 'degenerado'
+
+
+@dataclass(frozen=True)
+class PuntoCritico:
+    """
+    Punto crítico de f, libre o sobre la restricción.
+
+    Attributes:
+        x, y: Coordenadas
+        valor: f(x, y)
+        tipo: MINIMO, MAXIMO, SILLA (solo sin restricción) o DEGENERADO
+            si el criterio de la hessiana no decide
+        exacto: Tupla (x, y) exacta de SymPy, o None si se halló con Newton
+        multiplicador: λ de Lagrange, o None sin restricción
+    """
+    x: float
+    y: float
+    valor: float
+    tipo: str
+    exacto: Optional[tuple] = None
+    multiplicador: Optional[float] = None
+
+
+@dataclass
+class AnalisisDiferencial:
+    """
+    Derivadas de f y sus puntos críticos en una región.
+
+    Attributes:
+        gradiente: Lista (∂f/∂x, ∂f/∂y)
+        hessiana: sp.Matrix 2×2 de las derivadas segundas
+        puntos: PuntoCritico aislados dentro de la región, ordenados por valor
+        nivel: NIVEL_SIMBOLICO si SymPy dio todos los puntos de forma
+            exacta, NIVEL_NUMERICO si alguno salió solo de Newton
+        tiempo: Tiempo total empleado en segundos
+        restriccion: g(x, y) de Lagrange, o None
+        no_aislados: Soluciones de SymPy que son curvas de puntos críticos
+            (ej: x = 0 para f = x**2), como textos
+    """
+    gradiente: list
+    hessiana: sp.Matrix
+    puntos: list
+    nivel: str
+    tiempo: float
+    restriccion: Optional[sp.Expr] = None
+    no_aislados: list = field(default_factory=list)
+
+
+def campo_gradiente(func, x, y, x_min, x_max, y_min, y_max, n):
+    """
+    Evalúa f y su gradiente sobre una malla regular de n × n puntos.
+
+    Args:
+        func: Expresión de SymPy en x e y
+        x, y: Símbolos de la expresión
+        x_min, x_max, y_min, y_max: Límites de la malla
+        n: Puntos por eje
+
+    Returns:
+        Tupla (X, Y, Z, U, V) con U = ∂f/∂x y V = ∂f/∂y; los valores no
+        finitos pasan a NaN
+    """
+    xs, ys = np.linspace(x_min, x_max, n), np.linspace(y_min, y_max, n)
+    nucleo = compilar(func, (x, y)).nucleo_derivadas
+    with etapa('malla', puntos=n * n), np.errstate(all='ignore'):
+        Z, U, V = nucleo(xs[None, :], ys[:, None])[:3]
+    X, Y = np.meshgrid(xs, ys)
+    return (X, Y, *(np.where(np.isfinite(A), A, np.nan) for A in (Z, U, V)))
+
+
+def _matrices(segundas, n):
+    """Matrices (m, n, n) simétricas a partir de las derivadas segundas con i ≤ j."""
+    m = np.broadcast_shapes(*(np.shape(s) for s in segundas))
+    H = np.empty(m + (n, n))
+    k = 0
+    for i in range(n):
+        for j in range(i, n):
+            H[..., i, j] = H[..., j, i] = segundas[k]
+            k += 1
+    return H
+
+
+def _newton(nucleo, n, semillas):
+    """
+    Newton vectorizado para ∇F = 0 desde todas las semillas a la vez.
+
+    Args:
+        nucleo: Núcleo fusionado de F (ver nucleo_derivadas)
+        n: Número de incógnitas
+        semillas: Arreglo (m, n) de puntos iniciales
+
+    Returns:
+        Arreglo (k, n) con los ceros a los que convergieron las semillas
+    """
+    puntos = np.array(semillas, dtype=float)
+    identidad = np.eye(n)
+    with np.errstate(all='ignore'):
+        for _ in range(ITERACIONES_NEWTON):
+            valores = nucleo(*puntos.T)
+            F = np.stack(valores[1:n + 1], axis=-1)
+            J = _matrices(valores[n + 1:], n)
+            validos = np.isfinite(F).all(axis=1) & np.isfinite(J).all(axis=(1, 2))
+            validos &= np.abs(np.linalg.det(np.where(validos[:, None, None], J, identidad))) > 1e-300
+            if not validos.any():
+                return np.empty((0, n))
+            puntos, F, J = puntos[validos], F[validos], J[validos]
+            paso = np.linalg.solve(J, F[..., None])[..., 0]
+            puntos = puntos - paso
+            if np.abs(paso).max() <= TOLERANCIA_NEWTON * max(1.0, np.abs(puntos).max()):
+                break
+        valores = nucleo(*puntos.T)
+    F = np.stack(valores[1:n + 1], axis=-1)
+    escala = 1.0 + np.abs(valores[0])
+    return puntos[(np.abs(F) <= 1e3 * TOLERANCIA_NEWTON * escala[:, None]).all(axis=1)]
+
+
+def _resolver_simbolico(ecuaciones, incognitas):
+    """sp.solve del sistema; separa soluciones aisladas de familias (variables libres)."""
+    soluciones = sp.solve(ecuaciones, incognitas, dict=True)
+    aisladas, familias = [], []
+    for solucion in soluciones:
+        if all(v in solucion and not solucion[v].free_symbols for v in incognitas):
+            aisladas.append(tuple(solucion[v] for v in incognitas))
+        else:
+            familias.append(solucion)
+    return aisladas, familias
+
+
+def _dentro(punto, region, holgura=1e-9):
+    (x_min, x_max), (y_min, y_max) = region
+    hx, hy = holgura * max(1.0, x_max - x_min), holgura * max(1.0, y_max - y_min)
+    return x_min - hx <= punto[0] <= x_max + hx and y_min - hy <= punto[1] <= y_max + hy
+
+
+def _semillas(region, extra=0):
+    """Rejilla de SEMILLAS_POR_EJE² puntos interiores de la región (más columnas a 0)."""
+    (x_min, x_max), (y_min, y_max) = region
+    fracciones = (np.arange(SEMILLAS_POR_EJE) + 0.5) / SEMILLAS_POR_EJE
+    xs = x_min + (x_max - x_min) * fracciones
+    ys = y_min + (y_max - y_min) * fracciones
+    X, Y = np.meshgrid(xs, ys)
+    return np.column_stack([X.ravel(), Y.ravel()] + [np.zeros(X.size)] * extra)
+
+
+def _clasificar(segundas, restringido, escala):
+    """
+    Tipo de un punto crítico a partir de las derivadas segundas de f o de L.
+
+    Sin restricción: det H > 0 y f_xx > 0 es un mínimo, f_xx < 0 un máximo y
+    det H < 0 un punto de silla. Con restricción, la hessiana de L en
+    (x, y, λ) tiene el determinante de la orlada: > 0 es un máximo y < 0 un
+    mínimo sobre la curva.
+    """
+    n = 3 if restringido else 2
+    H = _matrices(segundas, n)
+    determinante = float(np.linalg.det(H))
+    if abs(determinante) <= 1e-9 * max(1.0, escala) ** n:
+        return DEGENERADO
+    if restringido:
+        return MAXIMO if determinante > 0 else MINIMO
+    if determinante < 0:
+        return SILLA
+    return MINIMO if H[0, 0] > 0 else MAXIMO
+
+
+def _puntos_criticos(func, incognitas, region, plazo, restriccion=None):
+    """
+    Ceros del gradiente de func respecto a las incógnitas dentro de la región.
+
+    Returns:
+        Tupla (puntos, exactos, familias): PuntoCritico ordenados por valor,
+        si todos son exactos y las soluciones de SymPy no aisladas
+    """
+    entrada = compilar(func, incognitas)
+    gradiente, _ = entrada.derivadas()
+    nucleo = entrada.nucleo_derivadas
+    n = len(incognitas)
+
+    aisladas, familias = [], []
+    with etapa('solve', plazo=plazo):
+        if plazo is None:
+            try:
+                resultado = _resolver_simbolico(gradiente, list(incognitas))
+            except Exception:
+                resultado = None
+        elif plazo > 0:
+            resultado = ejecutar_con_plazo(_resolver_simbolico, (gradiente, list(incognitas)), plazo)
+        else:
+            resultado = None
+    if resultado is not None:
+        aisladas, familias = resultado
+
+    candidatos = []
+    for solucion in aisladas:
+        valores = [complex(sp.N(v)) for v in solucion]
+        if all(abs(v.imag) <= 1e-12 * max(1.0, abs(v.real)) for v in valores):
+            candidatos.append((np.array([v.real for v in valores]), solucion))
+    semillas = _semillas(region, extra=n - 2)
+    if restriccion is not None:
+        # λ inicial por mínimos cuadrados en ∇f = λ∇g; -∇g es la última fila de la hessiana de L
+        with np.errstate(all='ignore'):
+            valores = nucleo(*semillas.T)
+            fx, fy, gx, gy = valores[1], valores[2], -valores[6], -valores[8]
+            semillas[:, 2] = np.nan_to_num((fx * gx + fy * gy) / (gx**2 + gy**2))
+    with etapa('newton', semillas=len(semillas)):
+        candidatos += [(punto, None) for punto in _newton(nucleo, n, semillas)]
+
+    (x_min, x_max), (y_min, y_max) = region
+    escala = max(x_max - x_min, y_max - y_min)
+    puntos = []
+    for punto, exacto in candidatos:
+        if not _dentro(punto, region) or any(
+                np.abs(punto[:2] - np.array([p.x, p.y])).max() <= 1e-7 * escala for p in puntos):
+            continue
+        with np.errstate(all='ignore'):
+            valores = [float(v) for v in nucleo(*punto)]
+        valor = valores[0] if restriccion is None else float(
+            compilar(func.subs(LAMBDA, 0), incognitas).nucleo(*punto))
+        puntos.append(PuntoCritico(
+            float(punto[0]), float(punto[1]), valor,
+            _clasificar(valores[n + 1:], restriccion is not None, escala),
+            exacto=None if exacto is None else tuple(exacto[:2]),
+            multiplicador=None if restriccion is None else float(punto[2])))
+    puntos.sort(key=lambda p: (p.valor, p.x, p.y))
+    return puntos, all(p.exacto is not None for p in puntos), familias
+
+
+def analizar_diferencial(func, x, y, x_min, x_max, y_min, y_max, plazo=PLAZO_ECUACIONES):
+    """
+    Gradiente, hessiana y puntos críticos clasificados de f en un rectángulo.
+
+    Args:
+        func: Expresión de SymPy en x e y
+        x, y: Símbolos de la expresión
+        x_min, x_max, y_min, y_max: Región donde se buscan los puntos críticos
+        plazo: Segundos concedidos a sp.solve (None: sin límite; 0: solo Newton)
+
+    Returns:
+        AnalisisDiferencial
+    """
+    inicio = time.perf_counter()
+    gradiente, hessiana = compilar(func, (x, y)).derivadas()
+    region = ((float(x_min), float(x_max)), (float(y_min), float(y_max)))
+    puntos, exactos, familias = _puntos_criticos(func, (x, y), region, plazo)
+    return AnalisisDiferencial(
+        gradiente, hessiana, puntos, NIVEL_SIMBOLICO if exactos else NIVEL_NUMERICO,
+        time.perf_counter() - inicio,
+        no_aislados=[", ".join(f"{v} = {e}" for v, e in s.items()) for s in familias])
+
+
+def multiplicadores_lagrange(func, restriccion, x, y, x_min, x_max, y_min, y_max,
+                             plazo=PLAZO_ECUACIONES):
+    """
+    Extremos de f sobre la curva g(x, y) = 0 por multiplicadores de Lagrange.
+
+    Resuelve ∇f = λ∇g, g = 0 como los puntos críticos de L = f − λ·g en
+    (x, y, λ) y los clasifica con la hessiana orlada.
+
+    Args:
+        func: Expresión de SymPy en x e y
+        restriccion: g(x, y), con la restricción g = 0
+        x, y: Símbolos de las expresiones
+        x_min, x_max, y_min, y_max: Región donde se buscan los extremos
+        plazo: Segundos concedidos a sp.solve
+
+    Returns:
+        AnalisisDiferencial con el gradiente y la hessiana de f, y los
+        puntos con su multiplicador
+    """
+    inicio = time.perf_counter()
+    gradiente, hessiana = compilar(func, (x, y)).derivadas()
+    region = ((float(x_min), float(x_max)), (float(y_min), float(y_max)))
+    lagrangiana = func - LAMBDA * restriccion
+    puntos, exactos, familias = _puntos_criticos(lagrangiana, (x, y, LAMBDA), region, plazo,
+                                                 restriccion=restriccion)
+    return AnalisisDiferencial(
+        gradiente, hessiana, puntos, NIVEL_SIMBOLICO if exactos else NIVEL_NUMERICO,
+        time.perf_counter() - inicio, restriccion=restriccion,
+        no_aislados=[", ".join(f"{v} = {e}" for v, e in s.items()) for s in familias])
@@ -0,0 +1,391 @@
+"""
+Ejecución de cálculos fuera del bucle de eventos de Tk
+======================================================
+
+SymPy mantiene el GIL durante las integraciones, así que los cálculos
+pesados se ejecutan en un grupo de procesos trabajadores. Cada trabajador
+es un proceso persistente que recibe tareas por una tubería; cancelar una
+tarea en curso termina su proceso y se crea otro cuando haga falta.
+
+Los resultados se entregan en el hilo principal mediante ``root.after``,
+por lo que los callbacks pueden tocar la interfaz con seguridad.
+
+Las funciones pueden indicarse por nombre (``'motor.calcular_area'``) para
+que el proceso principal no tenga que importar SymPy ni NumPy.
+
+Si la función es un generador, cada valor producido se envía como resultado
+parcial (por ejemplo, una vista previa de un gráfico) y el valor devuelto
+con ``return`` es el resultado final.
+
+Una tarea enviada con ``al_perfil`` se ejecuta con el perfilador del
+trabajador activo (ver perfilado.py) y sus etapas se entregan antes del
+resultado final.
+
+``enviar_diferido`` espera a que pase un intervalo sin nuevos envíos con
+la misma clave antes de enviar la tarea (debounce), para recalcular
+mientras se escribe sin encolar un cálculo por cada tecla.
+"""
+
+import importlib
+import inspect
+import multiprocessing
+import os
+import signal
+import sys
+import time
+from collections import deque
+
+from perfilado import PERFILADOR
+
+# Intervalo de sondeo de resultados (milisegundos)
+INTERVALO_SONDEO_MS = 50
+
+# Estados de los mensajes que envían los trabajadores
+OK = 'ok'
+ERROR = 'error'
+PARCIAL = 'parcial'
+PERFIL = 'perfil'
+
+
+def _terminar_trabajador(signum, frame):
+    """Convierte SIGTERM en SystemExit para que el proceso limpie sus hijos."""
+    sys.exit(0)
+
+
+def _resolver(funcion):
+    """Convierte un nombre 'modulo.funcion' en la función correspondiente."""
+    if isinstance(funcion, str):
+        modulo, _, nombre = funcion.rpartition('.')
+        return getattr(importlib.import_module(modulo), nombre)
+    return funcion
+
+
+def _ejecutar(conexion, ident, funcion, args, kwargs):
+    """Ejecuta una tarea; si es un generador, envía cada valor como parcial."""
+    resultado = _resolver(funcion)(*args, **kwargs)
+    if not inspect.isgenerator(resultado):
+        return resultado
+    while True:
+        try:
+            parcial = next(resultado)
+        except StopIteration as fin:
+            return fin.value
+        conexion.send((ident, PARCIAL, parcial))
+
+
+def _bucle_trabajador(conexion):
+    """
+    Bucle principal de un proceso trabajador.
+
+    Recibe tuplas (ident, funcion, args, kwargs, perfilar) y responde con
+    (ident, estado, valor), donde estado es OK, ERROR, PARCIAL o PERFIL.
+    Un mensaje None lo detiene.
+    """
+    if hasattr(signal, 'SIGTERM'):
+        signal.signal(signal.SIGTERM, _terminar_trabajador)
+
+    while True:
+        try:
+            mensaje = conexion.recv()
+        except (EOFError, OSError):
+            break
+        if mensaje is None:
+            break
+
+        ident, funcion, args, kwargs, perfilar = mensaje
+        if perfilar:
+            PERFILADOR.iniciar()
+        try:
+            respuesta = (ident, OK, _ejecutar(conexion, ident, funcion, args, kwargs))
+        except Exception as e:
+            respuesta = (ident, ERROR, e)
+        if perfilar:
+            conexion.send((ident, PERFIL, PERFILADOR.detener()))
+
+        try:
+            conexion.send(respuesta)
+        except Exception as e:
+            # El resultado o la excepción no se pudieron serializar
+            conexion.send((ident, ERROR, RuntimeError(str(e))))
+
+
+class _Trabajador:
+    """Proceso trabajador con su tubería y la tarea que está ejecutando."""
+
+    def __init__(self, contexto):
+        self.conexion, extremo_hijo = contexto.Pipe()
+        self.proceso = contexto.Process(target=_bucle_trabajador,
+                                        args=(extremo_hijo,))
+        self.proceso.start()
+        extremo_hijo.close()
+        self.tarea = None
+
+    def terminar(self):
+        """Detiene el proceso de inmediato, aunque esté ocupado."""
+        if self.proceso.is_alive():
+            self.proceso.terminate()
+        self.proceso.join()
+        self.conexion.close()
+
+
+class EjecutorTareas:
+    """
+    Grupo de procesos para ejecutar cálculos sin bloquear la interfaz.
+
+    Cada tarea se identifica con una clave (por ejemplo, la pestaña que la
+    originó). Enviar una tarea con una clave ocupada reemplaza a la anterior,
+    de modo que cada pestaña tiene a lo sumo una tarea activa y las pestañas
+    no se bloquean entre sí.
+
+    Attributes:
+        root: Ventana de tkinter usada para programar el sondeo (o None)
+        max_procesos: Número máximo de procesos trabajadores simultáneos
+    """
+
+    def __init__(self, root=None, max_procesos=None, contexto=None):
+        """
+        Args:
+            root: Ventana de tkinter; si es None, el sondeo se hace llamando
+                a procesar_pendientes() manualmente
+            max_procesos: Límite de trabajadores (por defecto, núcleos de CPU)
+            contexto: Contexto de multiprocessing (por defecto 'spawn', que
+                no hereda el estado de Tk del proceso principal)
+        """
+        self.root = root
+        self.max_procesos = max_procesos or max(1, min(4, os.cpu_count() or 1))
+        self._contexto = contexto or multiprocessing.get_context('spawn')
+        self._libres = []
+        self._ocupados = []
+        self._pendientes = deque()
+        self._tareas = {}
+        self._diferidas = {}
+        self._siguiente_id = 0
+        self._sondeo_programado = False
+
+    def enviar(self, clave, funcion, *args, al_terminar=None, al_fallar=None,
+               al_progreso=None, al_perfil=None, **kwargs):
+        """
+        Envía una tarea a ejecutar en segundo plano.
+
+        Args:
+            clave: Identificador de la tarea; reemplaza a otra con la misma clave
+            funcion: Función de nivel de módulo (debe poder serializarse) o
+                su nombre completo como texto, por ejemplo 'motor.calcular_area'
+            *args, **kwargs: Argumentos para la función
+            al_terminar: Callback con el resultado, llamado en el hilo de Tk
+            al_fallar: Callback con la excepción, llamado en el hilo de Tk
+            al_progreso: Callback con cada resultado parcial de un generador;
+                si llegan varios entre dos sondeos solo se entrega el último
+            al_perfil: Callback con la lista de etapas medidas en el
+                trabajador; si se indica, la tarea se ejecuta perfilada
+
+        Returns:
+            Identificador numérico de la tarea
+        """
+        self.cancelar(clave)
+        self._siguiente_id += 1
+        ident = self._siguiente_id
+        self._tareas[clave] = (ident, al_terminar, al_fallar, al_progreso, al_perfil)
+        self._pendientes.append((ident, clave, funcion, args, kwargs, al_perfil is not None))
+        self._despachar()
+        self._programar_sondeo()
+        return ident
+
+    def enviar_diferido(self, clave, retardo_ms, funcion, *args, **kwargs):
+        """
+        Envía una tarea cuando pasen retardo_ms sin otro envío con la misma clave.
+
+        Cada llamada reinicia la espera y sustituye a la tarea diferida
+        anterior. La tarea en curso con esa clave deja de entregar
+        resultados en el acto, porque ya son obsoletos, y se termina cuando
+        se envía la nueva; así, mientras se escribe, no se mata un
+        trabajador por cada tecla ni se encolan cálculos inútiles.
+
+        Args:
+            clave: Identificador de la tarea, como en enviar
+            retardo_ms: Milisegundos de espera sin nuevos envíos
+            funcion, *args, **kwargs: Como en enviar (callbacks incluidos)
+        """
+        obsoletas = set()
+        diferida = self._diferidas.pop(clave, None)
+        if diferida is not None:
+            obsoletas = diferida[1]
+        tarea = self._tareas.pop(clave, None)
+        if tarea is not None:
+            if not self._quitar_pendiente(tarea[0]):
+                obsoletas.add(tarea[0])
+        limite = time.monotonic() + retardo_ms / 1000
+        self._diferidas[clave] = (limite, obsoletas, funcion, args, kwargs)
+        self._programar_sondeo()
+
+    def cancelar(self, clave):
+        """
+        Cancela la tarea asociada a una clave.
+
+        Si la tarea ya se está ejecutando, su proceso se termina. También se
+        descarta la tarea diferida con esa clave, si la hay.
+
+        Returns:
+            True si había una tarea que cancelar
+        """
+        diferida = self._diferidas.pop(clave, None)
+        if diferida is not None:
+            for ident in diferida[1]:
+                self._terminar_tarea(ident)
+        tarea = self._tareas.pop(clave, None)
+        if tarea is None:
+            if diferida is not None:
+                self._despachar()
+            return diferida is not None
+        ident = tarea[0]
+
+        if not self._quitar_pendiente(ident):
+            self._terminar_tarea(ident)
+        self._despachar()
+        return True
+
+    def en_curso(self, clave):
+        """Indica si hay una tarea diferida, pendiente o en ejecución con esa clave."""
+        return clave in self._tareas or clave in self._diferidas
+
+    def _quitar_pendiente(self, ident):
+        """Retira una tarea de la cola si aún no se despachó; True si estaba."""
+        for pendiente in self._pendientes:
+            if pendiente[0] == ident:
+                self._pendientes.remove(pendiente)
+                return True
+        return False
+
+    def _terminar_tarea(self, ident):
+        """Termina el proceso que ejecuta una tarea, si sigue en curso."""
+        for trabajador in self._ocupados:
+            if trabajador.tarea == ident:
+                self._ocupados.remove(trabajador)
+                trabajador.terminar()
+                return
+
+    def procesar_pendientes(self):
+        """
+        Recoge los resultados disponibles y ejecuta sus callbacks.
+
+        Returns:
+            Número de tareas que siguen diferidas, pendientes o en ejecución
+        """
+        ahora = time.monotonic()
+        for clave, (limite, obsoletas, funcion, args, kwargs) in list(self._diferidas.items()):
+            if limite <= ahora:
+                del self._diferidas[clave]
+                for ident in obsoletas:
+                    self._terminar_tarea(ident)
+                self.enviar(clave, funcion, *args, **kwargs)
+
+        for trabajador in list(self._ocupados):
+            parcial = None
+            perfil = None
+            final = None
+            try:
+                while trabajador.conexion.poll():
+                    mensaje = trabajador.conexion.recv()
+                    if mensaje[1] == PARCIAL:
+                        parcial = mensaje
+                    elif mensaje[1] == PERFIL:
+                        perfil = mensaje
+                    else:
+                        final = mensaje
+                        break
+                if final is None and not trabajador.proceso.is_alive():
+                    raise EOFError
+            except (EOFError, OSError):
+                # El proceso murió sin responder
+                self._ocupados.remove(trabajador)
+                trabajador.terminar()
+                self._completar(trabajador.tarea, ERROR,
+                                RuntimeError("El proceso de cálculo terminó inesperadamente"))
+                continue
+
+            if parcial is not None:
+                self._notificar_progreso(*parcial)
+            if perfil is not None:
+                self._notificar_perfil(*perfil)
+            if final is not None:
+                self._ocupados.remove(trabajador)
+                trabajador.tarea = None
+                self._libres.append(trabajador)
+                self._completar(*final)
+
+        self._despachar()
+        return len(self._tareas) + len(self._diferidas)
+
+    def cerrar(self):
+        """Termina todos los procesos trabajadores y descarta las tareas."""
+        self._pendientes.clear()
+        self._tareas.clear()
+        self._diferidas.clear()
+        for trabajador in self._libres:
+            try:
+                trabajador.conexion.send(None)
+            except OSError:
+                pass
+            trabajador.terminar()
+        for trabajador in self._ocupados:
+            trabajador.terminar()
+        self._libres.clear()
+        self._ocupados.clear()
+
+    def _completar(self, ident, estado, valor):
+        """Ejecuta el callback final de una tarea si todavía es la vigente."""
+        for clave, (vigente, al_terminar, al_fallar, _, _) in list(self._tareas.items()):
+            if vigente == ident:
+                del self._tareas[clave]
+                callback = al_terminar if estado == OK else al_fallar
+                if callback is not None:
+                    callback(valor)
+                return
+
+    def _notificar_progreso(self, ident, estado, valor):
+        """Entrega un resultado parcial si la tarea sigue vigente."""
+        for vigente, _, _, al_progreso, _ in self._tareas.values():
+            if vigente == ident:
+                if al_progreso is not None:
+                    al_progreso(valor)
+                return
+
+    def _notificar_perfil(self, ident, estado, eventos):
+        """Entrega las etapas medidas de una tarea si sigue vigente."""
+        for vigente, _, _, _, al_perfil in self._tareas.values():
+            if vigente == ident:
+                if al_perfil is not None:
+                    al_perfil(eventos)
+                return
+
+    def _despachar(self):
+        """Asigna tareas pendientes a trabajadores libres."""
+        while self._pendientes:
+            if self._libres:
+                trabajador = self._libres.pop()
+            elif len(self._ocupados) < self.max_procesos:
+                trabajador = _Trabajador(self._contexto)
+            else:
+                return
+
+            ident, clave, funcion, args, kwargs, perfilar = self._pendientes.popleft()
+            try:
+                trabajador.conexion.send((ident, funcion, args, kwargs, perfilar))
+            except Exception as e:
+                self._libres.append(trabajador)
+                self._completar(ident, ERROR, e)
+                continue
+            trabajador.tarea = ident
+            self._ocupados.append(trabajador)
+
+    def _programar_sondeo(self):
+        """Programa el siguiente sondeo en el bucle de Tk si hace falta."""
+        if self.root is None or self._sondeo_programado:
+            return
+        self._sondeo_programado = True
+        self.root.after(INTERVALO_SONDEO_MS, self._sondear)
+
+    def _sondear(self):
+        self._sondeo_programado = False
+        if self.procesar_pendientes():
+            self._programar_sondeo()
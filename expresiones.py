@@ -0,0 +1,411 @@
+"""
+Caché de expresiones compiladas
+===============================
+
+Evita repetir ``sp.sympify`` y ``sp.lambdify`` cada vez que se pulsa un
+botón. Cada entrada guarda la expresión analizada, su núcleo NumPy, las
+antiderivadas simbólicas que ya se hayan calculado y, si se piden, sus
+derivadas con un núcleo fusionado que las evalúa todas a la vez.
+
+La caché es LRU con un número máximo de entradas y lleva contadores de
+aciertos y fallos. Existe una caché por proceso: la del proceso principal
+ahorra el análisis de los textos y la de cada trabajador ahorra la
+compilación de los núcleos entre tareas.
+
+El núcleo se puede compilar con varios backends: ``numpy`` (lambdify, una
+cadena de llamadas de NumPy con un arreglo temporal por operación),
+``numexpr`` (una sola pasada por bloques, sin temporales y con varios
+hilos) o ``numba`` (un ufunc compilado con JIT). Se elige con la variable
+de entorno ``CALCULADORA_BACKEND`` (``auto`` toma numexpr si está
+instalado). Si el backend no está instalado, no admite la expresión o
+falla al evaluarla, se usa NumPy.
+"""
+
+import importlib
+import importlib.util
+import math
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+import sympy as sp
+
+from perfilado import etapa
+
+# Número máximo de expresiones guardadas por defecto
+MAX_ENTRADAS = 128
+
+BACKENDS = ('numpy', 'numexpr', 'numba')
+VARIABLE_BACKEND = 'CALCULADORA_BACKEND'
+AUTOMATICO = 'auto'
+
+# Orden de preferencia de AUTOMATICO (numba queda fuera: compila cada
+# expresión con JIT, lo que solo compensa en mallas muy grandes)
+PREFERENCIA_AUTOMATICA = ('numexpr', 'numpy')
+
+
+def normalizar(texto):
+    """
+    Clave de caché de un texto: 'x * y' y 'x*y' comparten entrada.
+
+    Solo se eliminan los espacios que no separan dos nombres o números, así
+    que 'x y' o '2 3' no se confunden con 'xy' o '23'.
+    """
+    return re.sub(r'(?<!\w) | (?!\w)', '', " ".join(texto.split()))
+
+
+class ExpresionCompilada:
+    """
+    Expresión analizada junto con sus formas compiladas.
+
+    Attributes:
+        expr: Expresión de SymPy
+        variables: Tupla de símbolos de la expresión
+    """
+
+    def __init__(self, expr, variables):
+        self.expr = expr
+        self.variables = variables
+        self._nucleos = {}
+        self._antiderivadas = {}
+        self._derivadas = None
+        self._nucleo_derivadas = None
+
+    @property
+    def nucleo(self):
+        """Función vectorizada de la expresión con el backend activo, compilada al primer uso."""
+        return self.nucleo_con(backend_activo())
+
+    def nucleo_con(self, backend):
+        """
+        Función vectorizada de la expresión compilada con un backend.
+
+        Args:
+            backend: Uno de BACKENDS; si no está disponible se usa NumPy
+
+        Returns:
+            Función f(*arreglos) que admite difusión como un ufunc
+        """
+        if backend not in self._nucleos:
+            with etapa('lambdify', backend=backend):
+                self._nucleos[backend] = _compilar_nucleo(self.expr, self.variables, backend)
+        return self._nucleos[backend]
+
+    def derivadas(self):
+        """
+        Gradiente y hessiana simbólicos, calculados al primer uso.
+
+        Returns:
+            Tupla (gradiente, hessiana): lista de ∂f/∂vᵢ y sp.Matrix de ∂²f/∂vᵢ∂vⱼ
+        """
+        if self._derivadas is None:
+            with etapa('diff'):
+                gradiente = [sp.diff(self.expr, v) for v in self.variables]
+                hessiana = sp.Matrix([[sp.diff(g, v) for v in self.variables] for g in gradiente])
+            self._derivadas = (gradiente, hessiana)
+        return self._derivadas
+
+    @property
+    def nucleo_derivadas(self):
+        """
+        Núcleo fusionado de f, su gradiente y su hessiana, compilado al primer uso.
+
+        Una sola función de NumPy, generada con cse=True, calcula f, las n
+        derivadas primeras y las n(n+1)/2 segundas (∂²f/∂vᵢ∂vⱼ con i ≤ j), así
+        que las subexpresiones comunes a todas se evalúan una vez por punto.
+
+        Returns:
+            Función f(*arreglos) que devuelve la lista [f, ∂f/∂v₁, ...,
+            ∂²f/∂v₁², ∂²f/∂v₁∂v₂, ...] de arreglos float con la forma
+            difundida de los argumentos
+        """
+        if self._nucleo_derivadas is None:
+            gradiente, hessiana = self.derivadas()
+            n = len(self.variables)
+            segundas = [hessiana[i, j] for i in range(n) for j in range(i, n)]
+            with etapa('lambdify', backend='numpy'):
+                fusionado = sp.lambdify(self.variables, [self.expr, *gradiente, *segundas],
+                                        'numpy', cse=True)
+
+            def nucleo(*args):
+                forma = np.broadcast_shapes(*(np.shape(a) for a in args))
+                return [np.broadcast_to(np.asarray(valor, dtype=float), forma)
+                        for valor in fusionado(*args)]
+
+            self._nucleo_derivadas = nucleo
+        return self._nucleo_derivadas
+
+    def antiderivada(self, *variables):
+        """
+        Antiderivada indefinida respecto a las variables dadas, en orden.
+
+        Returns:
+            Expresión de SymPy (puede contener Integral si no hay forma cerrada)
+        """
+        if variables not in self._antiderivadas:
+            with etapa('integrate'):
+                self._antiderivadas[variables] = sp.integrate(self.expr, *variables)
+        return self._antiderivadas[variables]
+
+    def tiene_antiderivada(self, *variables):
+        """Indica si la antiderivada respecto a esas variables ya está calculada."""
+        return variables in self._antiderivadas
+
+    def guardar_antiderivada(self, variables, antiderivada):
+        """Registra una antiderivada calculada en otro lugar (por ejemplo, otro proceso)."""
+        self._antiderivadas[tuple(variables)] = antiderivada
+
+
+def backend_disponible(nombre):
+    """Indica si un backend se puede usar (NumPy siempre; los demás si están instalados)."""
+    if nombre == 'numpy':
+        return True
+    return nombre in BACKENDS and importlib.util.find_spec(nombre) is not None
+
+
+def backend_activo():
+    """Backend elegido con CALCULADORA_BACKEND, o 'numpy' si no está disponible."""
+    pedido = os.environ.get(VARIABLE_BACKEND, 'numpy').strip().lower()
+    candidatos = PREFERENCIA_AUTOMATICA if pedido == AUTOMATICO else (pedido,)
+    for nombre in candidatos:
+        if backend_disponible(nombre):
+            return nombre
+    return 'numpy'
+
+
+class _NucleoConRespaldo:
+    """
+    Núcleo de un backend opcional que pasa a NumPy si falla.
+
+    numexpr y numba no admiten todas las funciones de SymPy, y algunos
+    errores solo aparecen al evaluar; en ese caso el núcleo se sustituye
+    por el de NumPy para siempre.
+    """
+
+    def __init__(self, rapido, respaldo):
+        self.rapido = rapido
+        self.respaldo = respaldo
+
+    def __call__(self, *args):
+        if self.rapido is not None:
+            try:
+                return self.rapido(*args)
+            except Exception:
+                self.rapido = None
+        return self.respaldo(*args)
+
+
+def _compilar_nucleo(expr, variables, backend):
+    """
+    Compila expr con un backend; si no está disponible o no la admite, con NumPy.
+
+    Con cse=True, lambdify calcula una sola vez las subexpresiones repetidas
+    (ej: x**2 + y**2 en sin(x**2 + y**2)/(x**2 + y**2)).
+    """
+    respaldo = sp.lambdify(variables, expr, 'numpy', cse=True)
+    if backend == 'numpy' or not backend_disponible(backend):
+        return respaldo
+    try:
+        if backend == 'numexpr':
+            # lambdify traduce la expresión a una cadena de numexpr.evaluate
+            rapido = sp.lambdify(variables, expr, 'numexpr')
+        else:
+            numba = importlib.import_module('numba')
+            escalar = sp.lambdify(variables, expr, 'math', cse=True)
+            # El ufunc se compila en la primera llamada con cada tipo de entrada
+            rapido = numba.vectorize(nopython=True)(escalar)
+    except Exception:
+        return respaldo
+    return _NucleoConRespaldo(rapido, respaldo)
+
+
+def comparar_backends(fuente, variables, puntos=10**6, repeticiones=3):
+    """
+    Mide los backends disponibles evaluando una expresión en una rejilla.
+
+    Args:
+        fuente: Texto o expresión de SymPy
+        variables: Símbolos de la expresión
+        puntos: Puntos aproximados de la rejilla de prueba
+        repeticiones: Evaluaciones por backend (se guarda la mejor)
+
+    Returns:
+        Diccionario backend → {'compilacion', 'evaluacion', 'diferencia'}
+        con los segundos y la diferencia máxima respecto a NumPy, o None
+        si el backend no está instalado
+    """
+    expr = compilar(fuente, variables).expr
+    lado = max(2, round(puntos ** (1 / max(len(variables), 1))))
+    ejes = np.meshgrid(*[np.linspace(0.1, 1.0, lado)] * len(variables), sparse=True)
+    referencia = None
+    resultados = {}
+    for backend in BACKENDS:
+        if not backend_disponible(backend):
+            resultados[backend] = None
+            continue
+        inicio = time.perf_counter()
+        nucleo = _compilar_nucleo(expr, tuple(variables), backend)
+        # La primera llamada incluye la compilación JIT de numba
+        valores = np.broadcast_to(np.asarray(nucleo(*ejes), dtype=float),
+                                  np.broadcast_shapes(*(e.shape for e in ejes)))
+        compilacion = time.perf_counter() - inicio
+        tiempos = []
+        for _ in range(repeticiones):
+            inicio = time.perf_counter()
+            nucleo(*ejes)
+            tiempos.append(time.perf_counter() - inicio)
+        if referencia is None:
+            referencia = valores
+        with np.errstate(invalid='ignore'):
+            diferencia = float(np.nanmax(np.abs(valores - referencia), initial=0.0))
+        resultados[backend] = {'compilacion': compilacion, 'evaluacion': min(tiempos),
+                               'diferencia': diferencia}
+    return resultados
+
+
+class CacheExpresiones:
+    """
+    Caché LRU de expresiones compiladas.
+
+    Attributes:
+        max_entradas: Número máximo de expresiones guardadas
+        aciertos: Consultas resueltas desde la caché
+        fallos: Consultas que requirieron analizar la expresión
+    """
+
+    def __init__(self, max_entradas=MAX_ENTRADAS):
+        self.max_entradas = max_entradas
+        self.aciertos = 0
+        self.fallos = 0
+        self._entradas = OrderedDict()
+        self._candado = threading.Lock()
+
+    def obtener(self, fuente, variables):
+        """
+        Devuelve la expresión compilada para un texto o una expresión.
+
+        Args:
+            fuente: Texto de la función (ej: "x**2 + y") o expresión de SymPy
+            variables: Secuencia de símbolos de la expresión
+
+        Returns:
+            ExpresionCompilada compartida entre todas las consultas iguales
+
+        Raises:
+            sp.SympifyError: Si el texto no es una expresión válida
+        """
+        variables = tuple(variables)
+        if isinstance(fuente, str):
+            clave = (normalizar(fuente), variables)
+        else:
+            clave = (fuente, variables)
+
+        with self._candado:
+            entrada = self._entradas.get(clave)
+            if entrada is not None:
+                self._entradas.move_to_end(clave)
+                self.aciertos += 1
+                return entrada
+            self.fallos += 1
+
+        if isinstance(fuente, str):
+            with etapa('sympify'):
+                expr = sp.sympify(fuente)
+        else:
+            expr = fuente
+        entrada = ExpresionCompilada(expr, variables)
+
+        with self._candado:
+            self._entradas[clave] = entrada
+            while len(self._entradas) > self.max_entradas:
+                self._entradas.popitem(last=False)
+        return entrada
+
+    def limpiar(self):
+        """Vacía la caché y reinicia los contadores."""
+        with self._candado:
+            self._entradas.clear()
+            self.aciertos = 0
+            self.fallos = 0
+
+    def estadisticas(self):
+        """Devuelve un diccionario con el tamaño y los contadores de la caché."""
+        consultas = self.aciertos + self.fallos
+        return {
+            'entradas': len(self._entradas),
+            'max_entradas': self.max_entradas,
+            'aciertos': self.aciertos,
+            'fallos': self.fallos,
+            'tasa_aciertos': self.aciertos / consultas if consultas else 0.0,
+        }
+
+
+# Caché compartida por todo el proceso
+CACHE = CacheExpresiones()
+
+
+def compilar(fuente, variables):
+    """
+    Atajo para CACHE.obtener(fuente, variables).
+
+    Raises:
+        ValueError: Si fuente es un texto que usa símbolos que no están
+            entre las variables (ej: 'a*x' con variables x e y)
+    """
+    entrada = CACHE.obtener(fuente, variables)
+    if isinstance(fuente, str):
+        desconocidas = entrada.expr.free_symbols - set(variables)
+        if desconocidas:
+            nombres = ", ".join(sorted(str(s) for s in desconocidas))
+            permitidas = ", ".join(str(v) for v in variables)
+            raise ValueError(f"La función {fuente!r} usa variables desconocidas: {nombres} "
+                             f"(use {permitidas})")
+    return entrada
+
+
+def analizar_limite(fuente, variables=()):
+    """
+    Convierte un límite de integración en una expresión exacta de SymPy.
+
+    Los textos se analizan con la caché, de modo que 'pi/2' o 'sqrt(2)'
+    llegan a la integración simbólica sin pasar por float.
+
+    Args:
+        fuente: Texto (ej: "pi/2"), número o expresión de SymPy
+        variables: Símbolos de los que puede depender el límite (ej: el
+            límite de y en una región de tipo I depende de x)
+
+    Returns:
+        Expresión de SymPy
+
+    Raises:
+        ValueError: Si el límite usa otras variables o, siendo constante,
+            no es un número real y finito
+    """
+    variables = tuple(variables)
+    if isinstance(fuente, str):
+        expr = CACHE.obtener(fuente, variables).expr
+    else:
+        expr = sp.sympify(fuente)
+    if expr.free_symbols - set(variables):
+        if not variables:
+            raise ValueError(f"El límite {fuente!r} no puede depender de variables")
+        permitidas = ", ".join(str(v) for v in variables)
+        raise ValueError(f"El límite {fuente!r} solo puede depender de {permitidas}")
+    if expr.free_symbols:
+        return expr
+    try:
+        valor = complex(expr.evalf())
+    except TypeError:
+        valor = complex(math.nan)
+    if valor.imag != 0 or not math.isfinite(valor.real):
+        raise ValueError(f"El límite {fuente!r} no es un número real finito")
+    return expr
+
+
+def estadisticas_cache():
+    """Estadísticas de la caché del proceso actual (útil como tarea de un trabajador)."""
+    return CACHE.estadisticas()
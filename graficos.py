@@ -0,0 +1,308 @@
+"""
+Gestor de gráficos con redibujado incremental
+=============================================
+
+En lugar de limpiar la figura en cada gráfico, el gestor conserva los ejes,
+la barra de colores y el plano z=0 y solo sustituye los datos que cambian:
+
+- Superficies 3D: se reemplaza únicamente la superficie; el plano z=0 se
+  reconstruye solo si cambian los límites de x o y, y la barra de colores
+  se actualiza en su lugar. La vista (rotación) se conserva. En un volumen
+  entre dos superficies, la inferior ocupa el lugar del plano.
+- Regiones 2D: las curvas se actualizan con set_data y solo se rehace el
+  relleno entre ellas.
+- Curvas de barrido: la línea se actualiza con set_data.
+- Campos de gradiente: se rehacen las curvas de nivel, las flechas y los
+  puntos críticos; los ejes y la barra de colores se conservan.
+
+Los redibujados se piden con draw_idle, y el gestor mide el tiempo desde
+que se pide cada uno hasta que termina de dibujarse.
+"""
+
+import time
+from collections import deque
+
+import numpy as np
+
+MODO_MENSAJE = 'mensaje'
+MODO_SUPERFICIE = 'superficie'
+MODO_REGION = 'region'
+MODO_CURVA = 'curva'
+MODO_CAMPO = 'campo'
+
+# Flechas por eje en un campo de gradiente (la malla se submuestrea a esto)
+FLECHAS_POR_EJE = 20
+
+# Marcadores de los puntos críticos, uno por tipo en orden de aparición
+MARCADORES = ('o', '^', 'X', 's', 'D')
+
+
+class GestorGraficos:
+    """
+    Mantiene vivos los artistas de matplotlib entre gráficos sucesivos.
+
+    Attributes:
+        fig: Figura de matplotlib
+        canvas: Canvas donde se dibuja la figura
+        tiempos: Duración de los últimos redibujados, en segundos
+        al_dibujar: Callback opcional llamado con la duración de cada redibujado
+    """
+
+    def __init__(self, fig, canvas, al_dibujar=None):
+        self.fig = fig
+        self.canvas = canvas
+        self.al_dibujar = al_dibujar
+        self.tiempos = deque(maxlen=50)
+        self.modo = None
+        self._pedido = None
+        self._reiniciar_artistas()
+        self.canvas.mpl_connect('draw_event', self._al_terminar_dibujo)
+
+    @property
+    def ultimo_tiempo(self):
+        """Duración del último redibujado en segundos (None si no hubo ninguno)."""
+        return self.tiempos[-1] if self.tiempos else None
+
+    @property
+    def tiempo_medio(self):
+        """Duración media de los redibujados recientes en segundos."""
+        return sum(self.tiempos) / len(self.tiempos) if self.tiempos else None
+
+    def mostrar_mensaje(self, texto):
+        """Muestra un texto centrado en lugar de un gráfico."""
+        self._cambiar_modo(MODO_MENSAJE)
+        self._pedir_dibujo()
+        ax = self.fig.add_subplot(111)
+        ax.text(0.5, 0.5, texto,
+                horizontalalignment='center',
+                verticalalignment='center',
+                transform=ax.transAxes,
+                fontsize=14,
+                bbox=dict(boxstyle="round,pad=0.3", facecolor='#3498db', alpha=0.7),
+                color='white')
+        ax.set_xlim(0, 1)
+        ax.set_ylim(0, 1)
+        ax.axis('off')
+        self.canvas.draw_idle()
+
+    def superficie(self, X, Y, Z, cmap, titulo, Z_inferior=None):
+        """
+        Dibuja o actualiza una superficie 3D junto con el plano z=0.
+
+        Args:
+            X, Y, Z: Malla de la superficie
+            cmap: Mapa de colores de matplotlib
+            titulo: Título del gráfico
+            Z_inferior: Valores de la superficie inferior en la misma malla,
+                que se dibuja en lugar del plano z=0
+        """
+        self._pedir_dibujo()
+        if self._cambiar_modo(MODO_SUPERFICIE):
+            self._ax = self.fig.add_subplot(111, projection='3d')
+            self._ax.set_xlabel('x')
+            self._ax.set_ylabel('y')
+            self._ax.set_zlabel('z')
+        ax = self._ax
+
+        if self._superficie is not None:
+            self._superficie.remove()
+        # Sin submuestreo: la malla adaptativa ya trae solo los puntos necesarios
+        self._superficie = ax.plot_surface(X, Y, Z, cmap=cmap, alpha=0.8, rstride=1, cstride=1)
+
+        limites = (float(X.min()), float(X.max()), float(Y.min()), float(Y.max()))
+        if Z_inferior is not None:
+            # La superficie inferior cambia con los datos: se rehace siempre
+            if self._plano is not None:
+                self._plano.remove()
+            self._plano = ax.plot_surface(X, Y, Z_inferior, alpha=0.3, color='gray',
+                                          rstride=1, cstride=1)
+            self._limites_plano = None
+        elif limites != self._limites_plano:
+            # El plano z=0 solo depende de los límites de x e y
+            if self._plano is not None:
+                self._plano.remove()
+            x0, x1, y0, y1 = limites
+            self._plano = ax.plot_surface(np.array([[x0, x1], [x0, x1]]),
+                                          np.array([[y0, y0], [y1, y1]]),
+                                          np.zeros((2, 2)), alpha=0.3, color='gray')
+            self._limites_plano = limites
+
+        # Límites explícitos: los datos de superficies anteriores no cuentan
+        finitos = Z[np.isfinite(Z)] if Z_inferior is None else np.concatenate(
+            [Z[np.isfinite(Z)], Z_inferior[np.isfinite(Z_inferior)]])
+        z_min = min(float(finitos.min()), 0.0) if finitos.size else -1.0
+        z_max = max(float(finitos.max()), 0.0) if finitos.size else 1.0
+        if z_min == z_max:
+            z_min, z_max = z_min - 1.0, z_max + 1.0
+        ax.set_xlim(limites[0], limites[1])
+        ax.set_ylim(limites[2], limites[3])
+        ax.set_zlim(z_min, z_max)
+        ax.set_title(titulo)
+
+        if self._colorbar is None:
+            self._colorbar = self.fig.colorbar(self._superficie, ax=ax, shrink=0.5)
+        else:
+            self._colorbar.update_normal(self._superficie)
+
+        self.canvas.draw_idle()
+
+    def region(self, x_vals, y_sup, y_inf, etiqueta_sup, etiqueta_inf):
+        """
+        Dibuja o actualiza la región entre dos curvas.
+
+        Args:
+            x_vals: Abscisas comunes
+            y_sup, y_inf: Ordenadas de las curvas superior e inferior
+            etiqueta_sup, etiqueta_inf: Textos de la leyenda
+        """
+        self._pedir_dibujo()
+        if self._cambiar_modo(MODO_REGION):
+            self._ax = self.fig.add_subplot(111)
+            ax = self._ax
+            self._linea_sup, = ax.plot([], [], 'b-', linewidth=2)
+            self._linea_inf, = ax.plot([], [], 'r-', linewidth=2)
+            ax.set_xlabel('x')
+            ax.set_ylabel('y')
+            ax.set_title('Región de integración')
+            ax.grid(True, alpha=0.3)
+        ax = self._ax
+
+        self._linea_sup.set_data(x_vals, y_sup)
+        self._linea_inf.set_data(x_vals, y_inf)
+        self._linea_sup.set_label(etiqueta_sup)
+        self._linea_inf.set_label(etiqueta_inf)
+
+        if self._relleno is not None:
+            self._relleno.remove()
+        self._relleno = ax.fill_between(x_vals, y_inf, y_sup, alpha=0.3, color='green', label='Área')
+
+        ax.relim()
+        ax.autoscale_view()
+        ax.legend()
+        self.canvas.draw_idle()
+
+    def curva(self, x_vals, y_vals, etiqueta_x, etiqueta_y, titulo):
+        """
+        Dibuja o actualiza una curva 2D, como el resultado de un barrido.
+
+        Args:
+            x_vals, y_vals: Coordenadas de la curva
+            etiqueta_x, etiqueta_y: Nombres de los ejes
+            titulo: Título del gráfico
+        """
+        self._pedir_dibujo()
+        if self._cambiar_modo(MODO_CURVA):
+            self._ax = self.fig.add_subplot(111)
+            self._linea_sup, = self._ax.plot([], [], 'o-', color='#3498db',
+                                             linewidth=2, markersize=3)
+            self._ax.grid(True, alpha=0.3)
+        ax = self._ax
+
+        self._linea_sup.set_data(x_vals, y_vals)
+        ax.set_xlabel(etiqueta_x)
+        ax.set_ylabel(etiqueta_y)
+        ax.set_title(titulo)
+        ax.relim()
+        ax.autoscale_view()
+        self.canvas.draw_idle()
+
+    def campo(self, X, Y, Z, U, V, titulo, puntos=(), G=None):
+        """
+        Dibuja o actualiza las curvas de nivel de f y el campo de su gradiente.
+
+        Args:
+            X, Y, Z: Malla de f
+            U, V: Componentes del gradiente en la misma malla
+            titulo: Título del gráfico
+            puntos: Puntos a marcar como tuplas (x, y, tipo); los del mismo
+                tipo comparten marcador y entrada de la leyenda
+            G: Valores de una restricción g en la malla, cuya curva g = 0 se
+                dibuja, o None
+        """
+        self._pedir_dibujo()
+        if self._cambiar_modo(MODO_CAMPO):
+            self._ax = self.fig.add_subplot(111)
+            self._ax.set_xlabel('x')
+            self._ax.set_ylabel('y')
+            self._ax.set_aspect('auto')
+        ax = self._ax
+        for artista in self._campo:
+            artista.remove()
+        self._campo = []
+
+        self._superficie = ax.contourf(X, Y, np.ma.masked_invalid(Z), levels=20,
+                                       cmap='viridis', alpha=0.8)
+        self._campo.append(self._superficie)
+
+        # Flechas de longitud fija: la dirección importa más que el módulo
+        paso = max(1, -(-max(X.shape) // FLECHAS_POR_EJE))
+        U, V = U[::paso, ::paso], V[::paso, ::paso]
+        modulo = np.hypot(U, V)
+        with np.errstate(all='ignore'):
+            U, V = np.where(modulo > 0, U / modulo, 0.0), np.where(modulo > 0, V / modulo, 0.0)
+        self._campo.append(ax.quiver(X[::paso, ::paso], Y[::paso, ::paso], U, V,
+                                     color='white', pivot='mid', angles='xy'))
+
+        if G is not None and np.isfinite(G).any() and np.nanmin(G) <= 0 <= np.nanmax(G):
+            self._campo.append(ax.contour(X, Y, np.ma.masked_invalid(G), levels=[0],
+                                          colors='red', linewidths=2))
+        tipos = list(dict.fromkeys(tipo for _, _, tipo in puntos))
+        for i, tipo in enumerate(tipos):
+            xs = [px for px, _, t in puntos if t == tipo]
+            ys = [py for _, py, t in puntos if t == tipo]
+            self._campo.append(ax.scatter(xs, ys, marker=MARCADORES[i % len(MARCADORES)], s=70, zorder=3,
+                                          edgecolors='black', label=tipo))
+
+        ax.set_xlim(float(X.min()), float(X.max()))
+        ax.set_ylim(float(Y.min()), float(Y.max()))
+        ax.set_title(titulo)
+        if ax.get_legend() is not None:
+            ax.get_legend().remove()
+        if tipos:
+            ax.legend(loc='upper right')
+
+        if self._colorbar is None:
+            self._colorbar = self.fig.colorbar(self._superficie, ax=ax)
+        else:
+            self._colorbar.update_normal(self._superficie)
+
+        self.canvas.draw_idle()
+
+    def _reiniciar_artistas(self):
+        self._ax = None
+        self._superficie = None
+        self._plano = None
+        self._limites_plano = None
+        self._colorbar = None
+        self._linea_sup = None
+        self._linea_inf = None
+        self._relleno = None
+        self._campo = []
+
+    def _cambiar_modo(self, modo):
+        """
+        Prepara la figura para un tipo de gráfico.
+
+        Returns:
+            True si hubo que limpiar la figura (cambio de tipo de gráfico)
+        """
+        if modo == self.modo and modo != MODO_MENSAJE:
+            return False
+        self.fig.clear()
+        self._reiniciar_artistas()
+        self.modo = modo
+        return True
+
+    def _pedir_dibujo(self):
+        """Marca el inicio de una actualización para medir su duración."""
+        if self._pedido is None:
+            self._pedido = time.perf_counter()
+
+    def _al_terminar_dibujo(self, evento):
+        if self._pedido is None:
+            return
+        duracion = time.perf_counter() - self._pedido
+        self._pedido = None
+        self.tiempos.append(duracion)
+        if self.al_dibujar is not None:
+            self.al_dibujar(duracion)
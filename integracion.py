@@ -0,0 +1,1279 @@
+"""
+Motor de integración por niveles
+================================
+
+Calcula integrales simples, dobles sobre rectángulos y dobles sobre
+regiones de tipo I/II en dos niveles:
+
+1. Integración simbólica con SymPy, limitada por un plazo configurable.
+   Se ejecuta en un proceso aparte para poder abandonarla si no termina.
+   La antiderivada de cada integrando se guarda en la caché de
+   expresiones, así que cambiar solo los límites cuesta una sustitución.
+   Si la antiderivada no sirve en el dominio (por ejemplo, tiene saltos),
+   se intenta la integral definida con el plazo restante.
+2. Cubatura numérica adaptativa de Gauss–Kronrod sobre un núcleo NumPy
+   obtenido con ``sp.lambdify``, con estimación del error.
+
+Antes de los niveles, el integrando se canonicaliza (preprocesado.py) y,
+si es separable, f(x)·g(y) sobre un rectángulo se integra como el producto
+de dos integrales simples. Si tiene pliegues (Abs, sign...) o
+singularidades, el rectángulo se divide en piezas a lo largo de ellos
+(singularidades.py) y cada pieza se integra por niveles.
+
+El resultado indica qué nivel produjo el valor y cuánto tiempo tomó.
+Los resultados y las antiderivadas se guardan además en el almacén
+persistente (almacen.py), así que sobreviven entre sesiones.
+"""
+
+import heapq
+import itertools
+import math
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, replace
+from typing import Optional
+
+import mpmath
+import numpy as np
+import sympy as sp
+
+from almacen import almacen, clave, leer_expresion
+from expresiones import compilar
+from perfilado import etapa
+from preprocesado import ejecutar_con_plazo, preprocesar
+from singularidades import PLAZO_ANALISIS, dividir_rectangulo
+
+# Plazo por defecto (segundos) para la integración simbólica
+PLAZO_SIMBOLICO = 5.0
+
+NIVEL_SIMBOLICO = "simbólico"
+NIVEL_NUMERICO = "numérico"
+
+# Nodos y pesos de Gauss–Kronrod (15 puntos) y Gauss (7 puntos) en [-1, 1]
+_XGK = np.array([
+    0.991455371120812639206854697526329,
+    0.949107912342758524526189684047851,
+    0.864864423359769072789712788640926,
+    0.741531185599394439863864773280788,
+    0.586087235467691130294144845693013,
+    0.405845151377397166906606412076961,
+    0.207784955007898467600689403773245,
+    0.000000000000000000000000000000000,
+])
+_WGK = np.array([
+    0.022935322010529224963732008058970,
+    0.063092092629978553290700663189204,
+    0.104790010322250183839876322541518,
+    0.140653259715525918745189590510238,
+    0.169004726639267902826583426598550,
+    0.190350578064785409913256402421014,
+    0.204432940075298892414161999234649,
+    0.209482141084727828012999174891714,
+])
+_WG = np.array([
+    0.129484966168869693270611432679082,
+    0.279705391489276667901467771423780,
+    0.381830050505118944950369775488975,
+    0.417959183673469387755102040816327,
+])
+
+NODOS_KRONROD = np.concatenate([-_XGK[:-1], _XGK[::-1]])
+PESOS_KRONROD = np.concatenate([_WGK[:-1], _WGK[::-1]])
+# Los nodos de Gauss son los de índice impar dentro de los de Kronrod
+PESOS_GAUSS = np.zeros(15)
+PESOS_GAUSS[1::2] = np.concatenate([_WG[:-1], _WG[::-1]])
+
+# Gauss–Legendre de 10 puntos por panel para los cortes de una región
+NODOS_LEGENDRE, PESOS_LEGENDRE = np.polynomial.legendre.leggauss(10)
+
+# Número máximo de paneles de Gauss–Legendre por corte
+MAX_PANELES = 64
+
+# Cajas por bloque en la cubatura triple: acota la memoria de cada llamada
+# al núcleo (15³ nodos por caja) y es la unidad de reparto entre hilos
+CAJAS_POR_BLOQUE = 64
+
+# Variables auxiliares de la caja de un dominio con límites variables (ver a_caja)
+AUXILIARES_CAJA = sp.symbols('t_caja s_caja')
+
+# Cifras de trabajo adicionales y máximas de la cuadratura de mpmath
+CIFRAS_GUARDA = 5
+MAX_CIFRAS_TRABAJO = 400
+
+
+@dataclass
+class ResultadoBarrido:
+    """
+    Resultado de un barrido de un límite de integración.
+
+    Attributes:
+        parametro: Límite que varía ('x_min', 'x_max', 'y_min' o 'y_max')
+        valores: Valores del límite
+        resultados: Integral para cada valor del límite
+        errores: Estimación del error absoluto de cada resultado
+        exacto: Forma cerrada en función del límite, o None si fue numérico
+        nivel: Nivel que produjo los valores (NIVEL_SIMBOLICO o NIVEL_NUMERICO)
+        tiempo: Tiempo total empleado en segundos
+    """
+    parametro: str
+    valores: np.ndarray
+    resultados: np.ndarray
+    errores: np.ndarray
+    exacto: Optional[sp.Expr]
+    nivel: str
+    tiempo: float
+
+
+@dataclass
+class ResultadoIntegral:
+    """
+    Resultado de una integración.
+
+    Attributes:
+        valor: Aproximación numérica de la integral
+        exacto: Expresión simbólica exacta, o None si se obtuvo numéricamente
+        nivel: Nivel que produjo el valor (NIVEL_SIMBOLICO o NIVEL_NUMERICO)
+        tiempo: Tiempo total empleado en segundos
+        error: Estimación del error absoluto (0 para resultados exactos en
+            doble precisión)
+        almacenado: Si se leyó del almacén persistente en lugar de calcularse
+        digitos: Cifras significativas pedidas, o None para doble precisión
+        valor_preciso: Valor con esas cifras como texto (evalf o mpmath)
+        sugerencia: Sistema de coordenadas en el que probablemente sea más
+            barata (ver coordenadas.sugerir_coordenadas), o None
+        piezas: Número de piezas en que se dividió el dominio por pliegues
+            o singularidades (ver singularidades.dividir_rectangulo)
+    """
+    valor: float
+    exacto: Optional[sp.Expr]
+    nivel: str
+    tiempo: float
+    error: float = 0.0
+    almacenado: bool = False
+    digitos: Optional[int] = None
+    valor_preciso: Optional[str] = None
+    sugerencia: Optional[str] = None
+    piezas: int = 1
+
+
+def _evaluar_rectangulos(f, rects):
+    """
+    Aplica la regla tensorial de Gauss–Kronrod 15×15 a varios rectángulos.
+
+    Args:
+        f: Núcleo vectorizado f(X, Y)
+        rects: Arreglo (n, 4) con filas (x_min, x_max, y_min, y_max)
+
+    Returns:
+        Tupla (valores, errores) con un elemento por rectángulo
+    """
+    cx = 0.5 * (rects[:, 0] + rects[:, 1])
+    hx = 0.5 * (rects[:, 1] - rects[:, 0])
+    cy = 0.5 * (rects[:, 2] + rects[:, 3])
+    hy = 0.5 * (rects[:, 3] - rects[:, 2])
+
+    X = cx[:, None, None] + hx[:, None, None] * NODOS_KRONROD[None, :, None]
+    Y = cy[:, None, None] + hy[:, None, None] * NODOS_KRONROD[None, None, :]
+    F = np.broadcast_to(np.asarray(f(X, Y), dtype=float), X.shape[:1] + (15, 15))
+
+    jacobiano = hx * hy
+    kronrod = jacobiano * np.einsum('i,j,nij->n', PESOS_KRONROD, PESOS_KRONROD, F)
+    gauss = jacobiano * np.einsum('i,j,nij->n', PESOS_GAUSS, PESOS_GAUSS, F)
+    return kronrod, np.abs(kronrod - gauss)
+
+
+def cubatura_gauss_kronrod(f, x_min, x_max, y_min, y_max,
+                           tol=1e-10, max_evaluaciones=1000):
+    """
+    Integra numéricamente f(x, y) sobre un rectángulo con subdivisión adaptativa.
+
+    En cada iteración se dividen en cuatro los rectángulos con mayor error
+    y todos los hijos se evalúan en una sola llamada vectorizada al núcleo.
+
+    Args:
+        f: Núcleo vectorizado f(X, Y) que acepta arreglos de NumPy
+        x_min, x_max, y_min, y_max: Límites del rectángulo
+        tol: Tolerancia absoluta para el error total
+        max_evaluaciones: Número máximo de rectángulos evaluados
+
+    Returns:
+        Tupla (valor, error_estimado)
+    """
+    rects = np.array([[x_min, x_max, y_min, y_max]], dtype=float)
+    valores, errores = _evaluar_rectangulos(f, rects)
+    activos = [(-errores[0], valores[0], tuple(rects[0]))]
+    total_valor = float(valores[0])
+    total_error = float(errores[0])
+    evaluados = 1
+
+    while total_error > tol and evaluados < max_evaluaciones:
+        # Dividir los peores rectángulos hasta cubrir la mitad del error
+        peores = []
+        acumulado = 0.0
+        objetivo = 0.5 * total_error
+        while activos and acumulado < objetivo:
+            err_neg, val, rect = heapq.heappop(activos)
+            peores.append(rect)
+            acumulado -= err_neg
+            total_valor -= val
+            total_error += err_neg
+        if not peores:
+            break
+
+        hijos = []
+        for x0, x1, y0, y1 in peores:
+            xm = 0.5 * (x0 + x1)
+            ym = 0.5 * (y0 + y1)
+            hijos.extend([(x0, xm, y0, ym), (xm, x1, y0, ym),
+                          (x0, xm, ym, y1), (xm, x1, ym, y1)])
+        hijos = np.array(hijos)
+        valores, errores = _evaluar_rectangulos(f, hijos)
+        evaluados += len(hijos)
+
+        for rect, val, err in zip(hijos, valores, errores):
+            heapq.heappush(activos, (-err, val, tuple(rect)))
+            total_valor += val
+            total_error += err
+
+    # Recalcular los totales para evitar errores de redondeo acumulados
+    total_valor = float(sum(val for _, val, _ in activos))
+    total_error = float(-sum(err for err, _, _ in activos))
+    return total_valor, total_error
+
+
+def cuadratura_gauss_kronrod(f, a, b, tol=1e-10, max_evaluaciones=1000):
+    """
+    Integra numéricamente f(x) sobre [a, b] con subdivisión adaptativa.
+
+    Es la versión unidimensional de cubatura_gauss_kronrod: los intervalos
+    con mayor error se bisecan y se evalúan juntos en una llamada al núcleo.
+
+    Args:
+        f: Núcleo vectorizado f(X)
+        a, b: Extremos del intervalo
+        tol: Tolerancia absoluta para el error total
+        max_evaluaciones: Número máximo de intervalos evaluados
+
+    Returns:
+        Tupla (valor, error_estimado)
+    """
+    def evaluar(intervalos):
+        centro = 0.5 * (intervalos[:, 0] + intervalos[:, 1])
+        radio = 0.5 * (intervalos[:, 1] - intervalos[:, 0])
+        X = centro[:, None] + radio[:, None] * NODOS_KRONROD[None, :]
+        F = np.broadcast_to(np.asarray(f(X), dtype=float), X.shape)
+        kronrod = radio * (F @ PESOS_KRONROD)
+        gauss = radio * (F @ PESOS_GAUSS)
+        return kronrod, np.abs(kronrod - gauss)
+
+    intervalos = np.array([[a, b]], dtype=float)
+    valores, errores = evaluar(intervalos)
+    evaluados = 1
+    while errores.sum() > tol and evaluados < max_evaluaciones:
+        # Bisecar los intervalos cuyo error supera el promedio
+        dividir = errores >= errores.mean()
+        padres = intervalos[dividir]
+        medios = 0.5 * (padres[:, 0] + padres[:, 1])
+        hijos = np.concatenate([np.column_stack([padres[:, 0], medios]),
+                                np.column_stack([medios, padres[:, 1]])])
+        valores_hijos, errores_hijos = evaluar(hijos)
+        evaluados += len(hijos)
+        intervalos = np.concatenate([intervalos[~dividir], hijos])
+        valores = np.concatenate([valores[~dividir], valores_hijos])
+        errores = np.concatenate([errores[~dividir], errores_hijos])
+
+    return float(valores.sum()), float(errores.sum())
+
+
+def cubatura_lote(f, rects, tol=1e-10, max_subrectangulos=50000):
+    """
+    Integra f(x, y) sobre muchos rectángulos a la vez.
+
+    Todos los rectángulos (y sus subdivisiones) se evalúan juntos en cada
+    ronda. Solo se subdividen los subrectángulos de los rectángulos que aún
+    no alcanzan la tolerancia, empezando por los de mayor error.
+
+    Args:
+        f: Núcleo vectorizado f(X, Y)
+        rects: Arreglo (n, 4) con filas (x_min, x_max, y_min, y_max)
+        tol: Tolerancia absoluta del error de cada rectángulo
+        max_subrectangulos: Límite de subrectángulos vivos a la vez
+
+    Returns:
+        Tupla (valores, errores) con un elemento por rectángulo
+    """
+    rects = np.asarray(rects, dtype=float)
+    n = len(rects)
+    duenos = np.arange(n)
+    valores, errores = _evaluar_rectangulos(f, rects)
+
+    while True:
+        error_total = np.bincount(duenos, errores, minlength=n)
+        pendientes = error_total > tol
+        if not pendientes.any():
+            break
+        cantidad = np.bincount(duenos, minlength=n)
+        media = error_total / np.maximum(cantidad, 1)
+        dividir = pendientes[duenos] & (errores >= media[duenos])
+        if len(rects) + 3 * dividir.sum() > max_subrectangulos:
+            break
+
+        padres = rects[dividir]
+        xm = 0.5 * (padres[:, 0] + padres[:, 1])
+        ym = 0.5 * (padres[:, 2] + padres[:, 3])
+        hijos = np.concatenate([
+            np.column_stack([padres[:, 0], xm, padres[:, 2], ym]),
+            np.column_stack([xm, padres[:, 1], padres[:, 2], ym]),
+            np.column_stack([padres[:, 0], xm, ym, padres[:, 3]]),
+            np.column_stack([xm, padres[:, 1], ym, padres[:, 3]]),
+        ])
+        valores_hijos, errores_hijos = _evaluar_rectangulos(f, hijos)
+
+        rects = np.concatenate([rects[~dividir], hijos])
+        duenos = np.concatenate([duenos[~dividir], np.tile(duenos[dividir], 4)])
+        valores = np.concatenate([valores[~dividir], valores_hijos])
+        errores = np.concatenate([errores[~dividir], errores_hijos])
+
+    return (np.bincount(duenos, valores, minlength=n),
+            np.bincount(duenos, errores, minlength=n))
+
+
+def _evaluar_cajas(f, cajas):
+    """
+    Aplica la regla tensorial de Gauss–Kronrod 15×15×15 a varias cajas.
+
+    Args:
+        f: Núcleo vectorizado f(X, Y, Z)
+        cajas: Arreglo (n, 6) con filas (x_min, x_max, y_min, y_max, z_min, z_max)
+
+    Returns:
+        Tupla (valores, errores) con un elemento por caja
+    """
+    centros = 0.5 * (cajas[:, 0::2] + cajas[:, 1::2])
+    radios = 0.5 * (cajas[:, 1::2] - cajas[:, 0::2])
+    nodos = NODOS_KRONROD
+    X = centros[:, 0, None, None, None] + radios[:, 0, None, None, None] * nodos[:, None, None]
+    Y = centros[:, 1, None, None, None] + radios[:, 1, None, None, None] * nodos[None, :, None]
+    Z = centros[:, 2, None, None, None] + radios[:, 2, None, None, None] * nodos[None, None, :]
+    F = np.broadcast_to(np.asarray(f(X, Y, Z), dtype=float), (len(cajas), 15, 15, 15))
+
+    jacobiano = radios.prod(axis=1)
+    kronrod = jacobiano * (F @ PESOS_KRONROD @ PESOS_KRONROD @ PESOS_KRONROD)
+    gauss = jacobiano * (F @ PESOS_GAUSS @ PESOS_GAUSS @ PESOS_GAUSS)
+    return kronrod, np.abs(kronrod - gauss)
+
+
+def _evaluar_bloques(f, cajas, ejecutor):
+    """Evalúa las cajas por bloques de CAJAS_POR_BLOQUE, en hilos si hay ejecutor."""
+    bloques = np.array_split(cajas, -(-len(cajas) // CAJAS_POR_BLOQUE))
+    mapa = map if ejecutor is None or len(bloques) == 1 else ejecutor.map
+    resultados = list(mapa(lambda bloque: _evaluar_cajas(f, bloque), bloques))
+    return (np.concatenate([valores for valores, _ in resultados]),
+            np.concatenate([errores for _, errores in resultados]))
+
+
+def cubatura_triple(f, caja, tol=1e-10, max_cajas=4000, hilos=None):
+    """
+    Integra numéricamente f(x, y, z) sobre una caja con subdivisión adaptativa.
+
+    Como en cuadratura_gauss_kronrod, en cada ronda se bisecan (por su lado
+    más largo) las cajas cuyo error supera el promedio, y todas las hijas se
+    evalúan juntas. Las rondas grandes se reparten por bloques entre hilos:
+    las operaciones de NumPy sobre arreglos grandes liberan el GIL, así que
+    los bloques se evalúan en paralelo sin copiar el núcleo a otros procesos.
+
+    Args:
+        f: Núcleo vectorizado f(X, Y, Z)
+        caja: Límites (x_min, x_max, y_min, y_max, z_min, z_max)
+        tol: Tolerancia absoluta para el error total
+        max_cajas: Número máximo de cajas evaluadas
+        hilos: Hilos para repartir los bloques (por defecto, núcleos de CPU)
+
+    Returns:
+        Tupla (valor, error_estimado)
+    """
+    hilos = hilos or os.cpu_count() or 1
+    ejecutor = ThreadPoolExecutor(hilos) if hilos > 1 else None
+    try:
+        cajas = np.array([caja], dtype=float)
+        valores, errores = _evaluar_cajas(f, cajas)
+        evaluadas = 1
+        while errores.sum() > tol and evaluadas < max_cajas:
+            dividir = errores >= errores.mean()
+            padres = cajas[dividir]
+            filas = np.arange(len(padres))
+            eje = np.argmax(padres[:, 1::2] - padres[:, 0::2], axis=1)
+            medios = 0.5 * (padres[filas, 2 * eje] + padres[filas, 2 * eje + 1])
+            izquierdas, derechas = padres.copy(), padres.copy()
+            izquierdas[filas, 2 * eje + 1] = medios
+            derechas[filas, 2 * eje] = medios
+            hijas = np.concatenate([izquierdas, derechas])
+            valores_hijas, errores_hijas = _evaluar_bloques(f, hijas, ejecutor)
+            evaluadas += len(hijas)
+            cajas = np.concatenate([cajas[~dividir], hijas])
+            valores = np.concatenate([valores[~dividir], valores_hijas])
+            errores = np.concatenate([errores[~dividir], errores_hijas])
+    finally:
+        if ejecutor is not None:
+            ejecutor.shutdown()
+    return float(valores.sum()), float(errores.sum())
+
+
+def integrar_simbolico_con_plazo(func, limites, plazo=PLAZO_SIMBOLICO):
+    """
+    Intenta integrar simbólicamente dentro de un plazo.
+
+    Args:
+        func: Expresión de SymPy a integrar
+        limites: Tuplas (variable, inferior, superior) para sp.integrate
+        plazo: Segundos máximos de espera; None para esperar sin límite
+
+    Returns:
+        La integral evaluada, o None si no terminó a tiempo, falló o
+        quedó sin evaluar
+    """
+    if plazo is not None and plazo <= 0:
+        return None
+    with etapa('integrate', plazo=plazo):
+        integral = _integrar_con_plazo(func, limites, plazo)
+    if integral is None or integral.has(sp.Integral):
+        return None
+    return integral
+
+
+def _integrar_con_plazo(func, limites, plazo):
+    """sp.integrate en este proceso (plazo None) o en un hijo con plazo; None si falla."""
+    if plazo is None:
+        try:
+            return sp.integrate(func, *limites)
+        except Exception:
+            return None
+    return ejecutar_con_plazo(sp.integrate, (func, *limites), plazo)
+
+
+def antiderivada_con_plazo(func, variables, plazo=PLAZO_SIMBOLICO):
+    """
+    Antiderivada iterada de func respecto a las variables, guardada en caché.
+
+    Args:
+        func: Expresión de SymPy
+        variables: Símbolos en el orden de integración
+        plazo: Segundos concedidos a SymPy si no está en la caché
+
+    Returns:
+        La antiderivada, o None si no se obtuvo a tiempo o no tiene forma cerrada
+    """
+    variables = tuple(variables)
+    entrada = compilar(func, variables)
+    if entrada.tiene_antiderivada(*variables):
+        antiderivada = entrada.antiderivada(*variables)
+        return None if antiderivada.has(sp.Integral) else antiderivada
+
+    actual = almacen()
+    if actual is not None:
+        clave_antiderivada = clave('antiderivada', func, variables)
+        with etapa('almacen'):
+            datos = actual.obtener(clave_antiderivada)
+        if datos is not None:
+            try:
+                antiderivada = leer_expresion(datos['antiderivada'])
+            except ValueError:
+                # Entrada dañada o manipulada: se recalcula y se sobrescribe
+                antiderivada = None
+            if antiderivada is not None:
+                entrada.guardar_antiderivada(variables, antiderivada)
+                return antiderivada
+
+    antiderivada = integrar_simbolico_con_plazo(func, tuple((v,) for v in variables), plazo)
+    if antiderivada is not None:
+        entrada.guardar_antiderivada(variables, antiderivada)
+        if actual is not None:
+            actual.guardar(clave_antiderivada, {'antiderivada': sp.srepr(antiderivada)})
+    return antiderivada
+
+
+def evaluar_esquinas(antiderivada, variables, limites):
+    """
+    Integral definida sobre una caja a partir de una antiderivada iterada.
+
+    Suma la antiderivada en las esquinas de la caja con signo alterno, por
+    ejemplo G(b, d) - G(a, d) - G(b, c) + G(a, c) en dos dimensiones.
+
+    Args:
+        antiderivada: Antiderivada iterada respecto a las variables
+        variables: Símbolos de integración
+        limites: Pares (inferior, superior) de cada variable
+
+    Returns:
+        Expresión de SymPy con el valor de la integral
+    """
+    total = sp.S.Zero
+    for esquina in itertools.product((0, 1), repeat=len(variables)):
+        signo = -1 if (len(variables) - sum(esquina)) % 2 else 1
+        punto = {v: limite[lado] for v, limite, lado in zip(variables, limites, esquina)}
+        total += signo * antiderivada.subs(punto)
+    return total
+
+
+def _valor_real(integral):
+    """Valor float de una integral exacta, o None si no es real y finito."""
+    try:
+        with etapa('evalf'):
+            valor = complex(integral.evalf())
+    except (TypeError, ValueError):
+        return None
+    if abs(valor.imag) > 1e-12 * max(1.0, abs(valor.real)) or not math.isfinite(valor.real):
+        return None
+    return valor.real
+
+
+def _claves_almacen(operacion, func, variables, limites, tol):
+    """Claves del resultado exacto y del numérico (con su tolerancia) de una integral."""
+    return (clave(operacion, func, variables, limites),
+            clave(operacion, func, variables, limites, tol))
+
+
+def _consultar_almacen(claves, plazo, inicio):
+    """
+    Busca una integral en el almacén persistente.
+
+    Un resultado exacto siempre sirve. Uno numérico solo si se obtuvo tras
+    agotar un plazo simbólico al menos tan largo como el actual, para no
+    renunciar a la forma cerrada cuando ahora se concede más tiempo.
+
+    Returns:
+        ResultadoIntegral marcado como almacenado, o None
+    """
+    actual = almacen()
+    if actual is None:
+        return None
+    with etapa('almacen'):
+        datos = actual.obtener(claves[0])
+        if datos is None:
+            datos = actual.obtener(claves[1])
+            if datos is not None and datos['plazo'] is not None and (
+                    plazo is None or plazo > datos['plazo']):
+                datos = None
+    if datos is None:
+        return None
+    try:
+        exacto = None if datos['exacto'] is None else leer_expresion(datos['exacto'])
+    except ValueError:
+        return None
+    return ResultadoIntegral(datos['valor'], exacto, datos['nivel'],
+                             time.perf_counter() - inicio, datos['error'], almacenado=True)
+
+
+def _guardar_en_almacen(claves, resultado, plazo):
+    """Guarda un ResultadoIntegral en el almacén persistente y lo devuelve."""
+    actual = almacen()
+    if actual is not None:
+        exacto = resultado.exacto is not None
+        actual.guardar(claves[0] if exacto else claves[1], {
+            'valor': resultado.valor,
+            'exacto': sp.srepr(resultado.exacto) if exacto else None,
+            'nivel': resultado.nivel,
+            'error': resultado.error,
+            'plazo': None if exacto else plazo,
+        })
+    return resultado
+
+
+def _integrar_por_niveles(func, variables, limites, numerico, plazo, tol, separar=True):
+    """
+    Motor por niveles común a integrar_simple e integrar_doble.
+
+    El integrando se canonicaliza antes de buscarlo en el almacén; si es
+    separable (y separar es True) se integra factor a factor
+    (_integrar_separable).
+
+    Args:
+        func: Expresión de SymPy a integrar
+        variables: Símbolos de integración
+        limites: Pares (inferior, superior) exactos de cada variable
+        numerico: Función sin argumentos que devuelve (valor, error) numéricos
+        plazo: Segundos concedidos a la integración simbólica
+        tol: Tolerancia de numerico, que forma parte de la clave en el almacén
+        separar: Si se permite el camino separable, cuyo nivel numérico no
+            es numerico sino la cuadratura de cada factor
+
+    Returns:
+        ResultadoIntegral
+    """
+    inicio = time.perf_counter()
+    preprocesado = preprocesar(func, variables)
+    func = preprocesado.expr
+    claves = _claves_almacen('integral', func, variables, limites, tol)
+    guardado = _consultar_almacen(claves, plazo, inicio)
+    if guardado is not None:
+        return guardado
+    if (separar and preprocesado.factores is not None
+            and preprocesado.factores[0].is_number):
+        resultado = _integrar_separable(preprocesado.factores, variables, limites, plazo, tol)
+        return _guardar_en_almacen(claves, replace(
+            resultado, tiempo=time.perf_counter() - inicio), plazo)
+    referencia = None
+
+    antiderivada = antiderivada_con_plazo(func, variables, plazo)
+    if antiderivada is not None:
+        integral = evaluar_esquinas(antiderivada, variables, limites)
+        valor = _valor_real(integral)
+        if valor is not None:
+            # Una antiderivada con saltos dentro de la caja da un valor falso;
+            # se contrasta con la cubatura, que es barata frente a SymPy
+            with etapa('cubatura'):
+                referencia = numerico()
+            if abs(valor - referencia[0]) <= max(1e-6 * max(1.0, abs(valor)), 10 * referencia[1]):
+                return _guardar_en_almacen(claves, ResultadoIntegral(
+                    valor, integral, NIVEL_SIMBOLICO, time.perf_counter() - inicio), plazo)
+
+    restante = None if plazo is None else plazo - (time.perf_counter() - inicio)
+    integral = integrar_simbolico_con_plazo(
+        func, tuple((v, a, b) for v, (a, b) in zip(variables, limites)), restante)
+    if integral is not None:
+        valor = _valor_real(integral)
+        if valor is not None:
+            return _guardar_en_almacen(claves, ResultadoIntegral(
+                valor, integral, NIVEL_SIMBOLICO, time.perf_counter() - inicio), plazo)
+
+    if referencia is None:
+        with etapa('cubatura'):
+            referencia = numerico()
+    valor, error = referencia
+    return _guardar_en_almacen(claves, ResultadoIntegral(
+        valor, None, NIVEL_NUMERICO, time.perf_counter() - inicio, error), plazo)
+
+
+def _integrar_separable(factores, variables, limites, plazo, tol):
+    """
+    Integra un integrando separable c·f₁(v₁)·f₂(v₂)··· sobre una caja.
+
+    Cada factor se integra por separado con el motor de una variable, con
+    el plazo que queda, y el resultado es el producto. El error se propaga
+    como la cota de un producto: ∏(|vᵢ| + eᵢ) − ∏|vᵢ|.
+
+    Args:
+        factores: Tupla (coeficiente, f₁, f₂, ...) de preprocesar
+        variables, limites, plazo, tol: Como en _integrar_por_niveles
+
+    Returns:
+        ResultadoIntegral (el tiempo lo completa quien llama)
+    """
+    inicio = time.perf_counter()
+    coeficiente, *funciones = factores
+    partes = []
+    for factor, variable, (a, b) in zip(funciones, variables, limites):
+        restante = None if plazo is None else max(0.0, plazo - (time.perf_counter() - inicio))
+        nucleo = compilar(factor, (variable,)).nucleo
+        partes.append(_integrar_por_niveles(
+            factor, (variable,), [(a, b)],
+            lambda nucleo=nucleo, a=a, b=b: cuadratura_gauss_kronrod(
+                nucleo, float(a), float(b), tol=tol),
+            restante, tol))
+
+    exactas = all(parte.exacto is not None for parte in partes)
+    exacto = coeficiente * math.prod(parte.exacto for parte in partes) if exactas else None
+    escala = abs(float(coeficiente))
+    valor = float(coeficiente) * math.prod(parte.valor for parte in partes)
+    error = escala * (math.prod(abs(p.valor) + p.error for p in partes)
+                      - math.prod(abs(p.valor) for p in partes))
+    return ResultadoIntegral(valor, exacto, NIVEL_SIMBOLICO if exactas else NIVEL_NUMERICO,
+                             time.perf_counter() - inicio, error)
+
+
+def _mpmath(expr, variables=()):
+    """Función de mpmath de expr; se evalúa con la precisión vigente en cada llamada."""
+    with etapa('lambdify'):
+        return sp.lambdify(variables, expr, 'mpmath')
+
+
+def cuadratura_precisa(integral, digitos):
+    """
+    Evalúa una integral de mpmath subiendo la precisión solo lo necesario.
+
+    Empieza con digitos + CIFRAS_GUARDA cifras de trabajo y las multiplica
+    por 1.5 mientras el error estimado por mpmath, o la diferencia con la
+    evaluación anterior, supere 10**-digitos en relativo. La estimación de
+    mpmath sola es optimista con integrandos no suaves (ej: sqrt(x**2 + y**2)
+    en una esquina), así que siempre se comparan al menos dos evaluaciones.
+
+    Args:
+        integral: Función sin argumentos que devuelve (valor, error) de
+            mpmath con la precisión vigente (ej: mpmath.quad con error=True)
+        digitos: Cifras significativas pedidas
+
+    Returns:
+        Tupla (valor como texto con digitos cifras, error estimado,
+        cifras de trabajo usadas)
+    """
+    cifras = digitos + CIFRAS_GUARDA
+    anterior = None
+    while True:
+        with mpmath.workdps(cifras), etapa('mpmath', cifras=cifras):
+            valor, error = integral()
+            valor = mpmath.re(valor)
+            if anterior is not None:
+                error = max(error, abs(valor - anterior))
+            tolerancia = mpmath.mpf(10) ** -digitos * max(1, abs(valor))
+            if anterior is not None and error <= tolerancia or cifras >= MAX_CIFRAS_TRABAJO:
+                return mpmath.nstr(valor, digitos), float(error), cifras
+        anterior = valor
+        cifras = min(MAX_CIFRAS_TRABAJO, int(cifras * 1.5))
+
+
+def _racionalizar(*exprs):
+    """
+    Sustituye los decimales de las expresiones por el racional que se escribió.
+
+    Un '0.1' analizado es un Float de 53 bits que no vale 1/10; con más
+    cifras que la doble precisión su error aparecería en el resultado.
+    """
+    return [expr.xreplace({f: sp.nsimplify(f, rational=True) for f in expr.atoms(sp.Float)})
+            for expr in map(sp.sympify, exprs)]
+
+
+def _precisar(resultado, digitos, integral, operacion, func, variables, limites):
+    """
+    Completa un ResultadoIntegral con su valor a digitos cifras.
+
+    Un resultado exacto se evalúa con evalf(digitos), que ya sube la
+    precisión interna hasta garantizar esas cifras. Uno numérico se
+    recalcula con cuadratura_precisa y se guarda en el almacén con la
+    precisión como parte de la clave.
+
+    Args:
+        resultado: ResultadoIntegral en doble precisión
+        digitos: Cifras significativas pedidas
+        integral: Función para cuadratura_precisa
+        operacion, func, variables, limites: Datos de la clave del almacén
+    """
+    inicio = time.perf_counter()
+    if resultado.exacto is not None:
+        with etapa('evalf', digitos=digitos):
+            aproximado = resultado.exacto.evalf(digitos).as_real_imag()[0]
+        return replace(resultado, digitos=digitos, valor_preciso=str(aproximado),
+                       error=abs(float(aproximado)) * 10.0 ** -digitos,
+                       tiempo=resultado.tiempo + time.perf_counter() - inicio)
+
+    actual = almacen()
+    clave_precisa = clave(operacion, func, variables, limites, f'{digitos} cifras')
+    datos = None if actual is None else actual.obtener(clave_precisa)
+    if datos is None:
+        valor_preciso, error, _ = cuadratura_precisa(integral, digitos)
+        if actual is not None:
+            actual.guardar(clave_precisa, {'valor_preciso': valor_preciso, 'error': error})
+    else:
+        valor_preciso, error = datos['valor_preciso'], datos['error']
+    return replace(resultado, valor=float(valor_preciso), error=error, digitos=digitos,
+                   valor_preciso=valor_preciso, almacenado=datos is not None,
+                   tiempo=resultado.tiempo + time.perf_counter() - inicio)
+
+
+def integrar_doble(func, x, y, x_min, x_max, y_min, y_max,
+                   plazo=PLAZO_SIMBOLICO, tol=1e-10, digitos=None):
+    """
+    Calcula ∬ func dx dy sobre un rectángulo usando el motor por niveles.
+
+    Si el integrando tiene pliegues o singularidades dentro del rectángulo
+    o en su borde, se divide en piezas (ver integrar_piezas).
+
+    Args:
+        func: Expresión de SymPy en las variables x e y
+        x, y: Símbolos de integración
+        x_min, x_max, y_min, y_max: Límites del rectángulo (números o
+            constantes exactas de SymPy, como pi/2)
+        plazo: Segundos concedidos a la integración simbólica
+        tol: Tolerancia absoluta de la cubatura numérica
+        digitos: Cifras significativas del valor (ver _precisar), o None
+            para doble precisión; con ellas, los decimales del integrando y
+            de los límites se toman como racionales (ver _racionalizar)
+
+    Returns:
+        ResultadoIntegral con el valor, el nivel usado y el tiempo
+    """
+    if digitos is not None:
+        func, x_min, x_max, y_min, y_max = _racionalizar(func, x_min, x_max, y_min, y_max)
+    limites = [(sp.sympify(x_min), sp.sympify(x_max)), (sp.sympify(y_min), sp.sympify(y_max))]
+    inicio = time.perf_counter()
+    # El análisis de singularidades consume el plazo; con 0 solo se hace
+    # el que no llega a resolver ecuaciones
+    piezas = dividir_rectangulo(func, x, y, limites,
+                                PLAZO_ANALISIS if plazo is None else min(PLAZO_ANALISIS, plazo))
+    restante = None if plazo is None else max(0.0, plazo - (time.perf_counter() - inicio))
+    if piezas is not None:
+        resultado = integrar_piezas(piezas, (x, y), restante, tol)
+        resultado = replace(resultado, tiempo=time.perf_counter() - inicio)
+        if digitos is None:
+            return resultado
+        return _precisar(resultado, digitos, _cuadratura_piezas(piezas, (x, y)),
+                         'integral', func, (x, y), limites)
+
+    nucleo = compilar(func, (x, y)).nucleo
+    resultado = _integrar_por_niveles(
+        func, (x, y), limites,
+        lambda: cubatura_gauss_kronrod(nucleo, float(x_min), float(x_max),
+                                       float(y_min), float(y_max), tol=tol),
+        restante, tol)
+    resultado = replace(resultado, tiempo=time.perf_counter() - inicio)
+    if digitos is None:
+        return resultado
+    f = _mpmath(func, (x, y))
+    (a, b), (c, d) = [(_mpmath(inf), _mpmath(sup)) for inf, sup in limites]
+    return _precisar(resultado, digitos,
+                     lambda: mpmath.quad(f, [a(), b()], [c(), d()], error=True),
+                     'integral', func, (x, y), limites)
+
+
+def _suavizado(variable, singular_inferior, singular_superior):
+    """
+    Cambio de variable t = φ(s) de [0, 1] en sí mismo y su derivada.
+
+    φ tiene derivada nula en los extremos singulares, así que una
+    singularidad integrable como 1/sqrt(t) o log(t) en el borde pasa a ser
+    acotada: con t = s², dt/sqrt(t) = 2 ds.
+    """
+    s = variable
+    if singular_inferior and singular_superior:
+        return 3 * s**2 - 2 * s**3, 6 * s * (1 - s)
+    if singular_inferior:
+        return s**2, 2 * s
+    if singular_superior:
+        return 1 - (1 - s)**2, 2 * (1 - s)
+    return s, sp.S.One
+
+
+def _numerico_pieza(pieza, variables, tol):
+    """
+    Nivel numérico de una pieza: cubatura en [0, 1]² con los bordes singulares suavizados.
+
+    La pieza se lleva a una caja con a_caja y cada variable se lleva a
+    [0, 1] con _suavizado, de modo que la cubatura nunca se acerca a una
+    singularidad más de lo que permite el cambio de variable.
+    """
+    expr, (u, t) = a_caja(pieza.func, variables, pieza.limites)
+    (a, b), _ = pieza.limites
+    fi_u, derivada_u = _suavizado(u, *pieza.singulares[0])
+    fi_t, derivada_t = _suavizado(t, *pieza.singulares[1])
+    en_unidad = expr.subs({u: a + (b - a) * fi_u, t: fi_t}, simultaneous=True)
+    nucleo = compilar(en_unidad * (b - a) * derivada_u * derivada_t, (u, t)).nucleo
+    return lambda: cubatura_gauss_kronrod(nucleo, 0.0, 1.0, 0.0, 1.0, tol=tol)
+
+
+def integrar_piezas(piezas, variables, plazo=PLAZO_SIMBOLICO, tol=1e-10):
+    """
+    Suma las integrales de las piezas de un rectángulo dividido.
+
+    Cada pieza se integra por niveles: las rectangulares como en
+    integrar_doble y las de tipo I como en integrar_region, pero con el
+    nivel numérico de _numerico_pieza. Las piezas comparten el plazo: cada
+    una recibe lo que dejaron las anteriores.
+
+    Args:
+        piezas: Tupla de singularidades.Pieza
+        variables: Símbolos (x, y), de la exterior a la interior
+        plazo: Segundos concedidos a la integración simbólica
+        tol: Tolerancia absoluta de la cubatura de todas las piezas
+
+    Returns:
+        ResultadoIntegral con la suma; es simbólico si todas las piezas lo son
+    """
+    inicio = time.perf_counter()
+    tol_pieza = tol / len(piezas)
+    partes = []
+    for pieza in piezas:
+        restante = None if plazo is None else max(0.0, plazo - (time.perf_counter() - inicio))
+        numerico = _numerico_pieza(pieza, variables, tol_pieza)
+        if pieza.rectangular:
+            # Con un borde singular, el nivel numérico debe ser el suavizado
+            singular = any(itertools.chain(*pieza.singulares))
+            partes.append(_integrar_por_niveles(pieza.func, variables, list(pieza.limites),
+                                                numerico, restante, tol_pieza,
+                                                separar=not singular))
+        else:
+            partes.append(_definida_por_niveles('region', pieza.func, variables, pieza.limites,
+                                                numerico, restante, tol_pieza))
+
+    exactas = all(parte.exacto is not None for parte in partes)
+    return ResultadoIntegral(
+        sum(parte.valor for parte in partes),
+        sp.Add(*(parte.exacto for parte in partes)) if exactas else None,
+        NIVEL_SIMBOLICO if exactas else NIVEL_NUMERICO,
+        time.perf_counter() - inicio,
+        sum(parte.error for parte in partes),
+        almacenado=all(parte.almacenado for parte in partes),
+        piezas=len(piezas))
+
+
+def _cuadratura_piezas(piezas, variables):
+    """Función para cuadratura_precisa que suma mpmath.quad (tanh-sinh) sobre las piezas."""
+    integrandos = []
+    for pieza in piezas:
+        expr, en_caja = a_caja(pieza.func, variables, pieza.limites)
+        (a, b), _ = pieza.limites
+        integrandos.append((_mpmath(expr, en_caja), _mpmath(a), _mpmath(b)))
+
+    def integral():
+        valor, error = mpmath.mpf(0), mpmath.mpf(0)
+        for f, a, b in integrandos:
+            parcial, estimado = mpmath.quad(f, [a(), b()], [0, 1], error=True)
+            valor += parcial
+            error += estimado
+        return valor, error
+
+    return integral
+
+
+def integrar_simple(func, x, x_min, x_max, plazo=PLAZO_SIMBOLICO, tol=1e-10, digitos=None):
+    """
+    Calcula ∫ func dx sobre [x_min, x_max] usando el motor por niveles.
+
+    Args:
+        func: Expresión de SymPy en la variable x
+        x: Símbolo de integración
+        x_min, x_max: Límites de integración (números o constantes exactas)
+        plazo: Segundos concedidos a la integración simbólica
+        tol: Tolerancia absoluta de la cuadratura numérica
+        digitos: Cifras significativas del valor, o None para doble precisión
+
+    Returns:
+        ResultadoIntegral con el valor, el nivel usado y el tiempo
+    """
+    if digitos is not None:
+        func, x_min, x_max = _racionalizar(func, x_min, x_max)
+    limites = [(sp.sympify(x_min), sp.sympify(x_max))]
+    nucleo = compilar(func, (x,)).nucleo
+    resultado = _integrar_por_niveles(
+        func, (x,), limites,
+        lambda: cuadratura_gauss_kronrod(nucleo, float(x_min), float(x_max), tol=tol),
+        plazo, tol)
+    if digitos is None:
+        return resultado
+    f = _mpmath(func, (x,))
+    a, b = _mpmath(limites[0][0]), _mpmath(limites[0][1])
+    return _precisar(resultado, digitos, lambda: mpmath.quad(f, [a(), b()], error=True),
+                     'integral', func, (x,), limites)
+
+
+def integrar_cortes(f, t, inferior, superior, paneles=1):
+    """
+    Integra f(t, u) en u entre inferior(t) y superior(t) para muchos t a la vez.
+
+    Cada corte se divide en paneles iguales y cada panel se lleva a los
+    nodos de Gauss–Legendre, de modo que todos los cortes se evalúan en una
+    sola llamada vectorizada al núcleo.
+
+    Args:
+        f: Núcleo vectorizado f(T, U)
+        t: Arreglo de valores de la variable exterior (cualquier forma)
+        inferior, superior: Núcleos vectorizados de los límites del corte
+        paneles: Número de paneles por corte
+
+    Returns:
+        Arreglo con la forma de t con la integral de cada corte
+    """
+    t = np.asarray(t, dtype=float)
+    planos = t.ravel()
+    bajo = np.broadcast_to(np.asarray(inferior(planos), dtype=float), planos.shape)
+    alto = np.broadcast_to(np.asarray(superior(planos), dtype=float), planos.shape)
+    ancho = (alto - bajo) / paneles
+    centros = bajo[:, None] + ancho[:, None] * (np.arange(paneles) + 0.5)
+    U = centros[:, :, None] + 0.5 * ancho[:, None, None] * NODOS_LEGENDRE
+    T = np.broadcast_to(planos[:, None, None], U.shape)
+    F = np.broadcast_to(np.asarray(f(T, U), dtype=float), U.shape)
+    return (0.5 * ancho * (F @ PESOS_LEGENDRE).sum(axis=1)).reshape(t.shape)
+
+
+def _elegir_paneles(f, a, b, inferior, superior, tol):
+    """
+    Duplica los paneles de los cortes hasta que la integral interior converge.
+
+    Returns:
+        Tupla (paneles, error_estimado) con el error ya multiplicado por b - a
+    """
+    muestra = a + (b - a) * (np.arange(17) + 0.5) / 17
+    paneles = 1
+    anterior = integrar_cortes(f, muestra, inferior, superior, paneles)
+    while True:
+        actual = integrar_cortes(f, muestra, inferior, superior, 2 * paneles)
+        diferencia = float(np.max(np.abs(actual - anterior))) * abs(b - a)
+        paneles *= 2
+        if diferencia <= tol or paneles >= MAX_PANELES or not np.isfinite(diferencia):
+            return paneles, diferencia
+        anterior = actual
+
+
+def integrar_region(func, externa, interna, a, b, inferior, superior,
+                    plazo=PLAZO_SIMBOLICO, tol=1e-10, digitos=None):
+    """
+    Calcula ∬ func sobre una región de tipo I o II usando el motor por niveles.
+
+    La región es a ≤ externa ≤ b, inferior(externa) ≤ interna ≤ superior(externa).
+    Para una región de tipo I la variable exterior es x; para una de tipo II, y.
+    El nivel numérico integra cada corte con Gauss–Legendre (integrar_cortes)
+    y la variable exterior con Gauss–Kronrod adaptativo.
+
+    Args:
+        func: Expresión de SymPy en las dos variables
+        externa, interna: Símbolos de integración exterior e interior
+        a, b: Límites constantes de la variable exterior
+        inferior, superior: Expresiones de los límites interiores (pueden
+            depender de la variable exterior)
+        plazo: Segundos concedidos a la integración simbólica
+        tol: Tolerancia absoluta del nivel numérico
+        digitos: Cifras significativas del valor, o None para doble precisión
+
+    Returns:
+        ResultadoIntegral con el valor, el nivel usado y el tiempo
+    """
+    if digitos is not None:
+        func, a, b, inferior, superior = _racionalizar(func, a, b, inferior, superior)
+    a, b = sp.sympify(a), sp.sympify(b)
+    inferior, superior = sp.sympify(inferior), sp.sympify(superior)
+    resultado = _region_por_niveles(func, externa, interna, a, b, inferior, superior, plazo, tol)
+    if digitos is None:
+        return resultado
+
+    f = _mpmath(func, (externa, interna))
+    bajo, alto = _mpmath(inferior, (externa,)), _mpmath(superior, (externa,))
+    inicio, fin = _mpmath(a), _mpmath(b)
+    errores_cortes = []
+
+    def corte(t):
+        valor, error = mpmath.quad(lambda u: f(t, u), [bajo(t), alto(t)], error=True)
+        errores_cortes.append(error)
+        return valor
+
+    def integral():
+        errores_cortes.clear()
+        valor, error = mpmath.quad(corte, [inicio(), fin()], error=True)
+        return valor, error + abs(fin() - inicio()) * max(errores_cortes, default=0)
+
+    return _precisar(resultado, digitos, integral, 'region', func, (externa, interna),
+                     ((a, b), (inferior, superior)))
+
+
+def _region_por_niveles(func, externa, interna, a, b, inferior, superior, plazo, tol):
+    """Niveles simbólico y numérico de integrar_region, con límites ya exactos."""
+    def numerico():
+        f = compilar(func, (externa, interna)).nucleo
+        bajo = compilar(inferior, (externa,)).nucleo
+        alto = compilar(superior, (externa,)).nucleo
+        paneles, error_interior = _elegir_paneles(f, float(a), float(b), bajo, alto, tol)
+        valor, error = cuadratura_gauss_kronrod(
+            lambda T: integrar_cortes(f, T, bajo, alto, paneles), float(a), float(b), tol=tol)
+        return valor, error + error_interior
+
+    return _definida_por_niveles('region', func, (externa, interna),
+                                 ((a, b), (inferior, superior)), numerico, plazo, tol)
+
+
+def _definida_por_niveles(operacion, func, variables, limites, numerico, plazo, tol):
+    """
+    Motor por niveles para límites que dependen de variables exteriores.
+
+    Sin antiderivada reutilizable, el nivel simbólico es la integral
+    definida de SymPy y, si no llega a tiempo, se usa numerico().
+
+    Args:
+        operacion: Nombre de la operación en la clave del almacén
+        func: Expresión de SymPy a integrar
+        variables: Símbolos de integración, de la exterior a la interior
+        limites: Pares (inferior, superior) exactos de cada variable; los de
+            una variable pueden depender de las anteriores
+        numerico: Función sin argumentos que devuelve (valor, error) numéricos
+        plazo: Segundos concedidos a la integración simbólica
+        tol: Tolerancia de numerico
+
+    Returns:
+        ResultadoIntegral
+    """
+    inicio = time.perf_counter()
+    func = preprocesar(func, variables).expr
+    claves = _claves_almacen(operacion, func, variables, limites, tol)
+    guardado = _consultar_almacen(claves, plazo, inicio)
+    if guardado is not None:
+        return guardado
+
+    orden = tuple((v, bajo, alto) for v, (bajo, alto) in zip(variables, limites))[::-1]
+    integral = integrar_simbolico_con_plazo(func, orden, plazo)
+    if integral is not None:
+        valor = _valor_real(integral)
+        if valor is not None:
+            return _guardar_en_almacen(claves, ResultadoIntegral(
+                valor, integral, NIVEL_SIMBOLICO, time.perf_counter() - inicio), plazo)
+
+    with etapa('cubatura'):
+        valor, error = numerico()
+    return _guardar_en_almacen(claves, ResultadoIntegral(
+        valor, None, NIVEL_NUMERICO, time.perf_counter() - inicio, error), plazo)
+
+
+def a_caja(func, variables, limites):
+    """
+    Lleva un dominio con límites variables a una caja.
+
+    El dominio es a ≤ v₀ ≤ b, c(v₀) ≤ v₁ ≤ d(v₀), e(v₀, v₁) ≤ v₂ ≤ h(v₀, v₁).
+    Con v₁ = c + (d - c)·t y v₂ = e + (h - e)·s pasa a ser
+    [a, b] × [0, 1] × [0, 1] y el integrando se multiplica por el jacobiano
+    (d - c)(h - e). Para límites constantes es un cambio afín.
+
+    Args:
+        func: Expresión de SymPy
+        variables: Símbolos del dominio, del exterior al interior (2 o 3)
+        limites: Pares (inferior, superior) exactos de cada variable
+
+    Returns:
+        Tupla (expresión, variables) con el integrando en la caja y sus
+        variables: v₀ seguida de AUXILIARES_CAJA
+    """
+    auxiliares = AUXILIARES_CAJA[:len(variables) - 1]
+    sustitucion = {}
+    jacobiano = sp.S.One
+    for variable, (bajo, alto), auxiliar in zip(variables[1:], limites[1:], auxiliares):
+        bajo, alto = bajo.subs(sustitucion), alto.subs(sustitucion)
+        sustitucion[variable] = bajo + (alto - bajo) * auxiliar
+        jacobiano *= alto - bajo
+    return func.subs(sustitucion, simultaneous=True) * jacobiano, (variables[0], *auxiliares)
+
+
+def integrar_triple(func, x, y, z, x_min, x_max, y_min, y_max, z_min, z_max,
+                    plazo=PLAZO_SIMBOLICO, tol=1e-10, digitos=None):
+    """
+    Calcula ∭ func sobre un sólido usando el motor por niveles.
+
+    El sólido es x_min ≤ x ≤ x_max, y_min(x) ≤ y ≤ y_max(x),
+    z_min(x, y) ≤ z ≤ z_max(x, y). Si todos los límites son constantes se
+    reutiliza la antiderivada iterada como en integrar_doble; si no, se
+    intenta la integral definida. El nivel numérico lleva el sólido a una
+    caja (a_caja) y usa cubatura_triple, porque la integración simbólica
+    triple suele ser demasiado lenta.
+
+    Args:
+        func: Expresión de SymPy en x, y, z
+        x, y, z: Símbolos de integración
+        x_min, x_max: Límites constantes de x
+        y_min, y_max: Límites de y (pueden depender de x)
+        z_min, z_max: Límites de z (pueden depender de x e y)
+        plazo: Segundos concedidos a la integración simbólica
+        tol: Tolerancia absoluta de la cubatura numérica
+        digitos: Cifras significativas del valor, o None para doble precisión
+
+    Returns:
+        ResultadoIntegral con el valor, el nivel usado y el tiempo
+    """
+    if digitos is not None:
+        func, x_min, x_max, y_min, y_max, z_min, z_max = _racionalizar(
+            func, x_min, x_max, y_min, y_max, z_min, z_max)
+    limites = [(sp.sympify(x_min), sp.sympify(x_max)), (sp.sympify(y_min), sp.sympify(y_max)),
+               (sp.sympify(z_min), sp.sympify(z_max))]
+    en_caja, variables_caja = a_caja(func, (x, y, z), limites)
+    a, b = float(limites[0][0]), float(limites[0][1])
+
+    def numerico():
+        nucleo = compilar(en_caja, variables_caja).nucleo
+        return cubatura_triple(nucleo, (a, b, 0, 1, 0, 1), tol=tol)
+
+    if any(limite.free_symbols for par in limites for limite in par):
+        resultado = _definida_por_niveles('solido', func, (x, y, z), limites, numerico, plazo, tol)
+    else:
+        resultado = _integrar_por_niveles(func, (x, y, z), limites, numerico, plazo, tol)
+    if digitos is None:
+        return resultado
+
+    f = _mpmath(en_caja, variables_caja)
+    inicio, fin = _mpmath(limites[0][0]), _mpmath(limites[0][1])
+    return _precisar(resultado, digitos,
+                     lambda: mpmath.quad(f, [inicio(), fin()], [0, 1], [0, 1], error=True),
+                     'solido', func, (x, y, z), limites)
+
+
+LIMITES = ('x_min', 'x_max', 'y_min', 'y_max')
+
+
+# Funciones con las que una forma cerrada puede cambiar de rama a mitad de un barrido
+RAMIFICADAS = (sp.floor, sp.Piecewise, sp.tan, sp.atan)
+
+
+def _valores_de_control(cerrada, simbolo, n):
+    """
+    Índices de los valores de un barrido en los que se contrasta la forma cerrada.
+
+    Siempre el primero, el central y el último; todos si la forma cerrada
+    contiene floor, Piecewise, tan o atan del límite barrido.
+    """
+    if any(simbolo in termino.free_symbols for termino in cerrada.atoms(*RAMIFICADAS)):
+        return np.arange(n)
+    return np.unique([0, n // 2, n - 1])
+
+
+def barrer_limite(func, x, y, x_min, x_max, y_min, y_max, parametro, valores,
+                  plazo=PLAZO_SIMBOLICO, tol=1e-10):
+    """
+    Calcula ∬ func dx dy para muchos valores de uno de los límites.
+
+    Si existe una antiderivada G(x, y) se obtiene una sola vez (queda en la
+    caché de expresiones) y la forma cerrada
+    G(b, d) - G(a, d) - G(b, c) + G(a, c) se evalúa sobre todo el arreglo
+    de valores con NumPy. La forma cerrada se contrasta con la cubatura en
+    el primer valor, el central y el último, y en todos si depende del
+    límite barrido a través de floor, Piecewise, tan o atan, donde una
+    antiderivada puede saltar de rama a mitad del barrido (ver
+    _valores_de_control). Si alguno no coincide, o no hay antiderivada a
+    tiempo, todo el barrido se hace con cubatura_lote.
+
+    Args:
+        func: Expresión de SymPy en x e y
+        x, y: Símbolos de integración
+        x_min, x_max, y_min, y_max: Límites base del rectángulo
+        parametro: Límite que varía, uno de LIMITES
+        valores: Valores que toma ese límite
+        plazo: Segundos concedidos a la antiderivada simbólica
+        tol: Tolerancia absoluta de la cubatura numérica
+
+    Returns:
+        ResultadoBarrido
+    """
+    if parametro not in LIMITES:
+        raise ValueError(f"Límite desconocido: {parametro!r} (use {', '.join(LIMITES)})")
+    inicio = time.perf_counter()
+    valores = np.asarray(valores, dtype=float)
+    base = dict(zip(LIMITES, (float(x_min), float(x_max), float(y_min), float(y_max))))
+    columnas = [np.full(valores.shape, base[nombre]) if nombre != parametro else valores
+                for nombre in LIMITES]
+    rects = np.column_stack(columnas)
+
+    entrada = compilar(func, (x, y))
+    antiderivada = antiderivada_con_plazo(func, (x, y), plazo)
+    if antiderivada is not None:
+        a, b, c, d = sp.symbols('a b c d', real=True)
+        cerrada = evaluar_esquinas(antiderivada, (x, y), ((a, b), (c, d)))
+        with etapa('lambdify'):
+            evaluar = sp.lambdify((a, b, c, d), cerrada, 'numpy')
+        try:
+            with np.errstate(all='ignore'), etapa('forma_cerrada', puntos=valores.size):
+                resultados = np.broadcast_to(
+                    np.asarray(evaluar(*columnas), dtype=complex), valores.shape)
+        except (TypeError, ValueError, NameError):
+            # La forma cerrada usa funciones que NumPy no vectoriza
+            resultados = np.full(valores.shape, np.nan, dtype=complex)
+        simbolo = dict(zip(LIMITES, (a, b, c, d)))[parametro]
+        control = _valores_de_control(cerrada, simbolo, valores.size)
+        with etapa('cubatura', puntos=control.size):
+            referencia, _ = cubatura_lote(entrada.nucleo, rects[control], tol=tol)
+        if (np.all(np.isfinite(resultados)) and np.all(np.abs(resultados.imag) < 1e-9)
+                and np.all(np.abs(resultados[control].real - referencia)
+                           <= 1e-8 * np.maximum(1.0, np.abs(referencia)))):
+            # Los límites fijos se sustituyen tal cual para conservar su valor exacto
+            fijos = {s: sp.sympify(limite) for nombre, s, limite
+                     in zip(LIMITES, (a, b, c, d), (x_min, x_max, y_min, y_max))
+                     if nombre != parametro}
+            exacto = cerrada.subs(fijos).subs(simbolo, sp.Symbol(parametro))
+            return ResultadoBarrido(parametro, valores, resultados.real.copy(),
+                                    np.zeros(valores.shape), exacto, NIVEL_SIMBOLICO,
+                                    time.perf_counter() - inicio)
+
+    with etapa('cubatura', puntos=valores.size):
+        resultados, errores = cubatura_lote(entrada.nucleo, rects, tol=tol)
+    return ResultadoBarrido(parametro, valores, resultados, errores, None,
+                            NIVEL_NUMERICO, time.perf_counter() - inicio)
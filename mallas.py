@@ -0,0 +1,383 @@
+"""
+Evaluación de funciones sobre mallas
+====================================
+
+Prepara los datos numéricos de los gráficos (mallas de superficies y
+curvas límite) sin depender de la interfaz, de modo que puedan
+calcularse en un proceso trabajador.
+
+Además de las mallas uniformes, refinar_malla genera una secuencia de
+mallas de detalle creciente: una vista previa gruesa y luego mallas que
+concentran los puntos donde la superficie se curva, dentro de un
+presupuesto fijo de puntos.
+
+Las rejillas se evalúan por bloques de TAMANO_BLOQUE puntos, sin construir
+los arreglos completos de X e Y, y pueden escribirse en un ``np.memmap``:
+una malla de 4000×4000 para exportar ocupa en memoria solo un bloque, y
+tanto la memoria como el tiempo crecen de forma predecible.
+"""
+
+import numpy as np
+
+from expresiones import compilar
+from perfilado import etapa
+
+# Puntos por bloque de evaluación (512 KB de float64, cabe en la caché L2)
+TAMANO_BLOQUE = 2**16
+
+# Reglas de cuadratura sobre rejillas (ver pesos_cuadratura)
+REGLAS = ('trapecio', 'simpson', 'romberg')
+
+
+def evaluar_malla(func, x, y, x_min, x_max, y_min, y_max, n):
+    """
+    Evalúa z = func(x, y) sobre una malla regular de n × n puntos.
+
+    Args:
+        func: Expresión de SymPy en x e y
+        x, y: Símbolos de la expresión
+        x_min, x_max, y_min, y_max: Límites de la malla
+        n: Número de puntos por eje
+
+    Returns:
+        Tupla (X, Y, Z) de arreglos de forma (n, n)
+    """
+    x_vals = np.linspace(x_min, x_max, n)
+    y_vals = np.linspace(y_min, y_max, n)
+    X, Y = np.meshgrid(x_vals, y_vals)
+    return X, Y, _evaluar_rejilla(compilar(func, (x, y)).nucleo, x_vals, y_vals)
+
+
+def evaluar_curvas(funcs, x, x_min, x_max, n):
+    """
+    Evalúa varias curvas y = f(x) sobre los mismos n puntos.
+
+    Args:
+        funcs: Lista de expresiones de SymPy en x
+        x: Símbolo de la variable independiente
+        x_min, x_max: Intervalo de evaluación
+        n: Número de puntos
+
+    Returns:
+        Tupla (x_vals, [y_vals, ...])
+    """
+    x_vals = np.linspace(x_min, x_max, n)
+    curvas = []
+    for func in funcs:
+        func_lambdified = compilar(func, (x,)).nucleo
+        with etapa('malla', puntos=n):
+            curvas.append(np.broadcast_to(func_lambdified(x_vals), x_vals.shape).astype(float))
+    return x_vals, curvas
+
+
+def evaluar_por_bloques(nucleo, xs, ys, destino=None, tamano=TAMANO_BLOQUE):
+    """
+    Evalúa un núcleo sobre la rejilla producto xs × ys por bloques.
+
+    Cada bloque tiene unos tamano puntos (filas enteras cuando caben) y
+    se evalúa por difusión de xs e ys, de modo que nunca se construyen las
+    matrices completas de X e Y.
+
+    Args:
+        nucleo: Función vectorizada f(X, Y)
+        xs, ys: Coordenadas de las columnas y de las filas
+        destino: Arreglo (len(ys), len(xs)) donde escribir, por ejemplo un
+            np.memmap (ver malla_en_disco); por defecto se crea uno
+        tamano: Puntos por bloque
+
+    Returns:
+        El arreglo destino con Z
+    """
+    xs, ys = np.asarray(xs, dtype=float), np.asarray(ys, dtype=float)
+    if destino is None:
+        destino = np.empty((len(ys), len(xs)))
+    columnas = min(len(xs), tamano)
+    filas = max(1, tamano // columnas)
+    with etapa('malla', puntos=len(xs) * len(ys)), np.errstate(all='ignore'):
+        for fila in range(0, len(ys), filas):
+            Y = ys[fila:fila + filas, None]
+            for columna in range(0, len(xs), columnas):
+                X = xs[None, columna:columna + columnas]
+                destino[fila:fila + filas, columna:columna + columnas] = nucleo(X, Y)
+    return destino
+
+
+def malla_en_disco(ruta, filas, columnas):
+    """
+    Crea un arreglo float64 en un archivo .npy proyectado en memoria.
+
+    El archivo se puede abrir después con np.load(ruta, mmap_mode='r').
+
+    Returns:
+        np.memmap de forma (filas, columnas)
+    """
+    return np.lib.format.open_memmap(ruta, mode='w+', dtype=float, shape=(filas, columnas))
+
+
+def integrar_rejilla(Z, xs, ys, tamano=TAMANO_BLOQUE, regla='trapecio', error=False,
+                     restar=None, no_finitos=False):
+    """
+    Cuadratura 2D sobre una rejilla, leyendo Z por bloques de filas.
+
+    Sirve para mallas en disco y datos medidos más grandes que la memoria:
+    solo un bloque de filas está en memoria a la vez. La regla es el
+    producto tensorial de la regla 1D de cada eje (ver pesos_cuadratura),
+    así que cada bloque se integra con dos productos matriz-vector.
+
+    Los puntos no finitos (huecos de unos datos medidos o singularidades
+    de una función) no se rellenan: el valor y el error salen NaN, y con
+    no_finitos=True se informa de cuántos son.
+
+    Args:
+        Z: Arreglo (len(ys), len(xs)), en memoria o np.memmap
+        xs, ys: Coordenadas de las columnas y de las filas
+        regla: 'trapecio', 'simpson' o 'romberg'
+        error: Si es True, devuelve también una estimación del error, que
+            sale de comparar con una regla de orden menor en la misma pasada
+        restar: Núcleo opcional g(x, y) que se resta de Z en cada bloque
+            (ej: la superficie inferior de un volumen)
+        no_finitos: Si es True, devuelve también el número de puntos no
+            finitos de Z (tras restar g)
+
+    Returns:
+        Aproximación de ∬ f dx dy, seguida del error si error es True y del
+        número de puntos no finitos si no_finitos es True (como tupla)
+    """
+    xs, ys = np.asarray(xs, dtype=float), np.asarray(ys, dtype=float)
+    pesos_x = np.column_stack(pesos_cuadratura(xs, regla))
+    pesos_y = np.column_stack(pesos_cuadratura(ys, regla))
+    filas = max(1, tamano // len(xs))
+    totales = np.zeros(2)
+    malos = 0
+    for fila in range(0, len(ys), filas):
+        bloque = np.asarray(Z[fila:fila + filas], dtype=float)
+        if restar is not None:
+            with np.errstate(all='ignore'):
+                bloque = bloque - restar(xs[None, :], ys[fila:fila + filas, None])
+        finitos = np.isfinite(bloque)
+        if not finitos.all():
+            malos += int(bloque.size - np.count_nonzero(finitos))
+            continue
+        totales += np.einsum('ik,ik->k', pesos_y[fila:fila + filas], bloque @ pesos_x)
+    if malos:
+        totales[:] = np.nan
+    valor, referencia = float(totales[0]), float(totales[1])
+    resultado = (valor,) + ((abs(valor - referencia),) if error else ()) + (
+        (malos,) if no_finitos else ())
+    return resultado if len(resultado) > 1 else valor
+
+
+def submuestrear(xs, ys, Z, max_lado):
+    """
+    Reduce una rejilla tomando una de cada k filas y columnas.
+
+    Devuelve copias pequeñas aptas para plot_surface aunque Z sea un
+    np.memmap enorme; los extremos de la rejilla se conservan.
+
+    Returns:
+        Tupla (X, Y, Z) con como mucho max_lado + 1 puntos por lado
+    """
+    paso_x = max(1, -(-len(xs) // max_lado))
+    paso_y = max(1, -(-len(ys) // max_lado))
+    columnas = np.unique(np.r_[np.arange(0, len(xs), paso_x), len(xs) - 1])
+    filas = np.unique(np.r_[np.arange(0, len(ys), paso_y), len(ys) - 1])
+    X, Y = np.meshgrid(np.asarray(xs)[columnas], np.asarray(ys)[filas])
+    return X, Y, np.array(Z[np.ix_(filas, columnas)], dtype=float)
+
+
+def _pesos_trapecio(coords):
+    """Pesos de la regla del trapecio sobre puntos no equiespaciados."""
+    h = np.diff(coords)
+    pesos = np.zeros(len(coords))
+    pesos[:-1] += h / 2
+    pesos[1:] += h / 2
+    return pesos
+
+
+def _pesos_simpson(n, h):
+    """Pesos de Simpson compuesta sobre n ≥ 3 puntos equiespaciados (3/8 al final si n es par)."""
+    pesos = np.zeros(n)
+    pares = n - 1 if n % 2 else n - 4
+    pesos[:pares + 1:2] += 2 * h / 3
+    pesos[1:pares:2] += 4 * h / 3
+    pesos[0] -= h / 3
+    pesos[pares] -= h / 3
+    if n % 2 == 0:
+        pesos[pares:] += 3 * h / 8 * np.array([1, 3, 3, 1])
+    return pesos
+
+
+def pesos_cuadratura(coords, regla='trapecio'):
+    """
+    Pesos 1D de una regla de cuadratura y de una referencia para su error.
+
+    La diferencia entre la integral con los pesos y con la referencia es
+    la estimación del error:
+
+    - 'trapecio': admite puntos no equiespaciados. El error es un tercio de
+      la diferencia con el trapecio de paso doble (Richardson).
+    - 'simpson': Simpson 1/3 compuesta, con la regla de 3/8 en los tres
+      últimos intervalos si su número es impar. El error es 1/15 de la
+      diferencia con Simpson de paso doble si el número de intervalos es
+      múltiplo de 4; si no, la diferencia con el trapecio (pesimista).
+    - 'romberg': extrapolación de Richardson de los trapecios con pasos
+      h, 2h, 4h...; necesita 2**k + 1 puntos. El error es la diferencia con
+      la columna anterior de la tabla de Romberg.
+
+    Todas son lineales en los valores, así que se reducen a un vector de pesos.
+
+    Args:
+        coords: Coordenadas crecientes de los puntos
+        regla: 'trapecio', 'simpson' o 'romberg'
+
+    Returns:
+        Tupla (pesos, pesos_referencia) de arreglos del largo de coords
+
+    Raises:
+        ValueError: Si la regla no existe o los puntos no le sirven
+    """
+    coords = np.asarray(coords, dtype=float)
+    n = len(coords)
+    if regla not in REGLAS:
+        raise ValueError(f"Regla desconocida: {regla!r} (use {', '.join(REGLAS)})")
+    trapecio = _pesos_trapecio(coords)
+    if regla == 'trapecio' or n < 3:
+        indices = np.unique(np.r_[np.arange(0, n, 2), n - 1])
+        doble = np.zeros(n)
+        doble[indices] = _pesos_trapecio(coords[indices])
+        return trapecio, trapecio - (trapecio - doble) / 3
+
+    h = np.diff(coords)
+    if not np.allclose(h, h[0], rtol=1e-9, atol=0):
+        raise ValueError(f"La regla de {regla} necesita puntos equiespaciados")
+    h = h[0]
+    if regla == 'simpson':
+        pesos = _pesos_simpson(n, h)
+        if (n - 1) % 4:
+            return pesos, trapecio
+        doble = np.zeros(n)
+        doble[::2] = _pesos_simpson((n + 1) // 2, 2 * h)
+        return pesos, pesos - (pesos - doble) / 15
+
+    niveles = int(round(np.log2(n - 1)))
+    if 2**niveles + 1 != n:
+        raise ValueError(f"La regla de Romberg necesita 2**k + 1 puntos por eje, no {n}")
+    tabla = []
+    for nivel in range(niveles + 1):
+        paso = 2**(niveles - nivel)
+        fila = [np.zeros(n)]
+        fila[0][::paso] = _pesos_trapecio(coords[::paso])
+        for orden in range(1, nivel + 1):
+            anterior = tabla[nivel - 1][orden - 1]
+            fila.append(fila[orden - 1] + (fila[orden - 1] - anterior) / (4**orden - 1))
+        tabla.append(fila)
+    return tabla[-1][-1], tabla[-1][-2] if niveles else tabla[-1][-1]
+
+
+def _evaluar_rejilla(nucleo, xs, ys):
+    """
+    Evalúa el núcleo en la rejilla producto xs × ys; devuelve Z de forma (len(ys), len(xs)).
+
+    Los valores infinitos (una singularidad sobre la malla, como x = 0 en
+    1/sqrt(x)) pasan a NaN, que no se dibujan ni cuentan en la escala.
+    """
+    Z = evaluar_por_bloques(nucleo, xs, ys)
+    Z[np.isinf(Z)] = np.nan
+    return Z
+
+
+def _densidad_curvatura(Z, coords, eje):
+    """
+    Densidad de puntos deseada a lo largo de un eje.
+
+    El error de la interpolación lineal es del orden de h²·|f''|, así que
+    se equidistribuye tomando la densidad proporcional a √|f''| (máximo a lo
+    largo del otro eje), más un mínimo uniforme para no dejar zonas vacías.
+
+    Returns:
+        Densidad en cada coordenada (arreglo del mismo largo que coords)
+    """
+    if eje == 0:
+        Z = Z.T
+    h = np.diff(coords)
+    pendientes = np.diff(Z, axis=1) / h
+    segunda = np.abs(np.diff(pendientes, axis=1)) / (0.5 * (h[:-1] + h[1:]))
+    curvatura = np.nan_to_num(np.nanmax(segunda, axis=0, initial=0.0), nan=0.0, posinf=0.0)
+    curvatura = np.concatenate([curvatura[:1], curvatura, curvatura[-1:]])
+    densidad = np.sqrt(curvatura)
+    return densidad + max(densidad.mean(), 1e-12)
+
+
+def _equidistribuir(coords, densidad, n):
+    """Coloca n puntos de modo que cada intervalo tenga la misma integral de densidad."""
+    masa = np.concatenate([[0.0], np.cumsum(0.5 * (densidad[:-1] + densidad[1:]) * np.diff(coords))])
+    return np.interp(np.linspace(0.0, masa[-1], n), masa, coords)
+
+
+def _integral_trapecio(valores, coords):
+    """Regla del trapecio sobre puntos no equiespaciados."""
+    return float(np.sum(0.5 * (valores[:-1] + valores[1:]) * np.diff(coords)))
+
+
+def refinar_malla(func, x, y, x_min, x_max, y_min, y_max, presupuesto,
+                  n_inicial=15, rondas=2, tol=1e-3):
+    """
+    Genera mallas cada vez más detalladas dentro de un presupuesto de puntos.
+
+    La primera malla es una vista previa uniforme y barata. Cada ronda
+    siguiente estima la curvatura sobre la malla anterior y redistribuye
+    las líneas x = cte e y = cte para concentrarlas donde la función se
+    curva más. El presupuesto se reparte entre los ejes según su dificultad
+    y solo se gasta el necesario para que el error de interpolación quede
+    por debajo de tol veces el rango de z, así que las superficies suaves
+    usan pocas líneas. La malla sigue siendo rectilínea, apta para
+    plot_surface.
+
+    Args:
+        func: Expresión de SymPy en x e y
+        x, y: Símbolos de la expresión
+        x_min, x_max, y_min, y_max: Límites de la malla
+        presupuesto: Número máximo de puntos de las mallas refinadas
+        n_inicial: Puntos por eje de la vista previa
+        rondas: Número máximo de refinamientos después de la vista previa
+        tol: Error de interpolación tolerado, relativo al rango de z
+
+    Yields:
+        Tuplas (X, Y, Z): primero la vista previa y luego cada refinamiento
+    """
+    nucleo = compilar(func, (x, y)).nucleo
+    xs = np.linspace(x_min, x_max, n_inicial)
+    ys = np.linspace(y_min, y_max, n_inicial)
+    Z = _evaluar_rejilla(nucleo, xs, ys)
+    X, Y = np.meshgrid(xs, ys)
+    yield X, Y, Z
+
+    for _ in range(rondas):
+        finitos = Z[np.isfinite(Z)]
+        escala = np.ptp(finitos) if finitos.size else 0.0
+        if escala == 0:
+            return
+        densidad_x = _densidad_curvatura(Z, xs, eje=1)
+        densidad_y = _densidad_curvatura(Z, ys, eje=0)
+        peso_x = _integral_trapecio(densidad_x, xs)
+        peso_y = _integral_trapecio(densidad_y, ys)
+
+        # Líneas necesarias para la tolerancia: error ≈ (peso / n)² / 8
+        paso = np.sqrt(8 * tol * escala)
+        necesarias_x = int(np.ceil(peso_x / paso)) + 1
+        necesarias_y = int(np.ceil(peso_y / paso)) + 1
+        if necesarias_x <= len(xs) and necesarias_y <= len(ys):
+            return
+
+        # Repartir el presupuesto según la dificultad de cada eje
+        proporcion = np.clip(peso_x / peso_y, 0.25, 4.0)
+        nx = int(np.clip(np.sqrt(presupuesto * proporcion), 3, presupuesto // 3))
+        ny = max(presupuesto // nx, 3)
+        nx = max(min(nx, necesarias_x), 3)
+        ny = max(min(ny, necesarias_y), 3)
+
+        xs = _equidistribuir(xs, densidad_x, nx)
+        ys = _equidistribuir(ys, densidad_y, ny)
+        Z = _evaluar_rejilla(nucleo, xs, ys)
+        X, Y = np.meshgrid(xs, ys)
+        yield X, Y, Z
@@ -0,0 +1,281 @@
+"""
+Integración de Monte Carlo y cuasi-Monte Carlo
+==============================================
+
+Para integrandos ásperos (discontinuos, con picos) o de varias variables,
+la cubatura determinista escala mal. Aquí el integrando se estima
+promediando el núcleo de NumPy sobre muchos puntos de una caja:
+
+- ``mc``: puntos pseudoaleatorios; el error estándar sale de la varianza
+  de la muestra.
+- ``halton`` y ``sobol``: secuencias de baja discrepancia (cuasi-Monte
+  Carlo), que convergen más rápido en integrandos razonables. Se usan
+  REPLICAS copias aleatorizadas (rotación de Cranley–Patterson en Halton,
+  desplazamiento digital en Sobol); cada una da una estimación insesgada y
+  el error estándar sale de su dispersión.
+
+Los puntos se evalúan por bloques grandes, repartidos entre procesos, y
+la estimación se va entregando mientras mejora, de modo que se puede
+detener en cuanto el error sea aceptable.
+"""
+
+import functools
+import math
+import multiprocessing
+import os
+import time
+from dataclasses import dataclass
+
+import numpy as np
+
+from expresiones import compilar
+
+METODOS = ('mc', 'halton', 'sobol')
+
+# Puntos por bloque (por réplica en cuasi-Monte Carlo)
+TAMANO_BLOQUE = 2**16
+
+# Réplicas aleatorizadas de las secuencias de cuasi-Monte Carlo
+REPLICAS = 8
+
+# Segundos mínimos entre dos estimaciones parciales
+INTERVALO_PARCIAL = 0.25
+
+# Bases de Halton (primos) por dimensión
+BASES_HALTON = (2, 3, 5, 7, 11, 13, 17)
+
+# Números de dirección de Sobol (Joe y Kuo): (s, a, m₁…mₛ) desde la dimensión 2
+DIRECCIONES_SOBOL = (
+    (1, 0, (1,)),
+    (2, 1, (1, 3)),
+    (3, 1, (1, 3, 1)),
+    (3, 2, (1, 1, 1)),
+    (4, 1, (1, 1, 3, 3)),
+    (4, 4, (1, 3, 5, 13)),
+)
+
+BITS_SOBOL = 32
+
+
+@dataclass
+class EstimacionMonteCarlo:
+    """
+    Estimación de una integral por Monte Carlo.
+
+    Attributes:
+        valor: Estimación actual de la integral
+        error: Error estándar de la estimación
+        puntos: Evaluaciones del integrando hasta ahora
+        metodo: Uno de METODOS
+        tiempo: Segundos transcurridos
+        terminado: Si es la estimación final
+    """
+    valor: float
+    error: float
+    puntos: int
+    metodo: str
+    tiempo: float
+    terminado: bool = False
+
+
+def halton(indices, dimension):
+    """
+    Puntos de la secuencia de Halton en [0, 1)^dimension.
+
+    Args:
+        indices: Arreglo de enteros no negativos
+        dimension: Número de coordenadas (como máximo len(BASES_HALTON))
+
+    Returns:
+        Arreglo (len(indices), dimension)
+    """
+    indices = np.asarray(indices, dtype=np.int64)
+    puntos = np.zeros((len(indices), dimension))
+    for eje, base in enumerate(BASES_HALTON[:dimension]):
+        resto = indices.copy()
+        factor = 1.0 / base
+        while np.any(resto):
+            puntos[:, eje] += factor * (resto % base)
+            resto //= base
+            factor /= base
+    return puntos
+
+
+@functools.lru_cache(maxsize=None)
+def _direcciones_sobol(dimension):
+    """Números de dirección enteros (dimension, BITS_SOBOL) de Sobol."""
+    if dimension > len(DIRECCIONES_SOBOL) + 1:
+        raise ValueError(f"Sobol admite hasta {len(DIRECCIONES_SOBOL) + 1} dimensiones")
+    direcciones = np.zeros((dimension, BITS_SOBOL), dtype=np.uint64)
+    direcciones[0] = [1 << (BITS_SOBOL - 1 - j) for j in range(BITS_SOBOL)]
+    for eje, (s, a, m) in enumerate(DIRECCIONES_SOBOL[:dimension - 1], start=1):
+        v = [m[j] << (BITS_SOBOL - 1 - j) for j in range(s)]
+        for j in range(s, BITS_SOBOL):
+            nuevo = v[j - s] ^ (v[j - s] >> s)
+            for k in range(1, s):
+                nuevo ^= ((a >> (s - 1 - k)) & 1) * v[j - k]
+            v.append(nuevo)
+        direcciones[eje] = v
+    return direcciones
+
+
+def sobol(indices, dimension, desplazamientos=None):
+    """
+    Puntos de la secuencia de Sobol en [0, 1)^dimension.
+
+    Args:
+        indices: Arreglo de enteros no negativos (menores que 2**BITS_SOBOL)
+        dimension: Número de coordenadas
+        desplazamientos: Enteros opcionales (uno por coordenada) con los que
+            se hace XOR, para un desplazamiento digital aleatorio
+
+    Returns:
+        Arreglo (len(indices), dimension)
+    """
+    enteros = _enteros_sobol(indices, dimension)
+    if desplazamientos is not None:
+        enteros ^= np.asarray(desplazamientos, dtype=np.uint64)
+    return enteros / float(2**BITS_SOBOL)
+
+
+def _enteros_sobol(indices, dimension):
+    """Puntos de Sobol como enteros de BITS_SOBOL bits, antes de escalarlos a [0, 1)."""
+    indices = np.asarray(indices, dtype=np.uint64)
+    direcciones = _direcciones_sobol(dimension)
+    enteros = np.zeros((len(indices), dimension), dtype=np.uint64)
+    for bit in range(BITS_SOBOL):
+        activos = ((indices >> np.uint64(bit)) & np.uint64(1)).astype(bool)
+        enteros[activos] ^= direcciones[:, bit]
+    return enteros
+
+
+# Núcleo del proceso que evalúa bloques (ver _preparar_bloques)
+_NUCLEO = None
+_CAJA = None
+
+
+def _preparar_bloques(func, variables, caja):
+    """Compila el integrando una vez por proceso antes de evaluar bloques."""
+    global _NUCLEO, _CAJA
+    _NUCLEO = compilar(func, tuple(variables)).nucleo
+    _CAJA = np.asarray(caja, dtype=float)
+
+
+def _evaluar_en(unidad):
+    """Suma del núcleo sobre puntos de [0, 1)^d llevados a la caja."""
+    inferiores, superiores = _CAJA[:, 0], _CAJA[:, 1]
+    puntos = inferiores + unidad * (superiores - inferiores)
+    with np.errstate(all='ignore'):
+        valores = np.broadcast_to(np.asarray(_NUCLEO(*puntos.T), dtype=float), len(puntos))
+    return valores
+
+
+def _evaluar_bloque(tarea):
+    """
+    Evalúa un bloque de puntos.
+
+    Args:
+        tarea: Tupla (metodo, indice_bloque, tamano, semilla)
+
+    Returns:
+        En 'mc', arreglo [n, Σf, Σf²]; en cuasi-Monte Carlo, Σf de cada réplica
+    """
+    metodo, bloque, tamano, semilla = tarea
+    dimension = len(_CAJA)
+    if metodo == 'mc':
+        generador = np.random.default_rng([semilla, bloque])
+        valores = _evaluar_en(generador.random((tamano, dimension)))
+        return np.array([tamano, valores.sum(), (valores**2).sum()])
+
+    indices = np.arange(bloque * tamano, (bloque + 1) * tamano)
+    generador = np.random.default_rng(semilla)
+    if metodo == 'halton':
+        base = halton(indices, dimension)
+        rotaciones = generador.random((REPLICAS, dimension))
+        return np.array([_evaluar_en((base + rotacion) % 1.0).sum() for rotacion in rotaciones])
+    base = _enteros_sobol(indices, dimension)
+    desplazamientos = generador.integers(0, 2**BITS_SOBOL, (REPLICAS, dimension), dtype=np.uint64)
+    return np.array([_evaluar_en((base ^ d) / float(2**BITS_SOBOL)).sum()
+                     for d in desplazamientos])
+
+
+def _estimar(metodo, acumulado, bloques, tamano, volumen):
+    """Convierte las sumas acumuladas en (valor, error_estandar, evaluaciones)."""
+    if metodo == 'mc':
+        n, suma, cuadrados = acumulado
+        media = suma / n
+        varianza = max(cuadrados / n - media**2, 0.0) * n / max(n - 1, 1)
+        return float(volumen * media), float(volumen * math.sqrt(varianza / n)), int(n)
+    n = bloques * tamano
+    estimaciones = volumen * acumulado / n
+    error = float(np.std(estimaciones, ddof=1) / math.sqrt(len(estimaciones)))
+    return float(estimaciones.mean()), error, n * len(estimaciones)
+
+
+def integrar_montecarlo(func, variables, caja, metodo='sobol', error_objetivo=None,
+                        max_puntos=10**8, procesos=None, tamano=TAMANO_BLOQUE, semilla=None):
+    """
+    Estima ∫ func sobre una caja, entregando la estimación mientras mejora.
+
+    Es un generador: produce un EstimacionMonteCarlo cada INTERVALO_PARCIAL
+    segundos como mínimo y devuelve (return) la estimación final, apta para
+    EjecutorTareas. Termina al alcanzar error_objetivo o max_puntos; para
+    detenerlo antes basta con cancelar la tarea.
+
+    Args:
+        func: Expresión de SymPy
+        variables: Símbolos de func, uno por lado de la caja
+        caja: Pares (inferior, superior) numéricos de cada variable
+        metodo: 'mc', 'halton' o 'sobol'
+        error_objetivo: Error estándar con el que se da por terminado
+        max_puntos: Evaluaciones máximas del integrando
+        procesos: Procesos entre los que se reparten los bloques (por
+            defecto, núcleos de CPU; 1 evalúa en el proceso actual)
+        tamano: Puntos por bloque (por réplica en cuasi-Monte Carlo)
+        semilla: Semilla de los puntos aleatorios y las aleatorizaciones
+
+    Yields:
+        EstimacionMonteCarlo parciales
+
+    Raises:
+        ValueError: Si el método no existe
+    """
+    if metodo not in METODOS:
+        raise ValueError(f"Método desconocido: {metodo!r} (use {', '.join(METODOS)})")
+    inicio = time.perf_counter()
+    caja = [(float(a), float(b)) for a, b in caja]
+    volumen = math.prod(b - a for a, b in caja)
+    semilla = np.random.SeedSequence(semilla).entropy
+    por_bloque = tamano if metodo == 'mc' else tamano * REPLICAS
+    max_bloques = max(2, max_puntos // por_bloque)
+    tareas = ((metodo, bloque, tamano, semilla) for bloque in range(max_bloques))
+
+    procesos = procesos or os.cpu_count() or 1
+    if procesos > 1:
+        grupo = multiprocessing.Pool(procesos, _preparar_bloques, (func, tuple(variables), caja))
+        resultados = grupo.imap(_evaluar_bloque, tareas)
+    else:
+        grupo = None
+        _preparar_bloques(func, variables, caja)
+        resultados = map(_evaluar_bloque, tareas)
+
+    acumulado = None
+    ultimo_parcial = inicio
+    try:
+        for bloques, sumas in enumerate(resultados, start=1):
+            acumulado = sumas if acumulado is None else acumulado + sumas
+            if bloques < 2:
+                continue
+            valor, error, puntos = _estimar(metodo, acumulado, bloques, tamano, volumen)
+            ahora = time.perf_counter()
+            if (error_objetivo is not None and error <= error_objetivo) or bloques == max_bloques:
+                break
+            if ahora - ultimo_parcial >= INTERVALO_PARCIAL:
+                ultimo_parcial = ahora
+                yield EstimacionMonteCarlo(valor, error, puntos, metodo, ahora - inicio)
+    finally:
+        if grupo is not None:
+            grupo.terminate()
+            grupo.join()
+    return EstimacionMonteCarlo(valor, error, puntos, metodo, time.perf_counter() - inicio,
+                                terminado=True)
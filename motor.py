@@ -0,0 +1,763 @@
+"""
+Motor de cálculo sin interfaz gráfica
+=====================================
+
+Reúne la lógica de integrales dobles, áreas, volúmenes y derivadas
+(gradiente, hessiana, puntos críticos y multiplicadores de Lagrange) sin
+depender de tkinter ni de matplotlib, de modo que pueda usarse en
+servidores sin pantalla y en lotes.
+
+Uso desde la línea de comandos:
+
+    python motor.py trabajos.jsonl
+    python motor.py trabajos.csv -o resultados.jsonl --procesos 4
+
+Cada trabajo es un objeto JSON (o una fila CSV) con un campo ``tipo``:
+
+    {"id": 1, "tipo": "integral", "funcion": "x*y",
+     "x_min": 0, "x_max": 1, "y_min": 0, "y_max": 1}
+    {"id": 2, "tipo": "area", "y_sup": "x**2", "y_inf": "0",
+     "x_min": 0, "x_max": 3}
+    {"id": 3, "tipo": "volumen", "funcion": "x**2 + y**2",
+     "x_min": -1, "x_max": 1, "y_min": -1, "y_max": 1}
+    {"id": 4, "tipo": "triple", "funcion": "x*y*z", "x_min": 0, "x_max": 1,
+     "y_min": 0, "y_max": "x", "z_min": 0, "z_max": "x + y"}
+
+Un volumen con ``"z_inf"`` se mide entre esa superficie y ``funcion``.
+Con ``"coordenadas": "polares"`` (o ``"cilindricas"``/``"esfericas"`` en
+un trabajo triple) los límites son los de ese sistema; si una integral
+cartesiana no tiene forma cerrada a tiempo y el integrando tiene simetría
+radial, la salida incluye ``"sugerencia"`` con el sistema recomendado.
+Si el rectángulo se dividió por pliegues o singularidades del integrando
+(singularidades.py), la salida incluye ``"piezas"``.
+
+Los límites pueden ser números o expresiones exactas como ``"pi/2"``.
+Con ``"digitos": 50`` el trabajo añade ``valor_preciso`` con esas cifras.
+Los resultados se escriben como JSONL a medida que terminan. Los que ya
+estaban en el almacén persistente (almacen.py) se marcan con
+``"almacenado": true``; ``--sin-almacen`` obliga a recalcularlos todos.
+"""
+
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from dataclasses import replace
+
+import numpy as np
+import sympy as sp
+
+from almacen import VARIABLE_ENTORNO
+from coordenadas import CARTESIANAS, R, THETA, sistema, sugerir_coordenadas, transformar
+from datos import cargar_rejilla, coordenadas_rejilla
+from derivadas import analizar_diferencial, campo_gradiente, multiplicadores_lagrange
+from expresiones import analizar_limite, compilar
+from integracion import (a_caja, barrer_limite, integrar_doble, integrar_region,
+                         integrar_simple, integrar_triple, NIVEL_NUMERICO, NIVEL_SIMBOLICO,
+                         PLAZO_SIMBOLICO, ResultadoIntegral)
+from mallas import (evaluar_curvas, evaluar_malla, evaluar_por_bloques, integrar_rejilla,
+                    malla_en_disco, refinar_malla, submuestrear)
+from montecarlo import integrar_montecarlo
+from perfilado import etapa
+
+X, Y, Z = sp.symbols('x y z')
+
+TIPOS = ('integral', 'area', 'volumen', 'triple')
+
+# Puntos de la malla de una vista previa en vivo (la vista previa de refinar_malla)
+PRESUPUESTO_VISTA_PREVIA = 15 * 15
+
+
+def _exactos(*limites):
+    """Analiza límites como constantes exactas de SymPy (admite 'pi/2', 'sqrt(2)'...)."""
+    return [analizar_limite(limite) for limite in limites]
+
+
+def _numericos(*limites):
+    """Analiza límites y los convierte en float, para mallas y cubaturas."""
+    return [float(limite) for limite in _exactos(*limites)]
+
+
+def analizar_region(x_min, x_max, y_min, y_max, variables=(X, Y)):
+    """
+    Clasifica una región a partir de sus cuatro límites.
+
+    Los límites de y pueden depender de x (región de tipo I) o los de x
+    pueden depender de y (tipo II), pero no ambos a la vez. El orden de
+    integración se elige según cuál dependa del otro.
+
+    Args:
+        x_min, x_max, y_min, y_max: Límites de la primera y la segunda variable
+        variables: Las dos variables, (x, y) o las de otro sistema de
+            coordenadas como (r, theta)
+
+    Returns:
+        Tupla (externa, interna, a, b, inferior, superior) con la variable
+        exterior, la interior y sus límites exactos; para un rectángulo la
+        variable exterior es la primera
+
+    Raises:
+        ValueError: Si los límites dependen unos de otros en ambos sentidos
+    """
+    u, v = variables
+    u_inf, u_sup = analizar_limite(x_min, (v,)), analizar_limite(x_max, (v,))
+    v_inf, v_sup = analizar_limite(y_min, (u,)), analizar_limite(y_max, (u,))
+    u_variable = bool(u_inf.free_symbols or u_sup.free_symbols)
+    v_variable = bool(v_inf.free_symbols or v_sup.free_symbols)
+    if u_variable and v_variable:
+        raise ValueError(f"Los límites de {u} dependen de {v} y los de {v} dependen de {u}; "
+                         "solo unos pueden ser variables")
+    if u_variable:
+        return v, u, v_inf, v_sup, u_inf, u_sup
+    return u, v, u_inf, u_sup, v_inf, v_sup
+
+
+def _caja_region(externa, a, b, inferior, superior, muestras=201):
+    """Rectángulo (x_min, x_max, y_min, y_max) que contiene a una región."""
+    a, b = float(a), float(b)
+    cortes = evaluar_curvas([inferior, superior], externa, a, b, muestras)[1]
+    u_min = float(min(np.nanmin(c) for c in cortes))
+    u_max = float(max(np.nanmax(c) for c in cortes))
+    return (a, b, u_min, u_max) if externa == X else (u_min, u_max, a, b)
+
+
+def _caja_polar(externa, a, b, bajo, alto, muestras=201):
+    """Rectángulo (x_min, x_max, y_min, y_max) que contiene a una región polar."""
+    T = np.linspace(float(a), float(b), muestras)[:, None]
+    fracciones = np.linspace(0, 1, 21)[None, :]
+    U = bajo(T) + (alto(T) - bajo(T)) * fracciones
+    r, theta = (T, U) if externa == R else (U, T)
+    xs, ys = r * np.cos(theta), r * np.sin(theta)
+    return float(xs.min()), float(xs.max()), float(ys.min()), float(ys.max())
+
+
+def _con_sugerencia(resultado, func, destino):
+    """
+    Añade al resultado un sistema de coordenadas sugerido.
+
+    Solo se sugiere cuando la integral cartesiana no tuvo forma cerrada a
+    tiempo y el integrando tiene simetría radial (ver sugerir_coordenadas).
+    """
+    if destino.nombre != CARTESIANAS or resultado.nivel == NIVEL_SIMBOLICO:
+        return resultado
+    sugerencia = sugerir_coordenadas(func, destino.dimension)
+    return resultado if sugerencia is None else replace(resultado, sugerencia=sugerencia)
+
+
+def calcular_integral_doble(func_str, x_min, x_max, y_min, y_max, plazo=PLAZO_SIMBOLICO,
+                            digitos=None, coordenadas=CARTESIANAS):
+    """
+    Calcula ∬ f(x, y) dxdy sobre un rectángulo.
+
+    Args:
+        func_str: Texto de la función f(x, y)
+        x_min, x_max, y_min, y_max: Límites como números o textos exactos
+            ('pi/2', 'sqrt(2)'); los de y pueden depender de x o los de x
+            de y (ver analizar_region). En polares son los de r y theta
+        plazo: Segundos concedidos a la integración simbólica
+        digitos: Cifras significativas pedidas (evalf o mpmath), o None
+            para doble precisión
+        coordenadas: 'cartesianas' o 'polares'; f se sigue escribiendo en
+            x e y y el jacobiano se añade solo
+
+    Returns:
+        ResultadoIntegral, con una sugerencia de coordenadas si la
+        integral cartesiana no se resolvió de forma simbólica
+    """
+    destino = sistema(coordenadas, 2)
+    u, v = destino.variables
+    original = compilar(func_str, (X, Y)).expr
+    func = transformar(original, destino)
+    externa, interna, a, b, inferior, superior = analizar_region(x_min, x_max, y_min, y_max,
+                                                                 (u, v))
+    if inferior.free_symbols or superior.free_symbols:
+        resultado = integrar_region(func, externa, interna, a, b, inferior, superior,
+                                    plazo=plazo, digitos=digitos)
+    elif externa == u:
+        resultado = integrar_doble(func, u, v, a, b, inferior, superior,
+                                   plazo=plazo, digitos=digitos)
+    else:
+        resultado = integrar_doble(func, u, v, inferior, superior, a, b,
+                                   plazo=plazo, digitos=digitos)
+    return _con_sugerencia(resultado, original, destino)
+
+
+def calcular_area(y_sup_str, y_inf_str, x_min, x_max, plazo=PLAZO_SIMBOLICO, digitos=None):
+    """
+    Calcula el área entre y = y_sup(x) e y = y_inf(x) para x en [x_min, x_max].
+
+    Returns:
+        ResultadoIntegral
+    """
+    y_sup = compilar(y_sup_str, (X,)).expr
+    y_inf = compilar(y_inf_str, (X,)).expr
+    return integrar_simple(y_sup - y_inf, X, *_exactos(x_min, x_max),
+                           plazo=plazo, digitos=digitos)
+
+
+def calcular_volumen(func_str, x_min, x_max, y_min, y_max, plazo=PLAZO_SIMBOLICO,
+                     digitos=None, z_inferior='0', coordenadas=CARTESIANAS):
+    """
+    Calcula el volumen entre z = z_inferior(x, y) y z = f(x, y) sobre una región.
+
+    Con z_inferior = '0' es el volumen bajo la superficie. En polares la
+    región se da con límites de r y theta.
+
+    Returns:
+        ResultadoIntegral
+    """
+    if str(z_inferior).strip() not in ('', '0'):
+        func_str = f"({func_str}) - ({z_inferior})"
+    return calcular_integral_doble(func_str, x_min, x_max, y_min, y_max,
+                                   plazo=plazo, digitos=digitos, coordenadas=coordenadas)
+
+
+def calcular_integral_triple(func_str, x_min, x_max, y_min, y_max, z_min, z_max,
+                             plazo=PLAZO_SIMBOLICO, digitos=None, coordenadas=CARTESIANAS):
+    """
+    Calcula ∭ f(x, y, z) dz dy dx.
+
+    Args:
+        func_str: Texto de la función f(x, y, z)
+        x_min, x_max: Límites constantes de x
+        y_min, y_max: Límites de y, que pueden depender de x
+        z_min, z_max: Límites de z, que pueden depender de x e y
+        plazo: Segundos concedidos a la integración simbólica
+        digitos: Cifras significativas pedidas, o None para doble precisión
+        coordenadas: 'cartesianas', 'cilindricas' (límites de theta, r y z)
+            o 'esfericas' (theta, phi y rho); f se sigue escribiendo en
+            x, y y z y el jacobiano se añade solo
+
+    Returns:
+        ResultadoIntegral, con una sugerencia de coordenadas si la
+        integral cartesiana no se resolvió de forma simbólica
+    """
+    destino = sistema(coordenadas, 3)
+    u, v, w = destino.variables
+    original = compilar(func_str, (X, Y, Z)).expr
+    resultado = integrar_triple(transformar(original, destino), u, v, w,
+                                *_exactos(x_min, x_max),
+                                analizar_limite(y_min, (u,)), analizar_limite(y_max, (u,)),
+                                analizar_limite(z_min, (u, v)), analizar_limite(z_max, (u, v)),
+                                plazo=plazo, digitos=digitos)
+    return _con_sugerencia(resultado, original, destino)
+
+
+def estimar_montecarlo(func_str, limites, metodo='sobol', error_objetivo=None,
+                       max_puntos=10**8, procesos=None, coordenadas=CARTESIANAS):
+    """
+    Estima una integral doble o triple por Monte Carlo o cuasi-Monte Carlo.
+
+    Es un generador que entrega EstimacionMonteCarlo parciales y devuelve la
+    final (ver montecarlo.integrar_montecarlo). El dominio se lleva a una
+    caja con a_caja, así que admite los mismos límites variables que
+    calcular_integral_doble y calcular_integral_triple.
+
+    Args:
+        func_str: Texto de la función f(x, y) o f(x, y, z)
+        limites: (x_min, x_max, y_min, y_max) o, para una integral triple,
+            (x_min, x_max, y_min, y_max, z_min, z_max)
+        metodo: 'mc', 'halton' o 'sobol'
+        error_objetivo: Error estándar con el que se da por terminado
+        max_puntos: Evaluaciones máximas del integrando
+        procesos: Procesos entre los que se reparten los bloques
+        coordenadas: Sistema de coordenadas de los límites (ver
+            calcular_integral_doble y calcular_integral_triple)
+
+    Yields:
+        EstimacionMonteCarlo parciales
+    """
+    destino = sistema(coordenadas, len(limites) // 2)
+    func = transformar(compilar(func_str, (X, Y, Z)[:destino.dimension]).expr, destino)
+    if destino.dimension == 2:
+        externa, interna, a, b, inferior, superior = analizar_region(*limites,
+                                                                     destino.variables)
+        variables, pares = (externa, interna), [(a, b), (inferior, superior)]
+    else:
+        x_min, x_max, y_min, y_max, z_min, z_max = limites
+        variables = destino.variables
+        u, v = variables[:2]
+        pares = [_exactos(x_min, x_max),
+                 (analizar_limite(y_min, (u,)), analizar_limite(y_max, (u,))),
+                 (analizar_limite(z_min, (u, v)), analizar_limite(z_max, (u, v)))]
+    en_caja, variables_caja = a_caja(func, variables, pares)
+    caja = [pares[0]] + [(0, 1)] * (len(variables) - 1)
+    return (yield from integrar_montecarlo(en_caja, variables_caja, caja, metodo=metodo,
+                                           error_objetivo=error_objetivo,
+                                           max_puntos=max_puntos, procesos=procesos))
+
+
+def barrer_integral_doble(func_str, x_min, x_max, y_min, y_max, parametro,
+                          inicio, fin, puntos, plazo=PLAZO_SIMBOLICO, coordenadas=CARTESIANAS):
+    """
+    Calcula ∬ f(x, y) dxdy mientras uno de los límites recorre [inicio, fin].
+
+    Args:
+        func_str: Texto de la función f(x, y)
+        x_min, x_max, y_min, y_max: Límites base del rectángulo
+        parametro: Límite que varía ('x_min', 'x_max', 'y_min' o 'y_max')
+        inicio, fin: Extremos del recorrido del límite
+        puntos: Número de valores del límite
+        plazo: Segundos concedidos a la antiderivada simbólica
+        coordenadas: 'cartesianas' o 'polares' (límites de r y theta)
+
+    Returns:
+        ResultadoBarrido
+    """
+    destino = sistema(coordenadas, 2)
+    func = transformar(compilar(func_str, (X, Y)).expr, destino)
+    valores = np.linspace(*_numericos(inicio, fin), int(puntos))
+    return barrer_limite(func, *destino.variables, *_exactos(x_min, x_max, y_min, y_max),
+                         parametro, valores, plazo=plazo)
+
+
+def malla_funcion(func_str, x_min, x_max, y_min, y_max, n):
+    """
+    Evalúa z = f(x, y) sobre una malla n × n para graficarla.
+
+    Returns:
+        Tupla (X, Y, Z) de arreglos de NumPy
+    """
+    func = compilar(func_str, (X, Y)).expr
+    return evaluar_malla(func, X, Y, *_numericos(x_min, x_max, y_min, y_max), n)
+
+
+def exportar_malla(func_str, x_min, x_max, y_min, y_max, n, ruta=None, max_lado=100):
+    """
+    Evalúa z = f(x, y) sobre una malla n × n de alta resolución.
+
+    La malla se evalúa por bloques (ver mallas.evaluar_por_bloques) y, si
+    se indica una ruta, se escribe en un archivo .npy proyectado en memoria
+    en lugar de guardarse entera en RAM. De la misma pasada salen la
+    integral por la regla del trapecio y una versión reducida para graficar.
+
+    Args:
+        func_str: Texto de la función f(x, y)
+        x_min, x_max, y_min, y_max: Límites constantes de la malla
+        n: Puntos por eje (ej: 4000)
+        ruta: Archivo .npy donde guardar Z, o None para no guardarla
+        max_lado: Puntos por lado de la malla reducida
+
+    Returns:
+        Diccionario con 'malla' (X, Y, Z reducidas), 'integral' (NaN si
+        hay puntos no finitos), 'no_finitos' (cuántos), 'forma', 'ruta' y
+        'tiempo'
+    """
+    inicio = time.perf_counter()
+    nucleo = compilar(func_str, (X, Y)).nucleo
+    x_min, x_max, y_min, y_max = _numericos(x_min, x_max, y_min, y_max)
+    xs, ys = np.linspace(x_min, x_max, int(n)), np.linspace(y_min, y_max, int(n))
+    destino = None if ruta is None else malla_en_disco(ruta, len(ys), len(xs))
+    Z = evaluar_por_bloques(nucleo, xs, ys, destino)
+    integral, no_finitos = integrar_rejilla(Z, xs, ys, no_finitos=True)
+    reducida = submuestrear(xs, ys, Z, max_lado)
+    if destino is not None:
+        destino.flush()
+        del destino, Z
+    return {'malla': reducida, 'integral': integral, 'no_finitos': no_finitos,
+            'forma': (len(ys), len(xs)), 'ruta': ruta, 'tiempo': time.perf_counter() - inicio}
+
+
+def integrar_datos(ruta, x_min, x_max, y_min, y_max, regla='simpson', z_inferior='0'):
+    """
+    Integra una rejilla de alturas medida (ver datos.cargar_rejilla).
+
+    La rejilla se lee por bloques de filas, así que el archivo puede ser
+    más grande que la memoria.
+
+    Args:
+        ruta: Archivo .npy o CSV con las alturas
+        x_min, x_max, y_min, y_max: Rectángulo que cubre la rejilla
+        regla: 'trapecio', 'simpson' o 'romberg' (ver mallas.pesos_cuadratura)
+        z_inferior: Superficie inferior simbólica que se resta, o '0'
+
+    Returns:
+        ResultadoIntegral numérico con el error estimado por la regla
+
+    Raises:
+        ValueError: Si la rejilla (menos z_inferior) tiene puntos no
+            finitos, como huecos en los datos
+    """
+    inicio = time.perf_counter()
+    Z = cargar_rejilla(ruta)
+    xs, ys = coordenadas_rejilla(Z, *_numericos(x_min, x_max, y_min, y_max))
+    restar = None
+    if str(z_inferior).strip() not in ('', '0'):
+        restar = compilar(z_inferior, (X, Y)).nucleo
+    with etapa('cuadratura', regla=regla, forma=Z.shape):
+        valor, error, no_finitos = integrar_rejilla(Z, xs, ys, regla=regla, error=True,
+                                                    restar=restar, no_finitos=True)
+    if no_finitos:
+        raise ValueError(f"{os.path.basename(ruta)}: {no_finitos} de {Z.size} puntos no son "
+                         f"finitos (huecos o valores infinitos); complétalos antes de integrar")
+    return ResultadoIntegral(valor, None, NIVEL_NUMERICO, time.perf_counter() - inicio, error)
+
+
+def malla_datos(ruta, x_min, x_max, y_min, y_max, z_inferior='0', max_lado=100):
+    """
+    Malla reducida de una rejilla de alturas medida, para graficarla.
+
+    Returns:
+        Tupla (X, Y, Z) o, con superficie inferior, (X, Y, Z, Z_inferior)
+    """
+    Z = cargar_rejilla(ruta)
+    xs, ys = coordenadas_rejilla(Z, *_numericos(x_min, x_max, y_min, y_max))
+    XX, YY, ZZ = submuestrear(xs, ys, Z, max_lado)
+    if str(z_inferior).strip() in ('', '0'):
+        return XX, YY, ZZ
+    inferior = compilar(z_inferior, (X, Y)).nucleo
+    with np.errstate(all='ignore'):
+        return XX, YY, ZZ, np.broadcast_to(np.asarray(inferior(XX, YY), dtype=float), ZZ.shape)
+
+
+def malla_adaptativa(func_str, x_min, x_max, y_min, y_max, presupuesto,
+                     coordenadas=CARTESIANAS):
+    """
+    Genera mallas de z = f(x, y) de detalle creciente para graficarla.
+
+    Produce primero una vista previa gruesa y luego mallas refinadas donde
+    la superficie se curva, sin superar el presupuesto de puntos (ver
+    mallas.refinar_malla). En una región de tipo I o II, o dada en
+    polares, la malla cubre el rectángulo que la contiene y los puntos
+    exteriores valen NaN.
+
+    Yields:
+        Tuplas (X, Y, Z) de arreglos de NumPy
+    """
+    func = compilar(func_str, (X, Y)).expr
+    polares = sistema(coordenadas, 2).nombre != CARTESIANAS
+    variables = (R, THETA) if polares else (X, Y)
+    externa, interna, a, b, inferior, superior = analizar_region(x_min, x_max, y_min, y_max,
+                                                                 variables)
+    if not (polares or inferior.free_symbols or superior.free_symbols):
+        yield from refinar_malla(func, X, Y, *_numericos(x_min, x_max, y_min, y_max),
+                                 presupuesto)
+        return
+
+    bajo = compilar(inferior, (externa,)).nucleo
+    alto = compilar(superior, (externa,)).nucleo
+    if polares:
+        caja = _caja_polar(externa, a, b, bajo, alto)
+    else:
+        caja = _caja_region(externa, a, b, inferior, superior)
+    a, b = float(a), float(b)
+    for XX, YY, ZZ in refinar_malla(func, X, Y, *caja, presupuesto):
+        with np.errstate(invalid='ignore'):
+            if polares:
+                # Cada ángulo se lleva a la vuelta que empieza en su límite inferior
+                radio, angulo = np.hypot(XX, YY), np.arctan2(YY, XX)
+                if externa == R:
+                    T, U = radio, bajo(radio) + np.mod(angulo - bajo(radio), 2 * np.pi)
+                else:
+                    T, U = a + np.mod(angulo - a, 2 * np.pi), radio
+            else:
+                T, U = (XX, YY) if externa == X else (YY, XX)
+            fuera = (T < a) | (T > b) | (U < bajo(T)) | (U > alto(T))
+        yield XX, YY, np.where(fuera, np.nan, ZZ)
+
+
+def malla_volumen(func_str, z_inferior_str, x_min, x_max, y_min, y_max, presupuesto,
+                  coordenadas=CARTESIANAS):
+    """
+    Como malla_adaptativa, pero añade la superficie inferior de un volumen.
+
+    Yields:
+        Tuplas (X, Y, Z, Z_inferior) de arreglos de NumPy
+    """
+    inferior = compilar(z_inferior_str, (X, Y)).nucleo
+    for XX, YY, ZZ in malla_adaptativa(func_str, x_min, x_max, y_min, y_max, presupuesto,
+                                       coordenadas=coordenadas):
+        with np.errstate(all='ignore'):
+            abajo = np.broadcast_to(np.asarray(inferior(XX, YY), dtype=float), ZZ.shape)
+        yield XX, YY, ZZ, np.where(np.isnan(ZZ), np.nan, abajo)
+
+
+def curvas_region(y_sup_str, y_inf_str, x_min, x_max, n):
+    """
+    Evalúa las curvas límite de una región en n puntos para graficarla.
+
+    Returns:
+        Tupla (x_vals, [y_sup_vals, y_inf_vals])
+    """
+    y_sup = compilar(y_sup_str, (X,)).expr
+    y_inf = compilar(y_inf_str, (X,)).expr
+    return evaluar_curvas([y_sup, y_inf], X, *_numericos(x_min, x_max), n)
+
+
+def _restriccion(restriccion_str):
+    """Convierte 'g(x, y) = c' (o solo 'g(x, y)', igualada a 0) en g(x, y) - c."""
+    izquierda, _, derecha = str(restriccion_str).partition('=')
+    g = compilar(izquierda, (X, Y)).expr
+    return g - compilar(derecha, (X, Y)).expr if derecha.strip() else g
+
+
+def analizar_funcion(func_str, x_min, x_max, y_min, y_max, plazo=PLAZO_SIMBOLICO):
+    """
+    Gradiente, hessiana y puntos críticos clasificados de f en un rectángulo.
+
+    Returns:
+        derivadas.AnalisisDiferencial
+    """
+    func = compilar(func_str, (X, Y)).expr
+    return analizar_diferencial(func, X, Y, *_numericos(x_min, x_max, y_min, y_max),
+                                plazo=plazo)
+
+
+def optimizar_lagrange(func_str, restriccion_str, x_min, x_max, y_min, y_max,
+                       plazo=PLAZO_SIMBOLICO):
+    """
+    Extremos de f sobre una restricción con multiplicadores de Lagrange.
+
+    Args:
+        func_str: Texto de la función f(x, y)
+        restriccion_str: Texto de la restricción, 'x**2 + y**2 = 1' o
+            'x**2 + y**2 - 1' (igualada a 0)
+        x_min, x_max, y_min, y_max: Región donde se buscan los extremos
+
+    Returns:
+        derivadas.AnalisisDiferencial
+    """
+    func = compilar(func_str, (X, Y)).expr
+    return multiplicadores_lagrange(func, _restriccion(restriccion_str), X, Y,
+                                    *_numericos(x_min, x_max, y_min, y_max), plazo=plazo)
+
+
+def malla_gradiente(func_str, x_min, x_max, y_min, y_max, n, restriccion_str=None):
+    """
+    Evalúa f y ∇f sobre una malla n × n (la de malla_funcion) para el campo.
+
+    Returns:
+        Tupla (X, Y, Z, U, V, G): G es la restricción g sobre la malla para
+        dibujar g = 0, o None
+    """
+    func = compilar(func_str, (X, Y)).expr
+    limites = _numericos(x_min, x_max, y_min, y_max)
+    XX, YY, ZZ, U, V = campo_gradiente(func, X, Y, *limites, n)
+    G = None
+    if restriccion_str and str(restriccion_str).strip():
+        G = evaluar_malla(_restriccion(restriccion_str), X, Y, *limites, n)[2]
+    return XX, YY, ZZ, U, V, G
+
+
+def vista_previa(func_str, x_min, x_max, y_min, y_max, z_inferior='0',
+                 plazo=PLAZO_SIMBOLICO, coordenadas=CARTESIANAS):
+    """
+    Vista previa barata de una integral doble (o volumen) mientras se escribe.
+
+    Produce primero una malla gruesa para graficar y después una
+    estimación numérica sin nivel simbólico (plazo 0); la forma exacta se
+    busca al final, con el plazo completo, y es el valor devuelto. Si la
+    tarea se reemplaza por otra más reciente, lo que falte no se calcula.
+
+    Yields:
+        Diccionarios {'malla': ..., 'estimacion': ResultadoIntegral o None};
+        cada uno incluye lo anterior, porque el ejecutor solo entrega el
+        último parcial de cada sondeo
+
+    Returns:
+        ResultadoIntegral con el plazo completo
+    """
+    inferior = str(z_inferior).strip()
+    if inferior in ('', '0'):
+        mallas = malla_adaptativa(func_str, x_min, x_max, y_min, y_max,
+                                  PRESUPUESTO_VISTA_PREVIA, coordenadas=coordenadas)
+    else:
+        mallas = malla_volumen(func_str, inferior, x_min, x_max, y_min, y_max,
+                               PRESUPUESTO_VISTA_PREVIA, coordenadas=coordenadas)
+    malla = next(mallas)
+    mallas.close()
+    yield {'malla': malla, 'estimacion': None}
+
+    estimacion = calcular_volumen(func_str, x_min, x_max, y_min, y_max, plazo=0,
+                                  z_inferior=z_inferior, coordenadas=coordenadas)
+    if estimacion.nivel == NIVEL_SIMBOLICO or plazo == 0:
+        return estimacion
+    yield {'malla': malla, 'estimacion': estimacion}
+    return calcular_volumen(func_str, x_min, x_max, y_min, y_max, plazo=plazo,
+                            z_inferior=z_inferior, coordenadas=coordenadas)
+
+
+def precalentar():
+    """Carga SymPy y el compilador de NumPy; pensada como primera tarea de un trabajador."""
+    compilar("x*y", (X, Y)).nucleo
+
+
+def ejecutar_trabajo(trabajo, plazo=PLAZO_SIMBOLICO):
+    """
+    Ejecuta un trabajo descrito por un diccionario.
+
+    Args:
+        trabajo: Diccionario con 'tipo' y los campos de ese tipo
+        plazo: Plazo por defecto si el trabajo no trae el suyo
+
+    Returns:
+        Diccionario serializable a JSON con el resultado o el error
+    """
+    salida = {'id': trabajo.get('id'), 'tipo': trabajo.get('tipo')}
+    try:
+        tipo = trabajo.get('tipo')
+        plazo = float(trabajo['plazo']) if 'plazo' in trabajo else plazo
+        digitos = int(trabajo['digitos']) if 'digitos' in trabajo else None
+        coordenadas = trabajo.get('coordenadas') or CARTESIANAS
+        if tipo == 'area':
+            resultado = calcular_area(trabajo['y_sup'], trabajo['y_inf'],
+                                      trabajo['x_min'], trabajo['x_max'],
+                                      plazo=plazo, digitos=digitos)
+        elif tipo in ('integral', 'volumen'):
+            resultado = calcular_volumen(
+                trabajo['funcion'],
+                trabajo['x_min'], trabajo['x_max'],
+                trabajo['y_min'], trabajo['y_max'],
+                plazo=plazo, digitos=digitos, z_inferior=trabajo.get('z_inf', '0'),
+                coordenadas=coordenadas)
+        elif tipo == 'triple':
+            resultado = calcular_integral_triple(
+                trabajo['funcion'],
+                trabajo['x_min'], trabajo['x_max'],
+                trabajo['y_min'], trabajo['y_max'],
+                trabajo['z_min'], trabajo['z_max'],
+                plazo=plazo, digitos=digitos, coordenadas=coordenadas)
+        else:
+            raise ValueError(f"Tipo de trabajo desconocido: {tipo!r} (use {', '.join(TIPOS)})")
+    except Exception as e:
+        salida.update(estado='error', mensaje=str(e))
+        return salida
+
+    salida.update(
+        estado='ok',
+        valor=resultado.valor,
+        exacto=None if resultado.exacto is None else str(resultado.exacto),
+        nivel=resultado.nivel,
+        tiempo=resultado.tiempo,
+        error=resultado.error,
+        almacenado=resultado.almacenado,
+    )
+    if resultado.valor_preciso is not None:
+        salida.update(digitos=resultado.digitos, valor_preciso=resultado.valor_preciso)
+    if resultado.sugerencia is not None:
+        salida.update(sugerencia=resultado.sugerencia)
+    if resultado.piezas > 1:
+        salida.update(piezas=resultado.piezas)
+    return salida
+
+
+def leer_trabajos(ruta):
+    """
+    Lee trabajos de un archivo JSONL o CSV, uno por línea o fila.
+
+    Los trabajos sin 'id' reciben su número de línea. Las celdas CSV vacías
+    se ignoran.
+
+    Args:
+        ruta: Ruta del archivo, o '-' para la entrada estándar (JSONL)
+
+    Yields:
+        Diccionarios de trabajo
+    """
+    archivo = sys.stdin if ruta == '-' else open(ruta, newline='', encoding='utf-8')
+    try:
+        if ruta.lower().endswith('.csv'):
+            for numero, fila in enumerate(csv.DictReader(archivo), start=1):
+                trabajo = {clave: valor for clave, valor in fila.items() if valor not in (None, '')}
+                trabajo.setdefault('id', numero)
+                yield trabajo
+        else:
+            for numero, linea in enumerate(archivo, start=1):
+                if not linea.strip():
+                    continue
+                trabajo = json.loads(linea)
+                trabajo.setdefault('id', numero)
+                yield trabajo
+    finally:
+        if archivo is not sys.stdin:
+            archivo.close()
+
+
+def repartir_trabajos(funcion, trabajos, procesos=None, *args):
+    """
+    Aplica funcion(trabajo, *args) en paralelo y produce los resultados según terminan.
+
+    Solo se mantienen en vuelo unos pocos trabajos por proceso, así que
+    los archivos grandes se procesan sin cargarlos enteros en memoria.
+
+    Args:
+        funcion: Función de nivel de módulo (se envía a los procesos)
+        trabajos: Iterable de diccionarios de trabajo
+        procesos: Número de procesos (por defecto, núcleos de CPU); con 1
+            se ejecuta en el proceso actual
+        *args: Argumentos adicionales de funcion
+
+    Yields:
+        Los resultados de funcion, en orden de terminación
+    """
+    procesos = procesos or os.cpu_count() or 1
+    if procesos == 1:
+        for trabajo in trabajos:
+            yield funcion(trabajo, *args)
+        return
+
+    trabajos = iter(trabajos)
+    with ProcessPoolExecutor(max_workers=procesos) as grupo:
+        en_vuelo = set()
+        while True:
+            for trabajo in trabajos:
+                en_vuelo.add(grupo.submit(funcion, trabajo, *args))
+                if len(en_vuelo) >= 2 * procesos:
+                    break
+            if not en_vuelo:
+                return
+            listos, en_vuelo = wait(en_vuelo, return_when=FIRST_COMPLETED)
+            for futuro in listos:
+                yield futuro.result()
+
+
+def ejecutar_lote(trabajos, procesos=None, plazo=PLAZO_SIMBOLICO):
+    """
+    Ejecuta trabajos en paralelo y produce los resultados según terminan.
+
+    Args:
+        trabajos: Iterable de diccionarios de trabajo
+        procesos: Número de procesos (por defecto, núcleos de CPU)
+        plazo: Plazo simbólico por defecto de cada trabajo
+
+    Yields:
+        Diccionarios de resultado (ver ejecutar_trabajo)
+    """
+    return repartir_trabajos(ejecutar_trabajo, trabajos, procesos, plazo)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Evalúa en lote integrales dobles, áreas y volúmenes sin interfaz gráfica.")
+    parser.add_argument('entrada', help="Archivo JSONL o CSV de trabajos ('-' para stdin)")
+    parser.add_argument('-o', '--salida', default='-',
+                        help="Archivo JSONL de resultados (por defecto, stdout)")
+    parser.add_argument('-p', '--procesos', type=int, default=None,
+                        help="Número de procesos en paralelo (por defecto, núcleos de CPU)")
+    parser.add_argument('--plazo', type=float, default=PLAZO_SIMBOLICO,
+                        help="Segundos para la integración simbólica de cada trabajo")
+    parser.add_argument('--sin-almacen', action='store_true',
+                        help="No consultar ni guardar resultados en el almacén persistente")
+    args = parser.parse_args(argv)
+    if args.sin_almacen:
+        # Los procesos del lote heredan el entorno
+        os.environ[VARIABLE_ENTORNO] = 'off'
+
+    salida = sys.stdout if args.salida == '-' else open(args.salida, 'w', encoding='utf-8')
+    fallos = 0
+    try:
+        for resultado in ejecutar_lote(leer_trabajos(args.entrada), args.procesos, args.plazo):
+            fallos += resultado['estado'] != 'ok'
+            salida.write(json.dumps(resultado, ensure_ascii=False) + '\n')
+            salida.flush()
+    finally:
+        if salida is not sys.stdout:
+            salida.close()
+    return 1 if fallos else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
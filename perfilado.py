@@ -0,0 +1,178 @@
+"""
+Perfilado de las etapas de un cálculo
+=====================================
+
+Los módulos de cálculo marcan sus etapas (``sympify``, ``integrate``,
+``evalf``, ``lambdify``, la evaluación de mallas...) con::
+
+    with etapa('lambdify'):
+        ...
+
+Mientras el perfilador del proceso está detenido, ``etapa`` no hace nada y
+apenas cuesta. Al iniciarlo se registra el tiempo de reloj de cada etapa y,
+con tracemalloc, el pico de memoria reservada durante ella.
+
+Los eventos son diccionarios que pueden enviarse entre procesos y
+exportarse como traza de Chrome (``chrome://tracing`` o Perfetto).
+"""
+
+import contextlib
+import json
+import os
+import threading
+import time
+import tracemalloc
+
+
+class _Etapa:
+    """Contexto que mide una etapa y la registra al salir."""
+
+    def __init__(self, perfilador, nombre, args):
+        self.perfilador = perfilador
+        self.nombre = nombre
+        self.args = args
+        self.pico = 0
+        self.memoria_inicial = 0
+
+    def __enter__(self):
+        pila = self.perfilador._pila
+        if self.perfilador.memoria:
+            actual, pico = tracemalloc.get_traced_memory()
+            if pila:
+                pila[-1].pico = max(pila[-1].pico, pico)
+            tracemalloc.reset_peak()
+            self.memoria_inicial = self.pico = actual
+        pila.append(self)
+        self.inicio = time.time()
+        self._reloj = time.perf_counter()
+        return self
+
+    def __exit__(self, *excepcion):
+        duracion = time.perf_counter() - self._reloj
+        pila = self.perfilador._pila
+        pila.pop()
+        memoria = None
+        if self.perfilador.memoria:
+            self.pico = max(self.pico, tracemalloc.get_traced_memory()[1])
+            memoria = self.pico - self.memoria_inicial
+            if pila:
+                pila[-1].pico = max(pila[-1].pico, self.pico)
+            tracemalloc.reset_peak()
+        self.perfilador.registrar(self.nombre, self.inicio, duracion, memoria,
+                                  nivel=len(pila), **self.args)
+        return False
+
+
+class Perfilador:
+    """
+    Registro de las etapas de un proceso.
+
+    Attributes:
+        activo: Si se están registrando etapas
+        memoria: Si se mide el pico de memoria con tracemalloc
+        eventos: Etapas registradas desde el último inicio
+    """
+
+    def __init__(self):
+        self.activo = False
+        self.memoria = False
+        self.eventos = []
+        self._pila = []
+        self._tracemalloc_propio = False
+        self._candado = threading.Lock()
+
+    def iniciar(self, memoria=True):
+        """
+        Empieza a registrar etapas y descarta las anteriores.
+
+        Args:
+            memoria: Medir también el pico de memoria (tracemalloc hace más
+                lentas las reservas de memoria mientras está activo)
+        """
+        self.eventos = []
+        self._pila = []
+        self.memoria = memoria
+        if memoria and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._tracemalloc_propio = True
+        self.activo = True
+
+    def detener(self):
+        """
+        Deja de registrar etapas.
+
+        Returns:
+            Lista de eventos registrados
+        """
+        self.activo = False
+        if self._tracemalloc_propio:
+            tracemalloc.stop()
+            self._tracemalloc_propio = False
+        self.memoria = False
+        eventos, self.eventos = self.eventos, []
+        return eventos
+
+    def etapa(self, nombre, **args):
+        """Contexto que mide una etapa; no hace nada si el perfilador está detenido."""
+        if not self.activo:
+            return contextlib.nullcontext()
+        return _Etapa(self, nombre, args)
+
+    def registrar(self, nombre, inicio, duracion, memoria=None, nivel=0, **args):
+        """
+        Añade una etapa medida por otros medios.
+
+        Args:
+            nombre: Nombre de la etapa
+            inicio: Instante de inicio (segundos desde la época, time.time())
+            duracion: Duración en segundos
+            memoria: Pico de memoria reservada durante la etapa, en bytes
+            nivel: Profundidad de anidamiento
+            **args: Datos adicionales que se guardan con el evento
+        """
+        evento = {'nombre': nombre, 'inicio': inicio, 'duracion': duracion,
+                  'memoria': memoria, 'nivel': nivel, 'pid': os.getpid(),
+                  'hilo': threading.get_ident(), 'args': args}
+        with self._candado:
+            self.eventos.append(evento)
+        return evento
+
+
+# Perfilador del proceso actual
+PERFILADOR = Perfilador()
+
+
+def etapa(nombre, **args):
+    """Atajo para PERFILADOR.etapa(nombre, **args)."""
+    return PERFILADOR.etapa(nombre, **args)
+
+
+def traza_chrome(eventos, nombres_procesos=None):
+    """
+    Convierte eventos en una traza de Chrome (formato Trace Event).
+
+    Args:
+        eventos: Lista de eventos de Perfilador
+        nombres_procesos: Diccionario opcional pid → nombre a mostrar
+
+    Returns:
+        Diccionario serializable a JSON
+    """
+    traza = []
+    for pid, nombre in (nombres_procesos or {}).items():
+        traza.append({'name': 'process_name', 'ph': 'M', 'pid': pid, 'tid': 0,
+                      'args': {'name': nombre}})
+    for evento in eventos:
+        args = dict(evento.get('args') or {})
+        if evento.get('memoria') is not None:
+            args['memoria_pico_kb'] = round(evento['memoria'] / 1024, 1)
+        traza.append({'name': evento['nombre'], 'cat': 'calculadora', 'ph': 'X',
+                      'ts': evento['inicio'] * 1e6, 'dur': evento['duracion'] * 1e6,
+                      'pid': evento['pid'], 'tid': evento['hilo'], 'args': args})
+    return {'traceEvents': traza, 'displayTimeUnit': 'ms'}
+
+
+def exportar_chrome(eventos, ruta, nombres_procesos=None):
+    """Guarda los eventos como traza de Chrome en un archivo JSON."""
+    with open(ruta, 'w', encoding='utf-8') as archivo:
+        json.dump(traza_chrome(eventos, nombres_procesos), archivo, ensure_ascii=False)
@@ -0,0 +1,201 @@
+"""
+Preprocesado de integrandos
+===========================
+
+Antes de integrar, el integrando pasa por una canonicalización barata y
+se comprueba si es separable:
+
+- ``expand_power_exp`` separa las exponenciales (``exp(x + y)`` pasa a ser
+  ``exp(x)*exp(y)``) y ``factor_terms`` saca los factores comunes
+  (``x*y + x`` pasa a ser ``x*(y + 1)``). Así, entradas equivalentes
+  comparten la caché y el almacén, y SymPy recibe formas más sencillas.
+- Un integrando separable f(x)·g(y) sobre un rectángulo se integra como el
+  producto de dos integrales de una variable, mucho más baratas.
+
+Salvo con expresiones baratas (ver es_barata), el pase se hace en un
+proceso hijo con plazo, igual que la integración simbólica, para que la
+simplificación no pueda bloquear el cálculo: si no termina a tiempo se usa
+el integrando tal cual.
+"""
+
+import math
+import multiprocessing
+import queue
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Optional
+
+import sympy as sp
+
+from perfilado import etapa
+
+# Segundos máximos del pase de preprocesado
+PLAZO_PREPROCESADO = 1.0
+
+# Cotas de una expresión barata, que se simplifica en el propio proceso
+MAX_OPERACIONES_EN_PROCESO = 60
+MAX_GRADO_EN_PROCESO = 6
+
+# Integrandos preprocesados que se recuerdan por proceso
+MAX_PREPROCESADOS = 256
+
+
+@dataclass(frozen=True)
+class Preprocesado:
+    """
+    Integrando tras el preprocesado.
+
+    Attributes:
+        expr: Forma canónica, equivalente al integrando original
+        factores: Si es separable, tupla (coeficiente, f₁(v₁), f₂(v₂), ...)
+            con un factor por variable; None si no lo es
+    """
+    expr: sp.Expr
+    factores: Optional[tuple] = None
+
+
+def _ejecutar_en_hijo(funcion, args, cola):
+    """Ejecuta funcion(*args) en un proceso hijo y envía el resultado por la cola."""
+    try:
+        cola.put(("ok", funcion(*args)))
+    except Exception as e:
+        cola.put(("error", str(e)))
+
+
+def ejecutar_con_plazo(funcion, args, plazo):
+    """
+    Ejecuta funcion(*args) en un proceso hijo que se termina al agotar el plazo.
+
+    Los cálculos de SymPy no se pueden interrumpir desde otro hilo, así
+    que la única forma segura de acotarlos es un proceso aparte.
+
+    Args:
+        funcion: Función a ejecutar (con fork no hace falta que se pueda serializar)
+        args: Tupla de argumentos
+        plazo: Segundos máximos de espera
+
+    Returns:
+        El resultado, o None si no terminó a tiempo o lanzó una excepción
+    """
+    cola = multiprocessing.Queue()
+    proceso = multiprocessing.Process(target=_ejecutar_en_hijo,
+                                      args=(funcion, args, cola),
+                                      daemon=True)
+    proceso.start()
+    try:
+        estado, resultado = cola.get(timeout=plazo)
+    except queue.Empty:
+        return None
+    finally:
+        if proceso.is_alive():
+            proceso.terminate()
+        proceso.join()
+    return resultado if estado == "ok" else None
+
+
+def _grado(expr):
+    """Cota del grado polinómico de expr en sus símbolos, sin expandirla."""
+    if expr.is_Symbol:
+        return 1
+    if expr.is_Add:
+        return max(_grado(arg) for arg in expr.args)
+    if expr.is_Mul:
+        return sum(_grado(arg) for arg in expr.args)
+    if expr.is_Pow and expr.exp.is_Rational:
+        return math.ceil(abs(expr.exp) * _grado(expr.base))
+    return max((_grado(arg) for arg in expr.args), default=0)
+
+
+def es_barata(expr):
+    """
+    Si simplificar o analizar expr en el propio proceso no puede bloquear el cálculo.
+
+    El número de operaciones no basta: ``x**97*y**89 - 2`` tiene pocas, pero
+    factorizarla o resolverla es caro. Por eso se acota también el grado
+    polinómico, que incluye los exponentes enteros y racionales.
+    """
+    return (sp.count_ops(expr) <= MAX_OPERACIONES_EN_PROCESO
+            and _grado(expr) <= MAX_GRADO_EN_PROCESO)
+
+
+def canonicalizar(expr):
+    """
+    Forma canónica barata: exponenciales separadas y factores comunes fuera.
+
+    Solo se aceptan transformaciones que no aumenten mucho el número de
+    operaciones; si no, se devuelve la expresión original.
+    """
+    canonica = sp.factor_terms(sp.expand_power_exp(expr))
+    if sp.count_ops(canonica) > 1.5 * sp.count_ops(expr) + 2:
+        return expr
+    return canonica
+
+
+def separar(expr, variables):
+    """
+    Descompone un integrando separable en un factor por variable.
+
+    Args:
+        expr: Expresión de SymPy
+        variables: Símbolos de integración (al menos dos)
+
+    Returns:
+        Tupla (coeficiente, f₁(v₁), f₂(v₂), ...) o None si no es separable
+    """
+    if len(variables) < 2:
+        return None
+    partes = sp.separatevars(expr, symbols=list(variables), dict=True)
+    if not partes:
+        return None
+    return (partes['coeff'], *(partes[v] for v in variables))
+
+
+def _preprocesar(expr, variables):
+    canonica = canonicalizar(expr)
+    return Preprocesado(canonica, separar(canonica, variables))
+
+
+_preprocesados = OrderedDict()
+_candado = threading.Lock()
+
+
+def preprocesar(expr, variables, plazo=PLAZO_PREPROCESADO):
+    """
+    Canonicaliza un integrando y detecta si es separable, con plazo.
+
+    Solo las expresiones baratas (ver es_barata) se procesan sin plazo.
+    Los resultados se recuerdan por proceso (LRU). Si el pase falla o no
+    termina a tiempo, el integrando se devuelve sin cambios.
+
+    Args:
+        expr: Expresión de SymPy
+        variables: Símbolos de integración
+        plazo: Segundos máximos del pase
+
+    Returns:
+        Preprocesado
+    """
+    variables = tuple(variables)
+    clave = (expr, variables)
+    with _candado:
+        if clave in _preprocesados:
+            _preprocesados.move_to_end(clave)
+            return _preprocesados[clave]
+
+    with etapa('preprocesado'):
+        if es_barata(expr):
+            try:
+                resultado = _preprocesar(expr, variables)
+            except Exception:
+                resultado = None
+        else:
+            resultado = ejecutar_con_plazo(_preprocesar, (expr, variables), plazo)
+    if resultado is None:
+        resultado = Preprocesado(expr)
+
+    with _candado:
+        _preprocesados[clave] = resultado
+        while len(_preprocesados) > MAX_PREPROCESADOS:
+            _preprocesados.popitem(last=False)
+    return resultado
@@ -0,0 +1,210 @@
+"""
+Renderizado de gráficos sin pantalla
+====================================
+
+Genera imágenes PNG o SVG de lotes de funciones, superficies y regiones
+sin abrir la interfaz, por ejemplo para preparar material de un curso.
+Usa los mismos cálculos que los botones de graficar de la calculadora
+(motor.malla_adaptativa, motor.malla_volumen y motor.curvas_region) y el
+mismo GestorGraficos, sobre el backend Agg.
+
+Cada proceso conserva una figura plantilla por tamaño y resolución: los
+ejes, el plano z=0 y la barra de colores se reutilizan de una imagen a la
+siguiente y solo se sustituyen los datos, así que el coste por imagen es
+el del cálculo de la malla y el dibujo.
+
+Uso desde la línea de comandos:
+
+    python renderizado.py graficos.jsonl -d imagenes/
+    python renderizado.py graficos.csv -d imagenes/ --formato svg --procesos 4
+
+Cada trabajo es un objeto JSON (o una fila CSV) con un campo ``tipo``:
+
+    {"id": "silla", "tipo": "funcion", "funcion": "x**2 - y**2",
+     "x_min": -1, "x_max": 1, "y_min": -1, "y_max": 1}
+    {"id": 2, "tipo": "superficie", "funcion": "4 - x**2 - y**2", "z_inf": "0",
+     "x_min": 0, "x_max": 2, "y_min": 0, "y_max": "2*pi", "coordenadas": "polares"}
+    {"id": 3, "tipo": "region", "y_sup": "sqrt(x)", "y_inf": "x**2",
+     "x_min": 0, "x_max": 1}
+
+La imagen se guarda como ``<id>.<formato>`` en el directorio de salida (o
+con el nombre del campo ``archivo``) y se escribe una línea JSONL por
+trabajo con la ruta o el error.
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+import matplotlib.style
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+from graficos import GestorGraficos
+from motor import curvas_region, leer_trabajos, malla_adaptativa, malla_volumen, repartir_trabajos
+
+TIPOS_IMAGEN = ('funcion', 'superficie', 'region')
+FORMATOS = ('png', 'svg')
+
+# Presupuestos de puntos y muestras de las curvas (los mismos que la calculadora)
+PRESUPUESTO_FUNCION = 100 * 100
+PRESUPUESTO_SUPERFICIE = 50 * 50
+MUESTRAS_REGION = 100
+
+# Tamaño en pulgadas y resolución por defecto de las imágenes
+TAMANO = (10, 7)
+DPI = 100
+
+ESTILO = 'seaborn-v0_8' if 'seaborn-v0_8' in matplotlib.style.available else 'default'
+
+
+class _LienzoDiferido(FigureCanvasAgg):
+    """Lienzo Agg que solo dibuja al guardar la imagen, no en cada draw_idle."""
+
+    def draw_idle(self, *args, **kwargs):
+        pass
+
+
+# Gestores plantilla de este proceso, por (ancho, alto, dpi)
+_PLANTILLAS = {}
+
+
+def plantilla(tamano=TAMANO, dpi=DPI):
+    """
+    GestorGraficos de este proceso para un tamaño y una resolución.
+
+    Se crea en la primera llamada y se reutiliza después, de modo que las
+    imágenes sucesivas del mismo tipo solo sustituyen los datos.
+    """
+    clave = (*tamano, dpi)
+    if clave not in _PLANTILLAS:
+        with matplotlib.style.context(ESTILO):
+            fig = Figure(figsize=tamano, dpi=dpi, facecolor='#ecf0f1')
+        _PLANTILLAS[clave] = GestorGraficos(fig, _LienzoDiferido(fig))
+    return _PLANTILLAS[clave]
+
+
+def _ultima(mallas):
+    """Agota un generador de mallas adaptativas y devuelve la más refinada."""
+    malla = None
+    for malla in mallas:
+        pass
+    return malla
+
+
+def dibujar_trabajo(gestor, trabajo):
+    """
+    Dibuja un trabajo con la misma lógica que los botones de graficar.
+
+    Args:
+        gestor: GestorGraficos donde se dibuja
+        trabajo: Diccionario con 'tipo' y los campos de ese tipo
+
+    Raises:
+        ValueError: Si el tipo no existe
+    """
+    tipo = trabajo.get('tipo')
+    if tipo not in TIPOS_IMAGEN:
+        raise ValueError(f"Tipo de imagen desconocido: {tipo!r} (use {', '.join(TIPOS_IMAGEN)})")
+    coordenadas = trabajo.get('coordenadas') or 'cartesianas'
+    if tipo == 'region':
+        y_sup, y_inf = trabajo['y_sup'], trabajo['y_inf']
+        x_vals, (sup, inf) = curvas_region(y_sup, y_inf, trabajo['x_min'], trabajo['x_max'],
+                                           MUESTRAS_REGION)
+        gestor.region(x_vals, sup, inf, f'y = {y_sup}', f'y = {y_inf}')
+        return
+
+    func_str = trabajo['funcion']
+    limites = [trabajo[nombre] for nombre in ('x_min', 'x_max', 'y_min', 'y_max')]
+    z_inferior = str(trabajo.get('z_inf', '0')).strip()
+    if tipo == 'funcion':
+        malla = _ultima(malla_adaptativa(func_str, *limites, PRESUPUESTO_FUNCION,
+                                         coordenadas=coordenadas))
+        gestor.superficie(*malla, 'viridis', f'Gráfico de la Función: z = {func_str}')
+    else:
+        if z_inferior in ('', '0'):
+            malla = _ultima(malla_adaptativa(func_str, *limites, PRESUPUESTO_SUPERFICIE,
+                                             coordenadas=coordenadas))
+            titulo = f'Superficie z = {func_str}'
+        else:
+            malla = _ultima(malla_volumen(func_str, z_inferior, *limites, PRESUPUESTO_SUPERFICIE,
+                                          coordenadas=coordenadas))
+            titulo = f'Entre z = {z_inferior} y z = {func_str}'
+        gestor.superficie(*malla[:3], 'plasma', titulo,
+                          Z_inferior=malla[3] if len(malla) > 3 else None)
+
+
+def renderizar_trabajo(trabajo, directorio, formato='png', dpi=DPI):
+    """
+    Dibuja un trabajo en la plantilla del proceso y lo guarda como imagen.
+
+    Args:
+        trabajo: Diccionario con 'tipo', sus campos y, opcionalmente,
+            'archivo' (nombre de la imagen dentro del directorio)
+        directorio: Directorio de salida (debe existir)
+        formato: 'png' o 'svg'
+        dpi: Resolución de la imagen
+
+    Returns:
+        Diccionario serializable a JSON con la ruta o el error
+    """
+    inicio = time.perf_counter()
+    salida = {'id': trabajo.get('id'), 'tipo': trabajo.get('tipo')}
+    try:
+        if formato not in FORMATOS:
+            raise ValueError(f"Formato desconocido: {formato!r} (use {', '.join(FORMATOS)})")
+        gestor = plantilla(dpi=dpi)
+        with matplotlib.style.context(ESTILO):
+            dibujar_trabajo(gestor, trabajo)
+        ruta = os.path.join(directorio, trabajo.get('archivo') or f"{trabajo.get('id')}.{formato}")
+        gestor.fig.savefig(ruta, format=formato, facecolor=gestor.fig.get_facecolor())
+    except Exception as e:
+        salida.update(estado='error', mensaje=str(e))
+        return salida
+    salida.update(estado='ok', ruta=ruta, tiempo=time.perf_counter() - inicio)
+    return salida
+
+
+def renderizar_lote(trabajos, directorio, formato='png', procesos=None, dpi=DPI):
+    """
+    Renderiza trabajos en paralelo y produce los resultados según terminan.
+
+    Args:
+        trabajos: Iterable de diccionarios de trabajo
+        directorio: Directorio de salida; se crea si no existe
+        formato: 'png' o 'svg'
+        procesos: Número de procesos (por defecto, núcleos de CPU)
+        dpi: Resolución de las imágenes
+
+    Yields:
+        Diccionarios de resultado (ver renderizar_trabajo)
+    """
+    os.makedirs(directorio, exist_ok=True)
+    return repartir_trabajos(renderizar_trabajo, trabajos, procesos, directorio, formato, dpi)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Genera imágenes de funciones, superficies y regiones sin interfaz gráfica.")
+    parser.add_argument('entrada', help="Archivo JSONL o CSV de trabajos ('-' para stdin)")
+    parser.add_argument('-d', '--directorio', default='imagenes',
+                        help="Directorio de las imágenes (por defecto, ./imagenes)")
+    parser.add_argument('-f', '--formato', choices=FORMATOS, default='png',
+                        help="Formato de las imágenes")
+    parser.add_argument('--dpi', type=int, default=DPI, help="Resolución de las imágenes")
+    parser.add_argument('-p', '--procesos', type=int, default=None,
+                        help="Número de procesos en paralelo (por defecto, núcleos de CPU)")
+    args = parser.parse_args(argv)
+
+    fallos = 0
+    for resultado in renderizar_lote(leer_trabajos(args.entrada), args.directorio,
+                                     args.formato, args.procesos, args.dpi):
+        fallos += resultado['estado'] != 'ok'
+        print(json.dumps(resultado, ensure_ascii=False), flush=True)
+    return 1 if fallos else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,437 @@
+"""
+Singularidades y pliegues del integrando
+========================================
+
+Antes de integrar sobre un rectángulo se buscan las líneas donde el
+integrando deja de ser suave:
+
+- Singularidades: donde el integrando no es finito, según
+  ``sp.singularities`` respecto a cada variable (x = 0 en ``1/sqrt(x)`` y
+  en ``log(x*y)``, y = x en ``1/(x - y)``).
+- Pliegues: los ceros de los argumentos de Abs, sign, Heaviside, Max y Min,
+  donde el integrando cambia de fórmula (y = x en ``Abs(x - y)``).
+
+El rectángulo se corta en piezas de tipo I a lo largo de esas líneas. En
+cada pieza los signos son fijos: ``Abs(x - y)`` pasa a ser ``x - y`` o
+``y - x`` y ``log(x*y)`` con x, y > 0 pasa a ser ``log(x) + log(y)``, así
+que SymPy integra cada pieza enseguida. Las singularidades quedan en los
+bordes de las piezas, donde el nivel numérico las suaviza con un cambio de
+variable (ver integracion.integrar_piezas).
+
+El análisis llega a ``sp.solve``, que puede no terminar aun con
+expresiones pequeñas, así que se hace en un proceso hijo con plazo; si no
+termina, el rectángulo no se divide. Solo las expresiones baratas sin
+pliegues ni singularidades que dependan de y, que no llegan a
+``sp.solve``, se analizan en el propio proceso.
+"""
+
+import itertools
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+
+import numpy as np
+import sympy as sp
+
+from expresiones import compilar
+from perfilado import etapa
+from preprocesado import ejecutar_con_plazo, es_barata
+
+# Segundos máximos del análisis
+PLAZO_ANALISIS = 1.0
+
+# Análisis que se recuerdan por proceso
+MAX_ANALISIS = 256
+
+# Funciones cuya fórmula cambia al cruzar un cero de su argumento
+PLIEGUES = (sp.Abs, sp.sign, sp.Heaviside, sp.Max, sp.Min)
+
+# Funciones enteras: no añaden singularidades
+ENTERAS = (sp.exp, sp.sin, sp.cos, sp.sinh, sp.cosh)
+
+# Fracciones de cada pieza (por eje) donde se comprueba que los signos son fijos
+FRACCIONES_MUESTRA = (0.02, 0.25, 0.5, 0.75, 0.98)
+
+
+@dataclass(frozen=True)
+class Pieza:
+    """
+    Trozo de un rectángulo: a ≤ x ≤ b, inferior(x) ≤ y ≤ superior(x).
+
+    Attributes:
+        func: Integrando en la pieza, con Abs, sign, Heaviside, Max y Min
+            sustituidos por la rama que vale en ella
+        limites: ((a, b), (inferior, superior)) exactos
+        singulares: ((a, b), (inferior, superior)) con True en los bordes
+            donde el integrando no es finito
+    """
+    func: sp.Expr
+    limites: tuple
+    singulares: tuple = ((False, False), (False, False))
+
+    @property
+    def rectangular(self):
+        """Si los límites de y son constantes."""
+        return not any(limite.free_symbols for limite in self.limites[1])
+
+
+class _RamaVariable(Exception):
+    """Un pliegue cambia de rama dentro de una pieza: no se pudo localizar."""
+
+
+def _real(expr, punto=None):
+    """Valor float de expr (en punto, si se da), o None si no es real y finito."""
+    try:
+        valor = complex((expr if punto is None else expr.subs(punto)).evalf())
+    except (TypeError, ValueError):
+        return None
+    if abs(valor.imag) > 1e-12 * max(1.0, abs(valor.real)) or not np.isfinite(valor.real):
+        return None
+    return valor.real
+
+
+def _coinciden(valor, referencia):
+    """Si dos valores float coinciden salvo redondeo (valor puede ser None)."""
+    return valor is not None and abs(valor - referencia) <= 1e-12 * max(1.0, abs(referencia))
+
+
+def _lineas(func, variable, a, b):
+    """
+    Singularidades de func respecto a una variable.
+
+    Returns:
+        Conjunto de expresiones g tales que func no es finita en
+        variable = g: constantes dentro de [a, b] o funciones de la otra
+        variable (su parte real se comprueba al cortar)
+    """
+    try:
+        conjunto = sp.singularities(func, variable)
+        if not isinstance(conjunto, sp.FiniteSet):
+            conjunto = sp.Intersection(conjunto, sp.Interval(a, b))
+    except (NotImplementedError, ValueError, TypeError):
+        return set()
+    if not isinstance(conjunto, sp.FiniteSet):
+        return set()
+    lineas = set()
+    for g in conjunto:
+        if g.has(sp.I, sp.zoo, sp.oo, sp.nan):
+            continue
+        if g.free_symbols:
+            lineas.add(g)
+        else:
+            valor = _real(g)
+            if valor is not None and float(a) <= valor <= float(b):
+                lineas.add(g)
+    return lineas
+
+
+def _argumentos_pliegue(func):
+    """Expresiones cuyo cero es un pliegue de func."""
+    argumentos = set()
+    for sub in sp.preorder_traversal(func):
+        if isinstance(sub, (sp.Abs, sp.sign, sp.Heaviside)):
+            argumentos.add(sub.args[0])
+        elif isinstance(sub, (sp.Max, sp.Min)):
+            argumentos.update(p - q for p, q in itertools.combinations(sub.args, 2))
+    return argumentos
+
+
+def lineas_criticas(func, x, y, limites):
+    """
+    Líneas de singularidad y de pliegue de func dentro de un rectángulo.
+
+    Args:
+        func: Expresión de SymPy en x e y
+        x, y: Variables exterior e interior
+        limites: ((a, b), (c, d)) exactos
+
+    Returns:
+        Tupla (verticales, horizontales, curvas): diccionarios de x = valor,
+        y = valor e y = h(x) a True si la línea es una singularidad y a
+        False si solo es un pliegue
+    """
+    (a, b), (c, d) = limites
+    verticales, horizontales, curvas = {}, {}, {}
+    fuentes = [(func, True)] + [(1 / argumento, False) for argumento in _argumentos_pliegue(func)]
+    for expr, singular in fuentes:
+        for g in _lineas(expr, x, a, b):
+            if not g.free_symbols:
+                verticales[g] = verticales.get(g, False) or singular
+        for g in _lineas(expr, y, c, d):
+            destino = curvas if g.free_symbols else horizontales
+            destino[g] = destino.get(g, False) or singular
+    # Solo cuentan las curvas que dependen de x (y = h(x))
+    curvas = {h: singular for h, singular in curvas.items() if h.free_symbols == {x}}
+    return verticales, horizontales, curvas
+
+
+def _raices(expr, x, a, b):
+    """Raíces reales de expr = 0 en (a, b), exactas; lista vacía si SymPy no las halla."""
+    try:
+        soluciones = sp.solve(expr, x)
+    except (NotImplementedError, ValueError, TypeError):
+        return []
+    raices = []
+    for solucion in soluciones:
+        valor = _real(solucion)
+        if valor is not None and float(a) < valor < float(b):
+            raices.append(solucion)
+    return raices
+
+
+def _cortes(curvas, constantes, x, a, b):
+    """
+    Valores de x en (a, b) donde cambia el orden de los bordes de las piezas.
+
+    Son los cruces de cada curva con los bordes y rectas horizontales, los
+    cruces entre curvas y los extremos del dominio real de cada curva (los
+    ceros de las bases de sus raíces y logaritmos).
+    """
+    ecuaciones = [h - k for h in curvas for k in constantes]
+    ecuaciones += [h - g for h, g in itertools.combinations(curvas, 2)]
+    for h in curvas:
+        ecuaciones += [sub.base for sub in h.atoms(sp.Pow) if not sub.exp.is_integer]
+        ecuaciones += [sub.args[0] for sub in h.atoms(sp.log)]
+    return [raiz for ecuacion in ecuaciones for raiz in _raices(ecuacion, x, a, b)]
+
+
+def _ordenar(valores):
+    """Ordena (expresión, valor, marca) por valor y une los que coinciden, con marca OR."""
+    unidos = []
+    for expr, valor, marca in sorted(valores, key=lambda v: v[1]):
+        if unidos and _coinciden(unidos[-1][1], valor):
+            unidos[-1] = (unidos[-1][0], unidos[-1][1], unidos[-1][2] or marca)
+        else:
+            unidos.append((expr, valor, marca))
+    return unidos
+
+
+def _muestras(x, y, limites):
+    """Puntos interiores (X, Y) de una pieza donde se comprueban los signos."""
+    (x0, x1), (inferior, superior) = limites
+    fracciones = np.array(FRACCIONES_MUESTRA)
+    xs = float(x0) + (float(x1) - float(x0)) * fracciones
+    with np.errstate(all='ignore'):
+        bajo = np.broadcast_to(np.asarray(compilar(inferior, (x,)).nucleo(xs), dtype=float), xs.shape)
+        alto = np.broadcast_to(np.asarray(compilar(superior, (x,)).nucleo(xs), dtype=float), xs.shape)
+    X = np.repeat(xs, len(fracciones))
+    Y = (bajo[:, None] + (alto - bajo)[:, None] * fracciones[None, :]).ravel()
+    return X, Y
+
+
+def _en_muestras(expr, x, y, X, Y):
+    """Valores reales de expr en las muestras; lanza _RamaVariable si alguno no lo es."""
+    with np.errstate(all='ignore'):
+        valores = np.broadcast_to(compilar(expr, (x, y)).nucleo(X, Y), X.shape)
+    if np.iscomplexobj(valores):
+        if np.any(np.abs(valores.imag) > 0):
+            raise _RamaVariable
+        valores = valores.real
+    valores = np.asarray(valores, dtype=float)
+    if not np.all(np.isfinite(valores)):
+        raise _RamaVariable
+    return valores
+
+
+def _signo_fijo(expr, x, y, X, Y):
+    """Signo (1 o -1) de expr en toda la pieza; lanza _RamaVariable si cambia o se anula."""
+    signos = np.sign(_en_muestras(expr, x, y, X, Y))
+    if signos[0] == 0 or np.any(signos != signos[0]):
+        raise _RamaVariable
+    return int(signos[0])
+
+
+def fijar_ramas(func, x, y, limites):
+    """
+    Sustituye los pliegues de func por la rama que vale en una pieza.
+
+    Además, cada logaritmo de un producto cuyos factores son positivos en la
+    pieza se separa en una suma de logaritmos.
+
+    Args:
+        func: Expresión de SymPy en x e y
+        x, y: Variables exterior e interior
+        limites: Límites de la pieza, ((a, b), (inferior, superior))
+
+    Returns:
+        La expresión equivalente en la pieza, o None si algún pliegue cambia
+        de rama dentro de ella
+    """
+    X, Y = _muestras(x, y, limites)
+
+    def rama(expr):
+        if isinstance(expr, (sp.Max, sp.Min)):
+            valores = np.array([_en_muestras(arg, x, y, X, Y) for arg in expr.args])
+            elegidos = (np.argmax if isinstance(expr, sp.Max) else np.argmin)(valores, axis=0)
+            if np.any(elegidos != elegidos[0]):
+                raise _RamaVariable
+            return expr.args[elegidos[0]]
+        argumento = expr.args[0]
+        signo = _signo_fijo(argumento, x, y, X, Y)
+        if isinstance(expr, sp.Abs):
+            return signo * argumento
+        if isinstance(expr, sp.sign):
+            return sp.Integer(signo)
+        return sp.Integer(signo > 0)
+
+    def positivo(expr):
+        try:
+            return _signo_fijo(expr, x, y, X, Y) > 0
+        except _RamaVariable:
+            return False
+
+    def separar_logaritmo(expr):
+        factores = expr.args[0].as_ordered_factors()
+        bases = [f.base if f.is_Pow else f for f in factores]
+        if not all(positivo(base) for base in bases):
+            return expr
+        return sp.Add(*(sp.expand_log(sp.log(f), force=True) for f in factores))
+
+    try:
+        func = func.replace(lambda e: isinstance(e, PLIEGUES), rama)
+    except _RamaVariable:
+        return None
+    return func.replace(lambda e: isinstance(e, sp.log) and e.args[0].is_Mul, separar_logaritmo)
+
+
+def _sin_ecuaciones(func, y):
+    """
+    Si el análisis de func no puede llegar a sp.solve.
+
+    Sin pliegues ni singularidades que dependan de y no hay curvas
+    y = h(x) cuyos cruces buscar; basta con que además func sea barata.
+    """
+    if not es_barata(func) or func.has(*PLIEGUES):
+        return False
+    for sub in sp.preorder_traversal(func):
+        if not sub.has(y):
+            continue
+        if sub.is_Pow and not (sub.exp.is_Integer and sub.exp >= 0):
+            return False
+        if isinstance(sub, sp.Function) and not isinstance(sub, ENTERAS):
+            return False
+    return True
+
+
+def _analizar(func, x, y, limites):
+    """_dividir para el proceso hijo: la tupla distingue «no dividir» de un fallo."""
+    return (_dividir(func, x, y, limites),)
+
+
+def _dividir(func, x, y, limites):
+    """Cálculo de dividir_rectangulo, sin caché ni plazo."""
+    (a, b), (c, d) = limites
+    verticales, horizontales, curvas = lineas_criticas(func, x, y, limites)
+    if not (verticales or horizontales or curvas):
+        return None
+
+    constantes = [c, d, *horizontales]
+    cortes = [(a, float(a), False), (b, float(b), False)]
+    cortes += [(v, _real(v), False) for v in verticales]
+    cortes += [(raiz, _real(raiz), False) for raiz in _cortes(list(curvas), constantes, x, a, b)]
+    cortes = _ordenar(cortes)
+    cortes = [corte for corte in cortes if float(a) <= corte[1] <= float(b)]
+
+    def singular_vertical(valor):
+        return any(s and _coinciden(_real(v), valor) for v, s in verticales.items())
+
+    piezas = []
+    for (x0, v0, _), (x1, v1, _) in zip(cortes, cortes[1:]):
+        medio = {x: (v0 + v1) / 2}
+        bordes = [(c, float(c), False), (d, float(d), False)]
+        for k, singular in horizontales.items():
+            bordes.append((k, _real(k), singular))
+        for h, singular in curvas.items():
+            valor = _real(h, medio)
+            if valor is not None:
+                bordes.append((h, valor, singular))
+        bordes = [borde for borde in _ordenar(bordes) if float(c) <= borde[1] <= float(d)]
+        for (inferior, _, s_inf), (superior, _, s_sup) in zip(bordes, bordes[1:]):
+            piezas.append(((x0, x1), (inferior, superior),
+                           ((singular_vertical(v0), singular_vertical(v1)), (s_inf, s_sup))))
+
+    resultado = []
+    for limites_x, limites_y, singulares in piezas:
+        fijada = fijar_ramas(func, x, y, (limites_x, limites_y))
+        if fijada is None:
+            return None
+        # Con la rama fijada aparecen singularidades que sp.singularities
+        # no ve a través de Abs (1/sqrt(Abs(x)) pasa a ser 1/sqrt(x))
+        propias = _bordes_singulares(fijada, x, y, (limites_x, limites_y))
+        singulares = tuple(tuple(p or q for p, q in zip(*par)) for par in zip(singulares, propias))
+        resultado.append(Pieza(fijada, (limites_x, limites_y), singulares))
+    if len(resultado) == 1 and not any(itertools.chain(*resultado[0].singulares)):
+        return None
+    return tuple(resultado)
+
+
+def _bordes_singulares(func, x, y, limites):
+    """Bordes ((a, b), (inferior, superior)) de una pieza sobre los que func no es finita."""
+    (a, b), (inferior, superior) = limites
+    medio = {x: (float(a) + float(b)) / 2}
+
+    def sobre(lineas, borde, punto=None):
+        valor = _real(borde, punto)
+        if valor is None:
+            return False
+        return any(_coinciden(_real(g, punto), valor) for g in lineas)
+
+    verticales = {g for g in _lineas(func, x, a, b) if not g.free_symbols}
+    lineas_y = {g for g in _lineas(func, y, -sp.oo, sp.oo) if g.free_symbols <= {x}}
+    return ((sobre(verticales, a), sobre(verticales, b)),
+            (sobre(lineas_y, inferior, medio), sobre(lineas_y, superior, medio)))
+
+
+_analisis = OrderedDict()
+_candado = threading.Lock()
+
+
+def dividir_rectangulo(func, x, y, limites, plazo=PLAZO_ANALISIS):
+    """
+    Divide un rectángulo en piezas sin pliegues y con las singularidades en el borde.
+
+    Los resultados se recuerdan por proceso (LRU); un análisis que no
+    terminó a tiempo se repite si luego se concede más plazo. Si el análisis
+    falla, no termina o algún pliegue no se puede localizar, no se divide.
+
+    Args:
+        func: Expresión de SymPy en x e y
+        x, y: Variables exterior e interior
+        limites: ((a, b), (c, d)) exactos
+        plazo: Segundos máximos del análisis (None, sin límite); con 0 solo
+            se analizan las expresiones que no llegan a resolver ecuaciones
+
+    Returns:
+        Tupla de Pieza, o None si no hace falta dividir (ni pliegues ni
+        singularidades en el rectángulo)
+    """
+    limites = tuple(tuple(par) for par in limites)
+    clave = (func, x, y, limites)
+    with _candado:
+        if clave in _analisis:
+            piezas, agotado = _analisis[clave]
+            # Un análisis que no terminó se repite si ahora hay más plazo
+            if agotado is None or (plazo is not None and plazo <= agotado):
+                _analisis.move_to_end(clave)
+                return piezas
+
+    agotado = None
+    with etapa('singularidades'):
+        if _sin_ecuaciones(func, y):
+            try:
+                piezas = _dividir(func, x, y, limites)
+            except Exception:
+                piezas = None
+        else:
+            analisis = None
+            if plazo is None or plazo > 0:
+                analisis = ejecutar_con_plazo(_analizar, (func, x, y, limites), plazo)
+            piezas = None if analisis is None else analisis[0]
+            if analisis is None and plazo is not None:
+                agotado = plazo
+
+    with _candado:
+        _analisis[clave] = (piezas, agotado)
+        while len(_analisis) > MAX_ANALISIS:
+            _analisis.popitem(last=False)
+    return piezas
@@ -0,0 +1,64 @@
+"""
+Pruebas del almacén persistente de resultados
+"""
+import pytest
+import sympy as sp
+
+from almacen import AlmacenResultados, almacen, clave, leer_expresion
+from integracion import (antiderivada_con_plazo, integrar_doble, integrar_region,
+                         NIVEL_NUMERICO, NIVEL_SIMBOLICO)
+
+x, y = sp.symbols('x y')
+
+
+def test_guardar_persistir_y_descartar(tmp_path):
+    ruta = tmp_path / 'resultados.sqlite3'
+    primero = AlmacenResultados(str(ruta), max_bytes=200)
+    claves = [clave('integral', x**n, (x,), [(0, 1)]) for n in range(6)]
+    assert len(set(claves)) == 6
+    for n, c in enumerate(claves):
+        primero.guardar(c, {'valor': 1 / (n + 1), 'relleno': 'a' * 30})
+    primero.cerrar()
+
+    # Otra sesión encuentra las entradas recientes; las más antiguas se descartaron
+    segundo = AlmacenResultados(str(ruta), max_bytes=200)
+    assert segundo.obtener(claves[-1])['valor'] == 1 / 6
+    assert segundo.obtener(claves[0]) is None
+    estadisticas = segundo.estadisticas()
+    assert 0 < estadisticas['bytes'] <= 200
+    assert estadisticas['aciertos'] == 1 and estadisticas['fallos'] == 1
+
+
+def test_integrales_desde_almacen():
+    almacen().limpiar()
+    func = sp.exp(x) * sp.cos(y)
+    calculado = integrar_doble(func, x, y, 0, 1, 0, sp.pi / 2)
+    assert calculado.nivel == NIVEL_SIMBOLICO and not calculado.almacenado
+
+    # La segunda vez el resultado exacto se lee del almacén
+    guardado = integrar_doble(sp.exp(x) * sp.cos(y), x, y, 0, 1, 0, sp.pi / 2, plazo=0)
+    assert guardado.almacenado
+    assert guardado.exacto == calculado.exacto == sp.E - 1
+
+    # Un resultado numérico no sustituye a un intento simbólico con más plazo
+    region = integrar_region(sp.sqrt(x**2 + y**2), x, y, 0, 1, 0, x, plazo=0)
+    assert region.nivel == NIVEL_NUMERICO and not region.almacenado
+    assert integrar_region(sp.sqrt(x**2 + y**2), x, y, 0, 1, 0, x, plazo=0).almacenado
+
+
+def test_expresiones_guardadas_sin_evaluar_codigo():
+    a = sp.Symbol('a', positive=True)
+    for expr in (sp.pi / 2 + sp.sqrt(2), sp.Float('0.1', 30), sp.Piecewise((x, x > a), (0, True)),
+                 sp.atan(sp.tan(x / 2) / sp.sqrt(3)), -sp.I * sp.oo):
+        assert leer_expresion(sp.srepr(expr)) == expr
+    for texto in ("__import__('os')", "sin('__import__(1)')", "Symbol('x').evalf()",
+                  "Add(Symbol('x'), evaluate=True)", "Function('f')(Symbol('x'))"):
+        with pytest.raises(ValueError):
+            leer_expresion(texto)
+
+    # Una entrada manipulada del almacén se ignora y se recalcula
+    func = x**3 * sp.exp(5 * x)
+    almacen().guardar(clave('antiderivada', func, (x,)),
+                      {'antiderivada': "sin('__import__(\"os\").getpid()')"})
+    antiderivada = antiderivada_con_plazo(func, (x,))
+    assert sp.simplify(sp.diff(antiderivada, x) - func) == 0
@@ -0,0 +1,18 @@
+"""
+Pruebas del arranque perezoso de la interfaz
+"""
+import subprocess
+import sys
+
+
+def test_importar_interfaz_no_carga_modulos_pesados():
+    codigo = ("import sys, calculadora_multivariado; "
+              "pesados = [m for m in ('sympy', 'numpy', 'matplotlib') if m in sys.modules]; "
+              "assert not pesados, pesados")
+    subprocess.run([sys.executable, '-c', codigo], check=True)
+
+
+def test_precarga_importa_modulos():
+    codigo = ("import sys, calculadora_multivariado as cm; cm.precargar_modulos(); "
+              "assert all(m in sys.modules for m in cm.MODULOS_PRECARGA)")
+    subprocess.run([sys.executable, '-c', codigo], check=True)
@@ -0,0 +1,36 @@
+"""
+Pruebas del corpus y del benchmark de los casos de ejemplo
+"""
+import sympy as sp
+
+from benchmark_casos import cargar_corpus, comparar, ETAPAS, medir_caso
+
+
+def test_corpus():
+    casos = cargar_corpus()
+    por_nombre = {caso['nombre']: caso for caso in casos}
+
+    trigonometrica = por_nombre['Ejemplo 3: Función trigonométrica']
+    assert trigonometrica['tipo'] == 'integral'
+    assert trigonometrica['x_max'] == 'pi/2'
+    assert sp.sympify(trigonometrica['esperado']) == 1
+
+    parabolas = por_nombre['Ejemplo 2: Área entre dos parábolas']
+    assert sp.sympify(parabolas['esperado']) == 16 * sp.sqrt(2) / 3
+
+    # Los casos de test_calculadora.py que repiten un ejemplo no se duplican
+    pruebas = [caso for caso in casos if caso['origen'] == 'test_calculadora.py']
+    assert {caso['funcion'] for caso in pruebas} >= {'sqrt(x ** 2 + y ** 2)', 'E * x * y'}
+    assert len({caso['id'] for caso in casos}) == len(casos)
+
+
+def test_medir_caso_y_comparar():
+    caso = next(c for c in cargar_corpus() if c['nombre'] == 'Ejemplo 5: Región de tipo I')
+    medicion = medir_caso(caso, repeticiones=1, plazo=10)
+    assert medicion['correcto'], medicion['errores']
+    assert set(medicion['tiempos']) == set(ETAPAS)
+    assert abs(medicion['valores']['numerico'] - 1 / 24) < 1e-12
+
+    lenta = dict(medicion, tiempos={etapa: 10 * t + 1 for etapa, t in medicion['tiempos'].items()})
+    assert len(comparar([lenta], {'casos': [medicion]}, umbral=1.5)) == len(ETAPAS)
+    assert comparar([medicion], {'casos': [medicion]}, umbral=1.5) == []
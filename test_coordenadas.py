@@ -0,0 +1,24 @@
+"""
+Pruebas de los sistemas de coordenadas y su jacobiano
+"""
+import pytest
+import sympy as sp
+
+from coordenadas import PHI, R, RHO, sistema, sugerir_coordenadas, transformar
+
+x, y, z = sp.symbols('x y z')
+
+
+def test_transformar_incluye_jacobiano():
+    assert transformar(sp.sqrt(x**2 + y**2), sistema('polares', 2)) == R**2
+    assert transformar(x**2 + y**2 + z**2, sistema('esfericas', 3)) == RHO**4 * sp.sin(PHI)
+    assert transformar(x * y, sistema('cartesianas', 2)) == x * y
+    with pytest.raises(ValueError):
+        sistema('esfericas', 2)
+
+
+def test_sugerir_coordenadas():
+    assert sugerir_coordenadas(sp.exp(-(x**2 + y**2)), 2) == 'polares'
+    assert sugerir_coordenadas(x * y, 2) is None
+    assert sugerir_coordenadas(sp.sqrt(x**2 + y**2 + z**2), 3) == 'esfericas'
+    assert sugerir_coordenadas(z * sp.sqrt(x**2 + y**2), 3) == 'cilindricas'
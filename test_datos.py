@@ -0,0 +1,47 @@
+"""
+Pruebas de la carga de datos medidos como integrandos
+"""
+import numpy as np
+import pytest
+
+import motor
+from datos import cargar_rejilla
+
+
+def rejilla(filas=33, columnas=65):
+    """Alturas z = x·y medidas sobre [0, 2] × [0, 1]."""
+    xs, ys = np.linspace(0, 2, columnas), np.linspace(0, 1, filas)
+    return xs[None, :] * ys[:, None]
+
+
+def test_csv_grande_se_convierte_y_se_proyecta(tmp_path):
+    Z = rejilla()
+    ruta = tmp_path / "alturas.csv"
+    np.savetxt(ruta, Z, delimiter=';', header="z = x*y")
+
+    pequeno = cargar_rejilla(str(ruta))
+    grande = cargar_rejilla(str(ruta), max_csv_en_memoria=100)
+    assert not isinstance(pequeno, np.memmap) and isinstance(grande, np.memmap)
+    assert np.allclose(pequeno, Z) and np.allclose(grande, Z)
+    assert (tmp_path / "alturas.csv.npy").exists()
+
+
+def test_integrar_datos_con_superficie_inferior(tmp_path):
+    ruta = tmp_path / "alturas.npy"
+    np.save(ruta, rejilla())
+
+    # ∫₀² ∫₀¹ (x·y − x/4) dy dx = 1 − 1/2
+    resultado = motor.integrar_datos(str(ruta), '0', '2', '0', '1', regla='simpson', z_inferior='x/4')
+    assert resultado.nivel == motor.NIVEL_NUMERICO
+    assert abs(resultado.valor - 0.5) < 1e-12
+
+    X, Y, Z, Z_inferior = motor.malla_datos(str(ruta), 0, 2, 0, 1, z_inferior='x/4', max_lado=10)
+    assert Z.shape == Z_inferior.shape and Z.shape[0] <= 11
+    assert np.allclose(Z_inferior, X / 4)
+
+    # Una rejilla con huecos no se integra como si valieran cero
+    Z = rejilla()
+    Z[3, 5:8] = np.nan
+    np.save(ruta, Z)
+    with pytest.raises(ValueError, match="3 de"):
+        motor.integrar_datos(str(ruta), '0', '2', '0', '1')
@@ -0,0 +1,60 @@
+"""
+Pruebas del gradiente, la hessiana, los puntos críticos y los multiplicadores de Lagrange
+"""
+import numpy as np
+import pytest
+import sympy as sp
+
+from derivadas import (analizar_diferencial, campo_gradiente, MAXIMO, MINIMO,
+                       multiplicadores_lagrange, SILLA)
+from expresiones import compilar
+from integracion import NIVEL_NUMERICO, NIVEL_SIMBOLICO
+
+x, y = sp.symbols('x y')
+
+
+def test_nucleo_fusionado_de_derivadas():
+    func = sp.exp(x * y) * sp.sin(x)
+    gradiente, hessiana = compilar(func, (x, y)).derivadas()
+    assert gradiente == [sp.diff(func, x), sp.diff(func, y)]
+    esperados = [func, *gradiente, hessiana[0, 0], hessiana[0, 1], hessiana[1, 1]]
+
+    # Una llamada devuelve f, ∇f y la hessiana, con la forma de la malla
+    X, Y, Z, U, V = campo_gradiente(func, x, y, -1, 1, 0, 2, 7)
+    valores = compilar(func, (x, y)).nucleo_derivadas(X, Y)
+    assert len(valores) == 6 and all(v.shape == (7, 7) for v in valores)
+    for valor, expr in zip(valores, esperados):
+        assert np.allclose(valor, sp.lambdify((x, y), expr)(X, Y))
+    assert np.allclose(U, valores[1]) and np.allclose(V, valores[2])
+
+    # Las derivadas constantes también se extienden a toda la malla
+    assert compilar(x**2 + y, (x, y)).nucleo_derivadas(X, Y)[5].shape == (7, 7)
+
+
+@pytest.mark.parametrize('plazo,nivel', [(5.0, NIVEL_SIMBOLICO), (0, NIVEL_NUMERICO)])
+def test_puntos_criticos_clasificados(plazo, nivel):
+    # Con plazo 0 los puntos salen solo de Newton desde la rejilla de semillas
+    analisis = analizar_diferencial(x**3 - 3 * x + y**2, x, y, -3, 3, -3, 3, plazo=plazo)
+    assert analisis.nivel == nivel
+    assert [(p.x, p.y, p.tipo) for p in analisis.puntos] == [
+        pytest.approx((1.0, 0.0, MINIMO)), pytest.approx((-1.0, 0.0, SILLA))]
+    assert analisis.puntos[0].valor == pytest.approx(-2.0)
+
+    # Los puntos fuera de la región se descartan; una curva de puntos críticos se informa
+    assert analizar_diferencial(x**3 - 3 * x + y**2, x, y, 0, 3, -1, 1).puntos[0].tipo == MINIMO
+    assert analizar_diferencial(x**2, x, y, -1, 1, -1, 1).no_aislados == ['x = 0']
+
+
+def test_multiplicadores_de_lagrange():
+    analisis = multiplicadores_lagrange(x * y, x**2 + y**2 - 2, x, y, -2, 2, -2, 2)
+    assert analisis.nivel == NIVEL_SIMBOLICO
+    extremos = sorted((p.x, p.y, p.tipo, p.multiplicador) for p in analisis.puntos)
+    assert extremos == [pytest.approx((-1.0, -1.0, MAXIMO, 0.5)),
+                        pytest.approx((-1.0, 1.0, MINIMO, -0.5)),
+                        pytest.approx((1.0, -1.0, MINIMO, -0.5)),
+                        pytest.approx((1.0, 1.0, MAXIMO, 0.5))]
+
+    # Sin SymPy, Newton en (x, y, λ) halla los mismos extremos con valores de f
+    numerico = multiplicadores_lagrange(x + y, x**2 + y**2 - 1, x, y, -2, 2, -2, 2, plazo=0)
+    assert [(p.tipo, p.valor) for p in numerico.puntos] == [
+        (MINIMO, pytest.approx(-np.sqrt(2))), (MAXIMO, pytest.approx(np.sqrt(2)))]
@@ -0,0 +1,105 @@
+"""
+Pruebas del ejecutor de tareas en procesos trabajadores
+"""
+import time
+
+import sympy as sp
+
+from ejecucion import EjecutorTareas
+
+
+def esperar(ejecutor, limite=60):
+    inicio = time.time()
+    while ejecutor.procesar_pendientes() and time.time() - inicio < limite:
+        time.sleep(0.01)
+
+
+def test_resultado_y_error():
+    x = sp.symbols('x')
+    ejecutor = EjecutorTareas(max_procesos=2)
+    resultados, errores = [], []
+    try:
+        ejecutor.enviar('area', sp.integrate, x**2, (x, 0, 3),
+                        al_terminar=resultados.append)
+        ejecutor.enviar('fallo', int, 'no es un número', al_fallar=errores.append)
+        esperar(ejecutor)
+    finally:
+        ejecutor.cerrar()
+    assert resultados == [9]
+    assert len(errores) == 1 and isinstance(errores[0], ValueError)
+
+
+def test_cancelar_tarea_en_curso():
+    ejecutor = EjecutorTareas(max_procesos=1)
+    resultados = []
+    try:
+        ejecutor.enviar('lenta', time.sleep, 30, al_terminar=resultados.append)
+        assert ejecutor.en_curso('lenta')
+        assert ejecutor.cancelar('lenta')
+        assert not ejecutor.en_curso('lenta')
+
+        # El grupo sigue disponible después de cancelar
+        ejecutor.enviar('rapida', abs, -3, al_terminar=resultados.append)
+        esperar(ejecutor)
+    finally:
+        ejecutor.cerrar()
+    assert resultados == [3]
+
+
+def test_reemplazo_por_clave():
+    ejecutor = EjecutorTareas(max_procesos=2)
+    resultados = []
+    try:
+        ejecutor.enviar('tab', time.sleep, 30, al_terminar=resultados.append)
+        ejecutor.enviar('tab', abs, -5, al_terminar=resultados.append)
+        esperar(ejecutor)
+    finally:
+        ejecutor.cerrar()
+    assert resultados == [5]
+
+
+def test_resultados_parciales_de_generador():
+    ejecutor = EjecutorTareas(max_procesos=1)
+    parciales, finales = [], []
+    try:
+        ejecutor.enviar('grafico', 'motor.malla_adaptativa', 'sin(10*x)*cos(10*y)',
+                        -1, 1, -1, 1, 2500,
+                        al_progreso=parciales.append, al_terminar=finales.append)
+        esperar(ejecutor)
+    finally:
+        ejecutor.cerrar()
+    assert finales == [None]
+    assert parciales and parciales[-1][2].size <= 2500
+
+
+def test_perfil_de_etapas():
+    ejecutor = EjecutorTareas(max_procesos=1)
+    perfiles, finales = [], []
+    try:
+        ejecutor.enviar('volumen', 'motor.calcular_volumen', 'x**2*y + 1', 0, 1, 0, 1,
+                        plazo=0, al_perfil=perfiles.append, al_terminar=finales.append)
+        esperar(ejecutor)
+    finally:
+        ejecutor.cerrar()
+    assert len(finales) == 1 and len(perfiles) == 1
+    nombres = [evento['nombre'] for evento in perfiles[0]]
+    assert {'sympify', 'lambdify', 'cubatura'} <= set(nombres)
+    assert all(evento['duracion'] >= 0 and evento['memoria'] >= 0 for evento in perfiles[0])
+
+
+def test_envio_diferido_reemplaza_tareas_obsoletas():
+    ejecutor = EjecutorTareas(max_procesos=1)
+    resultados = []
+    inicio = time.time()
+    try:
+        ejecutor.enviar('vivo', time.sleep, 30, al_terminar=resultados.append)
+        # Varias pulsaciones seguidas: solo se envía la última
+        for valor in (-1, -2, -3):
+            ejecutor.enviar_diferido('vivo', 200, abs, valor, al_terminar=resultados.append)
+            ejecutor.procesar_pendientes()
+        assert ejecutor.en_curso('vivo')
+        esperar(ejecutor)
+    finally:
+        ejecutor.cerrar()
+    # La tarea lenta se terminó al enviar la nueva, sin esperar a que acabe
+    assert resultados == [3] and time.time() - inicio < 20
@@ -0,0 +1,87 @@
+"""
+Pruebas de la caché de expresiones compiladas
+"""
+import numpy as np
+import sympy as sp
+
+import pytest
+
+from expresiones import (analizar_limite, backend_activo, backend_disponible, BACKENDS,
+                         CacheExpresiones, comparar_backends, compilar, _NucleoConRespaldo)
+
+x, y = sp.symbols('x y')
+
+
+def test_aciertos_y_normalizacion():
+    cache = CacheExpresiones()
+    primera = cache.obtener("x * y", (x, y))
+    segunda = cache.obtener("x*y", (x, y))
+    assert primera is segunda
+    assert primera.expr == x*y
+    assert cache.aciertos == 1 and cache.fallos == 1
+
+    # Las mismas variables en otro orden son otra entrada
+    cache.obtener("x*y", (y, x))
+    assert cache.fallos == 2
+
+    # Se analiza el texto original: un espacio entre nombres o números no desaparece
+    cache.obtener("xy", (x, y))
+    for texto in ("x y", "2 3"):
+        with pytest.raises(sp.SympifyError):
+            cache.obtener(texto, (x, y))
+
+    # compilar rechaza los símbolos que no son variables de la función
+    with pytest.raises(ValueError, match="desconocidas: a"):
+        compilar("a*x", (x, y))
+
+
+def test_nucleo_y_antiderivada():
+    cache = CacheExpresiones()
+    entrada = cache.obtener("x**2 + y", (x, y))
+    assert entrada.nucleo is entrada.nucleo
+    assert np.allclose(entrada.nucleo(np.array([1.0, 2.0]), 1.0), [2.0, 5.0])
+    assert sp.simplify(entrada.antiderivada(x) - (x**3/3 + x*y)) == 0
+
+
+def test_limite_lru():
+    cache = CacheExpresiones(max_entradas=2)
+    cache.obtener("x", (x,))
+    cache.obtener("x + 1", (x,))
+    cache.obtener("x", (x,))        # "x" pasa a ser la más reciente
+    cache.obtener("x + 2", (x,))    # expulsa "x + 1"
+    assert cache.estadisticas()['entradas'] == 2
+    cache.obtener("x", (x,))
+    assert cache.aciertos == 2
+    cache.obtener("x + 1", (x,))
+    assert cache.fallos == 4
+
+
+def test_analizar_limite():
+    assert analizar_limite("pi / 2") == sp.pi / 2
+    assert analizar_limite("sqrt(2)") == sp.sqrt(2)
+    assert analizar_limite(3) == 3
+    for invalido in ("x + 1", "oo", "sqrt(-1)"):
+        with pytest.raises(ValueError):
+            analizar_limite(invalido)
+
+
+def test_backends_con_respaldo(monkeypatch):
+    monkeypatch.setenv('CALCULADORA_BACKEND', 'auto')
+    assert backend_disponible(backend_activo())
+    monkeypatch.setenv('CALCULADORA_BACKEND', 'inexistente')
+    assert backend_activo() == 'numpy'
+
+    # Cada backend (o NumPy en su lugar) da los mismos valores
+    entrada = CacheExpresiones().obtener("exp(-x**2)*cos(y)", (x, y))
+    X, Y = np.meshgrid(np.linspace(0, 1, 5), np.linspace(0, 1, 4), sparse=True)
+    for backend in BACKENDS:
+        assert np.allclose(entrada.nucleo_con(backend)(X, Y), np.exp(-X**2) * np.cos(Y))
+
+    def falla(*args):
+        raise TypeError("función no admitida")
+    nucleo = _NucleoConRespaldo(falla, lambda a: a + 1)
+    assert nucleo(1) == 2 and nucleo.rapido is None
+
+    resultados = comparar_backends("x*y", (x, y), puntos=10**4)
+    assert resultados['numpy']['diferencia'] == 0
+    assert all((r is None) == (not backend_disponible(b)) for b, r in resultados.items())
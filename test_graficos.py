@@ -0,0 +1,81 @@
+"""
+Pruebas del gestor de gráficos con redibujado incremental
+"""
+import numpy as np
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+from graficos import GestorGraficos, MODO_CAMPO, MODO_CURVA, MODO_REGION
+
+
+def crear_gestor():
+    fig = Figure(figsize=(4, 3), dpi=50)
+    return GestorGraficos(fig, FigureCanvasAgg(fig))
+
+
+def test_superficie_reutiliza_artistas():
+    gestor = crear_gestor()
+    xs = np.linspace(-1, 1, 10)
+    X, Y = np.meshgrid(xs, xs)
+    gestor.superficie(X, Y, X**2 + Y**2, 'viridis', 'primera')
+    ax, plano, barra = gestor._ax, gestor._plano, gestor._colorbar
+
+    gestor.superficie(X, Y, np.sin(X), 'plasma', 'segunda')
+    assert gestor._ax is ax and gestor._plano is plano and gestor._colorbar is barra
+    assert len(ax.collections) == 2
+    assert ax.get_title() == 'segunda'
+    assert len(gestor.tiempos) == 2
+
+    # Otros límites de x e y rehacen el plano, pero no los ejes
+    gestor.superficie(2 * X, Y, X, 'viridis', 'tercera')
+    assert gestor._ax is ax and gestor._plano is not plano
+    assert ax.get_xlim() == (-2.0, 2.0)
+
+    # Un volumen entre superficies dibuja la inferior en lugar del plano
+    gestor.superficie(X, Y, 1 + X**2, 'viridis', 'entre', Z_inferior=-1 - Y**2)
+    assert len(ax.collections) == 2
+    assert ax.get_zlim() == (-2.0, 2.0)
+
+
+def test_region_actualiza_curvas():
+    gestor = crear_gestor()
+    xs = np.linspace(0, 2, 20)
+    gestor.region(xs, xs**2, 0 * xs, 'y = x**2', 'y = 0')
+    linea = gestor._linea_sup
+    gestor.region(xs, 2 * xs, xs**2, 'y = 2*x', 'y = x**2')
+    assert gestor.modo == MODO_REGION
+    assert gestor._linea_sup is linea
+    assert np.allclose(linea.get_ydata(), 2 * xs)
+    assert gestor._ax.get_legend().get_texts()[0].get_text() == 'y = 2*x'
+
+
+def test_curva_de_barrido():
+    gestor = crear_gestor()
+    xs = np.linspace(0, 2, 10)
+    gestor.curva(xs, xs**2, 'x_max', '∬', 'Barrido')
+    linea = gestor._linea_sup
+    gestor.curva(xs, xs**3, 'y_max', '∬', 'Barrido')
+    assert gestor.modo == MODO_CURVA and gestor._linea_sup is linea
+    assert np.allclose(linea.get_ydata(), xs**3)
+    assert gestor._ax.get_xlabel() == 'y_max'
+
+
+def test_campo_de_gradiente():
+    gestor = crear_gestor()
+    xs = np.linspace(-2, 2, 60)
+    X, Y = np.meshgrid(xs, xs)
+    puntos = [(1.0, 0.0, 'mínimo local'), (-1.0, 0.0, 'punto de silla')]
+    gestor.campo(X, Y, X**3 - 3 * X + Y**2, 3 * X**2 - 3, 2 * Y, 'f', puntos,
+                 G=X**2 + Y**2 - 1)
+    ax, barra = gestor._ax, gestor._colorbar
+    assert gestor.modo == MODO_CAMPO
+    # Curvas de nivel, flechas (submuestreadas), restricción y un grupo por tipo
+    assert len(gestor._campo) == 5
+    assert gestor._campo[1].U.size == 20 * 20
+    assert [t.get_text() for t in ax.get_legend().get_texts()] == ['mínimo local',
+                                                                  'punto de silla']
+
+    gestor.campo(X, Y, X * Y, Y, X, 'g')
+    assert gestor._ax is ax and gestor._colorbar is barra
+    assert len(gestor._campo) == 2 and ax.get_legend() is None
+    assert ax.get_title() == 'g'
@@ -0,0 +1,146 @@
+"""
+Pruebas del motor de integración por niveles
+"""
+import math
+
+import numpy as np
+import sympy as sp
+
+from expresiones import compilar
+from integracion import (barrer_limite, cubatura_gauss_kronrod, cubatura_lote,
+                         cubatura_triple, integrar_doble, integrar_region, integrar_simple,
+                         integrar_triple, NIVEL_SIMBOLICO, NIVEL_NUMERICO)
+
+x, y = sp.symbols('x y')
+
+
+def test_cubatura_rectangulo():
+    valor, error = cubatura_gauss_kronrod(lambda X, Y: X**2 + Y**2, 0, 2, 0, 2)
+    assert abs(valor - 32 / 3) < 1e-10
+    assert error < 1e-10
+
+    valor, _ = cubatura_gauss_kronrod(lambda X, Y: 3.0, 0, 1, 0, 2)
+    assert abs(valor - 6) < 1e-12
+
+
+def test_cubatura_exponencial():
+    valor, error = cubatura_gauss_kronrod(lambda X, Y: 2.718281828459045**(-(X**2 + Y**2)),
+                                          -2, 2, -2, 2)
+    esperado = math.pi * math.erf(2)**2
+    assert abs(valor - esperado) < 1e-9
+    assert error < 1e-8
+
+
+def test_nivel_simbolico():
+    resultado = integrar_doble(x*y, x, y, 0, 1, 0, 1)
+    assert resultado.nivel == NIVEL_SIMBOLICO
+    assert resultado.exacto == sp.Rational(1, 4)
+    assert resultado.valor == 0.25
+    assert resultado.tiempo >= 0
+
+
+def test_antiderivada_reutilizada_al_cambiar_limites():
+    func = x**3 * sp.exp(y)
+    integrar_doble(func, x, y, 0, 1, 0, 1)
+    # Es separable: se guarda la antiderivada de cada factor
+    assert compilar(x**3, (x,)).tiene_antiderivada(x)
+    assert compilar(sp.exp(y), (y,)).tiene_antiderivada(y)
+
+    # Sin plazo no se podría integrar: solo se sustituyen los nuevos límites
+    resultado = integrar_doble(func, x, y, 0, 2, 0, sp.log(3), plazo=0)
+    assert resultado.nivel == NIVEL_SIMBOLICO
+    assert resultado.exacto == 8
+
+
+def test_antiderivada_discontinua():
+    # La antiderivada de SymPy salta en x = pi; la integral definida no
+    resultado = integrar_simple(1 / (2 + sp.cos(x)), x, 0, 2 * sp.pi)
+    assert resultado.nivel == NIVEL_SIMBOLICO
+    assert abs(resultado.valor - 2 * math.pi / math.sqrt(3)) < 1e-12
+
+
+def test_nivel_numerico_sin_plazo():
+    resultado = integrar_doble(sp.sqrt(x**2 + y**2), x, y, 0, 1, 0, 1, plazo=0)
+    assert resultado.nivel == NIVEL_NUMERICO
+    assert resultado.exacto is None
+    # (√2 + asinh(1)) / 3
+    esperado = (math.sqrt(2) + math.asinh(1)) / 3
+    assert abs(resultado.valor - esperado) < 1e-8
+
+
+def test_cubatura_lote():
+    rects = [(0, 1, 0, 1), (0, 2, 0, 1), (-1, 1, -1, 1)]
+    valores, errores = cubatura_lote(lambda X, Y: np.exp(X * Y), rects)
+    for (a, b, c, d), valor in zip(rects, valores):
+        esperado, _ = cubatura_gauss_kronrod(lambda X, Y: np.exp(X * Y), a, b, c, d)
+        assert abs(valor - esperado) < 1e-9
+    assert np.all(errores < 1e-9)
+
+
+def test_barrido_simbolico_y_numerico():
+    valores = np.linspace(0, 2, 5)
+    barrido = barrer_limite(x*y, x, y, 0, 1, 0, 1, 'x_max', valores)
+    assert barrido.nivel == NIVEL_SIMBOLICO
+    assert np.allclose(barrido.resultados, valores**2 / 4)
+    assert barrido.exacto == sp.Symbol('x_max')**2 / 4
+
+    barrido = barrer_limite(sp.sqrt(x**2 + y**2), x, y, 0, 1, 0, 1, 'y_max', [0.5, 1.0],
+                            plazo=0)
+    assert barrido.nivel == NIVEL_NUMERICO and barrido.exacto is None
+    assert abs(barrido.resultados[1] - (math.sqrt(2) + math.asinh(1)) / 3) < 1e-8
+
+    # La antiderivada de 1/(2 + cos(x)) salta de rama en x = pi: se recurre a la cubatura
+    barrido = barrer_limite(1 / (2 + sp.cos(x)), x, y, 0, 1, 0, 1, 'x_max', np.linspace(1, 6, 6))
+    assert barrido.nivel == NIVEL_NUMERICO
+    esperados = [2 / math.sqrt(3) * math.atan(math.tan(t / 2) / math.sqrt(3))
+                 + (2 * math.pi / math.sqrt(3) if t > math.pi else 0) for t in range(1, 7)]
+    assert np.allclose(barrido.resultados, esperados)
+
+
+def test_region_tipo_i_y_ii():
+    # Disco unidad como región de tipo I: área pi en ambos niveles
+    borde = sp.sqrt(1 - x**2)
+    for plazo in (None, 0):
+        resultado = integrar_region(sp.Integer(1), x, y, -1, 1, -borde, borde, plazo=plazo)
+        assert abs(resultado.valor - math.pi) < 1e-9
+
+    # Tipo II: x entre y**2 e y, con y en [0, 1]
+    resultado = integrar_region(x*y, y, x, 0, 1, y**2, y, plazo=0)
+    assert resultado.nivel == NIVEL_NUMERICO
+    assert abs(resultado.valor - 1 / 24) < 1e-12
+
+
+def test_precision_arbitraria():
+    # Exacto: evalf con las cifras pedidas
+    resultado = integrar_doble(x*y, x, y, 0, 1, 0, sp.pi, digitos=40)
+    assert resultado.valor_preciso == str((sp.pi**2 / 4).evalf(40))
+
+    # Numérico: mpmath hasta alcanzar las cifras, también en una región
+    esperado = ((sp.sqrt(2) + sp.asinh(1)) / 3).evalf(30)
+    resultado = integrar_doble(sp.sqrt(x**2 + y**2), x, y, 0, 1, 0, 1, plazo=0, digitos=20)
+    assert resultado.nivel == NIVEL_NUMERICO and resultado.digitos == 20
+    assert abs(sp.Float(resultado.valor_preciso, 20) - esperado) < 1e-18
+    assert resultado.error < 1e-19
+
+    resultado = integrar_region(x*y, y, x, 0, 1, y**2, y, plazo=0, digitos=25)
+    assert abs(sp.Float(resultado.valor_preciso, 25) - sp.Rational(1, 24)) < 1e-24
+
+
+def test_integral_triple():
+    z = sp.Symbol('z')
+    resultado = integrar_triple(x*y*z, x, y, z, 0, 1, 0, 1, 0, 2)
+    assert resultado.nivel == NIVEL_SIMBOLICO and resultado.exacto == sp.Rational(1, 2)
+
+    # Sólido con límites variables por el nivel numérico: bola unidad
+    borde_y = sp.sqrt(1 - x**2)
+    borde_z = sp.sqrt(1 - x**2 - y**2)
+    resultado = integrar_triple(sp.Integer(1), x, y, z, -1, 1, -borde_y, borde_y,
+                                -borde_z, borde_z, plazo=0)
+    assert resultado.nivel == NIVEL_NUMERICO
+    assert abs(resultado.valor - 4 * math.pi / 3) < 1e-4
+
+    # Repartir las cajas entre hilos no cambia el resultado
+    f = compilar(sp.exp(-x * y * z), (x, y, z)).nucleo
+    uno = cubatura_triple(f, (0, 1, 0, 2, 0, 3), tol=1e-12, hilos=1)
+    varios = cubatura_triple(f, (0, 1, 0, 2, 0, 3), tol=1e-12, hilos=4)
+    assert abs(uno[0] - varios[0]) < 1e-14 and uno[1] < 1e-10
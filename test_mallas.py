@@ -0,0 +1,84 @@
+"""
+Pruebas de la evaluación de mallas y del muestreo adaptativo
+"""
+import numpy as np
+import pytest
+import sympy as sp
+
+from mallas import (evaluar_malla, evaluar_por_bloques, integrar_rejilla, malla_en_disco,
+                    pesos_cuadratura, refinar_malla, submuestrear)
+
+x, y = sp.symbols('x y')
+
+
+def error_interpolacion(X, Y, Z, f):
+    """Error máximo de la interpolación bilineal de la malla frente a f."""
+    finos = np.linspace(-1, 1, 201)
+    filas = np.array([np.interp(finos, X[0], fila) for fila in Z])
+    interpolado = np.array([np.interp(finos, Y[:, 0], filas[:, k]) for k in range(len(finos))]).T
+    F, G = np.meshgrid(finos, finos)
+    return np.abs(interpolado - f(F, G)).max()
+
+
+def test_superficie_suave_no_se_refina():
+    niveles = list(refinar_malla(x + y, x, y, -1, 1, -1, 1, 10000))
+    assert len(niveles) == 1
+    assert niveles[0][2].shape == (15, 15)
+
+
+def test_refinamiento_respeta_presupuesto_y_mejora():
+    func = sp.exp(-50*(x**2 + y**2))
+    f = sp.lambdify((x, y), func)
+    niveles = list(refinar_malla(func, x, y, -1, 1, -1, 1, 2500))
+    assert niveles[0][2].size < niveles[-1][2].size <= 2500
+
+    adaptativa = error_interpolacion(*niveles[-1], f)
+    uniforme = error_interpolacion(*evaluar_malla(func, x, y, -1, 1, -1, 1, 50), f)
+    assert adaptativa < uniforme / 2
+
+
+def test_evaluacion_por_bloques_en_disco(tmp_path):
+    nucleo = sp.lambdify((x, y), sp.sin(x) * sp.cos(y))
+    xs, ys = np.linspace(0, np.pi, 301), np.linspace(0, np.pi / 2, 201)
+    X, Y = np.meshgrid(xs, ys)
+
+    # Bloques más pequeños que una fila y de varias filas dan lo mismo
+    for tamano in (100, 1000):
+        destino = malla_en_disco(tmp_path / f"z{tamano}.npy", len(ys), len(xs))
+        Z = evaluar_por_bloques(nucleo, xs, ys, destino, tamano=tamano)
+        assert np.allclose(Z, nucleo(X, Y))
+        assert abs(integrar_rejilla(Z, xs, ys, tamano=tamano) - 2) < 1e-4
+    assert np.load(tmp_path / "z100.npy", mmap_mode='r').shape == (201, 301)
+
+    Xr, Yr, Zr = submuestrear(xs, ys, Z, 50)
+    assert Zr.shape[0] <= 51 and Zr.shape[1] <= 51
+    assert (Xr[0, -1], Yr[-1, 0]) == (xs[-1], ys[-1])
+
+
+def test_reglas_de_cuadratura_y_su_error():
+    xs, ys = np.linspace(0, 1, 129), np.linspace(0, 2, 65)
+    Z = np.exp(xs)[None, :] * np.cos(ys)[:, None]
+    exacto = (np.e - 1) * np.sin(2)
+
+    errores = []
+    for regla in ('trapecio', 'simpson', 'romberg'):
+        valor, estimado = integrar_rejilla(Z, xs, ys, tamano=500, regla=regla, error=True)
+        real = abs(valor - exacto)
+        # La estimación acota el error real sin exagerarlo
+        assert real <= 2 * estimado + 1e-14 and estimado < 10 * real + 1e-13
+        errores.append(real)
+    assert errores[0] > 1000 * errores[1] > 1000 * errores[2]
+
+    with pytest.raises(ValueError):
+        pesos_cuadratura(np.linspace(0, 1, 100), 'romberg')
+
+
+def test_singularidades_de_la_malla_no_se_dibujan():
+    X, Y, Z = evaluar_malla(1 / sp.sqrt(x), x, y, 0, 1, 0, 1, 11)
+    assert np.isnan(Z[:, 0]).all()
+    assert np.isfinite(Z[:, 1:]).all()
+
+    # La cuadratura no los cuenta como cero: informa de cuántos son
+    valor, error, no_finitos = integrar_rejilla(Z, X[0], Y[:, 0], error=True, no_finitos=True)
+    assert np.isnan(valor) and np.isnan(error) and no_finitos == 11
+    assert integrar_rejilla(Z[:, 1:], X[0, 1:], Y[:, 0], no_finitos=True)[1] == 0
@@ -0,0 +1,50 @@
+"""
+Pruebas de la integración de Monte Carlo y cuasi-Monte Carlo
+"""
+import math
+
+import numpy as np
+import sympy as sp
+
+from montecarlo import halton, integrar_montecarlo, sobol
+
+x, y, z = sp.symbols('x y z')
+
+
+def _consumir(generador):
+    """Agota un generador de estimaciones; devuelve (parciales, final)."""
+    parciales = []
+    while True:
+        try:
+            parciales.append(next(generador))
+        except StopIteration as fin:
+            return parciales, fin.value
+
+
+def test_secuencias_baja_discrepancia():
+    assert np.allclose(halton([1, 2, 3], 2), [[0.5, 1 / 3], [0.25, 2 / 3], [0.75, 1 / 9]])
+    puntos = sobol(np.arange(4), 3)
+    assert np.allclose(puntos, [[0, 0, 0], [0.5, 0.5, 0.5], [0.25, 0.75, 0.75], [0.75, 0.25, 0.25]])
+    # Cada potencia de dos de puntos cae una vez en cada intervalo diádico
+    assert sorted(np.floor(sobol(np.arange(8), 3)[:, 2] * 8)) == list(range(8))
+
+
+def test_cuasi_montecarlo_alcanza_el_error():
+    exacto = 2 * 3 * (1 - math.exp(-1))
+    for metodo in ('halton', 'sobol'):
+        parciales, final = _consumir(integrar_montecarlo(
+            sp.exp(-x), (x, y, z), [(0, 1), (0, 2), (0, 3)], metodo=metodo,
+            error_objetivo=1e-5, procesos=1, semilla=1))
+        assert final.terminado and final.metodo == metodo
+        assert final.error <= 1e-5
+        assert abs(final.valor - exacto) < 1e-4
+        assert all(not parcial.terminado for parcial in parciales)
+
+
+def test_montecarlo_en_procesos_es_reproducible():
+    estimar = lambda procesos: _consumir(integrar_montecarlo(
+        x * y, (x, y), [(0, 1), (0, 2)], metodo='mc', error_objetivo=1e-2,
+        procesos=procesos, tamano=2**12, semilla=7))[1]
+    uno, dos = estimar(1), estimar(2)
+    assert (uno.valor, uno.puntos) == (dos.valor, dos.puntos)
+    assert abs(uno.valor - 1) < 5 * uno.error
@@ -0,0 +1,154 @@
+"""
+Pruebas del motor de cálculo sin interfaz y de su CLI
+"""
+import json
+import math
+import subprocess
+import sys
+
+import numpy as np
+import sympy as sp
+
+import pytest
+
+from motor import (analizar_region, calcular_area, calcular_integral_doble, ejecutar_lote,
+                   ejecutar_trabajo, estimar_montecarlo, leer_trabajos, malla_adaptativa,
+                   vista_previa, X, Y)
+
+
+def test_calcular_area():
+    resultado = calcular_area("2*x", "x**2", 0, 2)
+    assert abs(resultado.valor - 4 / 3) < 1e-12
+
+
+def test_limites_exactos():
+    resultado = calcular_integral_doble("sin(x)*cos(y)", "0", "pi/2", "0", "pi/2")
+    assert resultado.exacto == 1
+
+    resultado = calcular_area("1/x", "0", "1", "E")
+    assert resultado.exacto == 1
+
+    resultado = calcular_integral_doble("x", "0", "sqrt(2)", "0", "1")
+    assert resultado.exacto == 1 and isinstance(resultado.exacto, sp.Integer)
+
+    salida = ejecutar_trabajo({'tipo': 'area', 'y_sup': 'x', 'y_inf': '0',
+                               'x_min': 0, 'x_max': 'y'})
+    assert salida['estado'] == 'error'
+
+
+def test_regiones():
+    assert analizar_region(0, 1, "x**2", "x")[:2] == (X, Y)
+    assert analizar_region("y**2", "y", 0, 1)[:2] == (Y, X)
+    with pytest.raises(ValueError):
+        analizar_region("y", 1, "x", 1)
+
+    resultado = calcular_integral_doble("x + y", "y**2", "y", 0, 1)
+    assert resultado.exacto == sp.Rational(3, 20)
+
+    # Fuera del triángulo 0 <= y <= x <= 1 la malla vale NaN
+    *_, (XX, YY, ZZ) = malla_adaptativa("x + y", 0, 1, 0, "x", 400)
+    assert np.all(np.isnan(ZZ[YY > XX + 1e-12]))
+    assert not np.any(np.isnan(ZZ[YY <= XX]))
+
+
+def test_ejecutar_trabajo():
+    salida = ejecutar_trabajo({'id': 7, 'tipo': 'volumen', 'funcion': 'x + y + 1',
+                               'x_min': 0, 'x_max': '2', 'y_min': 0, 'y_max': 2})
+    assert salida['estado'] == 'ok'
+    assert salida['id'] == 7
+    assert abs(salida['valor'] - 12) < 1e-12
+
+    salida = ejecutar_trabajo({'tipo': 'area', 'y_sup': 'exp(x)', 'y_inf': '0',
+                               'x_min': 0, 'x_max': 1, 'digitos': 20})
+    assert salida['valor_preciso'] == '1.7182818284590452354'
+
+    # Los decimales se toman como el racional escrito, no como su Float de 53 bits
+    salida = ejecutar_trabajo({'tipo': 'area', 'y_sup': 'x', 'y_inf': '0',
+                               'x_min': 0, 'x_max': '0.1', 'digitos': 40})
+    assert salida['exacto'] == '1/200'
+    assert salida['valor_preciso'] == '0.005' + '0' * 39
+
+    # Volumen entre dos superficies e integral triple con límites variables
+    salida = ejecutar_trabajo({'tipo': 'volumen', 'funcion': '2 - x**2', 'z_inf': 'y**2',
+                               'x_min': -1, 'x_max': 1, 'y_min': -1, 'y_max': 1})
+    assert abs(salida['valor'] - 16 / 3) < 1e-12
+    salida = ejecutar_trabajo({'tipo': 'triple', 'funcion': '1', 'x_min': 0, 'x_max': 1,
+                               'y_min': 0, 'y_max': 'x', 'z_min': 0, 'z_max': 'x + y'})
+    assert abs(salida['valor'] - 0.5) < 1e-12
+
+    salida = ejecutar_trabajo({'tipo': 'integral', 'funcion': 'x*', 'x_min': 0,
+                               'x_max': 1, 'y_min': 0, 'y_max': 1})
+    assert salida['estado'] == 'error'
+
+
+def test_coordenadas_polares_y_esfericas():
+    # Cono sobre el disco unidad, y disco desplazado r ≤ 2cos(theta)
+    resultado = calcular_integral_doble("sqrt(x**2 + y**2)", 0, 1, 0, "2*pi",
+                                        coordenadas='polares')
+    assert resultado.exacto == 2 * sp.pi / 3
+    resultado = calcular_integral_doble("1", 0, "2*cos(theta)", "-pi/2", "pi/2",
+                                        coordenadas='polares')
+    assert resultado.exacto == sp.pi
+    salida = ejecutar_trabajo({'tipo': 'triple', 'funcion': 'x**2 + y**2 + z**2',
+                               'coordenadas': 'esfericas', 'x_min': 0, 'x_max': '2*pi',
+                               'y_min': 0, 'y_max': 'pi', 'z_min': 0, 'z_max': 1})
+    assert abs(salida['valor'] - 4 * np.pi / 5) < 1e-12
+
+    # Sin forma cerrada a tiempo en cartesianas se sugieren las polares
+    resultado = calcular_integral_doble("sqrt(x**2 + y**2)", -1, 1, "-sqrt(1 - x**2)",
+                                        "sqrt(1 - x**2)", plazo=0.1)
+    assert resultado.nivel == 'numérico'
+    assert resultado.sugerencia == 'polares'
+
+
+def test_montecarlo_con_limites_variables():
+    casos = [("x*y", ('0', '1', '0', 'x'), 1 / 8),
+             ("1", ('0', '1', '0', 'x', '0', 'x + y'), 0.5)]
+    for func_str, limites, exacto in casos:
+        generador = estimar_montecarlo(func_str, limites, error_objetivo=1e-6, procesos=1)
+        try:
+            while True:
+                next(generador)
+        except StopIteration as fin:
+            estimacion = fin.value
+        assert abs(estimacion.valor - exacto) < 1e-5
+
+
+def test_vista_previa_antes_de_la_forma_exacta():
+    generador = vista_previa("x*exp(x*y)", 0, 1, 0, 2, z_inferior='x', plazo=30)
+    parciales = []
+    try:
+        while True:
+            parciales.append(next(generador))
+    except StopIteration as fin:
+        final = fin.value
+    XX, YY, ZZ, abajo = parciales[0]['malla']
+    assert ZZ.shape == (15, 15) and np.allclose(abajo, XX)
+    assert parciales[0]['estimacion'] is None
+    # ∫₀¹ e^{2x} - 1 dx - 2·∫₀¹ x dx
+    exacto = (math.exp(2) - 1) / 2 - 1 - 1
+    assert abs(parciales[-1]['estimacion'].valor - exacto) < 1e-8
+    assert final.exacto is not None and abs(final.valor - exacto) < 1e-12
+
+
+def test_lote_csv(tmp_path):
+    ruta = tmp_path / "trabajos.csv"
+    ruta.write_text("tipo,funcion,y_sup,y_inf,x_min,x_max,y_min,y_max\n"
+                    "integral,x*y,,,0,1,0,1\n"
+                    "area,,x**2,0,0,3,,\n", encoding='utf-8')
+    resultados = {r['id']: r for r in ejecutar_lote(leer_trabajos(str(ruta)), procesos=1)}
+    assert resultados[1]['valor'] == 0.25
+    assert resultados[2]['valor'] == 9
+
+
+def test_cli_sin_tkinter(tmp_path):
+    ruta = tmp_path / "trabajos.jsonl"
+    ruta.write_text(json.dumps({'tipo': 'area', 'y_sup': 'sin(x)', 'y_inf': '0',
+                                'x_min': 0, 'x_max': 3.141592653589793}) + "\n",
+                    encoding='utf-8')
+    codigo = ("import sys, motor; motor.main(sys.argv[1:]); "
+              "assert 'tkinter' not in sys.modules and 'matplotlib' not in sys.modules")
+    proceso = subprocess.run([sys.executable, '-c', codigo, str(ruta), '-p', '1'],
+                             capture_output=True, text=True, check=True)
+    resultado = json.loads(proceso.stdout)
+    assert abs(resultado['valor'] - 2) < 1e-9
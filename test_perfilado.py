@@ -0,0 +1,42 @@
+"""
+Pruebas del perfilador de etapas y de la exportación a traza de Chrome
+"""
+import json
+
+from perfilado import exportar_chrome, Perfilador
+
+
+def test_etapas_anidadas_y_memoria():
+    perfilador = Perfilador()
+    with perfilador.etapa('inactiva'):
+        pass
+    assert perfilador.eventos == []
+
+    perfilador.iniciar()
+    with perfilador.etapa('exterior'):
+        with perfilador.etapa('interior', n=3):
+            bloque = bytearray(2_000_000)
+        del bloque
+    eventos = perfilador.detener()
+    assert not perfilador.activo
+
+    interior, exterior = eventos
+    assert (interior['nombre'], interior['nivel'], interior['args']) == ('interior', 1, {'n': 3})
+    assert exterior['nivel'] == 0
+    assert interior['memoria'] >= 2_000_000 and exterior['memoria'] >= 2_000_000
+    assert exterior['duracion'] >= interior['duracion']
+
+
+def test_traza_chrome(tmp_path):
+    perfilador = Perfilador()
+    perfilador.iniciar(memoria=False)
+    with perfilador.etapa('sympify'):
+        pass
+    perfilador.registrar('canvas.draw', 100.0, 0.25)
+    ruta = tmp_path / "traza.json"
+    exportar_chrome(perfilador.detener(), ruta, {1: 'principal'})
+
+    traza = json.loads(ruta.read_text(encoding='utf-8'))['traceEvents']
+    assert traza[0]['ph'] == 'M'
+    dibujo = traza[-1]
+    assert (dibujo['name'], dibujo['ph'], dibujo['ts'], dibujo['dur']) == ('canvas.draw', 'X', 1e8, 2.5e5)
@@ -0,0 +1,48 @@
+"""
+Pruebas del preprocesado de integrandos
+"""
+import time
+
+import sympy as sp
+
+from integracion import NIVEL_NUMERICO, NIVEL_SIMBOLICO, integrar_doble, integrar_triple
+from preprocesado import canonicalizar, ejecutar_con_plazo, es_barata, preprocesar, separar
+
+x, y, z = sp.symbols('x y z')
+
+
+def test_canonicalizacion_y_separacion():
+    assert canonicalizar(x*y + x) == x * (y + 1)
+    assert canonicalizar(sp.exp(x + y)) == sp.exp(x) * sp.exp(y)
+    assert separar(sp.sin(x) * sp.cos(y) * 3, (x, y)) == (3, sp.sin(x), sp.cos(y))
+    assert separar(x**2 + y**2, (x, y)) is None
+    assert separar(sp.sin(x + y), (x, y)) is None
+    assert preprocesar(x*y + x, (x, y)).factores == (1, x, y + 1)
+    # Un pase que no termina a tiempo se abandona
+    assert ejecutar_con_plazo(sum, (iter(int, 1),), 0.2) is None
+
+    # Pocas operaciones pero grado alto: el pase se hace con plazo
+    grande = x**97 * y**89 - x**13 + y**17 - 2
+    assert es_barata(x*y + x) and not es_barata(grande)
+    inicio = time.perf_counter()
+    assert preprocesar(grande, (x, y), plazo=0.1).factores is None
+    assert time.perf_counter() - inicio < 1
+
+
+def test_integrales_separables():
+    resultado = integrar_doble(sp.exp(x + y), x, y, 0, 1, 0, 2)
+    assert resultado.nivel == NIVEL_SIMBOLICO
+    assert sp.simplify(resultado.exacto - (sp.E - 1) * (sp.E**2 - 1)) == 0
+
+    # Sin plazo, cada factor se integra numéricamente y el error se propaga
+    resultado = integrar_triple(x * sp.exp(-y**2) * sp.cos(z), x, y, z, 0, 1, 0, 1, 0, 1, plazo=0)
+    assert resultado.nivel == NIVEL_NUMERICO
+    esperado = 0.5 * 0.7468241328124271 * 0.8414709848078965
+    assert abs(resultado.valor - esperado) < 1e-10
+    assert resultado.error < 1e-8
+
+    # Los factores comparten el plazo: el total no lo supera (con margen para la cuadratura)
+    factor = sp.exp(-x**4) * sp.sin(x**3) * sp.cos(x)**2 * sp.log(2 + x)
+    inicio = time.perf_counter()
+    integrar_doble(factor * factor.subs(x, y), x, y, 0, 1, 0, 1, plazo=1)
+    assert time.perf_counter() - inicio < 3
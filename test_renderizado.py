@@ -0,0 +1,34 @@
+"""
+Pruebas del renderizado de gráficos sin pantalla
+"""
+from renderizado import plantilla, renderizar_lote, renderizar_trabajo
+
+TRABAJOS = [
+    {'id': 'silla', 'tipo': 'funcion', 'funcion': 'x**2 - y**2',
+     'x_min': -1, 'x_max': 1, 'y_min': -1, 'y_max': 1},
+    {'id': 'cono', 'tipo': 'superficie', 'funcion': '2 - sqrt(x**2 + y**2)', 'z_inf': 'x/4',
+     'x_min': 0, 'x_max': 1, 'y_min': 0, 'y_max': '2*pi', 'coordenadas': 'polares'},
+    {'id': 'region', 'tipo': 'region', 'y_sup': 'sqrt(x)', 'y_inf': 'x**2',
+     'x_min': 0, 'x_max': 1},
+    {'id': 'mal', 'tipo': 'nada'},
+]
+
+
+def test_plantilla_reutilizada(tmp_path):
+    primero = renderizar_trabajo(TRABAJOS[0], tmp_path, dpi=40)
+    ejes = plantilla(dpi=40)._ax
+    segundo = renderizar_trabajo(dict(TRABAJOS[0], id='otra', funcion='sin(x*y)'), tmp_path,
+                                 formato='svg', dpi=40)
+    assert primero['estado'] == segundo['estado'] == 'ok'
+    assert plantilla(dpi=40)._ax is ejes
+    assert (tmp_path / 'silla.png').read_bytes().startswith(b'\x89PNG')
+    assert b'<svg' in (tmp_path / 'otra.svg').read_bytes()[:500]
+
+
+def test_lote_en_procesos(tmp_path):
+    resultados = {r['id']: r for r in renderizar_lote(TRABAJOS, tmp_path / 'imagenes',
+                                                      procesos=2, dpi=40)}
+    assert [resultados[t['id']]['estado'] for t in TRABAJOS] == ['ok', 'ok', 'ok', 'error']
+    assert 'desconocido' in resultados['mal']['mensaje']
+    assert sorted(p.name for p in (tmp_path / 'imagenes').iterdir()) == [
+        'cono.png', 'region.png', 'silla.png']
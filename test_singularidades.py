@@ -0,0 +1,77 @@
+"""
+Pruebas de la detección de singularidades y pliegues y de la división del dominio
+"""
+import math
+import time
+
+import pytest
+import sympy as sp
+
+from integracion import NIVEL_NUMERICO, NIVEL_SIMBOLICO, integrar_doble, integrar_piezas
+from singularidades import dividir_rectangulo
+
+x, y = sp.symbols('x y')
+CUADRADO = ((sp.S(0), sp.S(1)), (sp.S(0), sp.S(1)))
+
+
+def test_division_en_pliegues_y_singularidades():
+    # Abs(x - y): dos triángulos separados por y = x, cada uno con su rama
+    abajo, arriba = dividir_rectangulo(sp.Abs(x - y), x, y, CUADRADO)
+    assert (abajo.func, abajo.limites) == (x - y, ((0, 1), (0, x)))
+    assert (arriba.func, arriba.limites) == (y - x, ((0, 1), (x, 1)))
+
+    # log(x*y): una sola pieza con la singularidad en los bordes x = 0 e y = 0
+    pieza, = dividir_rectangulo(sp.log(x * y), x, y, CUADRADO)
+    assert pieza.func == sp.log(x) + sp.log(y)
+    assert pieza.singulares == ((True, False), (True, False))
+
+    # Una singularidad interior vista a través de Abs corta el rectángulo
+    izquierda, derecha = dividir_rectangulo(1 / sp.sqrt(sp.Abs(x - sp.S(1) / 2)), x, y, CUADRADO)
+    assert izquierda.limites[0] == (0, sp.S(1) / 2) and izquierda.singulares[0] == (False, True)
+
+    assert dividir_rectangulo(x * y, x, y, CUADRADO) is None
+    assert dividir_rectangulo(sp.log(x * y), x, y, ((1, 2), (1, 2))) is None
+
+
+def test_integrales_por_piezas():
+    resultado = integrar_doble(sp.Abs(x - y), x, y, 0, 1, 0, 1)
+    assert resultado.nivel == NIVEL_SIMBOLICO and resultado.exacto == sp.Rational(1, 3)
+    assert resultado.piezas == 2
+
+    # Sin plazo simbólico, el cambio de variable en los bordes singulares
+    # mantiene la cubatura exacta y finita
+    func = sp.log(x * y) * sp.cos(x - y)
+    resultado = integrar_piezas(dividir_rectangulo(func, x, y, CUADRADO), (x, y), plazo=0)
+    referencia = integrar_doble(func, x, y, 0, 1, 0, 1, digitos=20)
+    assert resultado.nivel == NIVEL_NUMERICO
+    assert abs(resultado.valor - referencia.valor) < 1e-8
+
+    func = sp.exp(x) / sp.sqrt(sp.Abs(x - sp.S(1) / 2))
+    resultado = integrar_piezas(dividir_rectangulo(func, x, y, CUADRADO), (x, y), plazo=0)
+    exacto = math.sqrt(math.pi) * math.exp(0.5) * (math.erf(math.sqrt(0.5))
+                                                   + float(sp.erfi(sp.sqrt(sp.S(1) / 2))))
+    assert resultado.piezas == 2 and abs(resultado.valor - exacto) < 1e-9
+
+    # Las piezas comparten el plazo simbólico en lugar de recibir cada una una parte fija
+    func = sp.Abs(x - y) * sp.Abs(x + y - 1) * sp.exp(-x**4 * y**3) * sp.log(2 + x * y)
+    inicio = time.perf_counter()
+    resultado = integrar_doble(func, x, y, 0, 1, 0, 1, plazo=1)
+    assert resultado.piezas == 6 and time.perf_counter() - inicio < 5
+
+
+def test_analisis_con_plazo():
+    # Pocas operaciones, pero sp.solve tarda más de un minuto con el pliegue
+    func = sp.Abs(x**7 + x * y - y**3 - sp.S(1) / 3)
+    inicio = time.perf_counter()
+    assert dividir_rectangulo(func, x, y, CUADRADO, plazo=0) is None
+    assert time.perf_counter() - inicio < 1
+
+    # El análisis se abandona al agotar el plazo y la integral sale por cubatura
+    inicio = time.perf_counter()
+    resultado = integrar_doble(func, x, y, 0, 1, 0, 1, plazo=1)
+    assert resultado.nivel == NIVEL_NUMERICO and time.perf_counter() - inicio < 10
+    assert integrar_doble(func, x, y, 0, 1, 0, 1, plazo=0).valor == pytest.approx(resultado.valor)
+
+    # Sin pliegues ni singularidades que dependan de y, se analiza aun sin plazo
+    pieza, = dividir_rectangulo(sp.exp(y) / sp.sqrt(x), x, y, CUADRADO, plazo=0)
+    assert pieza.singulares == ((True, False), (False, False))